@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, Query, status
+import logging
+from app.utils.profiling import profile_capture, PROFILE_MODES
+from app.utils.responses import ORJSONResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["admin"], default_response_class=ORJSONResponse)
+
+@router.get("/profile")
+async def get_profiles():
+    """Get the profiler status and the most recently captured profiles"""
+    return {"status": profile_capture.status(), "profiles": profile_capture.list_results()}
+
+@router.post("/profile")
+async def start_profiling(
+    requests: int = Query(1, ge=1, le=100, description="Number of requests to profile"),
+    mode: str = Query("cprofile", description=f"Profiler to use: {', '.join(PROFILE_MODES)}"),
+    path_prefix: str = Query("", description="Only profile requests whose path starts with this prefix")
+):
+    """Capture a profile for each of the next N matching requests"""
+    try:
+        profile_capture.arm(requests, mode=mode, path_prefix=path_prefix)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    logger.info("Profiling armed for %d requests (%s, prefix %r)", requests, mode, path_prefix)
+    return profile_capture.status()
+
+@router.delete("/profile")
+async def stop_profiling():
+    """Stop capturing profiles"""
+    profile_capture.disarm()
+    return profile_capture.status()
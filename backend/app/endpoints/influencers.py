@@ -1,27 +1,99 @@
-from fastapi import APIRouter, Query
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Query, BackgroundTasks, HTTPException, Header, Request, Response, status
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from pydantic import BaseModel, Field
 import chromadb
-from sentence_transformers import SentenceTransformer
 import numpy as np
 import logging
+import os
+import threading
+from app.utils.admission import AdmissionGate, Overloaded
+from app.utils.encoders import check_model_name, load_encoder
+from app.utils.reindex import reindex
+from app.utils.index_versions import IndexRegistry, template_hash
+from app.utils.search_cache import SearchCache, etag_matches, version_etag
+from app.utils.suggest import SUGGESTION_FIELDS, SuggestIndex
+from app.utils.influencer_store import InfluencerStore
+from app.utils.lexical import LexicalIndex, reciprocal_rank_fusion
+from app.utils.matching import DEFAULT_WEIGHTS, RosterMatrix, VectorCache, shortlist
+from app.utils.knn_graph import KnnGraph, nearest
+from app.utils.dedup import DedupIndex, MergeCandidate
+from app.utils.snapshots import SNAPSHOT_DTYPES, Snapshot, SnapshotError, write_snapshot
+from app.utils.rate_cards import BASE_CURRENCY, DELIVERABLES, cost_field, parse_budget, parse_deliverables, parse_rate_card, record_costs
+from app.utils.responses import ORJSONResponse, dumps
+from app.utils.logging_config import setup_logging, debug_enabled
+from app.utils.metrics import time_stage, CACHE_LOOKUPS, ERRORS
+from app.utils.tracing import span, start_trace
 
 # Set up logging
-logging.basicConfig(level=logging.INFO)
+setup_logging()
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/influencers", tags=["influencers"])
+router = APIRouter(prefix="/influencers", tags=["influencers"], default_response_class=ORJSONResponse)
 
-# Initialize the sentence transformer model with explicit parameters
+# Sentence transformer model used for embeddings, with a smaller fallback
+MODEL_NAME = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+FALLBACK_MODEL_NAME = 'paraphrase-MiniLM-L3-v2'
+
+# Re-index job settings
+REINDEX_WORKERS = int(os.getenv('REINDEX_WORKERS', 0)) or None
+REINDEX_SHARD_SIZE = int(os.getenv('REINDEX_SHARD_SIZE', 256))
+REINDEX_CHECKPOINT_DIR = os.getenv('REINDEX_CHECKPOINT_DIR', '.reindex_checkpoint')
+
+# Records encoded and added per batch when building an index in-process (kept under ChromaDB's max batch size)
+INDEX_BATCH_SIZE = int(os.getenv('INDEX_BATCH_SIZE', 4096))
+
+# Directory for a persistent ChromaDB store (in-memory if unset)
+CHROMA_PERSIST_DIR = os.getenv('CHROMA_PERSIST_DIR', '')
+
+# Index snapshot to start from when no complete index version is stored (see GET /influencers/index/snapshot)
+INDEX_SNAPSHOT_PATH = os.getenv('INDEX_SNAPSHOT_PATH', '')
+
+# Set by the pre-fork server: ChromaDB's client can't be used across fork(), so
+# the client and index are created in each worker by initialize_vector_db()
+DEFER_VECTOR_DB_INIT = os.getenv('DEFER_VECTOR_DB_INIT', 'false').lower() == 'true'
+
+# Set by the pre-fork server: every worker holds its own copy of the roster and index,
+# so upserts, re-indexes and index rebuilds would only reach the worker serving them
+ROSTER_READ_ONLY = os.getenv('ROSTER_READ_ONLY', 'false').lower() == 'true'
+
+# Search response cache settings
+SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', 1024))
+SEARCH_CACHE_TTL = float(os.getenv('SEARCH_CACHE_TTL', 300))
+SEARCH_CACHE_MAX_AGE = int(os.getenv('SEARCH_CACHE_MAX_AGE', 60))
+
+# Admission control for the CPU-bound encode/query stages of uncached searches
+SEARCH_MAX_CONCURRENCY = int(os.getenv('SEARCH_MAX_CONCURRENCY', 0)) or os.cpu_count() or 1
+SEARCH_MAX_QUEUE = int(os.getenv('SEARCH_MAX_QUEUE', 32))
+SEARCH_BATCH_MAX_QUEUE = int(os.getenv('SEARCH_BATCH_MAX_QUEUE', 8))
+
+# Hybrid search: reciprocal rank fusion damping constant and the BM25 ranking's weight relative to the vector ranking
+SEARCH_FUSION_K = float(os.getenv('SEARCH_FUSION_K', 60))
+SEARCH_LEXICAL_WEIGHT = float(os.getenv('SEARCH_LEXICAL_WEIGHT', 1.0))
+
+# Neighbours precomputed per influencer for /similar, and the memory one block of the graph build may use
+SIMILAR_GRAPH_K = int(os.getenv('SIMILAR_GRAPH_K', 20))
+SIMILAR_GRAPH_BLOCK_MB = int(os.getenv('SIMILAR_GRAPH_BLOCK_MB', 64))
+SIMILAR_GRAPH_PRECOMPUTE = os.getenv('SIMILAR_GRAPH_PRECOMPUTE', 'true').lower() == 'true'
+
+# Near-duplicate detection: how alike two records' names, handles and descriptions (estimated Jaccard
+# similarity of their shingles) and embeddings (cosine similarity) must be to be reported as one creator
+DEDUP_JACCARD_THRESHOLD = float(os.getenv('DEDUP_JACCARD_THRESHOLD', 0.6))
+DEDUP_COSINE_THRESHOLD = float(os.getenv('DEDUP_COSINE_THRESHOLD', 0.8))
+
+# Initialize the embedding encoder (the sentence transformer, or the hashing encoder when EMBEDDING_ENCODER=hashing)
 try:
     logger.info("Loading sentence transformer model...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    logger.info("Model loaded successfully")
+    model = load_encoder(MODEL_NAME)
+    model_name = model.name
+    logger.info("Model %s loaded successfully", model_name)
 except Exception as e:
     logger.error(f"Error loading model: {e}")
     # Fallback to a simpler model if the first one fails
     try:
-        model = SentenceTransformer('paraphrase-MiniLM-L3-v2')
+        model = load_encoder(FALLBACK_MODEL_NAME)
+        model_name = model.name
         logger.info("Fallback model loaded successfully")
     except Exception as e2:
         logger.error(f"Error loading fallback model: {e2}")
@@ -127,14 +199,84 @@ influencers = [
     }
 ]
 
+# Pydantic model for an influencer record
+class Influencer(BaseModel):
+    id: int
+    name: str
+    platforms: List[str]
+    category: str
+    followers: int
+    engagement_rate: float
+    region: str
+    rate_card: str
+    contact: str
+    description: Optional[str] = None
+
+# Pydantic model for a search result
+class InfluencerSearchResult(Influencer):
+    similarity_score: float
+
+# Pydantic model for a campaign brief to match against the roster
+class CampaignBrief(BaseModel):
+    brand_name: Optional[str] = Field(None, description="Name of the brand")
+    campaign_name: str = Field(..., description="Name of the campaign")
+    description: Optional[str] = Field(None, description="What the campaign is about and who it should reach")
+    deliverables: str = Field(..., description="Campaign deliverables, e.g. '2 Instagram posts, 1 YouTube video'")
+    timeline: str = Field(..., description="Campaign timeline")
+    budget_range: str = Field(..., description="Total budget for the campaign, e.g. '$10,000 - $20,000'")
+    category: Optional[str] = Field(None, description="Only match influencers in this category")
+    region: Optional[str] = Field(None, description="Only match influencers from this region")
+    platform: Optional[str] = Field(None, description="Only match influencers active on this platform")
+    min_followers: Optional[int] = Field(None, ge=0, description="Minimum follower count")
+    limit: int = Field(20, ge=1, le=200, description="Maximum number of influencers on the shortlist")
+    weights: Optional[Dict[str, float]] = Field(None, description="Weights of the relevance, engagement, reach and value scores")
+
+# Indexed roster store; its version is part of the search cache key
+influencer_store = InfluencerStore(influencers)
+
+# BM25 index over names, handles, descriptions and rate cards, for queries embeddings handle poorly
+lexical_index = LexicalIndex(influencers)
+
+# Autocomplete over names, categories, regions and platforms
+suggest_index = SuggestIndex(influencers)
+
+# MinHash/LSH index for spotting the same creator listed twice, e.g. by different agencies
+dedup_index = DedupIndex(influencers, jaccard_threshold=DEDUP_JACCARD_THRESHOLD, cosine_threshold=DEDUP_COSINE_THRESHOLD)
+
+# Cache of serialized search responses
+search_cache = SearchCache(max_entries=SEARCH_CACHE_SIZE, ttl_seconds=SEARCH_CACHE_TTL)
+
+# Bounds concurrent searches; interactive searches are admitted ahead of batch/planner ones
+search_gate = AdmissionGate(
+    "search",
+    max_concurrent=SEARCH_MAX_CONCURRENCY,
+    max_queue={"interactive": SEARCH_MAX_QUEUE, "batch": SEARCH_BATCH_MAX_QUEUE}
+)
+
 # Initialize ChromaDB for vector search
-chroma_client = chromadb.Client()
+def create_chroma_client():
+    return chromadb.PersistentClient(path=CHROMA_PERSIST_DIR) if CHROMA_PERSIST_DIR else chromadb.Client()
 
-# Try to get the collection if it exists, otherwise create it
-try:
-    influencer_collection = chroma_client.get_collection(name="influencers")
-except Exception:
-    influencer_collection = chroma_client.create_collection(name="influencers")
+chroma_client = None if DEFER_VECTOR_DB_INIT else create_chroma_client()
+
+# Versioned influencer collections, one per (model, description template) pair
+index_registry = IndexRegistry(chroma_client, model_loader=load_encoder, prefix="influencers")
+index_registry.register_model(model_name, model)
+
+# Roster embeddings computed ahead of the index build, shared copy-on-write by pre-forked workers
+precomputed_embeddings: Optional[Dict[str, Any]] = None
+
+# Dense embedding matrix and features of the roster for campaign matching, built from the active index on first use
+roster_matrix: Optional[RosterMatrix] = None
+roster_matrix_lock = threading.Lock()
+
+# Encoded campaign briefs, so edits to a brief's budget or deliverables don't re-run the model
+brief_vectors = VectorCache()
+
+# k-nearest-neighbour graph for /similar and the roster matrix it was built from
+similar_graph: Optional[KnnGraph] = None
+similar_graph_matrix: Optional[RosterMatrix] = None
+similar_graph_building = threading.Lock()
 
 # Generate comprehensive descriptions for embedding
 def generate_influencer_description(influencer: Dict[str, Any]) -> str:
@@ -162,134 +304,1155 @@ def generate_influencer_description(influencer: Dict[str, Any]) -> str:
         
     return desc
 
+def influencer_metadata(influencer: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert an influencer record into ChromaDB-compatible metadata"""
+    # Create a copy of the influencer data with platform list converted to string
+    metadata = influencer.copy()
+    metadata["platforms"] = ", ".join(metadata["platforms"])
+    # Convert all values to strings to ensure compatibility
+    for key, value in metadata.items():
+        if not isinstance(value, str):
+            metadata[key] = str(value)
+    # Parsed rate-card costs stay numeric so the vector query can filter on them
+    metadata.update(record_costs(influencer.get("rate_card")))
+    return metadata
+
+def index_template_hash() -> str:
+    """Hash of everything an index version is built from besides the model"""
+    return template_hash(generate_influencer_description, influencer_metadata)
+
+def roster_documents():
+    """Build the IDs, embedding texts and metadata for every influencer"""
+    roster = influencer_store.all()
+    ids = [str(influencer["id"]) for influencer in roster]
+    # Create rich descriptions for better semantic search
+    descriptions = [generate_influencer_description(inf) for inf in roster]
+    # Convert complex data types to strings for ChromaDB compatibility
+    metadatas = [influencer_metadata(inf) for inf in roster]
+    return ids, descriptions, metadatas
+
+def precompute_embeddings():
+    """Encode the roster now so index builds reuse the vectors instead of re-encoding"""
+    global precomputed_embeddings
+    ids, descriptions, _ = roster_documents()
+    with span("encode", records=len(descriptions)):
+        embeddings = np.asarray(model.encode(descriptions), dtype=np.float32)
+    precomputed_embeddings = {"model_name": model_name, "ids": ids, "embeddings": embeddings}
+    logger.info("Precomputed %d roster embeddings with %s", len(ids), model_name)
+
+def populate_in_process(collection, version_model_name: str, version_model):
+    """Fill an index collection by encoding the roster in this process"""
+    with span("describe"):
+        ids, descriptions, metadatas = roster_documents()
+    logger.info(f"Generated {len(descriptions)} descriptions for embedding")
+
+    # Reuse precomputed vectors if they match this model and roster
+    precomputed = precomputed_embeddings
+    if precomputed is not None and (precomputed["model_name"] != version_model_name or precomputed["ids"] != ids):
+        precomputed = None
+
+    # Encode and add in batches so large rosters don't hold every embedding at once
+    logger.info("Encoding descriptions and adding them to ChromaDB...")
+    for start in range(0, len(ids), INDEX_BATCH_SIZE):
+        end = start + INDEX_BATCH_SIZE
+        if precomputed is not None:
+            embeddings = precomputed["embeddings"][start:end].tolist()
+        else:
+            with span("encode", records=len(descriptions[start:end])):
+                embeddings = version_model.encode(descriptions[start:end]).tolist()
+        with span("index_add"):
+            collection.add(
+                ids=ids[start:end],
+                embeddings=embeddings,
+                metadatas=metadatas[start:end]
+            )
+    logger.info(f"Successfully added {len(ids)} influencers to the vector database")
+
+def populate_from_snapshot(snapshot: Snapshot):
+    """Return a populate function that fills an index collection from a snapshot's embeddings
+
+    Influencers missing from the snapshot (e.g. added to the roster since it
+    was taken) are encoded; everyone else's vector is read from the mapped file.
+    """
+    def populate(collection, version_model_name: str, version_model):
+        ids, descriptions, metadatas = roster_documents()
+        encoded = 0
+        for start in range(0, len(ids), INDEX_BATCH_SIZE):
+            end = min(start + INDEX_BATCH_SIZE, len(ids))
+            positions = np.array([snapshot.positions.get(id_str, -1) for id_str in ids[start:end]])
+            known = positions >= 0
+            embeddings = np.empty((end - start, snapshot.dimension), dtype=np.float32)
+            with span("snapshot_read", records=int(known.sum())):
+                embeddings[known] = snapshot.vectors(positions[known])
+            if not known.all():
+                missing = np.flatnonzero(~known)
+                with span("encode", records=len(missing)):
+                    embeddings[missing] = version_model.encode([descriptions[start + row] for row in missing])
+                encoded += len(missing)
+            with span("index_add"):
+                collection.add(ids=ids[start:end], embeddings=embeddings.tolist(), metadatas=metadatas[start:end])
+        logger.info(f"Added {len(ids)} influencers from snapshot {snapshot.path} ({encoded} encoded)")
+    return populate
+
+def populate_with_pool(workers: Optional[int] = None):
+    """Return a populate function that encodes the roster with the re-index process pool"""
+    def populate(collection, version_model_name: str, version_model):
+        ids, descriptions, metadatas = roster_documents()
+        reindex(
+            collection,
+            ids,
+            descriptions,
+            metadatas,
+            model_name=version_model_name,
+            workers=workers or REINDEX_WORKERS,
+            shard_size=REINDEX_SHARD_SIZE,
+            checkpoint_dir=REINDEX_CHECKPOINT_DIR
+        )
+    return populate
+
+def catch_up_changes(collection, version_model_name: str, version_model, ids):
+    """Re-index influencers upserted while an index version was being built, before it is swapped in"""
+    records = [record for record in (influencer_store.get(int(id_str)) for id_str in ids) if record is not None]
+    for start in range(0, len(records), INDEX_BATCH_SIZE):
+        batch = records[start:start + INDEX_BATCH_SIZE]
+        with span("encode", records=len(batch)):
+            embeddings = version_model.encode([generate_influencer_description(record) for record in batch])
+        collection.upsert(
+            ids=[str(record["id"]) for record in batch],
+            embeddings=np.asarray(embeddings, dtype=np.float32).tolist(),
+            metadatas=[influencer_metadata(record) for record in batch]
+        )
+    logger.info(f"Caught up {len(records)} influencers changed while building an index version")
+
+def restore_snapshot(path: str) -> bool:
+    """Restore the roster from a snapshot and build the index from its embeddings
+
+    Returns:
+        False if the snapshot was taken with another model or description template, so it can't be served
+
+    Raises:
+        SnapshotError: If the file is truncated, corrupt or of an unknown format
+    """
+    with span("snapshot_open"):
+        snapshot = Snapshot.open(path)
+    current_template = index_template_hash()
+    if snapshot.model_name != model_name or snapshot.template_hash != current_template:
+        logger.warning(
+            f"Ignoring snapshot {path}: built with {snapshot.model_name} (template {snapshot.template_hash}), "
+            f"serving {model_name} (template {current_template})"
+        )
+        return False
+    try:
+        changed = [record for record in snapshot.records() if influencer_store.get(record["id"]) != record]
+        if changed:
+            with span("snapshot_roster", records=len(changed)):
+                influencer_store.upsert(changed)
+                lexical_index.upsert(changed)
+                suggest_index.upsert(changed)
+                dedup_index.upsert(changed)
+        index_registry.build(model_name, current_template, populate_from_snapshot(snapshot), catch_up_changes)
+    finally:
+        snapshot.close()
+    logger.info(f"Restored {len(snapshot)} influencers and their embeddings from snapshot {path}")
+    return True
+
+def export_snapshot(dtype: str = "float16") -> Iterator[bytes]:
+    """Stream a snapshot of the roster and the active index version's embeddings
+
+    Embeddings are read from the collection in batches as the file is
+    written. The version stays pinned while streaming; a record upserted
+    meanwhile may be exported with its previous embedding.
+    """
+    with index_registry.acquire() as version:
+        records = influencer_store.all()
+        ids = [str(record["id"]) for record in records]
+
+        def batches() -> Iterator[np.ndarray]:
+            for start in range(0, len(ids), INDEX_BATCH_SIZE):
+                batch_ids = ids[start:start + INDEX_BATCH_SIZE]
+                stored = version.collection.get(ids=batch_ids, include=["embeddings"])
+                rows = dict(zip(stored["ids"], stored["embeddings"]))
+                if len(rows) != len(batch_ids):
+                    raise SnapshotError(f"{len(batch_ids) - len(rows)} influencers are missing from index version {version.key}")
+                yield np.asarray([rows[id_str] for id_str in batch_ids], dtype=np.float32)
+
+        header = {"model_name": version.model_name, "template_hash": version.template_hash,
+                  "version_key": version.key, "roster_version": influencer_store.version}
+        yield from write_snapshot(ids, records, batches(), version.model.dimension, header, dtype=dtype)
+
 # Initialize the vector database with influencer data
 def initialize_vector_db():
+    with start_trace("initialize_vector_db") as trace:
+        _initialize_vector_db()
+    logger.info("Vector database initialized in %.1f ms", trace.duration_ms, extra={"trace": trace.to_dict()})
+    if SIMILAR_GRAPH_PRECOMPUTE and index_registry.active is not None:
+        start_similar_graph_build()
+
+def _initialize_vector_db():
+    global chroma_client
+    if chroma_client is None:
+        chroma_client = index_registry.chroma_client = create_chroma_client()
+
+    if index_registry.active is not None:
+        logger.info(f"Index version {index_registry.active.key} is already active, skipping initialization")
+        return
+
+    current_template = index_template_hash()
+    wanted_key = IndexRegistry.version_key(model_name, current_template)
+
+    # Serve whatever a persistent store already holds, rebuilding in the background if it is stale
     try:
-        # First check if collection already has data
-        existing_count = len(influencer_collection.get(include=[])['ids'])
-        if existing_count > 0:
-            logger.info(f"Collection already contains {existing_count} items, skipping initialization")
-            return
+        existing = index_registry.load_existing(wanted_key)
     except Exception as e:
-        logger.warning(f"Error checking collection: {e}, will proceed with initialization")
+        logger.warning(f"Error loading existing index versions: {e}, will proceed with initialization")
+        existing = None
+    if existing is not None:
+        if existing.key != wanted_key:
+            logger.info(f"Index version {existing.key} is stale, building {wanted_key} in the background")
+            index_registry.build_in_background(model_name, current_template, populate_with_pool(), catch_up_changes)
+        return
     
+    # A snapshot from another node skips encoding the roster
+    if INDEX_SNAPSHOT_PATH and os.path.exists(INDEX_SNAPSHOT_PATH):
+        try:
+            if restore_snapshot(INDEX_SNAPSHOT_PATH):
+                return
+        except SnapshotError as e:
+            logger.error(f"Error loading index snapshot: {e}, will encode the roster instead")
+
     logger.info("Initializing vector database with influencer data...")
-    
-    # Generate IDs and descriptions
-    ids = [str(influencer["id"]) for influencer in influencers]
-    
-    # Create rich descriptions for better semantic search
-    descriptions = [generate_influencer_description(inf) for inf in influencers]
-    logger.info(f"Generated {len(descriptions)} descriptions for embedding")
-    
-    # Generate embeddings
-    logger.info("Encoding descriptions with the model...")
-    embeddings = model.encode(descriptions).tolist()
-    logger.info("Encoding complete")
-    
-    # Convert complex data types to strings for ChromaDB compatibility
-    metadatas = []
-    for influencer in influencers:
-        # Create a copy of the influencer data with platform list converted to string
-        metadata = influencer.copy()
-        metadata["platforms"] = ", ".join(metadata["platforms"])
-        # Convert all values to strings to ensure compatibility
-        for key, value in metadata.items():
-            if not isinstance(value, str):
-                metadata[key] = str(value)
-        metadatas.append(metadata)
-    
-    # Add documents to the collection
-    logger.info("Adding data to ChromaDB collection...")
     try:
-        influencer_collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            metadatas=metadatas
-        )
-        logger.info(f"Successfully added {len(ids)} influencers to the vector database")
+        index_registry.build(model_name, current_template, populate_in_process, catch_up_changes)
     except Exception as e:
         logger.error(f"Error adding data to collection: {e}")
         raise
 
+def stored_embeddings(version):
+    """Look up influencers' embeddings in an index version by ID, for confirming duplicates"""
+    def lookup(record_ids: List[int]) -> Dict[int, Any]:
+        stored = version.collection.get(ids=[str(record_id) for record_id in record_ids], include=["embeddings"])
+        return {int(id_str): embedding for id_str, embedding in zip(stored["ids"], stored["embeddings"])}
+    return lookup
+
+def upsert_influencers(records: List[Dict[str, Any]], dedup: str = "off") -> Tuple[int, List[MergeCandidate]]:
+    """Insert or replace influencers in the roster and the active index
+
+    Args:
+        records: Influencer records
+        dedup: "off", "report" to also return records that look like an influencer already in the
+            roster (or earlier in the batch) as merge candidates, or "skip" to leave those records out
+
+    Returns:
+        Number of records upserted, and the merge candidates found
+    """
+    if not records:
+        return 0, []
+
+    # A version swap waits for the write, so it lands in whichever version ends up serving
+    with index_registry.writing(), index_registry.acquire() as version:
+        descriptions = [generate_influencer_description(record) for record in records]
+        embeddings = np.asarray(version.model.encode(descriptions), dtype=np.float32)
+
+        candidates: List[MergeCandidate] = []
+        if dedup != "off":
+            with span("dedup"):
+                candidates = dedup_index.find(records, embeddings, stored_embeddings(version))
+            if dedup == "skip" and candidates:
+                duplicates = {candidate.record_id for candidate in candidates}
+                keep = [row for row, record in enumerate(records) if record["id"] not in duplicates]
+                records, embeddings = [records[row] for row in keep], embeddings[keep]
+            if candidates:
+                logger.info(f"Found {len(candidates)} likely duplicates in a batch of {len(descriptions)} influencers")
+        if not records:
+            return 0, candidates
+
+        influencer_store.upsert(records)
+        lexical_index.upsert(records)
+        suggest_index.upsert(records)
+        dedup_index.upsert(records)
+
+        ids = [str(record["id"]) for record in records]
+        index_registry.note_changes(ids)
+        version.collection.upsert(
+            ids=ids,
+            embeddings=embeddings.tolist(),
+            metadatas=[influencer_metadata(record) for record in records]
+        )
+        with roster_matrix_lock:
+            if roster_matrix is not None and roster_matrix.version_key == version.key:
+                roster_matrix.upsert(records, embeddings)
+                if similar_graph is not None and similar_graph_matrix is roster_matrix:
+                    similar_graph.update(roster_matrix, [record["id"] for record in records])
+
+    # Every cached search may now be stale
+    search_cache.invalidate()
+    logger.info(f"Upserted {len(records)} influencers (roster version {influencer_store.version})")
+    return len(records), candidates
+
+def find_duplicates() -> List[MergeCandidate]:
+    """Every pair of influencers in the roster that look like the same creator"""
+    with index_registry.acquire() as version:
+        return dedup_index.report(stored_embeddings(version))
+
+def current_roster_matrix(version) -> RosterMatrix:
+    """Return the roster matrix for an index version, loading it from the version's collection if needed"""
+    global roster_matrix
+    with roster_matrix_lock:
+        if roster_matrix is not None and roster_matrix.version_key == version.key:
+            return roster_matrix
+        with span("roster_matrix_load"):
+            records = influencer_store.all()
+            matrix = RosterMatrix(version.model.dimension, version_key=version.key, capacity=max(len(records), 1))
+            by_id = {str(record["id"]): record for record in records}
+            ids = list(by_id)
+            for start in range(0, len(ids), INDEX_BATCH_SIZE):
+                stored = version.collection.get(ids=ids[start:start + INDEX_BATCH_SIZE], include=["embeddings"])
+                if len(stored["ids"]):
+                    matrix.upsert([by_id[id_str] for id_str in stored["ids"]], np.asarray(stored["embeddings"]))
+        logger.info("Loaded %d roster embeddings for matching from index version %s", len(matrix), version.key)
+        roster_matrix = matrix
+        return matrix
+
+def build_similar_graph() -> bool:
+    """Build the neighbour graph over the active index version's embeddings
+
+    The graph is built from a snapshot without blocking upserts, then caught up
+    on whatever changed meanwhile before it replaces the previous one.
+
+    Returns:
+        False if a build was already running
+    """
+    global similar_graph, similar_graph_matrix
+    if not similar_graph_building.acquire(blocking=False):
+        return False
+    try:
+        with index_registry.acquire() as version:
+            matrix = current_roster_matrix(version)
+        ids, embeddings, generation = matrix.snapshot()
+        graph = KnnGraph(k=SIMILAR_GRAPH_K, max_block_bytes=SIMILAR_GRAPH_BLOCK_MB * 1024 * 1024)
+        with start_trace("similar_graph_build") as trace:
+            graph.build(ids, embeddings)
+        with roster_matrix_lock:
+            graph.update(matrix, matrix.changed_since(generation))
+            similar_graph, similar_graph_matrix = graph, matrix
+        logger.info("Built the similar-influencer graph over %d influencers in %.1f ms", len(graph), trace.duration_ms)
+        return True
+    finally:
+        similar_graph_building.release()
+
+def _run_similar_graph_build():
+    try:
+        build_similar_graph()
+    except Exception as e:
+        logger.error(f"Error building the similar-influencer graph: {e}")
+
+def start_similar_graph_build() -> bool:
+    """Build the neighbour graph in a background thread
+
+    Returns:
+        False if a build was already running, in which case no thread is started
+    """
+    if similar_graph_building.locked():
+        return False
+    threading.Thread(target=_run_similar_graph_build, name="similar-graph-build", daemon=True).start()
+    return True
+
+def find_similar(influencer_id: int) -> Optional[List[Any]]:
+    """Exact neighbours of an influencer by brute force, used until the graph is ready
+
+    Returns:
+        (influencer ID, similarity) pairs, best first, or None if the influencer isn't indexed
+    """
+    with index_registry.acquire() as version:
+        matrix = current_roster_matrix(version)
+    if similar_graph_matrix is not matrix:
+        start_similar_graph_build()
+    return nearest(matrix, influencer_id, SIMILAR_GRAPH_K)
+
+# State of the background re-index job
+reindex_lock = threading.Lock()
+reindex_status: Dict[str, Any] = {"running": False, "last_count": None, "last_error": None}
+
+def reindex_influencers(workers: Optional[int] = None) -> int:
+    """Re-embed the whole roster with a process pool and upsert it into the active collection
+
+    Progress is checkpointed to REINDEX_CHECKPOINT_DIR, so a run interrupted by a
+    crash picks up from the last completed shard instead of starting over.
+    """
+    ids, descriptions, metadatas = roster_documents()
+
+    with index_registry.acquire() as version:
+        return reindex(
+            version.collection,
+            ids,
+            descriptions,
+            metadatas,
+            model_name=version.model_name,
+            workers=workers or REINDEX_WORKERS,
+            shard_size=REINDEX_SHARD_SIZE,
+            checkpoint_dir=REINDEX_CHECKPOINT_DIR
+        )
+
+def _run_reindex_job(workers: Optional[int]):
+    """Run a re-index job and record its outcome in reindex_status"""
+    try:
+        reindex_status["last_count"] = reindex_influencers(workers)
+        reindex_status["last_error"] = None
+    except Exception as e:
+        logger.error(f"Re-index failed: {e}")
+        reindex_status["last_error"] = str(e)
+    finally:
+        reindex_status["running"] = False
+        reindex_lock.release()
+
 # Initialize the vector database on module import
 # Only run this in production, not during testing
-if __name__ != "__main__":
+if __name__ != "__main__" and not DEFER_VECTOR_DB_INIT:
     initialize_vector_db()
 
-@router.get("/", response_model=List[Dict[str, Any]])
-async def get_influencers():
-    """Get all influencers"""
-    return influencers
+def project(record: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the requested fields of a record"""
+    if not fields:
+        return record
+    return {field: record[field] for field in fields if field in record}
 
-@router.get("/search")
-async def search_influencers(q: str = Query(..., description="Natural language search query")):
-    """Search influencers using natural language and vector embeddings with cosine similarity"""
-    logger.info(f"Received search query: {q}")
-    
-    # Encode the query
-    logger.info("Encoding search query...")
-    query_embedding = model.encode(q).tolist()
-    
-    # Search in the collection with cosine similarity
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated fields= projection, rejecting unknown field names"""
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in Influencer.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return requested
+
+def validate_deliverable(deliverable: str):
+    if deliverable not in DELIVERABLES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown deliverable {deliverable}; expected one of {', '.join(DELIVERABLES)}"
+        )
+
+def roster_filters(
+    category: Optional[str] = Query(None, description="Only return influencers in this category"),
+    region: Optional[str] = Query(None, description="Only return influencers from this region"),
+    platform: Optional[str] = Query(None, description="Only return influencers active on this platform"),
+    min_followers: Optional[int] = Query(None, ge=0, description="Minimum follower count"),
+    max_followers: Optional[int] = Query(None, ge=0, description="Maximum follower count"),
+    min_engagement: Optional[float] = Query(None, ge=0, description="Minimum engagement rate (%)"),
+    deliverable: str = Query("post", description="Deliverable the cost filters apply to: post, video, tweet, ..."),
+    min_cost: Optional[float] = Query(None, ge=0, description="Minimum cost of the deliverable in USD"),
+    max_cost: Optional[float] = Query(None, ge=0, description="Maximum cost of the deliverable in USD"),
+    sort: str = Query("id", description="Sort field: id, followers, engagement_rate or cost_per_<deliverable>"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="Sort order"),
+) -> Dict[str, Any]:
+    """Structured roster filters shared by the listing and export endpoints"""
+    if sort not in InfluencerStore.SORT_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot sort by {sort}; expected one of {', '.join(InfluencerStore.SORT_FIELDS)}"
+        )
+    validate_deliverable(deliverable)
+    return {
+        "category": category,
+        "region": region,
+        "platform": platform,
+        "min_followers": min_followers,
+        "max_followers": max_followers,
+        "min_engagement": min_engagement,
+        "deliverable": deliverable,
+        "min_cost": min_cost,
+        "max_cost": max_cost,
+        "sort": sort,
+        "descending": order == "desc",
+    }
+
+def roster_headers(request: Request, index: bool = False) -> Dict[str, str]:
+    """Conditional request headers for a GET response computed from the roster alone
+
+    The strong ETag combines the roster's content fingerprint, with ``index``
+    the active index version too, and the path and query, so it changes
+    exactly when the response would and is the same from every worker serving
+    the same roster; clients revalidate on every use (``no-cache``).
+    """
+    active = index_registry.active if index else None
+    etag = version_etag(
+        influencer_store.fingerprint,
+        active.key if active else "",
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+    )
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+def not_modified(request: Request, headers: Dict[str, str]) -> Optional[Response]:
+    """A 304 response when the request's If-None-Match matches the ETag in ``headers``"""
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
+
+@router.get("/", response_model=List[Influencer])
+async def get_influencers(
+    request: Request,
+    filters: Dict[str, Any] = Depends(roster_filters),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of influencers per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+):
+    """Get a page of influencers
+
+    The next page's cursor is returned in the X-Next-Cursor header (and a Link
+    header); it is absent on the last page. Records come straight from the
+    store, so the response is serialized without re-validating each one.
+    Pages carry an ETag of the roster version; a matching If-None-Match is
+    answered with 304 before the page is read.
+    """
+    projection = parse_fields(fields)
+    headers = roster_headers(request)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+    try:
+        page, next_cursor = influencer_store.query(limit=limit, cursor=cursor, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return ORJSONResponse([project(record, projection) for record in page], headers=headers)
+
+@router.get("/export")
+async def export_influencers(
+    request: Request,
+    filters: Dict[str, Any] = Depends(roster_filters),
+    format: str = Query("ndjson", pattern="^(json|ndjson)$", description="Export format"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+):
+    """Stream every matching influencer as a JSON array or newline-delimited JSON"""
+    projection = parse_fields(fields)
+    headers = roster_headers(request)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+    records = influencer_store.iter_query(**filters)
+
+    def ndjson():
+        for record in records:
+            yield dumps(project(record, projection)) + b"\n"
+
+    def json_array():
+        yield b"["
+        for i, record in enumerate(records):
+            yield (b"," if i else b"") + dumps(project(record, projection))
+        yield b"]"
+
+    if format == "ndjson":
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson", headers=headers)
+    return StreamingResponse(json_array(), media_type="application/json", headers=headers)
+
+@router.get("/{influencer_id}/rates")
+async def get_influencer_rates(request: Request, influencer_id: int):
+    """Get an influencer's rate card parsed into per-deliverable prices, with USD equivalents"""
+    headers = roster_headers(request)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+    influencer = influencer_store.get(influencer_id)
+    if influencer is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Influencer {influencer_id} not found"
+        )
+    return ORJSONResponse({
+        "id": influencer_id,
+        "rate_card": influencer["rate_card"],
+        "base_currency": BASE_CURRENCY,
+        "prices": [price.to_dict() for price in parse_rate_card(influencer["rate_card"])],
+    }, headers=headers)
+
+@router.get("/{influencer_id}/similar", response_model=List[InfluencerSearchResult])
+async def get_similar_influencers(
+    request: Request,
+    influencer_id: int,
+    limit: int = Query(10, ge=1, le=50, description="Number of lookalikes to return (at most SIMILAR_GRAPH_K)"),
+    category: Optional[str] = Query(None, description="Only return influencers in this category"),
+    region: Optional[str] = Query(None, description="Only return influencers from this region"),
+):
+    """Get the influencers most similar to one influencer
+
+    Served from the precomputed neighbour graph; until the graph has been
+    built for the active index version, neighbours are computed exactly by
+    brute force. The X-Similar-Source header says which was used.
+    """
+    headers = roster_headers(request, index=True)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+    if influencer_store.get(influencer_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Influencer {influencer_id} not found"
+        )
+    graph = similar_graph
+    if graph is not None and similar_graph_matrix is roster_matrix:
+        source = "graph"
+        neighbours = graph.neighbours(influencer_id)
+    else:
+        source = "exact"
+        neighbours = await run_in_threadpool(find_similar, influencer_id)
+
+    results = []
+    for neighbour_id, similarity in neighbours or []:
+        record = influencer_store.get(neighbour_id)
+        if record is None or (category and record["category"] != category) or (region and record["region"] != region):
+            continue
+        results.append({**record, "similarity_score": similarity})
+        if len(results) == limit:
+            break
+    return ORJSONResponse(results, headers={**headers, "X-Similar-Source": source})
+
+@router.get("/duplicates")
+async def get_duplicates(request: Request):
+    """List pairs of influencers in the roster that look like the same creator, as merge candidates"""
+    headers = roster_headers(request)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+    candidates = await run_in_threadpool(find_duplicates)
+    return ORJSONResponse({"count": len(candidates), "candidates": [candidate.to_dict() for candidate in candidates]},
+                          headers=headers)
+
+def writable_roster():
+    """Reject requests that change the roster or its index when ROSTER_READ_ONLY is set"""
+    if ROSTER_READ_ONLY:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The roster is read-only in pre-forked workers; update it and restart the server"
+        )
+
+@router.post("/", dependencies=[Depends(writable_roster)])
+async def upsert_influencers_endpoint(
+    records: List[Influencer],
+    dedup: str = Query("off", pattern="^(off|report|skip)$", description="Check the batch for near-duplicates of known influencers: off, report them, or skip them"),
+):
+    """Insert or update influencers and index them for search
+
+    With dedup on, each incoming record that looks like an influencer already
+    in the roster (or an earlier record of the batch) is returned as a merge
+    candidate; with dedup=skip those records aren't upserted.
+    """
+    count, candidates = upsert_influencers([record.model_dump() for record in records], dedup=dedup)
+    response = {"message": f"Upserted {count} influencers", "roster_version": influencer_store.version}
+    if dedup != "off":
+        response["merge_candidates"] = [candidate.to_dict() for candidate in candidates]
+    return response
+
+@router.post("/reindex", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(writable_roster)])
+async def start_reindex(background_tasks: BackgroundTasks, workers: Optional[int] = Query(None, ge=1, description="Number of worker processes")):
+    """Start re-embedding the whole roster in the background"""
+    if not reindex_lock.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A re-index is already running"
+        )
+    reindex_status["running"] = True
+    background_tasks.add_task(_run_reindex_job, workers)
+    return {"message": "Re-index started", "records": len(influencer_store)}
+
+@router.get("/reindex")
+async def get_reindex_status():
+    """Get the status of the background re-index job"""
+    return reindex_status
+
+@router.get("/index")
+async def get_index_status():
+    """Get the active index version and any version being built"""
+    return index_registry.status()
+
+@router.post("/index/rebuild", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(writable_roster)])
+async def rebuild_index(
+    model: Optional[str] = Query(None, description="Embedding model for the new version (defaults to the active model)"),
+    workers: Optional[int] = Query(None, ge=1, description="Number of worker processes")
+):
+    """Build a new index version in the background and switch search over once it is complete"""
+    active = index_registry.active
+    new_model_name = model or (active.model_name if active else model_name)
     try:
-        results = influencer_collection.query(
-            query_embeddings=[query_embedding],
-            n_results=10,  # Get more results initially to calculate similarity scores
-            include=["metadatas", "distances"]  # Include distances for similarity calculation
+        check_model_name(new_model_name)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    current_template = index_template_hash()
+    key = IndexRegistry.version_key(new_model_name, current_template)
+
+    if active is not None and active.key == key:
+        return {"message": "Index version is already active", "key": key}
+    if not index_registry.build_in_background(new_model_name, current_template, populate_with_pool(workers), catch_up_changes):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An index version is already being built"
         )
-        logger.info(f"Vector search completed with {len(results['ids'][0])} results")
+    return {"message": "Index build started", "key": key}
+
+@router.get("/index/snapshot")
+async def get_index_snapshot(
+    request: Request,
+    dtype: str = Query("float16", pattern=f"^({'|'.join(SNAPSHOT_DTYPES)})$", description="Storage type of the embeddings"),
+):
+    """Stream a snapshot of the roster and the active index, for starting another node with INDEX_SNAPSHOT_PATH"""
+    active = index_registry.active
+    if active is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="No index version is active")
+    headers = roster_headers(request, index=True)
+    # Each export stamps its own created_at, so equal snapshots aren't byte for byte the same
+    headers["ETag"] = "W/" + headers["ETag"]
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+    headers["Content-Disposition"] = f'attachment; filename="influencers-{active.key}-{dtype}.snapshot"'
+    return StreamingResponse(export_snapshot(dtype), media_type="application/octet-stream", headers=headers)
+
+def hydrate_results(ranked_ids: List[str], similarity: Dict[str, float], top_k: int, verbose: bool = False) -> List[Dict[str, Any]]:
+    """Copies of the first ``top_k`` ranked influencers that have a similarity score, with the score added"""
+    matched_influencers = []
+    for id_str in ranked_ids:
+        score = similarity.get(id_str)
+        try:
+            influencer = influencer_store.get(int(id_str))
+        except (ValueError, TypeError):
+            # Skip if ID can't be converted to int
+            continue
+        if influencer is not None and score is not None:
+            # Add a copy of the influencer with the similarity score
+            influencer_copy = influencer.copy()
+            influencer_copy["similarity_score"] = score
+            matched_influencers.append(influencer_copy)
+            if verbose:
+                logger.debug("Match: %s with similarity score %.4f", influencer['name'], score)
+        if len(matched_influencers) == top_k:
+            break
+    return matched_influencers
+
+def search_stages(
+    q: str,
+    top_k: int = 2,
+    category: Optional[str] = None,
+    region: Optional[str] = None,
+    mode: str = "hybrid",
+    max_cost: Optional[float] = None,
+    deliverable: str = "post",
+    sort: str = "relevance",
+    preview: bool = True
+) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """Run a search, yielding each stage's top influencers with similarity scores as soon as it is ready
+
+    With ``preview``, a ``("vector", hits)`` stage is yielded as soon as the
+    vector query returns, ranked by vector similarity alone; the search ends
+    with a ``("results", top results)`` stage. ``hybrid`` fuses the vector
+    ranking with a BM25 ranking over names, handles, descriptions and rate
+    cards by reciprocal rank fusion; ``vector`` and ``lexical`` use one of the
+    rankings alone. The similarity score is always the vector similarity.
+    ``max_cost`` keeps only creators whose parsed rate card prices
+    ``deliverable`` at or under that many USD, and ``sort="cost"`` orders the
+    top results cheapest first.
+    """
+    verbose = debug_enabled(logger)
+    candidates = max(10, top_k)  # Get more results initially to calculate similarity scores
+    cost_key = cost_field(deliverable)
+
+    # Restrict the vector query to the requested category/region and budget
+    conditions = [{field: value} for field, value in (("category", category), ("region", region)) if value]
+    where_conditions = conditions + ([{cost_key: {"$lte": max_cost}}] if max_cost is not None else [])
+    where = None
+    if len(where_conditions) == 1:
+        where = where_conditions[0]
+    elif where_conditions:
+        where = {"$and": where_conditions}
+
+    def accept(record_id: int) -> bool:
+        record = influencer_store.get(record_id)
+        if record is None or any(record[field] != value for condition in conditions for field, value in condition.items()):
+            return False
+        if max_cost is None:
+            return True
+        cost = influencer_store.sort_value(record, cost_key)
+        return cost is not None and cost <= max_cost
+
+    # Search in the collection with cosine similarity
+    lexical_ids: List[str] = []
+    vector_ids: List[str] = []
+    try:
+        # Pin the active index version so a concurrent swap can't drop it mid-query
+        with index_registry.acquire() as version:
+            # Encode the query with the model the version was built with
+            logger.debug("Encoding search query...")
+            with time_stage("encode"):
+                query_embedding = version.model.encode(q).tolist()
+
+            # Convert distances to cosine similarity scores (ChromaDB uses L2 distance by default)
+            # Embeddings are normalized and ChromaDB's L2 distance is squared, so cosine similarity = 1 - distance / 2
+            similarity: Dict[str, float] = {}
+            if mode != "lexical":
+                with time_stage("vector_query"):
+                    results = version.collection.query(
+                        query_embeddings=[query_embedding],
+                        n_results=candidates,
+                        where=where,
+                        include=["metadatas", "distances"]  # Include distances for similarity calculation
+                    )
+                similarity.update(
+                    (id_str, 1 - distance / 2) for id_str, distance in zip(results["ids"][0], results["distances"][0])
+                )
+                vector_ids = sorted(results["ids"][0], key=similarity.get, reverse=True)
+                logger.debug("Vector search completed with %d results", len(vector_ids))
+                if preview:
+                    yield "vector", hydrate_results(vector_ids, similarity, top_k)
+
+            # The BM25 query runs after the vector one so the preview isn't held up by it
+            if mode != "vector":
+                with time_stage("lexical_query"):
+                    lexical_hits = lexical_index.search(q, top_k=candidates, accept=accept if where_conditions else None)
+                lexical_ids = [str(record_id) for record_id, _ in lexical_hits]
+                if verbose:
+                    logger.debug("Top BM25 scores: %s", [f'{id}:{score:.4f}' for id, score in lexical_hits[:5]])
+
+            # Score lexical hits the vector query didn't return against their stored embeddings
+            missing = [id_str for id_str in lexical_ids if id_str not in similarity]
+            if missing:
+                with time_stage("vector_lookup"):
+                    stored = version.collection.get(ids=missing, include=["embeddings"])
+                query_vector = np.asarray(query_embedding, dtype=np.float32)
+                for id_str, embedding in zip(stored["ids"], stored["embeddings"]):
+                    distance = float(np.sum((np.asarray(embedding, dtype=np.float32) - query_vector) ** 2))
+                    similarity[id_str] = 1 - distance / 2
     except Exception as e:
-        logger.error(f"Error during vector search: {e}")
+        logger.error("Error during vector search: %s", e)
+        ERRORS.inc(component="vector_search")
         # Return empty list as fallback
-        return []
+        yield "results", []
+        return
     
-    if not results['ids'][0]:
-        logger.info("No results found in vector search")
-        return []
+    if not similarity:
+        logger.debug("No results found in vector search")
+        yield "results", []
+        return
     
-    # Extract results
-    matched_ids = results["ids"][0]  # First query results
-    distances = results["distances"][0]  # Distances for first query
+    # Rank, fuse and hydrate the matched records
+    with time_stage("rerank"):
+        if mode == "vector":
+            ranked_ids = vector_ids
+        elif mode == "lexical":
+            ranked_ids = lexical_ids
+        else:
+            fused = reciprocal_rank_fusion([vector_ids, lexical_ids], weights=[1.0, SEARCH_LEXICAL_WEIGHT], k=SEARCH_FUSION_K)
+            ranked_ids = [id_str for id_str, _ in fused]
     
-    # Convert distances to cosine similarity scores (ChromaDB uses L2 distance by default)
-    # Cosine similarity = 1 - (distance^2 / 2)
-    # This is an approximation for normalized vectors
-    similarity_scores = [1 - (distance**2 / 2) for distance in distances]
+        if verbose:
+            logger.debug("Top similarity scores: %s", [f'{id}:{similarity[id]:.4f}' for id in ranked_ids[:5] if id in similarity])
     
-    # Create a list of (id, similarity_score) tuples
-    id_score_pairs = list(zip(matched_ids, similarity_scores))
+        # Get all matching influencers with their scores
+        matched_influencers = hydrate_results(ranked_ids, similarity, top_k, verbose)
+
+        if sort == "cost":
+            # Cheapest first among the most relevant; creators without a price for the deliverable go last
+            costs = {record["id"]: influencer_store.sort_value(record, cost_key) for record in matched_influencers}
+            matched_influencers.sort(key=lambda record: (costs[record["id"]] is None, costs[record["id"]] or 0.0))
     
-    # Sort by similarity score (highest first)
-    id_score_pairs.sort(key=lambda x: x[1], reverse=True)
+        # Return the top results
+        top_results = matched_influencers
     
-    logger.info(f"Top similarity scores: {[f'{id}:{score:.4f}' for id, score in id_score_pairs[:5]]}")
+    # One structured summary line per search; per-result detail is DEBUG only
+    logger.info(
+        "Search returned %d results", len(top_results),
+        extra={"result_ids": [result["id"] for result in top_results], "top_k": top_k, "mode": mode}
+    )
     
-    # Get all matching influencers with their scores
-    matched_influencers = []
-    for id_str, score in id_score_pairs:
+    yield "results", top_results
+
+def run_search(
+    q: str,
+    top_k: int = 2,
+    category: Optional[str] = None,
+    region: Optional[str] = None,
+    mode: str = "hybrid",
+    max_cost: Optional[float] = None,
+    deliverable: str = "post",
+    sort: str = "relevance"
+) -> List[Dict[str, Any]]:
+    """Run a search and return the top matching influencers with similarity scores (see ``search_stages``)"""
+    top_results: List[Dict[str, Any]] = []
+    for _, top_results in search_stages(
+        q, top_k=top_k, category=category, region=region, mode=mode,
+        max_cost=max_cost, deliverable=deliverable, sort=sort, preview=False
+    ):
+        pass
+    return top_results
+
+@router.get("/suggest")
+async def suggest_influencers(
+    q: str = Query(..., min_length=1, description="Text typed so far"),
+    limit: int = Query(10, ge=1, le=25, description="Maximum number of suggestions"),
+    types: Optional[str] = Query(None, description="Comma-separated suggestion types: name, category, region, platform"),
+):
+    """Suggest influencer names, categories, regions and platforms for a partially typed query
+
+    Answered from an in-memory trie without touching the embedding model, so
+    it can be called on every keystroke; typos are tolerated when nothing
+    matches the prefix exactly.
+    """
+    kinds = None
+    if types:
+        kinds = {kind.strip() for kind in types.split(",") if kind.strip()}
+        unknown = kinds - set(SUGGESTION_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown suggestion types: {', '.join(sorted(unknown))}"
+            )
+    return suggest_index.suggest(q, limit=limit, kinds=kinds)
+
+def search_cache_key(q: str, top_k: int, category: Optional[str], region: Optional[str], mode: str,
+                     max_cost: Optional[float], deliverable: str, sort: str) -> Tuple:
+    """Search cache key for a query and its options under the current index and roster versions"""
+    active = index_registry.active
+    index_version = f"{active.key if active else 'none'}:{influencer_store.version}"
+    return search_cache.make_key(
+        q,
+        {"category": category, "region": region, "mode": mode, "max_cost": max_cost, "deliverable": deliverable, "sort": sort},
+        top_k,
+        index_version
+    )
+
+def sse_event(event: str, data: bytes) -> bytes:
+    """One Server-Sent Event carrying a JSON payload"""
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+@router.get("/search", response_model=List[InfluencerSearchResult])
+async def search_influencers(
+    q: str = Query(..., description="Natural language search query"),
+    top_k: int = Query(2, ge=1, le=50, description="Number of results to return"),
+    category: Optional[str] = Query(None, description="Only return influencers in this category"),
+    region: Optional[str] = Query(None, description="Only return influencers from this region"),
+    mode: str = Query("hybrid", pattern="^(hybrid|vector|lexical)$", description="Ranking: vector and BM25 fused, or either alone"),
+    max_cost: Optional[float] = Query(None, ge=0, description="Only return influencers whose price for the deliverable is at most this many USD"),
+    deliverable: str = Query("post", description="Deliverable max_cost and sort=cost apply to: post, video, tweet, ..."),
+    sort: str = Query("relevance", pattern="^(relevance|cost)$", description="Order of the top results: by relevance, or cheapest first"),
+    priority: str = Query("interactive", pattern="^(interactive|batch)$", description="Admission lane; batch searches yield to interactive ones"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Search influencers using natural language and vector embeddings with cosine similarity
+
+    By default the vector ranking is fused with a BM25 keyword ranking, so
+    queries naming a creator, brand or handle find them too. Responses are cached per normalized query, filters, top_k and index version,
+    and carry an ETag so repeated searches can be answered with 304 Not Modified.
+    Uncached searches pass an admission gate and are shed with 503 and
+    Retry-After when its queue is full. Budgets are matched against the
+    parsed, USD-converted rate cards rather than the embedding text.
+    """
+    logger.debug("Received search query: %s", q)
+    validate_deliverable(deliverable)
+
+    cache_key = search_cache_key(q, top_k, category, region, mode, max_cost, deliverable, sort)
+    headers = {"Cache-Control": f"public, max-age={SEARCH_CACHE_MAX_AGE}"}
+
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("Serving search results from cache")
+        CACHE_LOOKUPS.inc(cache="search", result="hit")
+    else:
+        CACHE_LOOKUPS.inc(cache="search", result="miss")
+        try:
+            async with search_gate.admit(priority):
+                # Encode and query off the event loop
+                top_results = await run_in_threadpool(
+                    run_search, q, top_k=top_k, category=category, region=region, mode=mode,
+                    max_cost=max_cost, deliverable=deliverable, sort=sort
+                )
+        except Overloaded as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Search is overloaded, please retry later",
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        with time_stage("serialization"):
+            body = dumps(top_results)
+        # Failed searches come back empty; don't pin an empty result for the whole TTL
+        if not top_results:
+            return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-store"})
+        cached = search_cache.put(cache_key, body)
+
+    headers["ETag"] = cached.etag
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+@router.get("/search/stream")
+async def stream_search_influencers(
+    q: str = Query(..., description="Natural language search query"),
+    top_k: int = Query(2, ge=1, le=50, description="Number of results to return"),
+    category: Optional[str] = Query(None, description="Only return influencers in this category"),
+    region: Optional[str] = Query(None, description="Only return influencers from this region"),
+    mode: str = Query("hybrid", pattern="^(hybrid|vector|lexical)$", description="Ranking: vector and BM25 fused, or either alone"),
+    max_cost: Optional[float] = Query(None, ge=0, description="Only return influencers whose price for the deliverable is at most this many USD"),
+    deliverable: str = Query("post", description="Deliverable max_cost and sort=cost apply to: post, video, tweet, ..."),
+    sort: str = Query("relevance", pattern="^(relevance|cost)$", description="Order of the top results: by relevance, or cheapest first"),
+    priority: str = Query("interactive", pattern="^(interactive|batch)$", description="Admission lane; batch searches yield to interactive ones"),
+):
+    """Search like /influencers/search, streaming each stage as a Server-Sent Event
+
+    A ``vector`` event carries the vector hits as soon as the vector query
+    returns; a ``results`` event then carries the fused and reranked results
+    /search would return, and ``done`` ends the stream. Cached searches get
+    ``results`` straight away, and completed searches fill the same cache as
+    /search. Each stage is admitted through the search gate on its own, so a
+    slow reader holds no slot while it drains the stream; a stage shed by the
+    gate ends the stream with an ``error`` event carrying ``retry_after``
+    seconds.
+    """
+    validate_deliverable(deliverable)
+    cache_key = search_cache_key(q, top_k, category, region, mode, max_cost, deliverable, sort)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        CACHE_LOOKUPS.inc(cache="search", result="hit")
+
+        async def cached_events():
+            yield sse_event("results", cached.body)
+            yield sse_event("done", b"{}")
+
+        return StreamingResponse(cached_events(), media_type="text/event-stream", headers=headers)
+
+    CACHE_LOOKUPS.inc(cache="search", result="miss")
+
+    async def events():
+        stages = search_stages(
+            q, top_k=top_k, category=category, region=region, mode=mode,
+            max_cost=max_cost, deliverable=deliverable, sort=sort
+        )
         try:
-            influencer_id = int(id_str)
-            for influencer in influencers:
-                if influencer["id"] == influencer_id:
-                    # Add a copy of the influencer with the similarity score
-                    influencer_copy = influencer.copy()
-                    influencer_copy["similarity_score"] = score
-                    matched_influencers.append(influencer_copy)
-                    logger.info(f"Vector match: {influencer['name']} with similarity score {score:.4f}")
+            # Each stage runs off the event loop holding a gate slot, which is
+            # released before the event is sent so a slow reader doesn't keep it
+            while True:
+                try:
+                    async with search_gate.admit(priority):
+                        stage = await run_in_threadpool(next, stages, None)
+                except Overloaded as e:
+                    yield sse_event("error", dumps({"detail": "Search is overloaded, please retry later", "retry_after": e.retry_after}))
+                    return
+                if stage is None:
                     break
-        except (ValueError, TypeError):
-            # Skip if ID can't be converted to int
+                event, results = stage
+                body = dumps(results)
+                if event == "results" and results:
+                    search_cache.put(cache_key, body)
+                yield sse_event(event, body)
+        finally:
+            stages.close()
+        yield sse_event("done", b"{}")
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+def brief_text(brief: CampaignBrief) -> str:
+    """Text a campaign brief is embedded as; budget, deliverables and timeline are matched structurally instead"""
+    parts = [brief.campaign_name]
+    if brief.brand_name:
+        parts.append(f"by {brief.brand_name}")
+    if brief.description:
+        parts.append(brief.description)
+    return ". ".join(parts)
+
+def run_match(brief: CampaignBrief) -> Dict[str, Any]:
+    """Score the whole roster against a campaign brief and pick a shortlist within its budget
+
+    Raises:
+        ValueError: If no deliverables can be read from the brief
+    """
+    requested = parse_deliverables(brief.deliverables)
+    plan = {deliverable: count for deliverable, count in requested.items() if deliverable in DELIVERABLES}
+    if not plan:
+        raise ValueError(f"No known deliverables in {brief.deliverables!r}; expected some of {', '.join(DELIVERABLES)}")
+    budget_min, budget_max = parse_budget(brief.budget_range)
+
+    with index_registry.acquire() as version:
+        matrix = current_roster_matrix(version)
+        with time_stage("encode"):
+            query_vector = brief_vectors.get_or_encode(version.key, brief_text(brief), version.model)
+    with time_stage("match_score"):
+        scored = matrix.score(
+            query_vector,
+            plan,
+            max_cost=budget_max,
+            weights=brief.weights,
+            category=brief.category,
+            region=brief.region,
+            platform=brief.platform,
+            min_followers=brief.min_followers,
+        )
+        picks = shortlist(scored, brief.limit, budget=budget_max)
+
+    entries = []
+    total_cost = 0.0
+    for record_id, position in picks:
+        record = influencer_store.get(record_id)
+        if record is None:
             continue
-    
-    # Return the top 2 results based on similarity score
-    top_results = matched_influencers[:2] if matched_influencers else []
-    
-    if top_results:
-        logger.info(f"Returning top {len(top_results)} results:")
-        for result in top_results:
-            logger.info(f"  {result['name']} (score: {result['similarity_score']:.4f})")
-    else:
-        logger.info("No results found")
-    
-    return top_results
+        cost = float(scored["cost"][position])
+        total_cost += cost
+        entry = record.copy()
+        entry["match_score"] = round(float(scored["score"][position]), 4)
+        entry["similarity_score"] = float(scored["relevance"][position])
+        entry["campaign_cost"] = round(cost, 2)
+        entry["score_components"] = {
+            name: round(float(value), 4) for name, value in zip(DEFAULT_WEIGHTS, scored["components"][:, position])
+        }
+        entries.append(entry)
+
+    logger.info(
+        "Matched campaign against %d eligible influencers", len(scored["ids"]),
+        extra={"result_ids": [entry["id"] for entry in entries], "plan": plan}
+    )
+    return {
+        "campaign_name": brief.campaign_name,
+        "timeline": brief.timeline,
+        "deliverables": plan,
+        "unpriced_deliverables": sorted(set(requested) - set(plan)),
+        "budget": {"min": budget_min, "max": budget_max, "currency": BASE_CURRENCY},
+        "eligible": int(len(scored["ids"])),
+        "total_cost": round(total_cost, 2),
+        "meets_minimum": budget_min is None or total_cost >= budget_min,
+        "shortlist": entries,
+    }
+
+@router.post("/match")
+async def match_campaign(
+    brief: CampaignBrief,
+    priority: str = Query("interactive", pattern="^(interactive|batch)$", description="Admission lane; batch matches yield to interactive ones"),
+):
+    """Rank the whole roster for a campaign brief and return a shortlist that fits its budget
+
+    Every influencer is scored with one matrix product against the roster's
+    embeddings plus vectorized engagement, reach and value-for-money scores;
+    the campaign cost is computed from their parsed rate cards, so only
+    influencers who price every deliverable are considered.
+    """
+    unknown = set(brief.weights or {}) - set(DEFAULT_WEIGHTS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown weights: {', '.join(sorted(unknown))}; expected some of {', '.join(DEFAULT_WEIGHTS)}"
+        )
+    try:
+        async with search_gate.admit(priority):
+            result = await run_in_threadpool(run_match, brief)
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Matching is overloaded, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return result
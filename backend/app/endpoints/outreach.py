@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Body
-from typing import Dict, Any, Optional, Union, List
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional, List
 from pydantic import BaseModel, EmailStr, Field, validator
 import os
 import logging
+import asyncio
+import time
+import uuid
 from datetime import datetime
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
@@ -11,11 +15,15 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import requests
-import json
-import requests
-import json
-import os
-from dotenv import load_dotenv
+from app.utils.responses import ORJSONResponse
+from app.utils.logging_config import setup_logging
+from app.utils.metrics import time_provider, FALLBACKS, ERRORS
+from app.utils.scheduler import JOB_STATUSES, Job, JobStore, OutreachScheduler, SendWindow
+from app.utils.negotiations import ACCEPTANCE_GROUPS, NEGOTIATION_STATUSES, NegotiationStore
+from app.utils.rate_cards import parse_budget
+from app.utils.outreach_history import HISTORY_KINDS, OutreachHistoryIndex
+from app.utils.vector_search import VectorSearch
+from app.endpoints import influencers
 
 # Load environment variables
 load_dotenv()
@@ -31,12 +39,43 @@ SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
 SMTP_USERNAME = os.getenv('SMTP_USERNAME', '')
 SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
+SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', 'true').lower() == 'true'
+
+# Provider endpoints, overridable to point outreach at local stand-ins (see benchmarks/fake_providers.py)
+SENDGRID_API_HOST = os.getenv('SENDGRID_API_HOST', 'https://api.sendgrid.com')
+ELEVENLABS_API_BASE = os.getenv('ELEVENLABS_API_BASE', 'https://api.elevenlabs.io')
+# Seconds to wait on a provider before giving up
+PROVIDER_TIMEOUT = float(os.getenv('PROVIDER_TIMEOUT', 30))
+
+# Directory of the outreach job and negotiation databases unless their paths are set
+DATA_DIR = os.path.abspath(os.getenv('BRANDSYNC_DATA_DIR') or os.path.join(
+    os.getenv('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share'), 'brandsync'))
+
+# Scheduled outreach: job database, send windows in each region's local time (weekdays 0-6, Monday is 0),
+# concurrency caps and retries
+SCHEDULER_DB_PATH = os.path.abspath(os.getenv('SCHEDULER_DB_PATH') or os.path.join(DATA_DIR, 'outreach_jobs.sqlite3'))
+SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'true').lower() == 'true'
+EMAIL_SEND_WINDOW = os.getenv('EMAIL_SEND_WINDOW', '08:00-20:00')
+VOICE_SEND_WINDOW = os.getenv('VOICE_SEND_WINDOW', '10:00-18:00')
+SEND_WINDOW_DAYS = os.getenv('SEND_WINDOW_DAYS', '0-4')
+SCHEDULER_MAX_CONCURRENCY = int(os.getenv('SCHEDULER_MAX_CONCURRENCY', 4))
+SCHEDULER_VOICE_CONCURRENCY = int(os.getenv('SCHEDULER_VOICE_CONCURRENCY', 2))
+SCHEDULER_MAX_ATTEMPTS = int(os.getenv('SCHEDULER_MAX_ATTEMPTS', 3))
+SCHEDULER_RETRY_SECONDS = float(os.getenv('SCHEDULER_RETRY_SECONDS', 60))
+SCHEDULER_POLL_SECONDS = float(os.getenv('SCHEDULER_POLL_SECONDS', 30))
+
+# Negotiation summaries: database and most summaries committed per transaction
+NEGOTIATION_DB_PATH = os.path.abspath(os.getenv('NEGOTIATION_DB_PATH') or os.path.join(DATA_DIR, 'negotiations.sqlite3'))
+NEGOTIATION_WRITE_BATCH = int(os.getenv('NEGOTIATION_WRITE_BATCH', 256))
+
+# Negotiation notes and email messages are embedded in the background in batches of up to this many
+OUTREACH_HISTORY_BATCH_SIZE = int(os.getenv('OUTREACH_HISTORY_BATCH_SIZE', 64))
 
 # Set up logging
-logging.basicConfig(level=logging.INFO)
+setup_logging()
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/outreach", tags=["outreach"])
+router = APIRouter(prefix="/outreach", tags=["outreach"], default_response_class=ORJSONResponse)
 
 # Pydantic model for email request
 class EmailRequest(BaseModel):
@@ -108,9 +147,29 @@ class NegotiationSummary(BaseModel):
     status: str = Field(..., description="Status of the negotiation (pending, accepted, rejected)")
     notes: Optional[str] = None
     timestamp: datetime
+    influencer_id: Optional[int] = Field(None, description="ID of the influencer in the system")
+    campaign_id: Optional[int] = Field(None, description="ID of the campaign in the system")
+    category: Optional[str] = Field(None, description="Influencer's category (default: from the roster)")
+    region: Optional[str] = Field(None, description="Influencer's region (default: from the roster)")
+
+    @validator('status')
+    def normalize_status(cls, v):
+        return v.strip().lower()
+
+# Pydantic model for a stored negotiation summary
+class StoredNegotiationSummary(NegotiationSummary):
+    id: int
+    agreed_budget_usd: Optional[float] = None
 
 def send_email_via_smtp(sender_email, recipient_email, subject, html_content):
     """Send an email using Python's built-in SMTP library"""
+    with time_provider("smtp") as call:
+        sent = _send_email_via_smtp(sender_email, recipient_email, subject, html_content)
+        if not sent:
+            call["outcome"] = "error"
+    return sent
+
+def _send_email_via_smtp(sender_email, recipient_email, subject, html_content):
     try:
         # Create message container
         msg = MIMEMultipart('alternative')
@@ -123,8 +182,9 @@ def send_email_via_smtp(sender_email, recipient_email, subject, html_content):
         msg.attach(part)
         
         # Connect to SMTP server
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()  # Secure the connection
+        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=PROVIDER_TIMEOUT)
+        if SMTP_STARTTLS:
+            server.starttls()  # Secure the connection
         
         # Login to email account
         if SMTP_USERNAME and SMTP_PASSWORD:
@@ -193,29 +253,28 @@ async def send_email(request: EmailRequest):
         
         if use_mock:
             # Use mock email service (just log the email details)
-            logger.info(f"[MOCK EMAIL] Would send email to {request.influencer_email}")
-            logger.info(f"[MOCK EMAIL] Subject: {subject}")
-            logger.info(f"[MOCK EMAIL] Content: {html_content}")
+            # The rendered body is never logged; it may contain personal data
+            logger.info("[MOCK EMAIL] Simulated email to %s", request.influencer_email, extra={"subject": subject})
+            logger.debug("[MOCK EMAIL] Body length: %d characters", len(html_content))
             
             # For development/testing purposes, we'll consider this a success
-            logger.info(f"[MOCK EMAIL] Email to {request.influencer_email} simulated successfully")
             email_sent = True
         else:
             # Try SendGrid first (unless SMTP is specifically requested)
             if not use_smtp:
                 try:
-                    logger.info(f"Attempting to send email to {request.influencer_email} using SendGrid")
-                    logger.info(f"Using API key: {sendgrid_api_key[:5]}...{sendgrid_api_key[-5:] if len(sendgrid_api_key) > 10 else '***'}")
+                    logger.debug("Attempting to send email to %s using SendGrid", request.influencer_email)
                     
                     # Verify API key format
                     if not sendgrid_api_key.startswith('SG.') or len(sendgrid_api_key) < 50:
-                        logger.warning(f"SendGrid API key appears to be in an invalid format. Expected format: 'SG.xxxxxx...'")
+                        logger.warning("SendGrid API key appears to be in an invalid format. Expected format: 'SG.xxxxxx...'")
                     
                     # Create SendGrid client and send message
-                    sg = SendGridAPIClient(sendgrid_api_key)
-                    response = sg.send(message)
+                    sg = SendGridAPIClient(sendgrid_api_key, host=SENDGRID_API_HOST)
+                    with time_provider("sendgrid"):
+                        response = sg.send(message)
                     
-                    logger.info(f"Email sent to {request.influencer_email}, status code: {response.status_code}")
+                    logger.info("Email sent to %s via SendGrid", request.influencer_email, extra={"status_code": response.status_code})
                     email_sent = True
                 except Exception as e:
                     error_message = str(e)
@@ -232,8 +291,12 @@ async def send_email(request: EmailRequest):
                         error_detail = f"SendGrid API error: {error_message}"
             
             # If SendGrid failed or SMTP was requested, try SMTP
+            smtp_attempted = False
             if not email_sent and (use_smtp or os.getenv('FALLBACK_TO_SMTP', 'false').lower() == 'true'):
-                logger.info(f"Attempting to send email via SMTP")
+                logger.debug("Attempting to send email via SMTP")
+                smtp_attempted = True
+                if not use_smtp:
+                    FALLBACKS.inc(source="sendgrid", target="smtp")
                 if SMTP_USERNAME and SMTP_PASSWORD:
                     smtp_success = send_email_via_smtp(
                         sender_email=sender_email,
@@ -254,13 +317,12 @@ async def send_email(request: EmailRequest):
             # If both SendGrid and SMTP failed, check if we should fall back to mock
             if not email_sent and os.getenv('FALLBACK_TO_MOCK', 'true').lower() == 'true':
                 # Fall back to mock email service
-                logger.info(f"Falling back to mock email service")
-                logger.info(f"[MOCK EMAIL] Would send email to {request.influencer_email}")
-                logger.info(f"[MOCK EMAIL] Subject: {subject}")
-                logger.info(f"[MOCK EMAIL] Content: {html_content}")
+                logger.info("Falling back to mock email service")
+                FALLBACKS.inc(source="smtp" if smtp_attempted else "sendgrid", target="mock")
+                logger.info("[MOCK EMAIL] Simulated email to %s", request.influencer_email, extra={"subject": subject})
+                logger.debug("[MOCK EMAIL] Body length: %d characters", len(html_content))
                 
                 # For development/testing purposes, we'll consider this a success
-                logger.info(f"[MOCK EMAIL] Email to {request.influencer_email} simulated successfully")
                 email_sent = True
             
             # If all methods failed and we're not falling back to mock, raise an error
@@ -272,6 +334,13 @@ async def send_email(request: EmailRequest):
         
         # Log outreach event to Supabase (optional)
         timestamp = datetime.now()
+        # Make the message searchable through /outreach/history/search
+        outreach_history.add(
+            "email", uuid.uuid4().hex, request.message,
+            campaign_id=request.campaign_id, influencer_id=request.influencer_id,
+            campaign_name=request.campaign_name, influencer_name=request.influencer_name,
+            timestamp=timestamp.isoformat()
+        )
         if request.influencer_id and request.campaign_id:
             try:
                 # This is a placeholder for Supabase integration
@@ -289,6 +358,7 @@ async def send_email(request: EmailRequest):
         
     except Exception as e:
         logger.error(f"Error sending email: {str(e)}")
+        ERRORS.inc(component="email")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to send email: {str(e)}"
@@ -315,23 +385,22 @@ def call_voice_agent(phone_number: str, dynamic_vars: dict):
         # Initialize ElevenLabs client with API key
         client = ElevenLabs(api_key=elevenlabs_api_key)
         
-        logger.info(f"Calling ElevenLabs Voice Agent API for {phone_number}")
-        logger.info(f"Using API key: {elevenlabs_api_key[:5]}...{elevenlabs_api_key[-5:] if len(elevenlabs_api_key) > 10 else '***'}")
-        logger.info(f"Using agent ID: {agent_id}")
-        logger.info(f"Dynamic variables: {json.dumps(dynamic_vars, indent=2)}")
+        logger.info("Calling ElevenLabs Voice Agent API for %s", phone_number, extra={"agent_id": agent_id})
+        logger.debug("Dynamic variables: %s", dynamic_vars)
         
         try:
             # Make the call using the ElevenLabs client
-            call_response = client.call.create(
-                agent_id=agent_id,
-                voice_id="21m00Tcm4TlvDq8ikWAM",  # Default voice ID (Rachel)
-                recipient={
-                    "phone_number": phone_number
-                },
-                dynamic_variables=dynamic_vars
-            )
+            with time_provider("elevenlabs_sdk"):
+                call_response = client.call.create(
+                    agent_id=agent_id,
+                    voice_id="21m00Tcm4TlvDq8ikWAM",  # Default voice ID (Rachel)
+                    recipient={
+                        "phone_number": phone_number
+                    },
+                    dynamic_variables=dynamic_vars
+                )
             
-            logger.info(f"Call response: {call_response}")
+            logger.debug("Call response: %s", call_response)
             
             # Return the call details
             return {
@@ -374,7 +443,7 @@ async def trigger_voice_agent(request: VoiceAgentRequest):
         if use_mock:
             # Use mock voice service (just log the call details)
             logger.info(f"[MOCK VOICE CALL] Would call {request.phone_number}")
-            logger.info(f"[MOCK VOICE CALL] Dynamic variables: {json.dumps(dynamic_vars, indent=2)}")
+            logger.debug("[MOCK VOICE CALL] Dynamic variables: %s", dynamic_vars)
             
             # For development/testing purposes, we'll consider this a success
             logger.info(f"[MOCK VOICE CALL] Voice call to {request.phone_number} simulated successfully")
@@ -419,26 +488,75 @@ async def trigger_voice_agent(request: VoiceAgentRequest):
         
     except Exception as e:
         logger.error(f"Error initiating voice call: {str(e)}")
+        ERRORS.inc(component="voice")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to initiate voice call: {str(e)}"
         )
 
 
-@router.post("/negotiation/summary", response_model=NegotiationSummary)
+negotiation_store = NegotiationStore(NEGOTIATION_DB_PATH, max_batch=NEGOTIATION_WRITE_BATCH)
+
+def index_negotiation_notes(record: Dict[str, Any]):
+    """Queue a stored negotiation summary's notes for semantic search"""
+    outreach_history.add(
+        "negotiation", record["id"], record.get("notes"),
+        campaign_id=record.get("campaign_id"), influencer_id=record.get("influencer_id"),
+        campaign_name=record.get("campaign_name"), influencer_name=record.get("influencer_name"),
+        brand_name=record.get("brand_name"), status=record.get("status"), timestamp=record.get("timestamp")
+    )
+
+def backfill_outreach_history():
+    """Queue the notes of every stored negotiation; the history collection lives in memory
+
+    Run by the history worker of every process when it starts.
+    """
+    after_id, queued = 0, 0
+    while True:
+        records = negotiation_store.with_notes(after_id)
+        if not records:
+            break
+        for record in records:
+            index_negotiation_notes(record.to_dict())
+        after_id = records[-1].id
+        queued += len(records)
+    if queued:
+        logger.info(f"Queued notes of {queued} stored negotiations for semantic search")
+
+# Negotiation notes and email messages embedded with the search encoder, in a collection of their own
+outreach_history = OutreachHistoryIndex(
+    VectorSearch(collection_name="outreach_history", encoder=influencers.model),
+    batch_size=OUTREACH_HISTORY_BATCH_SIZE,
+    backfill=backfill_outreach_history,
+)
+
+def agreed_budget_usd(agreed_budget: Optional[str]) -> Optional[float]:
+    """USD value of an agreed budget; the midpoint if it is a range"""
+    bounds = [bound for bound in parse_budget(agreed_budget) if bound is not None]
+    return round(sum(bounds) / len(bounds), 2) if bounds else None
+
+@router.post("/negotiation/summary", response_model=StoredNegotiationSummary)
 async def log_negotiation_summary(summary: NegotiationSummary):
     """
     Log a negotiation summary after a voice call is completed.
     This endpoint allows recording the outcome of a negotiation call.
     """
     try:
-        # In a real implementation, this would save the summary to a database
         logger.info(f"Logging negotiation summary for {summary.influencer_name} with {summary.brand_name}")
         logger.info(f"Campaign: {summary.campaign_name}, Status: {summary.status}")
-        
-        # TODO: Implement database integration when needed
-        
-        return summary
+
+        record = summary.model_dump()
+        influencer = influencers.influencer_store.get(summary.influencer_id) if summary.influencer_id is not None else None
+        if influencer is not None:
+            record["category"] = record["category"] or influencer.get("category")
+            record["region"] = record["region"] or influencer.get("region")
+        record["agreed_budget_usd"] = agreed_budget_usd(summary.agreed_budget)
+        stored = {**record, "timestamp": summary.timestamp.timestamp()}
+        # Resolves once the batch holding this summary is committed
+        record["id"] = await asyncio.wrap_future(negotiation_store.add(stored, time.time()))
+        stored_record = await run_in_threadpool(negotiation_store.get, record["id"])
+        index_negotiation_notes(stored_record.to_dict())
+        return record
     except Exception as e:
         logger.error(f"Error logging negotiation summary: {str(e)}")
         raise HTTPException(
@@ -446,6 +564,71 @@ async def log_negotiation_summary(summary: NegotiationSummary):
             detail=f"Failed to log negotiation summary: {str(e)}"
         )
 
+@router.get("/negotiation/summaries")
+async def list_negotiation_summaries(
+    campaign_id: Optional[int] = Query(None, description="Only negotiations of this campaign"),
+    influencer_id: Optional[int] = Query(None, description="Only negotiations with this influencer"),
+    status_filter: Optional[str] = Query(None, alias="status", pattern=f"^({'|'.join(NEGOTIATION_STATUSES)})$", description="Only negotiations in this status"),
+    since: Optional[datetime] = Query(None, description="Only negotiations at or after this time"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of summaries to return"),
+):
+    """List stored negotiation summaries, most recent first"""
+    records = await run_in_threadpool(
+        negotiation_store.list, campaign_id=campaign_id, influencer_id=influencer_id, status=status_filter,
+        since=since.timestamp() if since else None, limit=limit,
+    )
+    return [record.to_dict() for record in records]
+
+@router.get("/history/search")
+async def search_outreach_history(
+    q: str = Query(..., min_length=1, description="What to look for, e.g. \"asked for usage rights\""),
+    kind: Optional[str] = Query(None, pattern=f"^({'|'.join(HISTORY_KINDS)})$", description="Only negotiation notes or only emails"),
+    campaign_id: Optional[int] = Query(None, description="Only history of this campaign"),
+    influencer_id: Optional[int] = Query(None, description="Only history with this influencer"),
+    top_k: int = Query(10, ge=1, le=100, description="Number of results to return"),
+):
+    """Search negotiation notes and outreach emails by meaning"""
+    try:
+        return await run_in_threadpool(
+            outreach_history.query, q, top_k=top_k, kind=kind, campaign_id=campaign_id, influencer_id=influencer_id
+        )
+    except Exception as e:
+        logger.error(f"Error searching outreach history: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search outreach history: {str(e)}"
+        )
+
+@router.get("/history/index")
+async def outreach_history_status():
+    """Documents in the outreach history index and documents still waiting to be embedded"""
+    return outreach_history.status()
+
+@router.get("/negotiation/acceptance")
+async def negotiation_acceptance(
+    by: str = Query("category", pattern=f"^({'|'.join(ACCEPTANCE_GROUPS)})$", description="Group negotiations by this field"),
+    campaign_id: Optional[int] = Query(None, description="Only negotiations of this campaign"),
+    since: Optional[datetime] = Query(None, description="Only negotiations at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only negotiations before this time"),
+):
+    """Acceptance rate of negotiations per category, region, campaign or brand"""
+    return await run_in_threadpool(
+        negotiation_store.acceptance, by=by, campaign_id=campaign_id,
+        since=since.timestamp() if since else None, until=until.timestamp() if until else None,
+    )
+
+@router.get("/negotiation/budgets")
+async def negotiation_budgets(
+    campaign_id: Optional[int] = Query(None, description="Only this campaign"),
+    since: Optional[datetime] = Query(None, description="Only negotiations at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only negotiations before this time"),
+):
+    """Median and total agreed budget (USD) of accepted negotiations per campaign"""
+    return await run_in_threadpool(
+        negotiation_store.budgets, campaign_id=campaign_id,
+        since=since.timestamp() if since else None, until=until.timestamp() if until else None,
+    )
+
 
 # Model for direct call request with dynamic influencer data
 class DirectCallRequest(BaseModel):
@@ -507,7 +690,7 @@ async def direct_call(request: DirectCallRequest):
         }
         
         # Make direct API call to ElevenLabs API using Twilio integration
-        url = "https://api.elevenlabs.io/v1/convai/twilio/outbound-call"
+        url = f"{ELEVENLABS_API_BASE}/v1/convai/twilio/outbound-call"
         
         headers = {
             "xi-api-key": elevenlabs_api_key,
@@ -532,15 +715,16 @@ async def direct_call(request: DirectCallRequest):
             "dynamic_variables": dynamic_vars
         }
         
-        logger.info(f"Making direct call to {request.phone_number} using ElevenLabs API")
-        logger.info(f"Using agent ID: {agent_id}")
-        logger.info(f"Dynamic variables: {json.dumps(dynamic_vars, indent=2)}")
+        logger.info("Making direct call to %s using ElevenLabs API", request.phone_number, extra={"agent_id": agent_id})
+        logger.debug("Dynamic variables: %s", dynamic_vars)
         
         # Make the API call
-        response = requests.post(url, headers=headers, json=payload)
+        with time_provider("elevenlabs") as call:
+            response = requests.post(url, headers=headers, json=payload, timeout=PROVIDER_TIMEOUT)
+            if response.status_code not in [200, 201, 202]:
+                call["outcome"] = "error"
         
-        logger.info(f"Response status code: {response.status_code}")
-        logger.info(f"Response body: {response.text}")
+        logger.debug("ElevenLabs response %d: %s", response.status_code, response.text)
         
         if response.status_code in [200, 201, 202]:
             result = response.json()
@@ -563,7 +747,158 @@ async def direct_call(request: DirectCallRequest):
         
     except Exception as e:
         logger.error(f"Error initiating direct call: {str(e)}")
+        ERRORS.inc(component="direct_call")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to initiate direct call: {str(e)}"
         )
+
+
+# Scheduled outreach
+class ScheduledEmail(EmailRequest):
+    region: Optional[str] = Field(None, description="Influencer's region; the email goes out in its local send window")
+    not_before: Optional[datetime] = Field(None, description="Earliest send time (default: now)")
+    idempotency_key: Optional[str] = Field(None, description="Scheduling the same key again returns the existing job")
+
+class ScheduledCall(VoiceAgentRequest):
+    region: Optional[str] = Field(None, description="Influencer's region; the call is placed in its local send window")
+    not_before: Optional[datetime] = Field(None, description="Earliest call time (default: now)")
+    idempotency_key: Optional[str] = Field(None, description="Scheduling the same key again returns the existing job")
+
+class EmailSchedule(BaseModel):
+    emails: List[ScheduledEmail] = Field(..., min_length=1, description="Emails to send")
+    spacing_seconds: float = Field(0, ge=0, description="Minimum time between emails to the same region")
+
+class CallSchedule(BaseModel):
+    calls: List[ScheduledCall] = Field(..., min_length=1, description="Calls to place")
+    spacing_seconds: float = Field(0, ge=0, description="Minimum time between calls to the same region, to spread them over working hours")
+
+def dispatch_outreach(job: Job) -> Dict[str, Any]:
+    """Send a scheduled job through the same path as /outreach/email or /outreach/voice
+
+    Raises:
+        HTTPException: If the send failed
+    """
+    if job.channel == "email":
+        response = asyncio.run(send_email(EmailRequest(**job.payload)))
+    else:
+        response = asyncio.run(trigger_voice_agent(VoiceAgentRequest(**job.payload)))
+    return response.model_dump(mode="json")
+
+scheduler = OutreachScheduler(
+    JobStore(SCHEDULER_DB_PATH),
+    dispatch_outreach,
+    windows={
+        "email": SendWindow.parse(EMAIL_SEND_WINDOW, SEND_WINDOW_DAYS),
+        "voice": SendWindow.parse(VOICE_SEND_WINDOW, SEND_WINDOW_DAYS),
+    },
+    max_concurrent=SCHEDULER_MAX_CONCURRENCY,
+    channel_limits={"voice": SCHEDULER_VOICE_CONCURRENCY},
+    max_attempts=SCHEDULER_MAX_ATTEMPTS,
+    retry_seconds=SCHEDULER_RETRY_SECONDS,
+    poll_seconds=SCHEDULER_POLL_SECONDS,
+)
+
+
+def start_background_services():
+    """Open this process's outreach databases and start its background threads; called on application startup
+
+    Nothing is opened or started at import, so a pre-fork master importing
+    the app doesn't hand its databases and threads to the workers.
+    """
+    scheduler.store.open()
+    negotiation_store.open()
+    negotiation_store.start()
+    outreach_history.start()
+    if SCHEDULER_ENABLED:
+        scheduler.start()
+
+
+def stop_background_services():
+    """Stop the outreach background threads and close the databases; called on application shutdown"""
+    scheduler.stop(timeout=10)
+    scheduler.store.close()
+    negotiation_store.close()
+
+def schedule_jobs(channel: str, requests: List[BaseModel], spacing_seconds: float) -> Dict[str, Any]:
+    jobs = []
+    for request in requests:
+        payload = request.model_dump(mode="json", exclude={"region", "not_before", "idempotency_key"})
+        idempotency_key = request.idempotency_key
+        if idempotency_key is None and request.campaign_id is not None and request.influencer_id is not None:
+            # One message per influencer and campaign unless the client says otherwise
+            idempotency_key = f"{channel}:{request.campaign_id}:{request.influencer_id}"
+        jobs.append({
+            "payload": payload,
+            "region": request.region,
+            "not_before": request.not_before.timestamp() if request.not_before else None,
+            "campaign_id": request.campaign_id,
+            "idempotency_key": idempotency_key,
+        })
+    stored = scheduler.schedule(channel, jobs, spacing_seconds=spacing_seconds)
+    logger.info(f"Scheduled {sum(created for _, created in stored)} {channel} outreach jobs")
+    return {
+        "scheduled": sum(created for _, created in stored),
+        "jobs": [{**job.to_dict(), "created": created} for job, created in stored],
+    }
+
+@router.post("/schedule/email", status_code=status.HTTP_202_ACCEPTED)
+async def schedule_emails(schedule: EmailSchedule):
+    """
+    Schedule emails to influencers, each sent in the local send window of its region.
+    Jobs are stored persistently and sent through the same path as /outreach/email.
+    """
+    return await run_in_threadpool(schedule_jobs, "email", schedule.emails, schedule.spacing_seconds)
+
+@router.post("/schedule/voice", status_code=status.HTTP_202_ACCEPTED)
+async def schedule_calls(schedule: CallSchedule):
+    """
+    Schedule voice calls to influencers, each placed in the local calling window of its region.
+    Jobs are stored persistently and placed through the same path as /outreach/voice.
+    """
+    return await run_in_threadpool(schedule_jobs, "voice", schedule.calls, schedule.spacing_seconds)
+
+@router.get("/jobs")
+async def list_jobs(
+    status_filter: Optional[str] = Query(None, alias="status", pattern=f"^({'|'.join(JOB_STATUSES)})$", description="Only jobs in this status"),
+    campaign_id: Optional[int] = Query(None, description="Only jobs of this campaign"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of jobs to return"),
+):
+    """List scheduled outreach jobs in send order"""
+    jobs = await run_in_threadpool(scheduler.store.list, status=status_filter, campaign_id=campaign_id, limit=limit)
+    return [job.to_dict() for job in jobs]
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: int):
+    """Get a scheduled outreach job and its outcome"""
+    job = await run_in_threadpool(scheduler.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: int):
+    """Cancel a scheduled outreach job that hasn't been sent yet"""
+    cancelled = await run_in_threadpool(scheduler.cancel, job_id)
+    job = await run_in_threadpool(scheduler.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
+    if not cancelled:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job {job_id} is no longer pending")
+    return job.to_dict()
+
+@router.post("/jobs/{job_id}/retry")
+async def retry_job(job_id: int):
+    """Send a failed or interrupted outreach job again, at the next opening of its send window"""
+    retried = await run_in_threadpool(scheduler.retry, job_id)
+    job = await run_in_threadpool(scheduler.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
+    if not retried:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job {job_id} is not failed or interrupted")
+    return job.to_dict()
+
+@router.get("/scheduler")
+async def get_scheduler_status():
+    """Scheduler state: queued and in-flight jobs, caps, send windows and job counts by status"""
+    return scheduler.status()
@@ -1,8 +1,22 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.endpoints import influencers, outreach
+from app.endpoints import influencers, outreach, admin
+from app.utils.compression import CompressionMiddleware
+from app.utils.logging_config import LogContextMiddleware
+from app.utils.metrics import MetricsMiddleware, registry
+from app.utils.tracing import TracingMiddleware
+from app.utils.profiling import ProfilingMiddleware
 
-app = FastAPI(title="BrandSync API", description="API for BrandSync influencer marketing platform")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background threads run per process, so each pre-forked worker starts its own here
+    outreach.start_background_services()
+    yield
+    outreach.stop_background_services()
+
+app = FastAPI(title="BrandSync API", description="API for BrandSync influencer marketing platform", lifespan=lifespan)
 
 # Configure CORS for frontend integration
 app.add_middleware(
@@ -13,10 +27,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses with brotli or gzip above COMPRESSION_MIN_SIZE bytes
+app.add_middleware(CompressionMiddleware)
+
+# Tag log records with their route and sample verbose DEBUG lines per request
+app.add_middleware(LogContextMiddleware)
+
+# Record per-route latency and status codes
+app.add_middleware(MetricsMiddleware)
+
+# Trace request stages (opt-in via X-Trace) and log slow requests with their span tree
+app.add_middleware(TracingMiddleware)
+
+# Profile the next N requests when armed through /admin/profile
+app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(influencers.router)
 app.include_router(outreach.router)
+app.include_router(admin.router)
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to BrandSync API. Visit /docs for API documentation."}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Expose in-process metrics in the Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
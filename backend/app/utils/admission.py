@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+from app.utils.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Lanes in priority order: a freed slot always goes to the oldest waiter of the first non-empty lane
+LANES = ("interactive", "batch")
+
+
+class Overloaded(Exception):
+    """Raised when a request can't even be queued at an admission gate"""
+
+    def __init__(self, gate: str, lane: str, retry_after: int):
+        super().__init__(f"{gate} is overloaded ({lane} queue full), retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+
+
+class AdmissionGate:
+    """Bounded concurrency gate with priority lanes and load shedding
+
+    At most ``max_concurrent`` requests run at once. Others wait in their
+    lane's FIFO queue; when a lane's queue is full, requests are rejected
+    immediately with ``Overloaded`` instead of piling up. Slots are handed
+    directly to the next waiter, so a newcomer can't overtake the queue.
+    Safe to use from several event loops (e.g. test clients) at once.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: Dict[str, int]):
+        """Initialize the gate
+
+        Args:
+            name: Gate name used in metrics and errors
+            max_concurrent: Number of requests allowed to run at once
+            max_queue: Maximum number of waiting requests per lane
+        """
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = {lane: max_queue.get(lane, 0) for lane in LANES}
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiting: Dict[str, deque] = {lane: deque() for lane in LANES}
+        # Moving average of how long an admitted request holds its slot, for Retry-After
+        self._service_seconds = 0.05
+        self.rejected = dict.fromkeys(LANES, 0)
+
+    def _queued(self) -> int:
+        return sum(len(queue) for queue in self._waiting.values())
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained"""
+        backlog = self._queued() + self._active
+        return max(1, math.ceil(backlog * self._service_seconds / self.max_concurrent))
+
+    def _update_gauges(self):
+        for lane, queue in self._waiting.items():
+            ADMISSION_QUEUE_DEPTH.set(len(queue), gate=self.name, lane=lane)
+        ADMISSION_IN_FLIGHT.set(self._active, gate=self.name)
+
+    async def acquire(self, lane: str = "interactive"):
+        """Wait for a slot in the given lane
+
+        Raises:
+            ValueError: If the lane is unknown
+            Overloaded: If the lane's queue is full
+        """
+        if lane not in self._waiting:
+            raise ValueError(f"Unknown lane {lane}; expected one of {', '.join(LANES)}")
+        start = time.perf_counter()
+        with self._lock:
+            if self._active < self.max_concurrent and not self._queued():
+                self._active += 1
+                self._update_gauges()
+                ADMISSION_WAIT_SECONDS.observe(0.0, gate=self.name, lane=lane)
+                return
+            if len(self._waiting[lane]) >= self.max_queue[lane]:
+                self.rejected[lane] += 1
+                ADMISSION_REJECTED.inc(gate=self.name, lane=lane)
+                raise Overloaded(self.name, lane, self.retry_after())
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiting[lane].append(waiter)
+            self._update_gauges()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            # The client went away; give back the slot if it was already handed to us
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiting[lane].remove(waiter)
+                    self._update_gauges()
+            if granted:
+                self.release()
+            raise
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - start, gate=self.name, lane=lane)
+
+    def release(self):
+        """Free a slot, handing it to the highest-priority waiter if there is one"""
+        with self._lock:
+            for lane in LANES:
+                if self._waiting[lane]:
+                    waiter = self._waiting[lane].popleft()
+                    waiter.granted = True
+                    waiter.loop.call_soon_threadsafe(_grant, waiter.future)
+                    break
+            else:
+                self._active -= 1
+            self._update_gauges()
+
+    @asynccontextmanager
+    async def admit(self, lane: str = "interactive"):
+        """Hold a slot for the duration of the block"""
+        await self.acquire(lane)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._service_seconds += 0.2 * (elapsed - self._service_seconds)
+            self.release()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "in_flight": self._active,
+                "queued": {lane: len(queue) for lane, queue in self._waiting.items()},
+                "max_queue": dict(self.max_queue),
+                "rejected": dict(self.rejected),
+                "service_seconds": round(self._service_seconds, 4),
+            }
+
+
+def _grant(future: asyncio.Future):
+    # A waiter cancelled after being granted releases the slot itself
+    if not future.done():
+        future.set_result(None)
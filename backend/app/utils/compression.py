@@ -0,0 +1,263 @@
+import gzip
+import os
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+# Encodings offered, in order of preference; br is dropped if the brotli package (in requirements.txt) isn't installed
+COMPRESSION_ENCODINGS = [e.strip() for e in os.getenv('COMPRESSION_ENCODINGS', 'br,gzip').split(',') if e.strip()]
+# Responses shorter than this many bytes go out uncompressed (0 disables compression)
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+
+# Streamed bodies are flushed to the client after this much input, so a slow stream isn't held back indefinitely
+COMPRESSION_STREAM_FLUSH_SIZE = 64 * 1024
+
+# Streams that must reach the client as they are written, and bodies that are already compact
+UNCOMPRESSED_TYPES = ("text/event-stream", "application/octet-stream", "application/gzip", "application/zip",
+                      "image/", "audio/", "video/")
+
+
+def supported_encodings(encodings: List[str]) -> List[str]:
+    """The encodings of a preference list this process can produce"""
+    return [e for e in encodings if e == "gzip" or (e == "br" and brotli is not None)]
+
+
+def choose_encoding(accept_encoding: str, offered: List[str]) -> Optional[str]:
+    """Pick the first offered encoding the Accept-Encoding header allows, or None for identity"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    for encoding in offered:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of a response's representation in an encoding ('"abc"' -> '"abc-gzip"')
+
+    A strong ETag names exact bytes, so the compressed body needs its own.
+    """
+    if etag.endswith('"'):
+        return f"{etag[:-1]}-{encoding}\""
+    return etag
+
+
+def split_encoded_etags(if_none_match: str, encodings: List[str]) -> Tuple[str, Dict[str, str]]:
+    """Strip encoding suffixes from the ETags of an If-None-Match header
+
+    Returns:
+        The header as the application sees it, and each stripped ETag mapped to the one the client sent
+    """
+    candidates, sent = [], {}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        stripped = candidate
+        for encoding in encodings:
+            suffix = f"-{encoding}\""
+            if candidate.endswith(suffix):
+                stripped = candidate[:-len(suffix)] + '"'
+                sent[stripped[2:] if stripped.startswith("W/") else stripped] = candidate
+                break
+        candidates.append(stripped)
+    return ", ".join(candidates), sent
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = COMPRESSION_GZIP_LEVEL,
+             brotli_quality: int = COMPRESSION_BROTLI_QUALITY) -> bytes:
+    """Compress a whole body"""
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    # mtime=0 makes the output, and so its ETag, depend on the body alone
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor for a streamed body"""
+
+    def __init__(self, encoding: str, gzip_level: int = COMPRESSION_GZIP_LEVEL,
+                 brotli_quality: int = COMPRESSION_BROTLI_QUALITY):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits 16 + MAX_WBITS writes the gzip header and trailer
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self._unflushed = 0
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk, flushing once COMPRESSION_STREAM_FLUSH_SIZE bytes are pending
+
+        Flushing every chunk would cost most of the ratio on row-per-chunk streams.
+        """
+        self._unflushed += len(data)
+        flush = self._unflushed >= COMPRESSION_STREAM_FLUSH_SIZE
+        if flush:
+            self._unflushed = 0
+        if self._brotli is not None:
+            return self._brotli.process(data) + (self._brotli.flush() if flush else b"")
+        return self._zlib.compress(data) + (self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else b"")
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with brotli or gzip
+
+    The encoding is negotiated from Accept-Encoding against the configured
+    preference list. A response that arrives in one piece is compressed only
+    when it reaches ``min_size`` bytes; a streamed one is compressed as it is
+    written and flushed every COMPRESSION_STREAM_FLUSH_SIZE bytes of input.
+    Responses that are already encoded, that opt out with ``Cache-Control:
+    no-transform`` or whose type is in UNCOMPRESSED_TYPES (Server-Sent
+    Events, binary snapshots) pass through untouched.
+
+    Compressed responses carry ``<etag>-<encoding>`` as their ETag, and the
+    suffix is stripped from If-None-Match before the application compares
+    it, so conditional requests keep working on compressed representations;
+    a 304 answers with the ETag the client sent.
+    """
+
+    def __init__(self, app, encodings: Optional[List[str]] = None, min_size: Optional[int] = None,
+                 gzip_level: Optional[int] = None, brotli_quality: Optional[int] = None):
+        """Initialize the middleware
+
+        Args:
+            app: ASGI application to wrap
+            encodings: Encodings in order of preference (default: COMPRESSION_ENCODINGS)
+            min_size: Smallest body compressed, in bytes; 0 disables compression (default: COMPRESSION_MIN_SIZE)
+            gzip_level: zlib compression level (default: COMPRESSION_GZIP_LEVEL)
+            brotli_quality: Brotli quality (default: COMPRESSION_BROTLI_QUALITY)
+        """
+        self.app = app
+        self.encodings = supported_encodings(COMPRESSION_ENCODINGS if encodings is None else encodings)
+        self.min_size = COMPRESSION_MIN_SIZE if min_size is None else min_size
+        self.gzip_level = COMPRESSION_GZIP_LEVEL if gzip_level is None else gzip_level
+        self.brotli_quality = COMPRESSION_BROTLI_QUALITY if brotli_quality is None else brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings or self.min_size <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = scope["headers"]
+        accept_encoding = ""
+        sent_etags: Dict[str, str] = {}
+        rewritten = []
+        for name, value in request_headers:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+            elif name == b"if-none-match":
+                stripped, sent_etags = split_encoded_etags(value.decode("latin-1"), self.encodings)
+                value = stripped.encode("latin-1")
+            rewritten.append((name, value))
+        if sent_etags:
+            scope = {**scope, "headers": rewritten}
+        encoding = choose_encoding(accept_encoding, self.encodings)
+
+        start_message = None
+        compressor: Optional[StreamCompressor] = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                if message["status"] == 304 and sent_etags:
+                    await send({**message, "headers": self._echo_etag(message["headers"], sent_etags)})
+                    return
+                # Held back until the first body chunk shows whether the response is worth compressing
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                payload = compressor.compress(body) if more_body else compressor.finish(body)
+                await send({"type": "http.response.body", "body": payload, "more_body": more_body})
+            elif not self._compressible(start_message["headers"]):
+                await send(start_message)
+                await send(message)
+            elif encoding is None or (not more_body and len(body) < self.min_size):
+                await send(self._vary(start_message))
+                await send(message)
+            elif more_body:
+                compressor = StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+                await send(self._encoded_start(start_message, encoding, None))
+                await send({"type": "http.response.body", "body": compressor.compress(body), "more_body": True})
+                return
+            else:
+                payload = compress(body, encoding, self.gzip_level, self.brotli_quality)
+                await send(self._encoded_start(start_message, encoding, len(payload)))
+                await send({"type": "http.response.body", "body": payload})
+            if not more_body or compressor is None:
+                start_message = None
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _compressible(headers) -> bool:
+        for name, value in headers:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type" and value.decode("latin-1").lower().startswith(UNCOMPRESSED_TYPES):
+                return False
+            if name == b"cache-control" and b"no-transform" in value.lower():
+                return False
+        return True
+
+    @staticmethod
+    def _vary(start_message):
+        headers = list(start_message["headers"])
+        for i, (name, value) in enumerate(headers):
+            if name == b"vary":
+                if b"accept-encoding" not in value.lower() and value != b"*":
+                    headers[i] = (name, value + b", Accept-Encoding")
+                break
+        else:
+            headers.append((b"vary", b"Accept-Encoding"))
+        return {**start_message, "headers": headers}
+
+    def _encoded_start(self, start_message, encoding: str, length: Optional[int]):
+        headers = []
+        for name, value in self._vary(start_message)["headers"]:
+            if name == b"content-length":
+                continue
+            if name == b"etag":
+                value = encoded_etag(value.decode("latin-1"), encoding).encode("latin-1")
+            headers.append((name, value))
+        headers.append((b"content-encoding", encoding.encode("latin-1")))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode("latin-1")))
+        return {**start_message, "headers": headers}
+
+    @staticmethod
+    def _echo_etag(headers, sent_etags: Dict[str, str]):
+        echoed = []
+        for name, value in headers:
+            if name == b"etag":
+                etag = value.decode("latin-1")
+                value = sent_etags.get(etag[2:] if etag.startswith("W/") else etag, etag).encode("latin-1")
+            echoed.append((name, value))
+        return echoed
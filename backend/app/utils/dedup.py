@@ -0,0 +1,310 @@
+import re
+import threading
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.utils.lexical import tokenize
+
+# Mersenne prime for the universal hashes behind the MinHash permutations
+_PRIME = np.uint64((1 << 61) - 1)
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def contact_key(contact: Optional[str]) -> str:
+    """Lowercased contact address, the strongest sign two records are the same creator"""
+    return (contact or "").strip().lower()
+
+
+def _char_grams(text: str, prefix: str, size: int = 3) -> Set[str]:
+    text = _NON_ALNUM.sub("", text.lower())
+    if len(text) <= size:
+        return {prefix + text} if text else set()
+    return {prefix + text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def shingles(record: Dict[str, Any]) -> Set[str]:
+    """Features two records of the same creator from different agencies tend to share
+
+    Character trigrams of the name and of the contact handle (without the
+    domain, which agencies change), and the description's words.
+    """
+    handle = contact_key(record.get("contact")).split("@")[0]
+    features = _char_grams(record.get("name", ""), "n:")
+    features |= _char_grams(handle, "c:")
+    features |= {"d:" + word for word in tokenize(record.get("description") or "")}
+    return features
+
+
+class MinHasher:
+    """MinHash signatures estimating the Jaccard similarity of shingle sets"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, features: Iterable[str]) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(feature.encode("utf-8")) for feature in features), dtype=np.uint64)
+        if not len(hashes):
+            return np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        # (a * x + b) mod p, wrapping at 2^64 like other MinHash implementations; that costs a little
+        # uniformity but keeps every permutation in one vectorized uint64 expression
+        with np.errstate(over="ignore"):
+            return ((np.outer(self._a, hashes) + self._b[:, np.newaxis]) % _PRIME).min(axis=1)
+
+    @staticmethod
+    def jaccard(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        """Estimated Jaccard similarity of two signatures, or of one signature with each row of a stack"""
+        return np.mean(first == second, axis=-1)
+
+
+class MergeCandidate:
+    """A pair of records that look like the same creator"""
+
+    __slots__ = ("record_id", "duplicate_of", "jaccard", "cosine", "same_contact")
+
+    def __init__(self, record_id: int, duplicate_of: int, jaccard: float, cosine: Optional[float], same_contact: bool):
+        self.record_id = record_id
+        self.duplicate_of = duplicate_of
+        self.jaccard = jaccard
+        self.cosine = cosine
+        self.same_contact = same_contact
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.record_id,
+            "duplicate_of": self.duplicate_of,
+            "jaccard": round(self.jaccard, 3),
+            "cosine": None if self.cosine is None else round(self.cosine, 3),
+            "same_contact": self.same_contact,
+        }
+
+    def __repr__(self):
+        return f"MergeCandidate({self.record_id} -> {self.duplicate_of}, jaccard={self.jaccard:.2f}, cosine={self.cosine})"
+
+
+class DedupIndex:
+    """MinHash/LSH index of the roster for finding near-duplicate creators
+
+    Each record's shingle signature is split into ``bands`` bands of ``rows``
+    values, and records sharing any band land in the same LSH bucket, so a new
+    record is only compared with the handful of records it collides with
+    rather than the whole roster. A candidate pair is confirmed when the
+    signatures agree on at least ``jaccard_threshold`` of their values and the
+    embeddings on at least ``cosine_threshold`` cosine similarity, or outright
+    when both records have the same contact address.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[Dict[str, Any]] = (),
+        bands: int = 24,
+        rows: int = 5,
+        jaccard_threshold: float = 0.6,
+        cosine_threshold: float = 0.8,
+    ):
+        """Initialize the index
+
+        Args:
+            records: Initial influencer records
+            bands: LSH bands; more bands find pairs with lower similarity
+            rows: Signature values per band; more rows make buckets more selective
+            jaccard_threshold: Estimated shingle Jaccard similarity a candidate pair needs
+            cosine_threshold: Embedding cosine similarity a candidate pair needs, when embeddings are available
+        """
+        self.bands = bands
+        self.rows = rows
+        self.jaccard_threshold = jaccard_threshold
+        self.cosine_threshold = cosine_threshold
+        self._hasher = MinHasher(num_perm=bands * rows)
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._contacts: Dict[int, str] = {}
+        self._by_contact: Dict[str, Set[int]] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[int]] = {}
+        self._lock = threading.RLock()
+        self.upsert(records)
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def _unindex(self, record_id: int):
+        signature = self._signatures.pop(record_id, None)
+        if signature is not None:
+            for key in self._band_keys(signature):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(record_id)
+                    if not bucket:
+                        del self._buckets[key]
+        contact = self._contacts.pop(record_id, None)
+        if contact:
+            holders = self._by_contact[contact]
+            holders.discard(record_id)
+            if not holders:
+                del self._by_contact[contact]
+
+    def _index(self, record_id: int, signature: np.ndarray, contact: str):
+        self._signatures[record_id] = signature
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(record_id)
+        self._contacts[record_id] = contact
+        if contact:
+            self._by_contact.setdefault(contact, set()).add(record_id)
+
+    def upsert(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Index records, replacing any already indexed under the same ID
+
+        Returns:
+            Number of records indexed
+        """
+        count = 0
+        with self._lock:
+            for record in records:
+                self._unindex(record["id"])
+                self._index(record["id"], self._hasher.signature(shingles(record)), contact_key(record.get("contact")))
+                count += 1
+        return count
+
+    def delete(self, record_ids: Iterable[int]):
+        """Remove records from the index"""
+        with self._lock:
+            for record_id in record_ids:
+                self._unindex(record_id)
+
+    def _candidates(self, signature: np.ndarray, contact: str) -> Set[int]:
+        found: Set[int] = set(self._by_contact.get(contact, ())) if contact else set()
+        for key in self._band_keys(signature):
+            found |= self._buckets.get(key, set())
+        return found
+
+    def find(
+        self,
+        records: Sequence[Dict[str, Any]],
+        embeddings: Optional[np.ndarray] = None,
+        existing_embeddings: Optional[Callable[[List[int]], Dict[int, np.ndarray]]] = None,
+    ) -> List[MergeCandidate]:
+        """Find records in a batch that duplicate an indexed record or an earlier record of the batch
+
+        A record is never reported as a duplicate of its own ID, so re-ingesting
+        a record to update it isn't flagged. The index isn't changed.
+
+        Args:
+            records: Incoming influencer records
+            embeddings: Their embeddings, one row per record, to confirm candidates by cosine similarity
+            existing_embeddings: Looks up indexed records' embeddings by ID (missing IDs may be left out)
+
+        Returns:
+            Merge candidates, at most one per incoming record (its most similar match)
+        """
+        signatures = [self._hasher.signature(shingles(record)) for record in records]
+        contacts = [contact_key(record.get("contact")) for record in records]
+        vectors = None
+        if embeddings is not None:
+            vectors = np.asarray(embeddings, dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1.0, norms)
+        batch_rows = {record["id"]: row for row, record in enumerate(records)}
+
+        # Collide every record with the index and with the batch records before it
+        batch = DedupIndex(bands=self.bands, rows=self.rows)
+        pairs: List[Tuple[int, int, Set[int], Set[int]]] = []
+        with self._lock:
+            for row, record in enumerate(records):
+                indexed = self._candidates(signatures[row], contacts[row]) - {record["id"]}
+                earlier = batch._candidates(signatures[row], contacts[row]) - {record["id"]}
+                pairs.append((row, record["id"], indexed, earlier))
+                batch._index(record["id"], signatures[row], contacts[row])
+            indexed_signatures = {
+                candidate: self._signatures[candidate] for _, _, indexed, _ in pairs for candidate in indexed
+            }
+            indexed_contacts = {candidate: self._contacts.get(candidate, "") for candidate in indexed_signatures}
+
+        # Only candidates past the Jaccard threshold (or sharing a contact) need their embeddings
+        shortlisted = []
+        for row, record_id, indexed, earlier in pairs:
+            candidates = list(indexed | earlier)
+            if not candidates:
+                continue
+            others = np.stack([
+                signatures[batch_rows[candidate]] if candidate in earlier else indexed_signatures[candidate]
+                for candidate in candidates
+            ])
+            for candidate, jaccard in zip(candidates, MinHasher.jaccard(signatures[row], others).tolist()):
+                in_batch = candidate in earlier
+                other_contact = contacts[batch_rows[candidate]] if in_batch else indexed_contacts[candidate]
+                same_contact = bool(contacts[row]) and contacts[row] == other_contact
+                if same_contact or jaccard >= self.jaccard_threshold:
+                    shortlisted.append((row, record_id, candidate, in_batch, jaccard, same_contact))
+
+        lookup: Dict[int, np.ndarray] = {}
+        wanted = sorted({candidate for _, _, candidate, in_batch, _, _ in shortlisted if not in_batch})
+        if vectors is not None and existing_embeddings is not None and wanted:
+            for candidate, embedding in existing_embeddings(wanted).items():
+                embedding = np.asarray(embedding, dtype=np.float32)
+                norm = np.linalg.norm(embedding)
+                lookup[candidate] = embedding / norm if norm else embedding
+
+        best: Dict[int, MergeCandidate] = {}
+        for row, record_id, candidate, in_batch, jaccard, same_contact in shortlisted:
+            cosine = None
+            if vectors is not None:
+                other = vectors[batch_rows[candidate]] if in_batch else lookup.get(candidate)
+                if other is not None:
+                    cosine = float(vectors[row] @ other)
+            if not same_contact and cosine is not None and cosine < self.cosine_threshold:
+                continue
+            match = MergeCandidate(record_id, candidate, jaccard, cosine, same_contact)
+            current = best.get(record_id)
+            if current is None or (match.same_contact, match.jaccard, match.cosine or 0) > (current.same_contact, current.jaccard, current.cosine or 0):
+                best[record_id] = match
+        return [best[record["id"]] for record in records if record["id"] in best]
+
+    def report(
+        self,
+        existing_embeddings: Optional[Callable[[List[int]], Dict[int, np.ndarray]]] = None,
+    ) -> List[MergeCandidate]:
+        """Every pair of indexed records that look like the same creator, each pair once
+
+        Args:
+            existing_embeddings: Looks up records' embeddings by ID, to confirm pairs by cosine similarity
+        """
+        with self._lock:
+            signatures = dict(self._signatures)
+            contacts = dict(self._contacts)
+            buckets = [set(bucket) for bucket in self._buckets.values() if len(bucket) > 1]
+            buckets += [set(holders) for holders in self._by_contact.values() if len(holders) > 1]
+
+        pairs: Dict[Tuple[int, int], Tuple[float, bool]] = {}
+        for bucket in buckets:
+            members = sorted(bucket)
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    if (first, second) in pairs:
+                        continue
+                    same_contact = bool(contacts[first]) and contacts[first] == contacts[second]
+                    jaccard = float(MinHasher.jaccard(signatures[first], signatures[second]))
+                    if same_contact or jaccard >= self.jaccard_threshold:
+                        pairs[(first, second)] = (jaccard, same_contact)
+
+        lookup: Dict[int, np.ndarray] = {}
+        if existing_embeddings is not None and pairs:
+            for record_id, embedding in existing_embeddings(sorted({i for pair in pairs for i in pair})).items():
+                embedding = np.asarray(embedding, dtype=np.float32)
+                norm = np.linalg.norm(embedding)
+                lookup[record_id] = embedding / norm if norm else embedding
+
+        candidates = []
+        for (first, second), (jaccard, same_contact) in sorted(pairs.items()):
+            cosine = None
+            if first in lookup and second in lookup:
+                cosine = float(lookup[first] @ lookup[second])
+            if not same_contact and cosine is not None and cosine < self.cosine_threshold:
+                continue
+            candidates.append(MergeCandidate(second, first, jaccard, cosine, same_contact))
+        return candidates
@@ -0,0 +1,130 @@
+import hashlib
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Which encoder backs embeddings: "sentence-transformers" (real model) or "hashing" (deterministic, offline)
+EMBEDDING_ENCODER = os.getenv('EMBEDDING_ENCODER', 'sentence-transformers')
+# Dimension of the hashing encoder's vectors; matches all-MiniLM-L6-v2
+HASHING_DIMENSION = int(os.getenv('HASHING_ENCODER_DIMENSION', 384))
+
+ENCODER_BACKENDS = ("sentence-transformers", "hashing")
+
+_TOKEN = re.compile(r"\w+")
+
+
+class Encoder(ABC):
+    """Turns text into embedding vectors
+
+    ``encode`` follows SentenceTransformer's convention: a single string gives
+    a 1-D vector, a list of strings gives a 2-D array with one row per text.
+    Subclasses that don't implement it can't be instantiated.
+    """
+
+    name: str = ""
+    dimension: int = 0
+
+    @abstractmethod
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Embed one text or a list of texts"""
+
+
+class SentenceTransformerEncoder(Encoder):
+    """Encoder backed by a sentence-transformers model"""
+
+    def __init__(self, model_name: str):
+        """Load the model
+
+        Args:
+            model_name: Name or path of the sentence transformer model
+        """
+        # Imported here so the hashing encoder never pays for importing torch
+        from sentence_transformers import SentenceTransformer
+        self.name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        return self.model.encode(texts, batch_size=batch_size, **kwargs)
+
+
+@lru_cache(maxsize=65536)
+def _token_slot(token: str, dimension: int) -> Tuple[int, float]:
+    """Bucket and sign of a token, stable across processes and Python versions"""
+    digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+    return digest % dimension, 1.0 if (digest >> 63) & 1 else -1.0
+
+
+class HashingEncoder(Encoder):
+    """Deterministic bag-of-words encoder using signed feature hashing
+
+    Texts sharing words get similar vectors, which is enough for tests and for
+    benchmarking everything around the model, without downloading or running
+    one. Vectors are L2-normalized like the sentence transformer's.
+    """
+
+    PREFIX = "hashing-"
+
+    def __init__(self, dimension: int = HASHING_DIMENSION):
+        self.dimension = dimension
+        self.name = f"{self.PREFIX}{dimension}"
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        vectors = np.zeros((len(batch), self.dimension), dtype=np.float32)
+        for row, text in enumerate(batch):
+            for token in _TOKEN.findall(text.lower()):
+                slot, sign = _token_slot(token, self.dimension)
+                vectors[row, slot] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1.0, norms)
+        return vectors[0] if single else vectors
+
+
+def check_model_name(model_name: str):
+    """Reject model names no encoder can load, before starting a build with one
+
+    Raises:
+        ValueError: If a hashing encoder name lacks a positive dimension, or the name is blank
+    """
+    if not model_name or not model_name.strip():
+        raise ValueError("Model name is empty")
+    if model_name.startswith(HashingEncoder.PREFIX):
+        dimension = model_name[len(HashingEncoder.PREFIX):]
+        if not dimension.isdigit() or int(dimension) <= 0:
+            raise ValueError(f"Invalid hashing encoder name {model_name!r}; expected {HashingEncoder.PREFIX}<dimension>")
+
+
+def load_encoder(model_name: str, backend: Optional[str] = None) -> Encoder:
+    """Create the encoder for a model name
+
+    Names produced by the hashing encoder (``hashing-<dimension>``) always load
+    a hashing encoder, so index versions built with it can be reloaded.
+
+    Args:
+        model_name: Sentence transformer model name, or a hashing encoder name
+        backend: One of ENCODER_BACKENDS; defaults to EMBEDDING_ENCODER
+
+    Returns:
+        The encoder
+
+    Raises:
+        ValueError: If the backend or the model name is invalid
+    """
+    check_model_name(model_name)
+    backend = backend or EMBEDDING_ENCODER
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend {backend}; expected one of {', '.join(ENCODER_BACKENDS)}")
+    if model_name.startswith(HashingEncoder.PREFIX):
+        return HashingEncoder(int(model_name[len(HashingEncoder.PREFIX):]))
+    if backend == "hashing":
+        return HashingEncoder()
+    return SentenceTransformerEncoder(model_name)
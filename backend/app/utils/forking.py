@@ -0,0 +1,60 @@
+import logging
+import os
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Objects to reset in every forked child; held weakly so registering doesn't keep them alive
+_registered: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def reset_in_child(obj):
+    """Call ``obj._after_fork()`` in every child process forked from now on
+
+    A child gets a copy of its parent's objects but none of its threads, and
+    must not use SQLite connections (or locks another thread may have held)
+    inherited from it. Objects owning any of those register here and start
+    over in the child, e.g. in the pre-fork server's workers. The hook runs
+    right after fork(), while the child has a single thread.
+
+    Objects may also define ``_before_fork()`` and ``_after_fork_in_parent()``,
+    run in the forking process around fork(): a store takes its lock there, so
+    no thread is inside SQLite (and holding its process-wide mutexes, which the
+    child would inherit locked) at the moment of the fork.
+    """
+    _registered.add(obj)
+
+
+def _call(objects, hook: str):
+    for obj in objects:
+        method = getattr(obj, hook, None)
+        if method is None:
+            continue
+        try:
+            method()
+        except Exception as e:
+            logger.error(f"Error in {type(obj).__name__}.{hook}: {e}")
+
+
+# The objects prepared for the fork in progress, so the parent releases exactly those
+_forking: list = []
+
+
+def _before_fork():
+    _forking[:] = list(_registered)
+    _call(_forking, "_before_fork")
+
+
+def _after_fork_in_parent():
+    _call(_forking, "_after_fork_in_parent")
+    _forking.clear()
+
+
+def _after_fork_in_child():
+    _call(list(_registered), "_after_fork")
+    _forking.clear()
+
+
+if hasattr(os, "register_at_fork"):  # Not available on Windows, which can't fork
+    os.register_at_fork(before=_before_fork, after_in_parent=_after_fork_in_parent,
+                        after_in_child=_after_fork_in_child)
@@ -0,0 +1,294 @@
+import hashlib
+import inspect
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Any, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def template_hash(*text_generators: Callable) -> str:
+    """Hash the source of the description (and metadata) generators so template edits produce a new version"""
+    source = "".join(inspect.getsource(text_generator) for text_generator in text_generators)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:12]
+
+
+class IndexVersion:
+    """A complete, servable generation of a vector index"""
+
+    def __init__(self, key: str, model_name: str, template_hash: str, collection, model):
+        self.key = key
+        self.model_name = model_name
+        self.template_hash = template_hash
+        self.collection = collection
+        self.model = model
+        # Number of requests currently using this version
+        self.refs = 0
+        # Set once a newer version has replaced this one
+        self.retired = False
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "model_name": self.model_name,
+            "template_hash": self.template_hash,
+            "collection": self.collection.name,
+        }
+
+
+class IndexRegistry:
+    """Blue/green registry of versioned collections
+
+    Every (model, description template) pair is stored in its own collection,
+    named ``<prefix>_<key>``. One version is active and serves queries while a
+    replacement is built in the background; once the replacement is complete
+    it is swapped in atomically and the old collection is dropped as soon as
+    the last request using it has finished.
+
+    Writers change the roster and the active version inside ``writing()`` and
+    report the IDs they changed with ``note_changes``; a build re-indexes
+    those IDs into its collection before it is swapped in, so nothing
+    written while it ran is lost.
+    """
+
+    def __init__(self, chroma_client, model_loader: Callable[[str], Any], prefix: str = "influencers"):
+        """Initialize the registry
+
+        Args:
+            chroma_client: ChromaDB client holding the versioned collections
+            model_loader: Function loading an embedding model by name
+            prefix: Collection name prefix for this index
+        """
+        self.chroma_client = chroma_client
+        self.model_loader = model_loader
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        # Held by writers and by a build while it catches up and swaps, so no write falls between the two
+        self._write_lock = threading.RLock()
+        # IDs changed since a build started; None while no build runs
+        self._changes: Optional[Set[str]] = None
+        self._active: Optional[IndexVersion] = None
+        self._models: Dict[str, Any] = {}
+        self.building: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+
+    @staticmethod
+    def version_key(model_name: str, template_hash: str) -> str:
+        return hashlib.sha256(f"{model_name}\0{template_hash}".encode("utf-8")).hexdigest()[:12]
+
+    def collection_name(self, key: str) -> str:
+        return f"{self.prefix}_{key}"
+
+    @property
+    def active(self) -> Optional[IndexVersion]:
+        return self._active
+
+    def register_model(self, model_name: str, model):
+        """Make an already loaded model available to versions using it"""
+        self._models[model_name] = model
+
+    def _load_model(self, model_name: str):
+        if model_name not in self._models:
+            logger.info(f"Loading model {model_name} for index version")
+            self._models[model_name] = self.model_loader(model_name)
+        return self._models[model_name]
+
+    @contextmanager
+    def acquire(self):
+        """Pin the active version for the duration of a request"""
+        with self._lock:
+            version = self._active
+            if version is None:
+                raise RuntimeError("No index version is active")
+            version.refs += 1
+        try:
+            yield version
+        finally:
+            with self._lock:
+                version.refs -= 1
+                drop = version.retired and version.refs == 0
+            if drop:
+                self._drop(version)
+
+    @contextmanager
+    def writing(self):
+        """Hold off version swaps while a change is written to the roster and the active version
+
+        Acquire the version to write to inside this block, so it is the one
+        that stays active.
+        """
+        with self._write_lock:
+            yield
+
+    def note_changes(self, ids: Iterable[str]):
+        """Record IDs changed in the roster, for a build in progress to re-index before its swap"""
+        with self._lock:
+            if self._changes is not None:
+                self._changes.update(ids)
+
+    def _take_changes(self, stop: bool = False) -> Set[str]:
+        with self._lock:
+            changes = self._changes or set()
+            self._changes = None if stop else set()
+        return changes
+
+    def activate(self, version: IndexVersion):
+        """Atomically make a version the one serving queries"""
+        with self._lock:
+            previous = self._active
+            self._active = version
+            drop = False
+            if previous is not None and previous.key != version.key:
+                previous.retired = True
+                drop = previous.refs == 0
+        logger.info(f"Activated index version {version.key} ({version.model_name}, template {version.template_hash})")
+        if drop:
+            self._drop(previous)
+
+    def _drop(self, version: IndexVersion):
+        """Delete a retired version's collection and release its model if unused"""
+        try:
+            self.chroma_client.delete_collection(name=version.collection.name)
+            logger.info(f"Garbage-collected index version {version.key}")
+        except Exception as e:
+            logger.warning(f"Error deleting collection for index version {version.key}: {e}")
+        active = self._active
+        if active is None or active.model_name != version.model_name:
+            self._models.pop(version.model_name, None)
+
+    def load_existing(self, wanted_key: Optional[str] = None) -> Optional[IndexVersion]:
+        """Activate a complete version left in the client by a previous run
+
+        The version matching ``wanted_key`` is preferred, otherwise the most
+        recently completed one. Incomplete and superseded collections are deleted.
+
+        Returns:
+            The activated version, or None if there is no complete version
+        """
+        complete = []
+        for entry in self.chroma_client.list_collections():
+            name = getattr(entry, "name", entry)
+            if not name.startswith(self.prefix + "_"):
+                continue
+            collection = self.chroma_client.get_collection(name=name)
+            metadata = collection.metadata or {}
+            if metadata.get("complete"):
+                complete.append(collection)
+            else:
+                logger.info(f"Deleting incomplete index collection {name}")
+                self.chroma_client.delete_collection(name=name)
+
+        if not complete:
+            return None
+
+        complete.sort(key=lambda c: (c.name == self.collection_name(wanted_key), c.metadata.get("completed_at", "")))
+        chosen = complete.pop()
+        for stale in complete:
+            logger.info(f"Deleting superseded index collection {stale.name}")
+            self.chroma_client.delete_collection(name=stale.name)
+
+        metadata = chosen.metadata
+        version = IndexVersion(
+            key=chosen.name[len(self.prefix) + 1:],
+            model_name=metadata["model_name"],
+            template_hash=metadata["template_hash"],
+            collection=chosen,
+            model=self._load_model(metadata["model_name"])
+        )
+        self.activate(version)
+        return version
+
+    def build(self, model_name: str, template_hash: str, populate: Callable,
+              catch_up: Optional[Callable] = None) -> IndexVersion:
+        """Build a version into a fresh collection and activate it once complete
+
+        Args:
+            model_name: Embedding model for the new version
+            template_hash: Hash of the description template, see template_hash
+            populate: Function ``populate(collection, model_name, model)`` filling the collection
+            catch_up: Function ``catch_up(collection, model_name, model, ids)`` re-indexing the IDs
+                noted as changed while ``populate`` ran; without it those changes are not carried over
+
+        Returns:
+            The newly active version
+        """
+        key = self.version_key(model_name, template_hash)
+        active = self._active
+        if active is not None and active.key == key:
+            logger.info(f"Index version {key} is already active")
+            return active
+
+        name = self.collection_name(key)
+        try:
+            self.chroma_client.delete_collection(name=name)
+        except Exception:
+            pass
+
+        metadata = {"model_name": model_name, "template_hash": template_hash, "complete": False}
+        collection = self.chroma_client.create_collection(name=name, metadata=metadata)
+        with self._lock:
+            self._changes = set()
+        try:
+            model = self._load_model(model_name)
+            populate(collection, model_name, model)
+            # Catch up once without holding writers back, then on whatever they wrote meanwhile before swapping
+            changes = self._take_changes()
+            if changes and catch_up is not None:
+                catch_up(collection, model_name, model, changes)
+            with self._write_lock:
+                changes = self._take_changes(stop=True)
+                if changes and catch_up is not None:
+                    catch_up(collection, model_name, model, changes)
+
+                # Only a collection marked complete is ever served or reloaded
+                metadata["complete"] = True
+                metadata["completed_at"] = datetime.now().isoformat()
+                collection.modify(metadata=metadata)
+
+                version = IndexVersion(key, model_name, template_hash, collection, model)
+                self.activate(version)
+        except Exception:
+            self._take_changes(stop=True)
+            self.chroma_client.delete_collection(name=name)
+            raise
+        return version
+
+    def build_in_background(self, model_name: str, template_hash: str, populate: Callable,
+                            catch_up: Optional[Callable] = None) -> bool:
+        """Start building a version in a background thread (see ``build``)
+
+        Returns:
+            False if another build is already running
+        """
+        with self._lock:
+            if self.building is not None:
+                return False
+            self.building = {
+                "key": self.version_key(model_name, template_hash),
+                "model_name": model_name,
+                "template_hash": template_hash,
+                "started_at": datetime.now().isoformat(),
+            }
+
+        def run():
+            try:
+                self.build(model_name, template_hash, populate, catch_up)
+                self.last_error = None
+            except Exception as e:
+                logger.error(f"Error building index version for {model_name}: {e}")
+                self.last_error = str(e)
+            finally:
+                self.building = None
+
+        threading.Thread(target=run, name=f"{self.prefix}-index-build", daemon=True).start()
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        active = self._active
+        return {
+            "active": active.describe() if active else None,
+            "building": self.building,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,263 @@
+import base64
+import binascii
+import bisect
+import hashlib
+import json
+import threading
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
+
+import orjson
+
+from app.utils.rate_cards import COST_FIELDS, DELIVERABLES, cost_field, record_costs
+
+
+class InfluencerStore:
+    """In-memory influencer roster with secondary indexes
+
+    Records are kept by ID, with inverted indexes on the categorical fields used
+    for filtering and sorted ``(value, id)`` indexes on the sortable fields, so
+    filtered, sorted pages can be served with keyset (cursor) pagination
+    instead of scanning and sorting the whole roster on every request.
+
+    Rate cards are parsed into base-currency costs per deliverable, which get
+    sorted indexes of their own (``cost_per_post``, ``cost_per_video``, ...);
+    records that don't quote a deliverable are left out of its index.
+    """
+
+    # Categorical fields with an inverted index (list fields index each element)
+    INDEXED_FIELDS = ("category", "region", "platforms")
+    # Fields the roster can be sorted by
+    SORT_FIELDS = ("id", "followers", "engagement_rate") + COST_FIELDS
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+        """Initialize the store
+
+        Args:
+            records: Initial influencer records
+        """
+        self._records: Dict[int, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[str, Set[int]]] = {field: {} for field in self.INDEXED_FIELDS}
+        self._sorted: Dict[str, List[Tuple[Any, int]]] = {field: [] for field in self.SORT_FIELDS}
+        self._costs: Dict[int, Dict[str, float]] = {}
+        self._lock = threading.RLock()
+        # Incremented on every change so callers can key caches on the roster state
+        self.version = 0
+        # Sum of the records' content hashes, kept up to date on every change
+        self._hashes: Dict[int, int] = {}
+        self._content_hash = 0
+        self.upsert(records)
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the roster's content, independent of the order records were added in
+
+        Unlike ``version`` it is the same in every process holding the same
+        records, e.g. the pre-fork server's workers, and across restarts.
+        """
+        return f"{self._content_hash:032x}"
+
+    @staticmethod
+    def _hash(record: Dict[str, Any]) -> int:
+        content = orjson.dumps(record, option=orjson.OPT_SORT_KEYS, default=str)
+        return int.from_bytes(hashlib.blake2b(content, digest_size=16).digest(), "big")
+
+    @staticmethod
+    def _index_values(record: Dict[str, Any], field: str) -> List[str]:
+        value = record.get(field)
+        values = value if isinstance(value, list) else [value]
+        return [str(v).lower() for v in values if v is not None]
+
+    def sort_value(self, record: Dict[str, Any], field: str) -> Any:
+        """Value of a sort field for a record (None for a cost the rate card doesn't quote)"""
+        if field in COST_FIELDS:
+            return self._costs.get(record["id"], {}).get(field)
+        return record[field]
+
+    def costs(self, record_id: int) -> Dict[str, float]:
+        """Base-currency costs parsed from a record's rate card, keyed by cost field"""
+        return dict(self._costs.get(record_id, {}))
+
+    def _index(self, record: Dict[str, Any]):
+        record_id = record["id"]
+        for field in self.INDEXED_FIELDS:
+            for value in self._index_values(record, field):
+                self._postings[field].setdefault(value, set()).add(record_id)
+        self._costs[record_id] = record_costs(record.get("rate_card"))
+        for field in self.SORT_FIELDS:
+            value = self.sort_value(record, field)
+            if value is not None:
+                bisect.insort(self._sorted[field], (value, record_id))
+
+    def _unindex(self, record: Dict[str, Any]):
+        record_id = record["id"]
+        for field in self.INDEXED_FIELDS:
+            for value in self._index_values(record, field):
+                postings = self._postings[field].get(value)
+                if postings is not None:
+                    postings.discard(record_id)
+                    if not postings:
+                        del self._postings[field][value]
+        for field in self.SORT_FIELDS:
+            value = self.sort_value(record, field)
+            if value is None:
+                continue
+            entries = self._sorted[field]
+            position = bisect.bisect_left(entries, (value, record_id))
+            if position < len(entries) and entries[position] == (value, record_id):
+                del entries[position]
+        self._costs.pop(record_id, None)
+
+    def upsert(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace records by ID
+
+        Returns:
+            Number of records upserted
+        """
+        count = 0
+        with self._lock:
+            for record in records:
+                existing = self._records.get(record["id"])
+                if existing is not None:
+                    self._unindex(existing)
+                self._records[record["id"]] = record
+                self._index(record)
+                record_hash = self._hash(record)
+                self._content_hash = (self._content_hash - self._hashes.get(record["id"], 0) + record_hash) % 2**128
+                self._hashes[record["id"]] = record_hash
+                count += 1
+            if count:
+                self.version += 1
+        return count
+
+    def get(self, record_id: int) -> Optional[Dict[str, Any]]:
+        return self._records.get(record_id)
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Return every record in ID order"""
+        with self._lock:
+            return [self._records[record_id] for _, record_id in self._sorted["id"]]
+
+    def __len__(self):
+        return len(self._records)
+
+    @staticmethod
+    def encode_cursor(sort: str, descending: bool, value: Any, record_id: int) -> str:
+        raw = json.dumps([sort, descending, value, record_id], separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[Any, int]:
+        """Decode a cursor, raising ValueError if it is malformed or from a different ordering"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            cursor_sort, cursor_descending, value, record_id = json.loads(raw)
+        except (binascii.Error, ValueError, TypeError):
+            raise ValueError("Malformed cursor")
+        if cursor_sort != sort or cursor_descending != descending:
+            raise ValueError("Cursor was issued for a different sort order")
+        return value, record_id
+
+    def _candidates(self, filters: Dict[str, Optional[str]]) -> Optional[Set[int]]:
+        """Intersect the inverted indexes for the given equality filters (None if unfiltered)"""
+        candidates = None
+        for field, value in filters.items():
+            if value is None:
+                continue
+            postings = self._postings[field].get(value.lower(), set())
+            candidates = set(postings) if candidates is None else candidates & postings
+        return candidates
+
+    def _cost_range(self, deliverable: str, min_cost: Optional[float], max_cost: Optional[float]) -> Set[int]:
+        """IDs whose cost for a deliverable lies within the bounds, read off its sorted index"""
+        entries = self._sorted[cost_field(deliverable)]
+        start = 0 if min_cost is None else bisect.bisect_left(entries, (min_cost,))
+        end = len(entries) if max_cost is None else bisect.bisect_right(entries, (max_cost, float("inf")))
+        return {record_id for _, record_id in entries[start:end]}
+
+    def _ordered_entries(self, sort: str, candidates: Optional[Set[int]]) -> List[Tuple[Any, int]]:
+        if candidates is not None and len(candidates) * 8 < len(self._records):
+            # Small filtered sets are cheaper to sort directly than to scan the full index for
+            values = ((self.sort_value(self._records[record_id], sort), record_id) for record_id in candidates)
+            return sorted(entry for entry in values if entry[0] is not None)
+        return self._sorted[sort]
+
+    def iter_query(
+        self,
+        category: Optional[str] = None,
+        region: Optional[str] = None,
+        platform: Optional[str] = None,
+        min_followers: Optional[int] = None,
+        max_followers: Optional[int] = None,
+        min_engagement: Optional[float] = None,
+        deliverable: str = "post",
+        min_cost: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        sort: str = "id",
+        descending: bool = False,
+        cursor: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield matching records in sort order, starting after ``cursor``
+
+        ``min_cost`` and ``max_cost`` bound the base-currency cost of
+        ``deliverable``; records without a price for it don't match them.
+
+        Raises:
+            ValueError: If the sort field, deliverable or cursor is invalid
+        """
+        if sort not in self.SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {sort}; expected one of {', '.join(self.SORT_FIELDS)}")
+        if deliverable not in DELIVERABLES:
+            raise ValueError(f"Unknown deliverable {deliverable}; expected one of {', '.join(DELIVERABLES)}")
+
+        with self._lock:
+            candidates = self._candidates({"category": category, "region": region, "platforms": platform})
+            if min_cost is not None or max_cost is not None:
+                in_range = self._cost_range(deliverable, min_cost, max_cost)
+                candidates = in_range if candidates is None else candidates & in_range
+            # Snapshot the index so concurrent upserts can't disturb iteration
+            entries = list(self._ordered_entries(sort, candidates))
+
+        if cursor:
+            after = tuple(self.decode_cursor(cursor, sort, descending))
+            if descending:
+                entries = entries[:bisect.bisect_left(entries, after)]
+            else:
+                entries = entries[bisect.bisect_right(entries, after):]
+        if descending:
+            entries = reversed(entries)
+
+        for _, record_id in entries:
+            if candidates is not None and record_id not in candidates:
+                continue
+            record = self._records.get(record_id)
+            if record is None:
+                continue
+            if min_followers is not None and record["followers"] < min_followers:
+                continue
+            if max_followers is not None and record["followers"] > max_followers:
+                continue
+            if min_engagement is not None and record["engagement_rate"] < min_engagement:
+                continue
+            yield record
+
+    def query(self, limit: int, sort: str = "id", descending: bool = False, **filters) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return one page of matching records and the cursor for the next page
+
+        Args:
+            limit: Maximum number of records to return
+            sort: Field to sort by, one of SORT_FIELDS
+            descending: Sort from highest to lowest
+            **filters: Filters and cursor accepted by iter_query
+
+        Returns:
+            The page and the cursor for the next page (None on the last page)
+        """
+        page = []
+        next_cursor = None
+        for record in self.iter_query(sort=sort, descending=descending, **filters):
+            if len(page) == limit:
+                last = page[-1]
+                next_cursor = self.encode_cursor(sort, descending, self.sort_value(last, sort), last["id"])
+                break
+            page.append(record)
+        return page, next_cursor
@@ -0,0 +1,202 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.utils.matching import RosterMatrix
+
+
+def _top_k(similarities: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column indexes and values of each row's k largest similarities, best first"""
+    k = min(k, similarities.shape[1])
+    if k == 0:
+        empty = np.zeros((similarities.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+    if k < similarities.shape[1]:
+        columns = np.argpartition(similarities, similarities.shape[1] - k, axis=1)[:, -k:]
+    else:
+        columns = np.tile(np.arange(similarities.shape[1]), (similarities.shape[0], 1))
+    values = np.take_along_axis(similarities, columns, axis=1)
+    order = np.argsort(-values, axis=1, kind="stable")
+    return np.take_along_axis(columns, order, axis=1), np.take_along_axis(values, order, axis=1)
+
+
+class KnnGraph:
+    """Exact k-nearest-neighbour graph over the roster's embeddings
+
+    Each record's ``k`` most cosine-similar records are computed up front, so
+    lookalikes are a dictionary lookup. The build multiplies one block of rows
+    against the whole matrix at a time, bounding the similarity scratch space
+    to ``max_block_bytes`` however large the roster gets.
+
+    Updates are incremental and keep the graph exact: a changed record gets a
+    fresh neighbour list and is inserted into every list it now beats the last
+    entry of, while lists that contained a changed or deleted record are
+    recomputed, since their best replacement may not be in them.
+    """
+
+    def __init__(self, k: int = 10, max_block_bytes: int = 64 * 1024 * 1024):
+        """Initialize an empty graph
+
+        Args:
+            k: Neighbours kept per record
+            max_block_bytes: Most memory one block of similarities may take during a build or update
+        """
+        self.k = k
+        self.max_block_bytes = max_block_bytes
+        # record id -> (neighbour ids, similarities), best first
+        self._neighbours: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        # record id -> records whose lists contain it
+        self._reverse: Dict[int, Set[int]] = {}
+        # Similarity a record must beat to enter each full list, as sorted id and value arrays so they can be
+        # looked up for the whole roster at once; ids whose list changed since are synced lazily
+        self._kth_ids = np.zeros(0, dtype=np.int64)
+        self._kth_values = np.zeros(0, dtype=np.float32)
+        self._kth_dirty: Set[int] = set()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._neighbours)
+
+    def _block_size(self, columns: int) -> int:
+        # Each similarity takes 4 bytes, plus 8 for its index while the top k are partitioned out
+        return max(1, self.max_block_bytes // (12 * max(columns, 1)))
+
+    def _unlink(self, record_id: int):
+        """Forget which records a record's current list points at"""
+        previous = self._neighbours.get(record_id)
+        if previous is not None:
+            for neighbour_id in previous[0].tolist():
+                referrers = self._reverse.get(neighbour_id)
+                if referrers is not None:
+                    referrers.discard(record_id)
+
+    def _set(self, record_id: int, neighbour_ids: np.ndarray, similarities: np.ndarray):
+        self._unlink(record_id)
+        self._neighbours[record_id] = (neighbour_ids, similarities)
+        for neighbour_id in neighbour_ids.tolist():
+            self._reverse.setdefault(neighbour_id, set()).add(record_id)
+        self._kth_dirty.add(record_id)
+
+    def _drop(self, record_id: int):
+        self._unlink(record_id)
+        self._neighbours.pop(record_id, None)
+        self._reverse.pop(record_id, None)
+        self._kth_dirty.add(record_id)
+
+    def _kth(self, record_id: int) -> float:
+        entry = self._neighbours.get(record_id)
+        if entry is None or len(entry[1]) < self.k:
+            return -np.inf
+        return float(entry[1][-1])
+
+    def _thresholds(self, ids: np.ndarray) -> np.ndarray:
+        """Similarity a new neighbour must beat for each of the given records' lists"""
+        if len(self._kth_dirty) * 8 > len(self._kth_ids):
+            # Many changes (e.g. after a build): rebuild the arrays in one go
+            self._kth_ids = np.array(sorted(self._neighbours), dtype=np.int64)
+            self._kth_values = np.array([self._kth(record_id) for record_id in self._kth_ids.tolist()], dtype=np.float32)
+        else:
+            for record_id in self._kth_dirty:
+                position = int(np.searchsorted(self._kth_ids, record_id))
+                present = position < len(self._kth_ids) and self._kth_ids[position] == record_id
+                if record_id not in self._neighbours:
+                    if present:
+                        self._kth_ids = np.delete(self._kth_ids, position)
+                        self._kth_values = np.delete(self._kth_values, position)
+                elif present:
+                    self._kth_values[position] = self._kth(record_id)
+                else:
+                    self._kth_ids = np.insert(self._kth_ids, position, record_id)
+                    self._kth_values = np.insert(self._kth_values, position, self._kth(record_id))
+        self._kth_dirty.clear()
+        if not len(self._kth_ids):
+            return np.full(len(ids), -np.inf, dtype=np.float32)
+        positions = np.minimum(np.searchsorted(self._kth_ids, ids), len(self._kth_ids) - 1)
+        return np.where(self._kth_ids[positions] == ids, self._kth_values[positions], -np.inf).astype(np.float32)
+
+    def _compute(self, rows: List[int], ids: np.ndarray, embeddings: np.ndarray):
+        """Compute the neighbour lists of the given rows against every row, one block at a time"""
+        block_size = self._block_size(len(ids))
+        for start in range(0, len(rows), block_size):
+            block = np.asarray(rows[start:start + block_size])
+            similarities = embeddings[block] @ embeddings.T
+            similarities[np.arange(len(block)), block] = -np.inf  # never your own neighbour
+            columns, values = _top_k(similarities, min(self.k, len(ids) - 1))
+            for row, row_columns, row_values in zip(block.tolist(), columns, values):
+                self._set(int(ids[row]), ids[row_columns].copy(), row_values.astype(np.float32))
+
+    def build(self, ids: np.ndarray, embeddings: np.ndarray):
+        """Compute every record's neighbours from scratch
+
+        Args:
+            ids: Record IDs, one per embedding row
+            embeddings: L2-normalized embeddings
+        """
+        with self._lock:
+            self._neighbours.clear()
+            self._reverse.clear()
+            self._kth_dirty.clear()
+            self._kth_ids = np.zeros(0, dtype=np.int64)
+            self._kth_values = np.zeros(0, dtype=np.float32)
+            self._compute(list(range(len(ids))), ids, embeddings)
+
+    def update(self, matrix: RosterMatrix, record_ids: Iterable[int]):
+        """Bring the graph up to date after the given records were upserted into or deleted from the matrix"""
+        with self._lock, matrix.read() as (ids, embeddings, rows):
+            changed = set(record_ids)
+            present = [record_id for record_id in changed if record_id in rows]
+            stale: Set[int] = set(present)
+
+            for record_id in changed:
+                # Lists holding a changed or deleted record may now have a better candidate outside them
+                stale |= self._reverse.get(record_id, set())
+                if record_id not in rows:
+                    self._drop(record_id)
+            stale = {record_id for record_id in stale if record_id in rows}
+
+            # Insert the changed records into every other list they now beat the last entry of
+            if present and len(ids) > 1:
+                limit = min(self.k, len(ids) - 1)
+                thresholds = self._thresholds(ids)
+                block_size = self._block_size(len(ids))
+                for start in range(0, len(present), block_size):
+                    block = present[start:start + block_size]
+                    similarities = embeddings[[rows[record_id] for record_id in block]] @ embeddings.T
+                    for record_id, row_similarities in zip(block, similarities):
+                        for row in np.flatnonzero(row_similarities > thresholds).tolist():
+                            other_id = int(ids[row])
+                            if other_id == record_id or other_id in stale:
+                                continue
+                            self._insert(other_id, record_id, float(row_similarities[row]), limit)
+                            thresholds[row] = self._kth(other_id)
+
+            self._compute([rows[record_id] for record_id in stale], ids, embeddings)
+
+    def _insert(self, record_id: int, neighbour_id: int, similarity: float, limit: int):
+        neighbour_ids, similarities = self._neighbours.get(record_id, (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)))
+        keep = neighbour_ids != neighbour_id
+        neighbour_ids, similarities = neighbour_ids[keep], similarities[keep]
+        position = int(np.searchsorted(-similarities, -similarity, side="right"))
+        neighbour_ids = np.insert(neighbour_ids, position, neighbour_id)[:limit]
+        similarities = np.insert(similarities, position, similarity)[:limit]
+        self._set(record_id, neighbour_ids, similarities.astype(np.float32))
+
+    def neighbours(self, record_id: int) -> Optional[List[Tuple[int, float]]]:
+        """A record's neighbours and their similarities, best first (None if the record isn't in the graph)"""
+        entry = self._neighbours.get(record_id)
+        if entry is None:
+            return None
+        return list(zip(entry[0].tolist(), entry[1].tolist()))
+
+
+def nearest(matrix: RosterMatrix, record_id: int, k: int) -> Optional[List[Tuple[int, float]]]:
+    """Exact neighbours of one record by brute force, for when no graph is available"""
+    with matrix.read() as (ids, embeddings, rows):
+        row = rows.get(record_id)
+        if row is None:
+            return None
+        similarities = (embeddings @ embeddings[row])[np.newaxis]
+        similarities[0, row] = -np.inf
+        columns, values = _top_k(similarities, min(k, len(ids) - 1))
+        return list(zip(ids[columns[0]].tolist(), values[0].tolist()))
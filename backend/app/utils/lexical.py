@@ -0,0 +1,222 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Splits names, handles and e-mail addresses into searchable words ("raj@techreviews.in" -> raj, techreviews, in)
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Words too common in queries and descriptions to tell creators apart; skipping them keeps postings short
+STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "by", "for", "from", "in", "is", "of", "on",
+    "or", "the", "their", "they", "to", "who", "with",
+))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens of a text, without stopwords"""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class LexicalIndex:
+    """In-memory inverted index over influencer records with BM25 scoring
+
+    Each record is indexed as one document whose term frequencies are weighted
+    per field, so a query naming a creator or handle counts more when it
+    matches the name or contact than when the word appears in a description.
+    Records can be added, replaced and removed one at a time; the collection
+    statistics BM25 needs (document count, average length) are kept up to date
+    incrementally, so no rebuild is ever required.
+
+    A term's BM25 contributions are computed once into arrays and reused by
+    later queries until the next change, so a query costs a few vectorized
+    additions per term instead of a Python loop over every posting.
+    """
+
+    # Term frequency multiplier per indexed field
+    FIELD_WEIGHTS = {
+        "name": 3.0,
+        "contact": 2.0,
+        "category": 1.5,
+        "region": 1.5,
+        "platforms": 1.0,
+        "rate_card": 1.0,
+        "description": 1.0,
+    }
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = (), k1: float = 1.2, b: float = 0.75):
+        """Initialize the index
+
+        Args:
+            records: Initial influencer records
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        # term -> {slot: weighted term frequency}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        # Each record occupies a slot (a position in the score array); freed slots are reused
+        self._slots: Dict[int, int] = {}
+        self._slot_ids: List[Optional[int]] = []
+        self._free_slots: List[int] = []
+        # slot -> weighted term frequencies and weighted document length
+        self._terms_by_slot: Dict[int, Dict[str, float]] = {}
+        self._lengths = np.zeros(0, dtype=np.float64)
+        self._total_length = 0.0
+        # term -> (slots, BM25 contributions), valid until the next change
+        self._term_scores: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.RLock()
+        self.upsert(records)
+
+    def _terms(self, record: Dict[str, Any]) -> Dict[str, float]:
+        frequencies: Dict[str, float] = {}
+        for field, weight in self.FIELD_WEIGHTS.items():
+            value = record.get(field)
+            if not value:
+                continue
+            text = " ".join(value) if isinstance(value, list) else str(value)
+            for term, count in Counter(tokenize(text)).items():
+                frequencies[term] = frequencies.get(term, 0.0) + weight * count
+        return frequencies
+
+    def _remove(self, record_id: int):
+        slot = self._slots.pop(record_id, None)
+        if slot is None:
+            return
+        for term in self._terms_by_slot.pop(slot):
+            postings = self._postings[term]
+            del postings[slot]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths[slot]
+        self._lengths[slot] = 0.0
+        self._slot_ids[slot] = None
+        self._free_slots.append(slot)
+
+    def _add(self, record: Dict[str, Any]):
+        record_id = record["id"]
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slot_ids[slot] = record_id
+        else:
+            slot = len(self._slot_ids)
+            self._slot_ids.append(record_id)
+            if slot >= len(self._lengths):
+                self._lengths = np.concatenate([self._lengths, np.zeros(max(1024, slot), dtype=np.float64)])
+        frequencies = self._terms(record)
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[slot] = frequency
+        self._slots[record_id] = slot
+        self._terms_by_slot[slot] = frequencies
+        self._lengths[slot] = sum(frequencies.values())
+        self._total_length += self._lengths[slot]
+
+    def upsert(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Index records, replacing any already indexed under the same ID
+
+        Returns:
+            Number of records indexed
+        """
+        count = 0
+        with self._lock:
+            for record in records:
+                self._remove(record["id"])
+                self._add(record)
+                count += 1
+            if count:
+                self._term_scores.clear()
+        return count
+
+    def delete(self, record_ids: Iterable[int]):
+        """Remove records from the index"""
+        with self._lock:
+            for record_id in record_ids:
+                self._remove(record_id)
+            self._term_scores.clear()
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _scores_for(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        cached = self._term_scores.get(term)
+        if cached is not None:
+            return cached
+        postings = self._postings.get(term)
+        if not postings:
+            return None
+        count = len(self._slots)
+        slots = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+        frequencies = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+        # BM25 idf; the +1 keeps it positive for terms found in most documents
+        idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+        norms = self.k1 * (1 - self.b + self.b * self._lengths[slots] / (self._total_length / count))
+        cached = self._term_scores[term] = (slots, idf * frequencies * (self.k1 + 1) / (frequencies + norms))
+        return cached
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        accept: Optional[Callable[[int], bool]] = None
+    ) -> List[Tuple[int, float]]:
+        """Score records against a query with BM25
+
+        Args:
+            query: Free-text query
+            top_k: Maximum number of results
+            accept: Optional predicate restricting which record IDs may be returned
+
+        Returns:
+            (record ID, score) pairs, best first
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            if not self._slots or not terms:
+                return []
+            scores = np.zeros(len(self._slot_ids), dtype=np.float64)
+            for term in terms:
+                term_scores = self._scores_for(term)
+                if term_scores is not None:
+                    scores[term_scores[0]] += term_scores[1]
+            slot_ids = self._slot_ids
+
+            matched = np.flatnonzero(scores)
+            if accept is None and len(matched) > top_k:
+                # Only the best top_k need sorting
+                matched = matched[np.argpartition(-scores[matched], top_k)[:top_k]]
+            ranked = matched[np.argsort(-scores[matched], kind="stable")]
+
+            results = []
+            for slot in ranked.tolist():
+                record_id = slot_ids[slot]
+                if accept is None or accept(record_id):
+                    results.append((record_id, float(scores[slot])))
+                    if len(results) == top_k:
+                        break
+        return results
+
+
+def reciprocal_rank_fusion(rankings: List[List[Any]], weights: Optional[List[float]] = None, k: float = 60) -> List[Tuple[Any, float]]:
+    """Fuse several ranked lists of IDs with weighted reciprocal rank fusion
+
+    Each ID scores ``weight / (k + rank)`` in every list it appears in (ranks
+    start at 1), so agreement between lists beats a high rank in just one.
+
+    Args:
+        rankings: Ranked lists of IDs, best first
+        weights: Weight per list (defaults to 1 for every list)
+        k: Rank damping constant; larger values flatten the contribution of top ranks
+
+    Returns:
+        (ID, fused score) pairs, best first
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[Any, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,189 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Logging settings
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+# Fraction of requests whose DEBUG lines are kept, e.g. "/influencers/search=0.01,/outreach/email=0.1"
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', 1.0))
+LOG_DEBUG_SAMPLE_RATES = os.getenv('LOG_DEBUG_SAMPLE_RATES', '')
+
+# Route of the request being handled and whether its DEBUG lines were sampled
+current_route: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("log_route", default=None)
+debug_sampled: contextvars.ContextVar[bool] = contextvars.ContextVar("log_debug_sampled", default=True)
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse a "route=rate,route=rate" sampling specification"""
+    rates = {}
+    for item in spec.split(","):
+        route, sep, rate = item.strip().partition("=")
+        if sep:
+            rates[route.strip()] = float(rate)
+    return rates
+
+
+_sample_rates = parse_sample_rates(LOG_DEBUG_SAMPLE_RATES)
+
+
+def debug_enabled(logger: logging.Logger) -> bool:
+    """Check whether DEBUG lines from a logger would be kept for the current request
+
+    Guarding loops of debug calls with this avoids building records that the
+    sampling filter would drop anyway.
+    """
+    return logger.isEnabledFor(logging.DEBUG) and debug_sampled.get()
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as single-line JSON objects, including any extra= fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        route = getattr(record, "route", None)
+        if route:
+            entry["route"] = route
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key != "route":
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Drop DEBUG records from requests that were not sampled, and tag records with their route"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.DEBUG and not debug_sampled.get():
+            return False
+        record.route = current_route.get()
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that never blocks the caller and defers formatting to the listener thread
+
+    The stock QueueHandler formats every record in the calling thread before
+    enqueueing it; here records are enqueued as-is and the message is only
+    built when the listener writes it out. When the queue is full the record
+    is dropped and counted rather than stalling the request.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def create_queue_handler(handler: logging.Handler, queue_size: int = LOG_QUEUE_SIZE):
+    """Wrap a handler behind a bounded queue drained by a background listener
+
+    Returns:
+        The queue handler to attach to loggers and the (unstarted) listener
+    """
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    queue_handler.addFilter(DebugSamplingFilter())
+    listener = QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    return queue_handler, listener
+
+
+def setup_logging():
+    """Route the root logger through a non-blocking queue to a structured stderr handler
+
+    Safe to call from every module; only the first call configures logging.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler(sys.stderr)
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    queue_handler, _listener = create_queue_handler(handler)
+    root = logging.getLogger()
+    root.addHandler(queue_handler)
+    root.setLevel(LOG_LEVEL)
+    _listener.start()
+    atexit.register(_stop_listener)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _restart_after_fork():
+    """Give a forked child its own queue and listener thread
+
+    The parent's listener thread doesn't exist in the child, and the queue's
+    lock may have been held by it at the time of the fork.
+    """
+    global _listener
+    root = logging.getLogger()
+    old_handler = next((h for h in root.handlers if isinstance(h, NonBlockingQueueHandler)), None)
+    if old_handler is None:
+        return
+    queue_handler, _listener = create_queue_handler(_listener.handlers[0])
+    root.removeHandler(old_handler)
+    root.addHandler(queue_handler)
+    _listener.start()
+
+
+class LogContextMiddleware:
+    """ASGI middleware recording the route and the DEBUG sampling decision for each request
+
+    Sampling is decided once per request, so a sampled request keeps all of its
+    DEBUG lines and an unsampled one drops them all.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "")
+        rate = _sample_rates.get(path, LOG_DEBUG_SAMPLE_RATE)
+        route_token = current_route.set(path)
+        sampled_token = debug_sampled.set(rate >= 1.0 or random.random() < rate)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_route.reset(route_token)
+            debug_sampled.reset(sampled_token)
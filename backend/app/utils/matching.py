@@ -0,0 +1,332 @@
+import math
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.rate_cards import DELIVERABLES, cost_field, record_costs
+
+# Weight of each standardized component in a match score
+DEFAULT_WEIGHTS = {
+    "relevance": 1.0,   # cosine similarity of the brief to the creator's description
+    "engagement": 0.35,  # engagement rate
+    "reach": 0.25,       # log follower count
+    "value": 0.4,        # log expected engagements per dollar for the campaign's deliverables
+}
+
+
+class RosterMatrix:
+    """Dense, row-aligned embedding matrix and structured features of the roster
+
+    Every record occupies one row of an L2-normalized embedding matrix and of
+    per-feature arrays (followers, engagement, parsed rate-card costs and
+    categorical codes), so a brief can be scored against the whole roster
+    with one matrix product and a handful of vectorized operations. Deleted
+    rows are filled with the last row, keeping the arrays dense.
+
+    The matrix belongs to one index version (``version_key``); rows are added
+    with the embeddings that version's model produced. Every upsert and delete
+    bumps ``generation`` so derived structures built from a snapshot can catch
+    up on what changed since.
+    """
+
+    CATEGORICAL_FIELDS = ("category", "region")
+
+    def __init__(self, dimension: int, version_key: Optional[str] = None, capacity: int = 1024):
+        """Initialize an empty matrix
+
+        Args:
+            dimension: Embedding dimension
+            version_key: Index version the embeddings come from
+            capacity: Initial number of rows to allocate
+        """
+        self.dimension = dimension
+        self.version_key = version_key
+        self._size = 0
+        self._rows: Dict[int, int] = {}
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._embeddings = np.zeros((capacity, dimension), dtype=np.float32)
+        self._log_followers = np.zeros(capacity, dtype=np.float32)
+        self._followers = np.zeros(capacity, dtype=np.float64)
+        self._engagement = np.zeros(capacity, dtype=np.float32)
+        self._costs = np.full((capacity, len(DELIVERABLES)), np.nan, dtype=np.float64)
+        self._codes = {field: np.full(capacity, -1, dtype=np.int32) for field in self.CATEGORICAL_FIELDS}
+        self._platforms = np.zeros(capacity, dtype=np.int64)
+        # Lowercased categorical value -> code (codes are never reused, so they stay stable)
+        self._vocab: Dict[str, Dict[str, int]] = {field: {} for field in self.CATEGORICAL_FIELDS + ("platforms",)}
+        # record id -> generation of its last upsert or delete
+        self._changed: Dict[int, int] = {}
+        self.generation = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, record_id: int) -> bool:
+        return record_id in self._rows
+
+    def _code(self, field: str, value: Any) -> int:
+        vocab = self._vocab[field]
+        key = str(value).lower()
+        if key not in vocab:
+            vocab[key] = len(vocab)
+        return vocab[key]
+
+    def _grow(self, needed: int):
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+
+        def grown(array: np.ndarray, fill) -> np.ndarray:
+            larger = np.full((new_capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            larger[:capacity] = array
+            return larger
+
+        self._ids = grown(self._ids, 0)
+        self._embeddings = grown(self._embeddings, 0)
+        self._log_followers = grown(self._log_followers, 0)
+        self._followers = grown(self._followers, 0)
+        self._engagement = grown(self._engagement, 0)
+        self._costs = grown(self._costs, np.nan)
+        self._codes = {field: grown(codes, -1) for field, codes in self._codes.items()}
+        self._platforms = grown(self._platforms, 0)
+
+    def upsert(self, records: Sequence[Dict[str, Any]], embeddings: np.ndarray):
+        """Insert or replace records with their embeddings
+
+        Args:
+            records: Influencer records
+            embeddings: One embedding per record, in the same order
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(records), self.dimension)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.where(norms == 0, 1.0, norms)
+        with self._lock:
+            self._grow(self._size + len(records))
+            self.generation += 1
+            for record, embedding in zip(records, embeddings):
+                record_id = record["id"]
+                self._changed[record_id] = self.generation
+                row = self._rows.get(record_id)
+                if row is None:
+                    row = self._rows[record_id] = self._size
+                    self._size += 1
+                self._ids[row] = record_id
+                self._embeddings[row] = embedding
+                self._followers[row] = record["followers"]
+                self._log_followers[row] = math.log10(max(record["followers"], 1))
+                self._engagement[row] = record["engagement_rate"]
+                costs = record_costs(record.get("rate_card"))
+                self._costs[row] = [costs.get(cost_field(deliverable), np.nan) for deliverable in DELIVERABLES]
+                for field in self.CATEGORICAL_FIELDS:
+                    self._codes[field][row] = self._code(field, record[field])
+                mask = 0
+                for platform in record.get("platforms", ()):
+                    code = self._code("platforms", platform)
+                    if code < 63:
+                        mask |= 1 << code
+                self._platforms[row] = mask
+
+    def delete(self, record_ids: Iterable[int]):
+        """Remove records, moving the last row into each freed row"""
+        with self._lock:
+            self.generation += 1
+            for record_id in record_ids:
+                row = self._rows.pop(record_id, None)
+                if row is None:
+                    continue
+                self._changed[record_id] = self.generation
+                last = self._size - 1
+                if row != last:
+                    moved_id = int(self._ids[last])
+                    self._rows[moved_id] = row
+                    self._ids[row] = self._ids[last]
+                    self._embeddings[row] = self._embeddings[last]
+                    self._followers[row] = self._followers[last]
+                    self._log_followers[row] = self._log_followers[last]
+                    self._engagement[row] = self._engagement[last]
+                    self._costs[row] = self._costs[last]
+                    for codes in self._codes.values():
+                        codes[row] = codes[last]
+                    self._platforms[row] = self._platforms[last]
+                self._costs[last] = np.nan
+                self._size = last
+
+    def embedding(self, record_id: int) -> Optional[np.ndarray]:
+        """The normalized embedding of a record (None if it isn't in the matrix)"""
+        with self._lock:
+            row = self._rows.get(record_id)
+            return None if row is None else self._embeddings[row].copy()
+
+    def ids(self) -> np.ndarray:
+        with self._lock:
+            return self._ids[:self._size].copy()
+
+    @contextmanager
+    def read(self):
+        """Hold the matrix still and yield views of its ids, embeddings and id -> row map"""
+        with self._lock:
+            yield self._ids[:self._size], self._embeddings[:self._size], self._rows
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Copies of the ids and embeddings, with the generation they were taken at"""
+        with self._lock:
+            return self._ids[:self._size].copy(), self._embeddings[:self._size].copy(), self.generation
+
+    def changed_since(self, generation: int) -> List[int]:
+        """IDs upserted or deleted after the given generation"""
+        with self._lock:
+            return [record_id for record_id, changed in self._changed.items() if changed > generation]
+
+    def _filter_mask(self, category: Optional[str], region: Optional[str], platform: Optional[str],
+                     min_followers: Optional[int]) -> np.ndarray:
+        n = self._size
+        mask = np.ones(n, dtype=bool)
+        for field, value in (("category", category), ("region", region)):
+            if value is not None:
+                code = self._vocab[field].get(value.lower())
+                mask &= self._codes[field][:n] == (-2 if code is None else code)
+        if platform is not None:
+            code = self._vocab["platforms"].get(platform.lower())
+            bit = 0 if code is None or code >= 63 else 1 << code
+            mask &= (self._platforms[:n] & bit) != 0
+        if min_followers is not None:
+            mask &= self._followers[:n] >= min_followers
+        return mask
+
+    def score(
+        self,
+        query_vector: np.ndarray,
+        plan: Dict[str, int],
+        max_cost: Optional[float] = None,
+        weights: Optional[Dict[str, float]] = None,
+        category: Optional[str] = None,
+        region: Optional[str] = None,
+        platform: Optional[str] = None,
+        min_followers: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Score every eligible record for a campaign
+
+        A record is eligible if its rate card prices every planned deliverable,
+        the campaign would cost it no more than ``max_cost`` and it passes the
+        filters. Components are standardized over the eligible records before
+        they are weighted, so the weights don't depend on units.
+
+        Args:
+            query_vector: Embedding of the brief, from this matrix's model
+            plan: Count of each deliverable in DELIVERABLES the campaign needs
+            max_cost: Most the campaign may pay one creator, in the base currency
+            weights: Component weights, defaulting to DEFAULT_WEIGHTS
+            category, region, platform, min_followers: Structured filters
+
+        Returns:
+            Arrays over the eligible records: ``ids``, ``score``, ``cost``,
+            ``relevance`` and the standardized ``components`` (one row per weight)
+        """
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        query = np.asarray(query_vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        columns = [DELIVERABLES.index(deliverable) for deliverable in plan]
+        quantities = np.array([plan[deliverable] for deliverable in plan], dtype=np.float64)
+
+        with self._lock:
+            n = self._size
+            eligible = self._filter_mask(category, region, platform, min_followers)
+            if columns:
+                cost = self._costs[:n, columns] @ quantities
+            else:
+                cost = np.zeros(n)
+            eligible &= ~np.isnan(cost)
+            if max_cost is not None:
+                eligible &= cost <= max_cost
+            rows = np.flatnonzero(eligible)
+            ids = self._ids[rows]
+            # Gathering a few eligible rows is cheaper than the full product; for many it's the other way round
+            if len(rows) * 4 < n:
+                relevance = self._embeddings[rows] @ query
+            else:
+                relevance = (self._embeddings[:n] @ query)[rows]
+            engagement = self._engagement[rows].astype(np.float64)
+            log_followers = self._log_followers[rows].astype(np.float64)
+            followers = self._followers[rows]
+        cost = cost[rows]
+
+        deliverable_count = max(float(quantities.sum()), 1.0)
+        expected_engagements = followers * engagement / 100 * deliverable_count
+        value = np.log1p(expected_engagements) - np.log1p(cost)
+
+        raw = {"relevance": relevance.astype(np.float64), "engagement": engagement, "reach": log_followers, "value": value}
+        components = np.zeros((len(raw), len(rows)))
+        for position, name in enumerate(raw):
+            values = raw[name]
+            spread = values.std() if len(values) else 0.0
+            components[position] = (values - values.mean()) / spread if spread > 0 else 0.0
+        score = np.array([weights.get(name, 0.0) for name in raw]) @ components
+        return {"ids": ids, "score": score, "cost": cost, "relevance": relevance, "components": components}
+
+
+def shortlist(
+    scored: Dict[str, np.ndarray],
+    limit: int,
+    budget: Optional[float] = None,
+) -> List[Tuple[int, int]]:
+    """Pick the best-scoring creators whose combined cost fits the budget
+
+    Creators are taken greedily in score order, skipping any that would take
+    the total over ``budget``, until ``limit`` are chosen or nobody left fits.
+
+    Returns:
+        (record id, position in the scored arrays) pairs in score order
+    """
+    score, cost, ids = scored["score"], scored["cost"], scored["ids"]
+    if not len(score):
+        return []
+    remaining = math.inf if budget is None else budget
+    # Usually the shortlist is found among the top few hundred; only sort everything if it isn't
+    window = min(len(score), max(limit * 8, 256))
+    chosen: List[Tuple[int, int]] = []
+    while True:
+        if window < len(score):
+            top = np.argpartition(-score, window - 1)[:window]
+            order = top[np.argsort(-score[top], kind="stable")]
+        else:
+            order = np.argsort(-score, kind="stable")
+        chosen, spent = [], 0.0
+        cheapest = float(cost.min())
+        for position in order:
+            if cost[position] <= remaining - spent:
+                chosen.append((int(ids[position]), int(position)))
+                spent += cost[position]
+                if len(chosen) == limit or remaining - spent < cheapest:
+                    return chosen
+        if window >= len(score):
+            return chosen
+        window = len(score)
+
+
+class VectorCache:
+    """Small LRU of encoded texts, so re-scoring an edited brief skips the model when its text is unchanged"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_encode(self, version_key: str, text: str, model) -> np.ndarray:
+        key = (version_key, text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                return vector
+        vector = np.asarray(model.encode(text), dtype=np.float32)
+        with self._lock:
+            self._entries[key] = vector
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return vector
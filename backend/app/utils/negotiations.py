@@ -0,0 +1,354 @@
+import logging
+import os
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from app.utils.forking import reset_in_child
+
+logger = logging.getLogger(__name__)
+
+NEGOTIATION_STATUSES = ("pending", "accepted", "rejected")
+
+# Columns acceptance rates can be grouped by
+ACCEPTANCE_GROUPS = ("category", "region", "campaign_name", "brand_name")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS negotiation_summaries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    influencer_id INTEGER,
+    influencer_name TEXT NOT NULL,
+    brand_name TEXT NOT NULL,
+    campaign_id INTEGER,
+    campaign_name TEXT NOT NULL,
+    category TEXT,
+    region TEXT,
+    deliverables TEXT NOT NULL,
+    timeline TEXT NOT NULL,
+    agreed_budget TEXT,
+    agreed_budget_usd REAL,
+    status TEXT NOT NULL,
+    notes TEXT,
+    timestamp REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS negotiation_summaries_campaign ON negotiation_summaries (campaign_id, campaign_name, status, agreed_budget_usd);
+CREATE INDEX IF NOT EXISTS negotiation_summaries_category ON negotiation_summaries (category, status);
+CREATE INDEX IF NOT EXISTS negotiation_summaries_region ON negotiation_summaries (region, status);
+CREATE INDEX IF NOT EXISTS negotiation_summaries_influencer ON negotiation_summaries (influencer_id, timestamp);
+CREATE INDEX IF NOT EXISTS negotiation_summaries_time ON negotiation_summaries (timestamp);
+"""
+
+_COLUMNS = ("id", "influencer_id", "influencer_name", "brand_name", "campaign_id", "campaign_name", "category",
+            "region", "deliverables", "timeline", "agreed_budget", "agreed_budget_usd", "status", "notes",
+            "timestamp", "created_at")
+
+_INSERT = (f"INSERT INTO negotiation_summaries ({', '.join(_COLUMNS[1:])}) "
+           f"VALUES ({', '.join('?' for _ in _COLUMNS[1:])})")
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    return None if timestamp is None else datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class NegotiationRecord:
+    """A stored negotiation outcome"""
+
+    __slots__ = _COLUMNS
+
+    def __init__(self, row: Sequence[Any]):
+        for name, value in zip(_COLUMNS, row):
+            setattr(self, name, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {name: getattr(self, name) for name in _COLUMNS}
+        record["timestamp"] = _isoformat(self.timestamp)
+        record["created_at"] = _isoformat(self.created_at)
+        return record
+
+
+class NegotiationStore:
+    """Negotiation summaries persisted in SQLite, with aggregates computed in SQL
+
+    Writes are group-committed: ``add`` queues a summary and returns a future,
+    and a writer thread inserts everything queued since its last commit in one
+    transaction, up to ``max_batch`` rows. A burst of summaries costs one
+    commit instead of one each, and a single summary waits for nothing but its
+    own commit. The future resolves with the new row's ID once it is durable.
+    The connection and the writer belong to the process that opened them: a
+    forked child (e.g. a pre-fork worker) opens and starts its own.
+
+    Aggregates (acceptance rates, median agreed budgets) run as single
+    queries over the indexes, so they never load the summaries into Python.
+    """
+
+    def __init__(self, path: str, max_batch: int = 256):
+        """Set up the store; the database is opened and the writer started on first use
+
+        Args:
+            path: SQLite database file, or ``:memory:``
+            max_batch: Most summaries inserted per transaction
+        """
+        self.path = path
+        self.max_batch = max(1, max_batch)
+        self._closed = False
+        self.batches = 0
+        self.written = 0
+        self._reset()
+        reset_in_child(self)
+
+    def _reset(self):
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._pending: Deque[Tuple[Tuple[Any, ...], Future]] = deque()
+        self._condition = threading.Condition()
+        self._writing = False
+        self._thread: Optional[threading.Thread] = None
+
+    def _before_fork(self):
+        self._lock.acquire()
+
+    def _after_fork_in_parent(self):
+        self._lock.release()
+
+    def _after_fork(self):
+        # The writer thread stayed in the parent, along with the summaries it had queued and its connection
+        self._reset()
+
+    def _connection(self) -> sqlite3.Connection:
+        """The open connection, opening it first if needed; call with the lock held"""
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # Autocommit outside the writer's explicit transactions
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def open(self):
+        """Open the database now instead of on first use, e.g. on application startup"""
+        with self._lock:
+            self._connection()
+
+    def start(self):
+        """Start this process's writer thread if it isn't running; ``add`` also starts it"""
+        with self._condition:
+            if self._thread is not None or self._closed:
+                return
+            self._thread = threading.Thread(target=self._run, name="negotiation-writer", daemon=True)
+            self._thread.start()
+
+    def add(self, summary: Dict[str, Any], now: float) -> "Future[int]":
+        """Queue a summary for the next batch
+
+        Args:
+            summary: Dict with the columns of a summary (``timestamp`` as a Unix timestamp)
+            now: Current timestamp
+
+        Returns:
+            Future resolving with the summary's ID once it is committed
+
+        Raises:
+            RuntimeError: If the store is closed
+        """
+        row = tuple(summary.get(name) for name in _COLUMNS[1:-1]) + (now,)
+        future: "Future[int]" = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Negotiation store is closed")
+            self._pending.append((row, future))
+            self._condition.notify_all()
+        self.start()
+        return future
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                batch = [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+                self._writing = True
+            try:
+                self._write(batch)
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    def _write(self, batch: List[Tuple[Tuple[Any, ...], Future]]):
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    ids = [conn.execute(_INSERT, row).lastrowid for row, _ in batch]
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} negotiation summaries: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.written += len(batch)
+        for record_id, (_, future) in zip(ids, batch):
+            future.set_result(record_id)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued summary is committed; False on timeout"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def close(self):
+        """Commit what is queued and stop the writer"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _query(self, sql: str, parameters: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._connection().execute(sql, parameters).fetchall()
+
+    @staticmethod
+    def _where(table: str = "", **filters: Any) -> Tuple[str, List[Any]]:
+        """WHERE clause for equality filters plus ``since``/``until`` bounds on the negotiation time"""
+        conditions, parameters = [], []
+        prefix = f"{table}." if table else ""
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if column == "since":
+                conditions.append(f"{prefix}timestamp >= ?")
+            elif column == "until":
+                conditions.append(f"{prefix}timestamp < ?")
+            else:
+                conditions.append(f"{prefix}{column} = ?")
+            parameters.append(value)
+        return (f"WHERE {' AND '.join(conditions)} " if conditions else ""), parameters
+
+    def get(self, record_id: int) -> Optional[NegotiationRecord]:
+        rows = self._query(f"SELECT {', '.join(_COLUMNS)} FROM negotiation_summaries WHERE id = ?", (record_id,))
+        return NegotiationRecord(rows[0]) if rows else None
+
+    def list(self, campaign_id: Optional[int] = None, influencer_id: Optional[int] = None, status: Optional[str] = None,
+             since: Optional[float] = None, limit: int = 100) -> List[NegotiationRecord]:
+        """Summaries, most recent negotiation first"""
+        where, parameters = self._where(campaign_id=campaign_id, influencer_id=influencer_id, status=status, since=since)
+        rows = self._query(
+            f"SELECT {', '.join(_COLUMNS)} FROM negotiation_summaries {where}ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (*parameters, limit),
+        )
+        return [NegotiationRecord(row) for row in rows]
+
+    def with_notes(self, after_id: int = 0, limit: int = 1000) -> List[NegotiationRecord]:
+        """Summaries that have notes, in ID order from just after ``after_id``"""
+        rows = self._query(
+            f"SELECT {', '.join(_COLUMNS)} FROM negotiation_summaries WHERE id > ? AND notes IS NOT NULL AND notes != '' "
+            "ORDER BY id LIMIT ?",
+            (after_id, limit),
+        )
+        return [NegotiationRecord(row) for row in rows]
+
+    def acceptance(self, by: str = "category", campaign_id: Optional[int] = None, since: Optional[float] = None,
+                   until: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Negotiation outcomes per group, most negotiations first
+
+        The acceptance rate is the share of decided negotiations (accepted or
+        rejected) that were accepted; None while none are decided.
+
+        Args:
+            by: Column to group by, one of ACCEPTANCE_GROUPS
+            campaign_id: Only negotiations of this campaign
+            since: Only negotiations at or after this timestamp
+            until: Only negotiations before this timestamp
+
+        Raises:
+            ValueError: If ``by`` isn't a groupable column
+        """
+        if by not in ACCEPTANCE_GROUPS:
+            raise ValueError(f"Can't group by {by!r}; expected one of {', '.join(ACCEPTANCE_GROUPS)}")
+        where, parameters = self._where(campaign_id=campaign_id, since=since, until=until)
+        rows = self._query(
+            f"SELECT {by}, COUNT(*), SUM(status = 'accepted'), SUM(status = 'rejected') "
+            f"FROM negotiation_summaries {where}GROUP BY {by} ORDER BY COUNT(*) DESC, {by}",
+            parameters,
+        )
+        return [
+            {
+                by: key,
+                "negotiations": total,
+                "accepted": accepted,
+                "rejected": rejected,
+                "pending": total - accepted - rejected,
+                "acceptance_rate": round(accepted / (accepted + rejected), 4) if accepted + rejected else None,
+            }
+            for key, total, accepted, rejected in rows
+        ]
+
+    def budgets(self, campaign_id: Optional[int] = None, since: Optional[float] = None,
+                until: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Agreed budgets per campaign, most negotiations first
+
+        The median is taken over accepted negotiations whose agreed budget
+        could be converted to USD. SQLite has no median aggregate, so the
+        budgets are ranked within each campaign by a window function and the
+        middle one or two rows are averaged, all inside one query.
+        """
+        where, parameters = self._where(campaign_id=campaign_id, since=since, until=until)
+        outer_where, _ = self._where("s", campaign_id=campaign_id, since=since, until=until)
+        accepted = ("AND" if where else "WHERE") + " status = 'accepted' AND agreed_budget_usd IS NOT NULL "
+        rows = self._query(
+            f"""
+            WITH ranked AS (
+                SELECT campaign_id, campaign_name, agreed_budget_usd AS budget,
+                       ROW_NUMBER() OVER (PARTITION BY campaign_id, campaign_name ORDER BY agreed_budget_usd) AS position,
+                       COUNT(*) OVER (PARTITION BY campaign_id, campaign_name) AS priced
+                FROM negotiation_summaries {where}{accepted}
+            ), medians AS (
+                SELECT campaign_id, campaign_name, AVG(budget) AS median, MAX(priced) AS priced
+                FROM ranked WHERE position IN ((priced + 1) / 2, (priced + 2) / 2)
+                GROUP BY campaign_id, campaign_name
+            )
+            SELECT s.campaign_id, s.campaign_name, COUNT(*), SUM(s.status = 'accepted'), m.priced, m.median,
+                   SUM(CASE WHEN s.status = 'accepted' THEN s.agreed_budget_usd END)
+            FROM negotiation_summaries s
+            LEFT JOIN medians m ON m.campaign_id IS s.campaign_id AND m.campaign_name = s.campaign_name
+            {outer_where}
+            GROUP BY s.campaign_id, s.campaign_name
+            ORDER BY COUNT(*) DESC, s.campaign_name
+            """,
+            (*parameters, *parameters),
+        )
+        return [
+            {
+                "campaign_id": campaign_id,
+                "campaign_name": campaign_name,
+                "negotiations": total,
+                "accepted": accepted_count,
+                "priced": priced or 0,
+                "median_agreed_budget_usd": None if median is None else round(median, 2),
+                "total_agreed_budget_usd": None if committed is None else round(committed, 2),
+            }
+            for campaign_id, campaign_name, total, accepted_count, priced, median, committed in rows
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self._query("SELECT status, COUNT(*) FROM negotiation_summaries GROUP BY status"))
@@ -0,0 +1,154 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from app.utils.forking import reset_in_child
+from app.utils.vector_search import VectorSearch
+
+logger = logging.getLogger(__name__)
+
+HISTORY_KINDS = ("negotiation", "email")
+
+
+class OutreachHistoryIndex:
+    """Negotiation notes and outreach emails, embedded in the background for semantic search
+
+    ``add`` only queues a document, so the request that wrote it never waits
+    for the encoder. A worker thread embeds everything queued since its last
+    batch in one ``encode`` call (up to ``batch_size`` documents) and upserts
+    it into the collection; documents queued while a batch is being encoded
+    form the next one. Re-adding a queued document replaces it, so it is
+    embedded once.
+
+    The collection lives in memory and the worker in the process that started
+    it, so every process (e.g. each pre-fork worker) starts its own and runs
+    ``backfill`` to queue the documents stored before it started.
+    """
+
+    def __init__(self, search: VectorSearch, batch_size: int = 64, backfill: Optional[Callable[[], Any]] = None):
+        """Initialize the index; the worker thread is started by ``start()`` or the first ``add``
+
+        Args:
+            search: Vector search over the history collection
+            batch_size: Most documents embedded per encoder call
+            backfill: Called by the worker of every process before its first batch, to queue stored documents
+        """
+        self.search = search
+        self.batch_size = max(1, batch_size)
+        self.backfill = backfill
+        self._reset()
+        reset_in_child(self)
+
+    def _reset(self):
+        # Document ID -> (text, metadata), in arrival order
+        self._pending: "OrderedDict[str, Any]" = OrderedDict()
+        self._condition = threading.Condition()
+        self._indexing = 0
+        self.indexed = 0
+        self.batches = 0
+        self.errors = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def _after_fork(self):
+        # Neither the parent's worker nor its in-memory collection came along; the child backfills its own
+        self._reset()
+
+    def start(self):
+        """Start this process's worker thread if it isn't running"""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="outreach-history", daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def document_id(kind: str, source_id: Any) -> str:
+        return f"{kind}:{source_id}"
+
+    def add(self, kind: str, source_id: Any, text: Optional[str], **metadata: Any) -> bool:
+        """Queue a document for embedding
+
+        Args:
+            kind: One of HISTORY_KINDS
+            source_id: ID of the document within its kind (a negotiation summary ID, an email's send ID)
+            text: Text to embed; blank documents are skipped
+            **metadata: Fields to filter and show results by, e.g. campaign_id and influencer_id (None values are left out)
+
+        Returns:
+            Whether the document was queued
+        """
+        if not text or not text.strip():
+            return False
+        metadata = {key: value for key, value in metadata.items() if value is not None}
+        metadata["kind"] = kind
+        with self._condition:
+            document_id = self.document_id(kind, source_id)
+            self._pending.pop(document_id, None)
+            self._pending[document_id] = (text.strip(), metadata)
+            self._condition.notify_all()
+        self.start()
+        return True
+
+    def _run(self):
+        if self.backfill is not None:
+            try:
+                self.backfill()
+            except Exception as e:
+                logger.error(f"Error backfilling outreach history: {e}")
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                batch = [self._pending.popitem(last=False) for _ in range(min(self.batch_size, len(self._pending)))]
+                self._indexing = len(batch)
+            try:
+                self.search.upsert_texts(
+                    [document_id for document_id, _ in batch],
+                    [text for _, (text, _) in batch],
+                    [metadata for _, (_, metadata) in batch],
+                )
+                self.indexed += len(batch)
+                self.batches += 1
+            except Exception as e:
+                self.errors += len(batch)
+                logger.error(f"Error indexing {len(batch)} outreach history documents: {e}")
+            finally:
+                with self._condition:
+                    self._indexing = 0
+                    self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued document is searchable; False on timeout"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._indexing, timeout)
+
+    def query(self, query: str, top_k: int = 10, kind: Optional[str] = None, campaign_id: Optional[int] = None,
+              influencer_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Documents most similar to the query, optionally of one kind, campaign or influencer
+
+        Documents still queued for embedding aren't found yet.
+        """
+        conditions = [
+            {key: value}
+            for key, value in (("kind", kind), ("campaign_id", campaign_id), ("influencer_id", influencer_id))
+            if value is not None
+        ]
+        where = conditions[0] if len(conditions) == 1 else {"$and": conditions} if conditions else None
+        results = []
+        for match in self.search.query(query, top_k=top_k, where=where):
+            metadata = dict(match["metadata"] or {})
+            results.append({
+                "id": match["id"],
+                "kind": metadata.pop("kind", None),
+                "text": match["document"],
+                "similarity_score": round(match["similarity"], 4),
+                **metadata,
+            })
+        return results
+
+    def status(self) -> Dict[str, Any]:
+        with self._condition:
+            pending = len(self._pending) + self._indexing
+        return {"pending": pending, "indexed": self.indexed, "batches": self.batches, "errors": self.errors,
+                "documents": self.search.collection.count()}
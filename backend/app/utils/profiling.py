@@ -0,0 +1,142 @@
+import cProfile
+import io
+import logging
+import pstats
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:  # Optional dependency
+    PyinstrumentProfiler = None
+
+PROFILE_MODES = ("cprofile", "pyinstrument")
+
+
+class ProfileCapture:
+    """Captures profiles for the next N requests on demand
+
+    Only one request is profiled at a time (Python allows a single active
+    profiler per thread), so concurrent requests while a capture is running
+    are simply not profiled.
+    """
+
+    def __init__(self, max_results: int = 20):
+        """Initialize the capture
+
+        Args:
+            max_results: Number of captured profiles kept for retrieval
+        """
+        self._lock = threading.Lock()
+        self.remaining = 0
+        self.mode = "cprofile"
+        self.path_prefix = ""
+        self._busy = False
+        self.results: deque = deque(maxlen=max_results)
+
+    def arm(self, requests: int, mode: str = "cprofile", path_prefix: str = ""):
+        """Profile the next ``requests`` requests whose path starts with ``path_prefix``
+
+        Raises:
+            ValueError: If the mode is unknown or its profiler isn't installed
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode}; expected one of {', '.join(PROFILE_MODES)}")
+        if mode == "pyinstrument" and PyinstrumentProfiler is None:
+            raise ValueError("pyinstrument is not installed")
+        with self._lock:
+            self.remaining = requests
+            self.mode = mode
+            self.path_prefix = path_prefix
+
+    def disarm(self):
+        with self._lock:
+            self.remaining = 0
+
+    def _claim(self, path: str) -> Optional[str]:
+        """Reserve the profiler for a request, returning the mode to use"""
+        with self._lock:
+            if self.remaining <= 0 or self._busy or not path.startswith(self.path_prefix):
+                return None
+            self.remaining -= 1
+            self._busy = True
+            return self.mode
+
+    def _release(self, method: str, path: str, mode: str, report: str):
+        with self._lock:
+            self._busy = False
+            self.results.append({
+                "method": method,
+                "path": path,
+                "mode": mode,
+                "captured_at": datetime.now().isoformat(),
+                "report": report,
+            })
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "remaining": self.remaining,
+            "mode": self.mode,
+            "path_prefix": self.path_prefix,
+            "pyinstrument_available": PyinstrumentProfiler is not None,
+            "captured": len(self.results),
+        }
+
+    def list_results(self) -> List[Dict[str, Any]]:
+        return list(self.results)
+
+
+def _cprofile_report(profiler: cProfile.Profile, limit: int = 40) -> str:
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+# Process-wide capture controlled through the admin endpoints
+profile_capture = ProfileCapture()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware running cProfile or pyinstrument around armed requests
+
+    The profiler runs on the event loop thread, so work offloaded to the
+    threadpool and other requests interleaving with the profiled one are
+    attributed as they happen on that thread.
+    """
+
+    def __init__(self, app, capture: ProfileCapture = profile_capture):
+        self.app = app
+        self.capture = capture
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.capture.remaining <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "")
+        mode = self.capture._claim(path)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        if mode == "pyinstrument":
+            profiler = PyinstrumentProfiler(async_mode="enabled")
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if mode == "pyinstrument":
+                profiler.stop()
+                report = profiler.output_text()
+            else:
+                profiler.disable()
+                report = _cprofile_report(profiler)
+            self.capture._release(scope.get("method", ""), path, mode, report)
+            logger.info("Captured %s profile for %s", mode, path)
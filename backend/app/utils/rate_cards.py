@@ -0,0 +1,315 @@
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Currency every price is converted to for filtering and sorting
+BASE_CURRENCY = "USD"
+
+# Local FX table: units of each currency per unit of BASE_CURRENCY. FX_RATES_PATH
+# can point at a JSON file of the same shape to override or extend it.
+DEFAULT_FX_RATES = {
+    "USD": 1.0,
+    "INR": 83.0,
+    "GBP": 0.79,
+    "EUR": 0.92,
+    "MXN": 17.0,
+    "BRL": 5.0,
+    "IDR": 15500.0,
+    "CAD": 1.36,
+    "AUD": 1.52,
+    "JPY": 150.0,
+}
+
+# Currency symbols as they appear in rate cards; longer symbols are matched first
+CURRENCY_SYMBOLS = {
+    "MX$": "MXN",
+    "R$": "BRL",
+    "CA$": "CAD",
+    "C$": "CAD",
+    "A$": "AUD",
+    "US$": "USD",
+    "Rp": "IDR",
+    "Rs.": "INR",
+    "Rs": "INR",
+    "₹": "INR",
+    "$": "USD",
+    "£": "GBP",
+    "€": "EUR",
+    "¥": "JPY",
+}
+
+# Deliverables prices are indexed under; anything else is kept under its own name
+DELIVERABLES = ("post", "video", "story", "reel", "tweet", "blog", "stream", "webinar")
+DELIVERABLE_ALIASES = {
+    "blog post": "blog",
+    "youtube video": "video",
+    "instagram post": "post",
+    "live stream": "stream",
+    "livestream": "stream",
+    "stories": "story",
+}
+
+_SYMBOL = "|".join(re.escape(symbol) for symbol in sorted(CURRENCY_SYMBOLS, key=len, reverse=True))
+# A number with an optional scale, as in "50,000", "2.5k", "₹1.5 lakh" or "3 crore"
+_AMOUNT = r"(?P<amount>\d(?:[\d,.]*\d)?)\s*(?:(?P<scale>(?i:k|m|lakhs?|lacs?|l|crores?|cr))\b)?"
+_PRICE = re.compile(
+    rf"(?:(?P<symbol>{_SYMBOL})|(?P<code>\b[A-Z]{{3}}\b))\s*{_AMOUNT}\s*"
+    r"(?:(?:per|for|a|an)\s+|/\s*)(?:(?:a|an|one|each)\s+)?"
+    r"(?P<deliverable>[A-Za-z][A-Za-z ]*?)\s*(?=,|;|\band\b|\.|\(|$)"
+)
+_SCALES = {"k": 1e3, "m": 1e6, "l": 1e5, "lakh": 1e5, "lac": 1e5, "cr": 1e7, "crore": 1e7}
+_DOTTED_THOUSANDS = re.compile(r"\d{1,3}(?:\.\d{3})+")
+
+
+def _parse_amount(text: str, scale: Optional[str] = None) -> float:
+    """Parse "50,000", "2.5" or the European "1.200" and "1.200,50" as a number, times a scale such as k or lakh"""
+    if "." in text and text.rfind(",") > text.rfind("."):
+        amount = float(text.replace(".", "").replace(",", "."))
+    elif _DOTTED_THOUSANDS.fullmatch(text):
+        amount = float(text.replace(".", ""))
+    else:
+        amount = float(text.replace(",", ""))
+    if scale:
+        amount *= _SCALES[scale.lower().rstrip("s")]
+    return amount
+
+
+def normalize_deliverable(text: str) -> str:
+    """Map a deliverable phrase like "sponsored blog" or "videos" onto DELIVERABLES where possible"""
+    phrase = " ".join(text.lower().split())
+    if phrase in DELIVERABLE_ALIASES:
+        return DELIVERABLE_ALIASES[phrase]
+    words = phrase.split()
+    while words and words[0] in ("sponsored", "dedicated", "single"):
+        words = words[1:]
+    phrase = " ".join(words)
+    if phrase in DELIVERABLE_ALIASES:
+        return DELIVERABLE_ALIASES[phrase]
+    last = words[-1] if words else phrase
+    singular = last[:-1] if last.endswith("s") and last[:-1] in DELIVERABLES else last
+    if singular in DELIVERABLES:
+        return singular
+    return phrase
+
+
+class FxTable:
+    """Exchange rates for converting rate-card prices into BASE_CURRENCY"""
+
+    def __init__(self, rates: Dict[str, float], base: str = BASE_CURRENCY):
+        """Initialize the table
+
+        Args:
+            rates: Units of each currency per unit of the base currency
+            base: Currency prices are converted to
+        """
+        self.base = base
+        self.rates = {code.upper(): float(rate) for code, rate in rates.items()}
+        self.rates[base] = 1.0
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "FxTable":
+        """Load DEFAULT_FX_RATES, overridden by the JSON file at ``path`` if it exists"""
+        rates = dict(DEFAULT_FX_RATES)
+        if path:
+            try:
+                with open(path) as rates_file:
+                    rates.update(json.load(rates_file))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not load FX rates from {path}: {e}, using the built-in table")
+        return cls(rates)
+
+    def convert(self, amount: float, currency: str) -> Optional[float]:
+        """Convert an amount into the base currency (None if the currency is unknown)"""
+        rate = self.rates.get(currency.upper())
+        if not rate:
+            return None
+        return amount / rate
+
+
+_fx_table: Optional[FxTable] = None
+_fx_lock = threading.Lock()
+
+
+def get_fx_table() -> FxTable:
+    """Return the process-wide FX table, loading it from FX_RATES_PATH on first use"""
+    global _fx_table
+    if _fx_table is None:
+        with _fx_lock:
+            if _fx_table is None:
+                _fx_table = FxTable.load(os.getenv("FX_RATES_PATH"))
+    return _fx_table
+
+
+class Price:
+    """One price quoted on a rate card"""
+
+    __slots__ = ("deliverable", "amount", "currency", "base_amount")
+
+    def __init__(self, deliverable: str, amount: float, currency: str, base_amount: Optional[float]):
+        self.deliverable = deliverable
+        self.amount = amount
+        self.currency = currency
+        self.base_amount = base_amount
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "deliverable": self.deliverable,
+            "amount": self.amount,
+            "currency": self.currency,
+            "base_amount": None if self.base_amount is None else round(self.base_amount, 2),
+        }
+
+    def __repr__(self):
+        return f"Price({self.deliverable!r}, {self.amount!r}, {self.currency!r})"
+
+
+def parse_rate_card(text: Optional[str], fx: Optional[FxTable] = None) -> List[Price]:
+    """Parse a free-text rate card into per-deliverable prices
+
+    Understands the formats used across the roster, e.g. "₹50,000 per post,
+    ₹150,000 per video", "£5,000 for sponsored blog", "Rp1,500,000 per post",
+    "€1.200,50 per post", "₹1.5 lakh per video" or "USD 2.5k per reel". Fragments that don't look like a price are skipped.
+
+    Args:
+        text: The rate card
+        fx: FX table for the base-currency amounts (the process-wide table by default)
+
+    Returns:
+        Prices in the order they appear on the card
+    """
+    if not text:
+        return []
+    fx = fx or get_fx_table()
+    prices = []
+    for match in _PRICE.finditer(text):
+        currency = CURRENCY_SYMBOLS[match.group("symbol")] if match.group("symbol") else match.group("code")
+        if match.group("code") and currency not in fx.rates:
+            continue
+        amount = _parse_amount(match.group("amount"), match.group("scale"))
+        deliverable = normalize_deliverable(match.group("deliverable"))
+        if not deliverable:
+            continue
+        prices.append(Price(deliverable, amount, currency, fx.convert(amount, currency)))
+    return prices
+
+
+def base_costs(text: Optional[str], fx: Optional[FxTable] = None) -> Dict[str, float]:
+    """Cost of each deliverable on a rate card in the base currency
+
+    If a card quotes the same deliverable twice, the cheaper price is kept.
+    """
+    costs: Dict[str, float] = {}
+    for price in parse_rate_card(text, fx):
+        if price.base_amount is None:
+            continue
+        current = costs.get(price.deliverable)
+        if current is None or price.base_amount < current:
+            costs[price.deliverable] = price.base_amount
+    return costs
+
+
+_NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+                 "seven": 7, "eight": 8, "nine": 9, "ten": 10}
+_QUANTITY = re.compile(
+    r"(?:^|(?<=[,;+(]))\s*(?:(?P<count>\d+|" + "|".join(_NUMBER_WORDS) + r")\s*(?:x\s*)?)?"
+    r"(?P<deliverable>[A-Za-z][A-Za-z ]*?)\s*(?:x\s*(?P<times>\d+))?\s*(?=[,;+)]|$)",
+    re.IGNORECASE
+)
+# Platform names in a brief ("2 Instagram posts") don't change which price applies
+_PLATFORM_WORDS = ("instagram", "youtube", "tiktok", "twitter", "twitch", "linkedin", "snapchat", "facebook", "x")
+
+
+def parse_deliverables(text: Optional[str]) -> Dict[str, int]:
+    """Parse a brief's deliverables ("2 Instagram posts, 1 YouTube video and 3 tweets") into counts
+
+    Deliverables are normalized like rate-card prices, so the counts line up
+    with the parsed costs; phrases outside DELIVERABLES are kept under their
+    own name.
+    """
+    counts: Dict[str, int] = {}
+    if not text:
+        return counts
+    for match in _QUANTITY.finditer(re.sub(r"\s+(?:and|&)\s+", ", ", text)):
+        words = [word for word in match.group("deliverable").lower().split() if word not in _PLATFORM_WORDS]
+        if not words:
+            continue
+        deliverable = normalize_deliverable(" ".join(words))
+        count = match.group("count")
+        quantity = int(count) if count and count.isdigit() else _NUMBER_WORDS.get((count or "one").lower(), 1)
+        quantity *= int(match.group("times") or 1)
+        counts[deliverable] = counts.get(deliverable, 0) + quantity
+    return counts
+
+
+_BUDGET_AMOUNT = re.compile(
+    rf"(?:(?P<symbol>{_SYMBOL})|(?P<prefix>\b[A-Z]{{3}}))?\s*{_AMOUNT}\s*(?P<code>[A-Z]{{3}}\b)?",
+    re.IGNORECASE
+)
+_RANGE_SEPARATOR = re.compile(r"-|–|—|~|to|and", re.IGNORECASE)
+
+
+def parse_budget(text: Optional[str], fx: Optional[FxTable] = None) -> Tuple[Optional[float], Optional[float]]:
+    """Parse a budget range ("$10,000 - $20,000", "10k-20k USD", "up to ₹5 lakh") into base-currency bounds
+
+    Two amounts make a range only when joined by a separator such as "-" or
+    "to"; otherwise the first amount is an upper bound unless the text says
+    "at least", "from", "min" or ends with "+". Once any amount carries a
+    currency or a scale, bare numbers ("2023 campaign $5,000") are ignored
+    unless they form a range with such an amount. The first currency
+    mentioned applies to every amount; without one the amounts are taken to
+    be in BASE_CURRENCY.
+
+    Returns:
+        The lower and upper bound, either of which may be None
+    """
+    if not text:
+        return None, None
+    fx = fx or get_fx_table()
+    amounts, currencies, marked, spans = [], [], [], []
+    for match in _BUDGET_AMOUNT.finditer(text):
+        symbol, amount, scale = match.group("symbol"), match.group("amount"), match.group("scale")
+        # A three-letter word next to a number ("for 3 posts") only counts if it's a known currency
+        prefix, code = (group if group and group.upper() in fx.rates else None for group in match.group("prefix", "code"))
+        currencies.append(CURRENCY_SYMBOLS[symbol] if symbol else (prefix or code or "").upper() or None)
+        marked.append(bool(currencies[-1] or scale))
+        amounts.append(_parse_amount(amount, scale))
+        start = match.start("symbol") if symbol else match.start("prefix") if prefix else match.start("amount")
+        end = match.end("code") if code else match.end("scale") if scale else match.end("amount")
+        spans.append((start, end))
+    # Whether each amount and the next one form a range
+    joined = [_RANGE_SEPARATOR.fullmatch(text[left[1]:right[0]].strip()) is not None for left, right in zip(spans, spans[1:])]
+
+    kept = [
+        i for i in range(len(amounts))
+        if marked[i] or not any(marked)
+        or (i > 0 and marked[i - 1] and joined[i - 1])
+        or (i < len(joined) and marked[i + 1] and joined[i])
+    ]
+    if not kept:
+        return None, None
+    currency = next((currencies[i] for i in kept if currencies[i]), None) or fx.base
+    converted = [fx.convert(amounts[i], currency) for i in kept]
+    if len(kept) >= 2 and kept[1] == kept[0] + 1 and joined[kept[0]]:
+        return min(converted[:2]), max(converted[:2])
+    if re.search(r"\b(?:at least|from|min(?:imum)?|over|above)\b|\+\s*$", text, re.IGNORECASE):
+        return converted[0], None
+    return None, converted[0]
+
+
+def cost_field(deliverable: str) -> str:
+    """Name of the sort field and index metadata key for a deliverable's cost"""
+    return f"cost_per_{deliverable}"
+
+
+COST_FIELDS: Tuple[str, ...] = tuple(cost_field(deliverable) for deliverable in DELIVERABLES)
+
+
+def record_costs(rate_card: Optional[str], fx: Optional[FxTable] = None) -> Dict[str, float]:
+    """Base-currency costs of the known deliverables on a rate card, keyed by cost field"""
+    costs = base_costs(rate_card, fx)
+    return {cost_field(deliverable): round(costs[deliverable], 2) for deliverable in DELIVERABLES if deliverable in costs}
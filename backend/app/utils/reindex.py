@@ -0,0 +1,191 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Model loaded once per worker process by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_name: str):
+    """Load the encoder once when a worker process starts"""
+    global _worker_model
+    from app.utils.encoders import load_encoder
+    _worker_model = load_encoder(model_name)
+
+
+def _encode_shard(shard_index: int, texts: List[str]):
+    """Encode one shard of texts inside a worker process"""
+    embeddings = _worker_model.encode(texts, convert_to_numpy=True)
+    return shard_index, np.asarray(embeddings, dtype=np.float32)
+
+
+def roster_fingerprint(model_name: str, ids: List[str], texts: List[str], shard_size: int) -> str:
+    """Fingerprint a re-index run so a checkpoint is only resumed for identical input"""
+    digest = hashlib.sha256()
+    digest.update(f"{model_name}\0{shard_size}\0".encode("utf-8"))
+    for item_id, text in zip(ids, texts):
+        digest.update(item_id.encode("utf-8") + b"\0" + text.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+class ReindexCheckpoint:
+    """On-disk record of the shards a re-index run has already embedded
+
+    Each completed shard's embeddings are saved next to a small manifest, so a
+    crashed run can replay them into the index without encoding them again.
+    """
+
+    def __init__(self, directory: str, fingerprint: str):
+        """Initialize the checkpoint
+
+        Args:
+            directory: Directory holding the manifest and shard files
+            fingerprint: Fingerprint of the run, see roster_fingerprint
+        """
+        self.directory = directory
+        self.fingerprint = fingerprint
+        self.manifest_path = os.path.join(directory, "manifest.json")
+
+    def load(self) -> int:
+        """Return the number of completed shards, discarding a stale checkpoint"""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        if manifest.get("fingerprint") != self.fingerprint:
+            logger.info("Re-index checkpoint belongs to a different run, starting from scratch")
+            self.clear()
+            return 0
+        return int(manifest.get("completed", 0))
+
+    def shard_path(self, shard_index: int) -> str:
+        return os.path.join(self.directory, f"shard_{shard_index:06d}.npy")
+
+    def save_shard(self, shard_index: int, embeddings: np.ndarray):
+        """Persist a shard and advance the manifest past it"""
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Write to temporary files first so a crash never leaves a torn shard or manifest
+        tmp_shard = self.shard_path(shard_index) + ".tmp"
+        with open(tmp_shard, "wb") as f:
+            np.save(f, embeddings)
+        os.replace(tmp_shard, self.shard_path(shard_index))
+
+        tmp_manifest = self.manifest_path + ".tmp"
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "completed": shard_index + 1}, f)
+        os.replace(tmp_manifest, self.manifest_path)
+
+    def load_shard(self, shard_index: int) -> np.ndarray:
+        return np.load(self.shard_path(shard_index))
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def reindex(
+    collection,
+    ids: List[str],
+    texts: List[str],
+    metadatas: List[Dict[str, Any]],
+    model_name: str,
+    workers: Optional[int] = None,
+    shard_size: int = 256,
+    checkpoint_dir: Optional[str] = None,
+) -> int:
+    """Re-embed every record with a process pool and write the results to a collection
+
+    Records are split into shards of ``shard_size`` and encoded by ``workers``
+    processes, each of which loads the model once. Results are consumed in
+    shard order and upserted as they arrive, so the index is always filled
+    front to back and at most a couple of shards per worker are held in memory.
+
+    Args:
+        collection: ChromaDB collection to write to
+        ids: Record IDs
+        texts: Text to embed for each record
+        metadatas: Metadata stored alongside each record
+        model_name: Name of the sentence transformer model the workers load
+        workers: Number of worker processes (defaults to the CPU count)
+        shard_size: Number of records encoded per task
+        checkpoint_dir: Directory for resumable checkpoints (disabled if None)
+
+    Returns:
+        Number of records written
+    """
+    if not ids:
+        return 0
+
+    workers = workers or os.cpu_count() or 1
+    shards = [(start, min(start + shard_size, len(ids))) for start in range(0, len(ids), shard_size)]
+
+    checkpoint = None
+    completed = 0
+    if checkpoint_dir:
+        checkpoint = ReindexCheckpoint(checkpoint_dir, roster_fingerprint(model_name, ids, texts, shard_size))
+        completed = min(checkpoint.load(), len(shards))
+
+    def write_shard(shard_index: int, embeddings: np.ndarray):
+        start, end = shards[shard_index]
+        collection.upsert(
+            ids=ids[start:end],
+            embeddings=embeddings.tolist(),
+            metadatas=metadatas[start:end]
+        )
+
+    # Replay shards embedded by a previous, interrupted run
+    if completed:
+        logger.info(f"Resuming re-index from checkpoint: {completed}/{len(shards)} shards already embedded")
+        for shard_index in range(completed):
+            write_shard(shard_index, checkpoint.load_shard(shard_index))
+
+    remaining = range(completed, len(shards))
+    if remaining:
+        logger.info(f"Re-indexing {len(ids)} records in {len(shards)} shards with {workers} workers")
+
+        # Spawn rather than fork so workers never inherit the parent's torch thread state
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model_name,)
+        ) as executor:
+            # Keep a bounded window of shards in flight and drain it in order
+            pending = deque()
+            next_shard = iter(remaining)
+            for shard_index in next_shard:
+                start, end = shards[shard_index]
+                pending.append(executor.submit(_encode_shard, shard_index, texts[start:end]))
+                if len(pending) >= workers * 2:
+                    break
+
+            while pending:
+                shard_index, embeddings = pending.popleft().result()
+                write_shard(shard_index, embeddings)
+                if checkpoint:
+                    checkpoint.save_shard(shard_index, embeddings)
+                logger.info(f"Re-indexed shard {shard_index + 1}/{len(shards)}")
+
+                for shard_index in next_shard:
+                    start, end = shards[shard_index]
+                    pending.append(executor.submit(_encode_shard, shard_index, texts[start:end]))
+                    break
+
+    if checkpoint:
+        checkpoint.clear()
+
+    logger.info(f"Re-index complete: {len(ids)} records written")
+    return len(ids)
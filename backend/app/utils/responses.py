@@ -0,0 +1,27 @@
+import warnings
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse as FastAPIORJSONResponse
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to compact UTF-8 JSON with orjson"""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+# Recent FastAPI releases mark their ORJSONResponse deprecated in favour of response models, and warn on subclassing;
+# our large responses deliberately skip response models, so the warning doesn't apply
+with warnings.catch_warnings():
+    warnings.filterwarnings("ignore", message="ORJSONResponse is deprecated")
+
+    class ORJSONResponse(FastAPIORJSONResponse):
+        """FastAPI's orjson response, always rendering numpy values and non-string keys
+
+        Endpoints returning large payloads should build this response directly:
+        FastAPI then skips response model validation and ``jsonable_encoder``, and
+        the content is serialized in a single orjson call.
+        """
+
+        def render(self, content: Any) -> bytes:
+            return dumps(content)
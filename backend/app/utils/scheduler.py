@@ -0,0 +1,608 @@
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dt_time, timedelta, timezone, tzinfo
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.utils.forking import reset_in_child
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8: fall back to the standard offsets below
+    ZoneInfo = None
+
+logger = logging.getLogger(__name__)
+
+# Region -> (IANA time zone, standard UTC offset in hours used when no time zone database is available)
+REGION_TIMEZONES = {
+    "India": ("Asia/Kolkata", 5.5),
+    "USA": ("America/New_York", -5.0),
+    "UK": ("Europe/London", 0.0),
+    "Mexico": ("America/Mexico_City", -6.0),
+    "Germany": ("Europe/Berlin", 1.0),
+    "Brazil": ("America/Sao_Paulo", -3.0),
+    "Indonesia": ("Asia/Jakarta", 7.0),
+    "Canada": ("America/Toronto", -5.0),
+}
+
+JOB_STATUSES = ("pending", "running", "sent", "failed", "cancelled", "interrupted")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outreach_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    region TEXT,
+    campaign_id INTEGER,
+    idempotency_key TEXT UNIQUE,
+    run_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outreach_jobs_due ON outreach_jobs (status, run_at);
+CREATE INDEX IF NOT EXISTS outreach_jobs_campaign ON outreach_jobs (campaign_id);
+"""
+
+_COLUMNS = ("id", "channel", "payload", "region", "campaign_id", "idempotency_key", "run_at", "status",
+            "attempts", "result", "error", "created_at", "updated_at")
+
+
+def region_timezone(region: Optional[str]) -> tzinfo:
+    """Time zone outreach to a region is scheduled in (UTC for unknown regions)"""
+    name, offset = REGION_TIMEZONES.get(region or "", ("UTC", 0.0))
+    if ZoneInfo is not None:
+        try:
+            return ZoneInfo(name)
+        except KeyError:  # No time zone database installed
+            pass
+    return timezone(timedelta(hours=offset))
+
+
+class SendWindow:
+    """Local hours and weekdays outreach may go out in, e.g. 09:00-18:00 Monday to Friday"""
+
+    __slots__ = ("start", "end", "weekdays")
+
+    def __init__(self, start: dt_time = dt_time(9), end: dt_time = dt_time(18), weekdays: Iterable[int] = range(5)):
+        if end <= start:
+            raise ValueError(f"Send window must end after it starts ({start:%H:%M}-{end:%H:%M})")
+        self.start = start
+        self.end = end
+        self.weekdays = frozenset(weekdays)
+
+    @classmethod
+    def parse(cls, hours: str, days: str = "0-4") -> "SendWindow":
+        """Build a window from ``"HH:MM-HH:MM"`` and weekdays like ``"0-4"`` or ``"0,2,4"`` (Monday is 0)
+
+        Raises:
+            ValueError: If either can't be parsed
+        """
+        try:
+            start, end = (datetime.strptime(part.strip(), "%H:%M").time() for part in hours.split("-"))
+        except ValueError:
+            raise ValueError(f"Invalid send window hours {hours!r}; expected HH:MM-HH:MM")
+        weekdays: Set[int] = set()
+        for part in days.split(","):
+            first, _, last = part.strip().partition("-")
+            weekdays.update(range(int(first), int(last or first) + 1))
+        if not weekdays <= set(range(7)):
+            raise ValueError(f"Invalid send window days {days!r}; expected weekdays 0-6")
+        return cls(start, end, weekdays)
+
+    def next_open(self, when: float, tz: tzinfo) -> float:
+        """Earliest timestamp at or after ``when`` that falls inside the window in time zone ``tz``"""
+        local = datetime.fromtimestamp(when, tz)
+        for offset in range(8):
+            day = local.date() + timedelta(days=offset)
+            if day.weekday() not in self.weekdays:
+                continue
+            closes = datetime.combine(day, self.end, tzinfo=tz).timestamp()
+            if when < closes:
+                return max(when, datetime.combine(day, self.start, tzinfo=tz).timestamp())
+        return when  # No weekdays at all: the window never holds anything back
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"start": self.start.strftime("%H:%M"), "end": self.end.strftime("%H:%M"), "weekdays": sorted(self.weekdays)}
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    return None if timestamp is None else datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class Job:
+    """A scheduled outreach message or call"""
+
+    __slots__ = _COLUMNS
+
+    def __init__(self, row: Sequence[Any]):
+        for name, value in zip(_COLUMNS, row):
+            setattr(self, name, value)
+        self.payload = json.loads(self.payload)
+        self.result = json.loads(self.result) if self.result else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "channel": self.channel,
+            "status": self.status,
+            "region": self.region,
+            "campaign_id": self.campaign_id,
+            "idempotency_key": self.idempotency_key,
+            "run_at": _isoformat(self.run_at),
+            "attempts": self.attempts,
+            "payload": self.payload,
+            "result": self.result,
+            "error": self.error,
+            "created_at": _isoformat(self.created_at),
+            "updated_at": _isoformat(self.updated_at),
+        }
+
+
+class JobStore:
+    """Outreach jobs persisted in SQLite
+
+    Jobs move from ``pending`` to ``running`` in a single conditional UPDATE
+    that is committed before anything is sent, so two schedulers sharing the
+    database (or one restarted mid-run) can never both claim a job. A job still
+    ``running`` once its lease has expired was interrupted mid-send; it may or
+    may not have gone out, so it becomes ``interrupted`` and is only sent again
+    when retried explicitly.
+
+    The database is opened on first use in each process: a process forked
+    from one that used the store opens its own connection.
+    """
+
+    def __init__(self, path: str):
+        """Set up the job store; the database is created on first use
+
+        Args:
+            path: SQLite database file, or ``:memory:``
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        reset_in_child(self)
+
+    def _before_fork(self):
+        self._lock.acquire()
+
+    def _after_fork_in_parent(self):
+        self._lock.release()
+
+    def _after_fork(self):
+        # The parent's connection must not be used here; it is left for the parent to close
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """The open connection, opening it first if needed; call with the lock held"""
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # Autocommit; every statement is its own transaction
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def open(self):
+        """Open the database now instead of on first use, e.g. on application startup"""
+        with self._lock:
+            self._connection()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _fetch(self, sql: str, parameters: Sequence[Any] = ()) -> List[Job]:
+        with self._lock:
+            rows = self._connection().execute(f"SELECT {', '.join(_COLUMNS)} FROM outreach_jobs {sql}", parameters).fetchall()
+        return [Job(row) for row in rows]
+
+    def add(self, jobs: Sequence[Dict[str, Any]], now: float) -> List[Tuple[Job, bool]]:
+        """Insert jobs; one whose idempotency key is already taken isn't inserted again
+
+        Args:
+            jobs: Dicts with channel, payload, region, campaign_id, idempotency_key and run_at
+            now: Current timestamp
+
+        Returns:
+            For every job, the stored job and whether it was newly created
+        """
+        ids: List[Tuple[int, bool]] = []
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for job in jobs:
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO outreach_jobs (channel, payload, region, campaign_id, idempotency_key, run_at,"
+                        " created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (job["channel"], json.dumps(job["payload"]), job.get("region"), job.get("campaign_id"),
+                         job.get("idempotency_key"), job["run_at"], now, now),
+                    )
+                    if cursor.rowcount:
+                        ids.append((cursor.lastrowid, True))
+                    else:
+                        existing = conn.execute(
+                            "SELECT id FROM outreach_jobs WHERE idempotency_key = ?", (job["idempotency_key"],)
+                        ).fetchone()
+                        ids.append((existing[0], False))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return [(self.get(job_id), created) for job_id, created in ids]
+
+    def get(self, job_id: int) -> Optional[Job]:
+        jobs = self._fetch("WHERE id = ?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def list(self, status: Optional[str] = None, campaign_id: Optional[int] = None, limit: int = 100) -> List[Job]:
+        """Jobs in scheduled order, optionally filtered by status and campaign"""
+        conditions, parameters = [], []
+        if status is not None:
+            conditions.append("status = ?")
+            parameters.append(status)
+        if campaign_id is not None:
+            conditions.append("campaign_id = ?")
+            parameters.append(campaign_id)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        return self._fetch(f"{where}ORDER BY run_at, id LIMIT ?", (*parameters, limit))
+
+    def due(self, before: float, limit: int = 10_000) -> List[Tuple[float, int, str, Optional[str]]]:
+        """(run_at, id, channel, region) of pending jobs due before a timestamp, soonest first"""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT run_at, id, channel, region FROM outreach_jobs WHERE status = 'pending' AND run_at < ?"
+                " ORDER BY run_at LIMIT ?",
+                (before, limit),
+            ).fetchall()
+
+    def claim(self, job_id: int, now: float, lease_seconds: float) -> Optional[Job]:
+        """Mark a due pending job as running; None if it was claimed, cancelled or moved meanwhile"""
+        with self._lock:
+            cursor = self._connection().execute(
+                "UPDATE outreach_jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, updated_at = ?"
+                " WHERE id = ? AND status = 'pending' AND run_at <= ?",
+                (now + lease_seconds, now, job_id, now),
+            )
+        return self.get(job_id) if cursor.rowcount else None
+
+    def _update(self, sql: str, parameters: Sequence[Any]) -> int:
+        with self._lock:
+            return self._connection().execute(f"UPDATE outreach_jobs SET {sql}", parameters).rowcount
+
+    def finish(self, job_id: int, status: str, now: float, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        """Record the outcome of a running job"""
+        self._update(
+            "status = ?, result = ?, error = ?, lease_until = NULL, updated_at = ? WHERE id = ? AND status = 'running'",
+            (status, json.dumps(result) if result is not None else None, error, now, job_id),
+        )
+
+    def reschedule(self, job_id: int, run_at: float, now: float, from_status: str = "pending", error: Optional[str] = None) -> bool:
+        """Move a job in ``from_status`` back to pending at a new time"""
+        return bool(self._update(
+            "status = 'pending', run_at = ?, error = COALESCE(?, error), lease_until = NULL, updated_at = ?"
+            " WHERE id = ? AND status = ?",
+            (run_at, error, now, job_id, from_status),
+        ))
+
+    def cancel(self, job_id: int, now: float) -> bool:
+        """Cancel a pending job"""
+        return bool(self._update("status = 'cancelled', updated_at = ? WHERE id = ? AND status = 'pending'", (now, job_id)))
+
+    def recover(self, now: float) -> int:
+        """Mark running jobs whose lease has expired as interrupted
+
+        Returns:
+            Number of jobs marked
+        """
+        return self._update(
+            "status = 'interrupted', lease_until = NULL, error = 'Interrupted while sending; retry to send again',"
+            " updated_at = ? WHERE status = 'running' AND lease_until < ?",
+            (now, now),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection().execute("SELECT status, COUNT(*) FROM outreach_jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        counts.update(rows)
+        return counts
+
+
+class OutreachScheduler:
+    """Dispatches scheduled outreach jobs from a persistent store at their send time
+
+    Due jobs are kept in a min-heap keyed by send time, so the dispatcher
+    thread sleeps until the next one is due instead of polling the database;
+    the heap is refilled from the store every ``poll_seconds`` with whatever is
+    due before the next refill, which also picks up jobs scheduled by other
+    processes sharing the database. Every job is sent inside its region's send
+    window for its channel: send times are moved to the next opening when
+    scheduled and again when dispatched late (e.g. after downtime).
+
+    At most ``max_concurrent`` jobs are sent at once, and at most
+    ``channel_limits[channel]`` of one channel; due jobs over a channel's limit
+    wait until one of its sends finishes. Sends that raise are retried with
+    exponential backoff up to ``max_attempts`` attempts.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        dispatch: Callable[[Job], Optional[Dict[str, Any]]],
+        windows: Optional[Dict[str, SendWindow]] = None,
+        max_concurrent: int = 4,
+        channel_limits: Optional[Dict[str, int]] = None,
+        max_attempts: int = 3,
+        retry_seconds: float = 60.0,
+        poll_seconds: float = 30.0,
+        lease_seconds: float = 600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the scheduler; call ``start()`` to run the dispatcher thread
+
+        Args:
+            store: Persistent job store
+            dispatch: Sends one job through the existing outreach path and returns its result; raises on failure
+            windows: Send window per channel (channels without one are sent any time)
+            max_concurrent: Most jobs sent at once
+            channel_limits: Most jobs of a channel sent at once
+            max_attempts: Attempts per job before it is marked failed
+            retry_seconds: Delay before the first retry; doubled for every further attempt
+            poll_seconds: Interval between refills of the heap from the store
+            lease_seconds: How long a send may take before its job is considered interrupted
+            clock: Source of the current timestamp
+        """
+        self.store = store
+        self.dispatch = dispatch
+        self.windows = windows or {}
+        self.max_concurrent = max(1, max_concurrent)
+        self.channel_limits = channel_limits or {}
+        self.max_attempts = max(1, max_attempts)
+        self.retry_seconds = retry_seconds
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+
+        self._reset()
+        self.sent = 0
+        self.failed = 0
+        reset_in_child(self)
+
+    def _reset(self):
+        # (run_at, job id, channel, region) of jobs due before the next refill
+        self._heap: List[Tuple[float, int, str, Optional[str]]] = []
+        self._queued: Set[int] = set()
+        # Due jobs held back by their channel's limit
+        self._blocked: Dict[str, Deque[Tuple[float, int, str, Optional[str]]]] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._horizon = float("-inf")
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="outreach-send")
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def _after_fork(self):
+        # The dispatcher and send threads stayed in the parent; the child starts with none running.
+        # Sends the parent had in flight are its own; their jobs stay claimed by it in the store.
+        self._reset()
+
+    def window_open(self, channel: str, region: Optional[str], when: float) -> float:
+        """Earliest time at or after ``when`` a job may go out on a channel to a region"""
+        window = self.windows.get(channel)
+        return when if window is None else window.next_open(when, region_timezone(region))
+
+    def schedule(self, channel: str, jobs: Sequence[Dict[str, Any]], spacing_seconds: float = 0.0) -> List[Tuple[Job, bool]]:
+        """Store jobs and queue them for dispatch
+
+        Each job is sent at its ``not_before`` timestamp (default: now) or the
+        next opening of its region's send window. With ``spacing_seconds``,
+        jobs to the same region are also at least that far apart, so a
+        campaign's calls are spread over working hours instead of all going
+        out when the window opens.
+
+        Args:
+            channel: Outreach channel, e.g. "email" or "voice"
+            jobs: Dicts with payload and optional region, not_before, campaign_id and idempotency_key
+            spacing_seconds: Minimum time between jobs of this batch to the same region
+
+        Returns:
+            For every job, the stored job and whether it was newly created (False for a repeated idempotency key)
+        """
+        now = self.clock()
+        previous: Dict[Optional[str], float] = {}
+        rows = []
+        for job in jobs:
+            region = job.get("region")
+            run_at = max(now, job.get("not_before") or now)
+            if region in previous:
+                run_at = max(run_at, previous[region] + spacing_seconds)
+            run_at = self.window_open(channel, region, run_at)
+            previous[region] = run_at
+            rows.append({**job, "channel": channel, "run_at": run_at})
+
+        stored = self.store.add(rows, now)
+        with self._condition:
+            for job, created in stored:
+                if created and job.run_at < self._horizon:
+                    self._push((job.run_at, job.id, job.channel, job.region))
+            self._condition.notify()
+        return stored
+
+    def cancel(self, job_id: int) -> bool:
+        return self.store.cancel(job_id, self.clock())
+
+    def retry(self, job_id: int) -> bool:
+        """Send a failed or interrupted job again at the next opening of its send window"""
+        job = self.store.get(job_id)
+        if job is None or job.status not in ("failed", "interrupted"):
+            return False
+        run_at = self.window_open(job.channel, job.region, self.clock())
+        if not self.store.reschedule(job_id, run_at, self.clock(), from_status=job.status):
+            return False
+        with self._condition:
+            if run_at < self._horizon:
+                self._push((run_at, job_id, job.channel, job.region))
+            self._condition.notify()
+        return True
+
+    def _push(self, entry: Tuple[float, int, str, Optional[str]]):
+        if entry[1] not in self._queued:
+            self._queued.add(entry[1])
+            heapq.heappush(self._heap, entry)
+
+    def _refill(self, now: float):
+        """Recover interrupted jobs and queue everything due before the next refill"""
+        interrupted = self.store.recover(now)
+        if interrupted:
+            logger.warning("Marked %d outreach jobs interrupted mid-send; they won't be resent unless retried", interrupted)
+        self._horizon = now + self.poll_seconds
+        for entry in self.store.due(self._horizon):
+            self._push(tuple(entry))
+
+    def tick(self) -> int:
+        """Start sending every due job there is capacity for
+
+        Returns:
+            Number of jobs started
+        """
+        started = 0
+        with self._condition:
+            now = self.clock()
+            if now >= self._horizon:
+                self._refill(now)
+            while self._heap and self._heap[0][0] <= now and sum(self._in_flight.values()) < self.max_concurrent:
+                entry = heapq.heappop(self._heap)
+                self._queued.discard(entry[1])
+                _, job_id, channel, region = entry
+                opens = self.window_open(channel, region, now)
+                if opens > now:
+                    # Dispatched after its window closed (e.g. the server was down): wait for the next opening
+                    if self.store.reschedule(job_id, opens, now) and opens < self._horizon:
+                        self._push((opens, job_id, channel, region))
+                    continue
+                limit = self.channel_limits.get(channel)
+                if limit is not None and self._in_flight.get(channel, 0) >= limit:
+                    self._blocked.setdefault(channel, deque()).append(entry)
+                    continue
+                self._in_flight[channel] = self._in_flight.get(channel, 0) + 1
+                self._executor.submit(self._send, job_id, channel)
+                started += 1
+        return started
+
+    def _send(self, job_id: int, channel: str):
+        try:
+            job = self.store.claim(job_id, self.clock(), self.lease_seconds)
+            if job is None:
+                return  # Cancelled, rescheduled or claimed by another process
+            try:
+                result = self.dispatch(job)
+            except Exception as e:
+                error = getattr(e, "detail", None) or str(e) or type(e).__name__
+                if job.attempts < self.max_attempts:
+                    delay = self.retry_seconds * 2 ** (job.attempts - 1)
+                    run_at = self.window_open(channel, job.region, self.clock() + delay)
+                    self.store.reschedule(job_id, run_at, self.clock(), from_status="running", error=str(error))
+                    logger.warning("Outreach job %d failed (attempt %d), retrying: %s", job_id, job.attempts, error)
+                    with self._condition:
+                        if run_at < self._horizon:
+                            self._push((run_at, job_id, channel, job.region))
+                else:
+                    self.store.finish(job_id, "failed", self.clock(), error=str(error))
+                    self.failed += 1
+                    logger.error("Outreach job %d failed after %d attempts: %s", job_id, job.attempts, error)
+                return
+            self.store.finish(job_id, "sent", self.clock(), result=result)
+            self.sent += 1
+            logger.info("Sent scheduled %s outreach job %d", channel, job_id, extra={"campaign_id": job.campaign_id})
+        except Exception as e:
+            logger.error(f"Error running outreach job {job_id}: {e}")
+        finally:
+            with self._condition:
+                self._in_flight[channel] -= 1
+                blocked = self._blocked.get(channel)
+                if blocked:
+                    self._push(blocked.popleft())
+                self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+            self.tick()
+            with self._condition:
+                if self._stopping:
+                    return
+                now = self.clock()
+                wake_at = self._horizon
+                if self._heap and sum(self._in_flight.values()) < self.max_concurrent:
+                    wake_at = min(wake_at, self._heap[0][0])
+                self._condition.wait(timeout=max(0.0, min(wake_at - now, self.poll_seconds)))
+
+    def start(self):
+        """Run the dispatcher in a background thread
+
+        Each process runs its own dispatcher: a process forked from one with
+        a running scheduler has to call ``start()`` again.
+        """
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="outreach-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop dispatching and wait for sends in progress"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.drain(timeout)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until no job is being sent; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while sum(self._in_flight.values()):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        with self._condition:
+            status = {
+                "running": self._thread is not None,
+                "queued": len(self._heap),
+                "in_flight": dict(self._in_flight),
+                "blocked": {channel: len(queue) for channel, queue in self._blocked.items() if queue},
+                "max_concurrent": self.max_concurrent,
+                "channel_limits": dict(self.channel_limits),
+                "windows": {channel: window.to_dict() for channel, window in self.windows.items()},
+            }
+        status["jobs"] = self.store.counts()
+        return status
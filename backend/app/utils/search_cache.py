@@ -0,0 +1,91 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak comparison, as required for If-None-Match
+    return "*" in candidates or etag in (candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates)
+
+
+def version_etag(*parts: Any) -> str:
+    """Strong ETag for a response determined entirely by the given parts, e.g. data versions and request options"""
+    return '"' + hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest() + '"'
+
+
+class CachedResponse:
+    """A serialized response body together with its strong ETag"""
+
+    def __init__(self, body: bytes, expires_at: float):
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.expires_at = expires_at
+
+
+class SearchCache:
+    """LRU cache of serialized search responses
+
+    Keys combine the normalized query, filters, result count and the index
+    version the results were computed against, so a swapped index or an
+    updated roster never serves stale results. Filter values are kept
+    verbatim: the filters they feed are exact matches, so values differing
+    only in case can have different results.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300):
+        """Initialize the cache
+
+        Args:
+            max_entries: Maximum number of responses kept before evicting the least recently used
+            ttl_seconds: How long a response stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Lower-case a query and collapse whitespace so trivial variants share an entry"""
+        return " ".join(query.lower().split())
+
+    def make_key(self, query: str, filters: Dict[str, Any], top_k: int, version: str) -> Tuple:
+        filter_items = tuple(sorted((name, value) for name, value in filters.items() if value is not None))
+        return (self.normalize_query(query), filter_items, top_k, version)
+
+    def get(self, key: Tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Tuple, body: bytes) -> CachedResponse:
+        entry = CachedResponse(body, time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
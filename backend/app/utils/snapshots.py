@@ -0,0 +1,268 @@
+import hashlib
+import json
+import struct
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+SNAPSHOT_MAGIC = b"BSNAPv1\n"
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_DTYPES = ("float32", "float16", "int8")
+
+# Sections start on this boundary so the embedding matrix can be mapped and viewed in place
+_ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sQ")  # Magic and header length
+_CHECKSUM_SIZE = hashlib.sha256().digest_size
+_READ_CHUNK = 1 << 20
+
+
+class SnapshotError(ValueError):
+    """A snapshot file that is truncated, corrupt or of an unknown format"""
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _padding(offset: int) -> bytes:
+    return b"\0" * (_align(offset) - offset)
+
+
+def quantize(vectors: np.ndarray, dtype: str):
+    """Convert float32 rows to a snapshot dtype
+
+    int8 rows are scaled symmetrically by their largest absolute value, which
+    keeps the cosine similarity of normalized embeddings within about 1%.
+
+    Returns:
+        The converted rows and, for int8, the float32 scale of every row (otherwise None)
+    """
+    if dtype == "float32":
+        return vectors.astype(np.float32, copy=False), None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def to_columns(records: Sequence[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Column-oriented copy of records; a field a record lacks is None"""
+    names: Dict[str, None] = {}
+    for record in records:
+        names.update(dict.fromkeys(record))
+    return {name: [record.get(name) for record in records] for name in names}
+
+
+def write_snapshot(
+    ids: Sequence[str],
+    records: Sequence[Dict[str, Any]],
+    batches: Iterable[np.ndarray],
+    dimension: int,
+    header: Dict[str, Any],
+    dtype: str = "float16",
+) -> Iterator[bytes]:
+    """Stream a snapshot file
+
+    The file is a magic number and the length of a JSON header, the header,
+    then 64-byte-aligned sections: the IDs (JSON), the records (JSON, one list
+    per field), the embedding matrix (row-major, ``dtype``) and, for int8, the
+    float32 scale of every row. It ends with the SHA-256 of everything before.
+    Every section but the matrix is serialized up front, so the matrix can be
+    written as it is read, one batch at a time.
+
+    Args:
+        ids: Index IDs, in the order of the matrix rows
+        records: Record behind each ID
+        batches: Consecutive float32 row blocks of the embedding matrix
+        dimension: Embedding dimension
+        header: Fields describing the index, e.g. model_name, template_hash and version_key
+        dtype: One of SNAPSHOT_DTYPES
+
+    Raises:
+        SnapshotError: If the batches don't add up to one row per ID
+    """
+    if dtype not in SNAPSHOT_DTYPES:
+        raise ValueError(f"Unknown snapshot dtype {dtype!r}; expected one of {', '.join(SNAPSHOT_DTYPES)}")
+    count = len(ids)
+    blobs = {
+        "ids": json.dumps(list(ids)).encode("utf-8"),
+        "records": json.dumps(to_columns(records), default=str).encode("utf-8"),
+    }
+    sizes = {
+        **{name: len(blob) for name, blob in blobs.items()},
+        "embeddings": count * dimension * np.dtype(dtype).itemsize,
+    }
+    if dtype == "int8":
+        sizes["scales"] = count * 4
+    sections, offset = {}, 0
+    for name, size in sizes.items():
+        sections[name] = {"offset": offset, "length": size}
+        offset = _align(offset + size)
+
+    header = {
+        **header,
+        "format": SNAPSHOT_FORMAT,
+        "count": count,
+        "dimension": dimension,
+        "dtype": dtype,
+        "created_at": header.get("created_at") or datetime.now().isoformat(),
+        "sections": sections,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    checksum = hashlib.sha256()
+    position = 0
+
+    def emit(chunk: bytes) -> bytes:
+        nonlocal position
+        checksum.update(chunk)
+        position += len(chunk)
+        return chunk
+
+    yield emit(_PREAMBLE.pack(SNAPSHOT_MAGIC, len(header_bytes)) + header_bytes)
+    yield emit(_padding(position))
+
+    for name, blob in blobs.items():
+        yield emit(blob + _padding(len(blob)))
+
+    rows, scales = 0, []
+    for batch in batches:
+        batch = np.asarray(batch, dtype=np.float32).reshape(-1, dimension)
+        quantized, batch_scales = quantize(batch, dtype)
+        if batch_scales is not None:
+            scales.append(batch_scales)
+        rows += len(batch)
+        if rows > count:
+            raise SnapshotError(f"Got more than {count} embedding rows")
+        yield emit(quantized.tobytes())
+    if rows != count:
+        raise SnapshotError(f"Got {rows} embedding rows for {count} IDs")
+    yield emit(_padding(sections["embeddings"]["offset"] + sizes["embeddings"]))
+
+    if dtype == "int8":
+        yield emit(np.concatenate(scales).astype(np.float32).tobytes() if scales else b"")
+        yield emit(_padding(sizes["scales"]))
+    yield checksum.digest()
+
+
+class Snapshot:
+    """A snapshot file opened for import, with its embedding matrix memory-mapped
+
+    Only the header, IDs and records are read into memory; rows of the
+    matrix are paged in from the file as they are read, and processes that
+    map the same file share those pages.
+    """
+
+    def __init__(self, path: str, header: Dict[str, Any], ids: List[str], columns: Dict[str, List[Any]],
+                 embeddings: np.ndarray, scales: Optional[np.ndarray]):
+        self.path = path
+        self.header = header
+        self.ids = ids
+        self.columns = columns
+        self.embeddings = embeddings
+        self.scales = scales
+        self.positions = {id_str: position for position, id_str in enumerate(ids)}
+
+    @property
+    def model_name(self) -> str:
+        return self.header.get("model_name")
+
+    @property
+    def template_hash(self) -> str:
+        return self.header.get("template_hash")
+
+    @property
+    def dimension(self) -> int:
+        return self.header["dimension"]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def open(cls, path: str, verify: bool = True) -> "Snapshot":
+        """Read a snapshot's header, IDs and records and map its embedding matrix
+
+        Args:
+            path: Snapshot file
+            verify: Check the SHA-256 of the whole file first (one sequential read)
+
+        Raises:
+            SnapshotError: If the file is truncated, corrupt or of an unknown format
+        """
+        with open(path, "rb") as snapshot_file:
+            preamble = snapshot_file.read(_PREAMBLE.size)
+            if len(preamble) < _PREAMBLE.size:
+                raise SnapshotError(f"{path} is too short to be a snapshot")
+            magic, header_length = _PREAMBLE.unpack(preamble)
+            if magic != SNAPSHOT_MAGIC:
+                raise SnapshotError(f"{path} is not an index snapshot")
+            try:
+                header = json.loads(snapshot_file.read(header_length))
+            except ValueError:
+                raise SnapshotError(f"{path} has a corrupt header")
+            if header.get("format") != SNAPSHOT_FORMAT:
+                raise SnapshotError(f"{path} has unsupported snapshot format {header.get('format')!r}")
+
+            snapshot_file.seek(0, 2)
+            size = snapshot_file.tell()
+            if verify:
+                cls._verify(snapshot_file, size, path)
+
+            data_start = _align(_PREAMBLE.size + header_length)
+            sections = header["sections"]
+            if data_start + max(s["offset"] + s["length"] for s in sections.values()) > size - _CHECKSUM_SIZE:
+                raise SnapshotError(f"{path} is truncated")
+
+            def read(name: str) -> Any:
+                snapshot_file.seek(data_start + sections[name]["offset"])
+                try:
+                    return json.loads(snapshot_file.read(sections[name]["length"]))
+                except ValueError:
+                    raise SnapshotError(f"{path} has a corrupt {name} section")
+
+            ids, columns = read("ids"), read("records")
+
+        count, dimension = header["count"], header["dimension"]
+        if len(ids) != count:
+            raise SnapshotError(f"{path} lists {len(ids)} IDs for {count} rows")
+        embeddings = np.memmap(path, dtype=header["dtype"], mode="r", shape=(count, dimension),
+                               offset=data_start + sections["embeddings"]["offset"]) if count else np.empty((0, dimension), dtype=header["dtype"])
+        scales = None
+        if "scales" in sections:
+            scales = np.memmap(path, dtype=np.float32, mode="r", shape=(count,),
+                               offset=data_start + sections["scales"]["offset"]) if count else np.empty(0, dtype=np.float32)
+        return cls(path, header, ids, columns, embeddings, scales)
+
+    @staticmethod
+    def _verify(snapshot_file, size: int, path: str):
+        if size < _CHECKSUM_SIZE:
+            raise SnapshotError(f"{path} is truncated")
+        checksum = hashlib.sha256()
+        snapshot_file.seek(0)
+        remaining = size - _CHECKSUM_SIZE
+        while remaining:
+            chunk = snapshot_file.read(min(_READ_CHUNK, remaining))
+            if not chunk:
+                raise SnapshotError(f"{path} is truncated")
+            checksum.update(chunk)
+            remaining -= len(chunk)
+        if snapshot_file.read(_CHECKSUM_SIZE) != checksum.digest():
+            raise SnapshotError(f"{path} failed its checksum")
+
+    def records(self) -> List[Dict[str, Any]]:
+        """The records behind the IDs, in matrix order"""
+        names = list(self.columns)
+        return [dict(zip(names, values)) for values in zip(*self.columns.values())]
+
+    def vectors(self, positions: Any) -> np.ndarray:
+        """float32 embeddings of the rows at ``positions`` (a slice or an index array)"""
+        vectors = np.array(self.embeddings[positions], dtype=np.float32)
+        if self.scales is not None:
+            vectors *= self.scales[positions][:, None]
+        return vectors
+
+    def close(self):
+        """Drop the file mapping; it is unmapped once no array refers to it"""
+        self.embeddings = self.scales = None
@@ -0,0 +1,389 @@
+import heapq
+import itertools
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Kinds of suggestion, from the record fields they come from
+SUGGESTION_FIELDS = {"name": "name", "category": "category", "region": "region", "platform": "platforms"}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def words(text: str) -> List[str]:
+    """Lowercase alphanumeric words of a text"""
+    return _WORD.findall(text.lower())
+
+
+def trigrams(word: str) -> Set[str]:
+    """Trigrams of a word, padded at the start so short prefixes still have some"""
+    padded = f"$${word}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (optimal string alignment) distance, or ``limit + 1`` once it exceeds ``limit``"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class _Entry:
+    __slots__ = ("serial", "key", "kind", "text", "words", "weight", "count", "record_id")
+
+    def __init__(self, serial: int, key: Tuple, kind: str, text: str, record_id: Optional[int] = None):
+        self.serial = serial
+        self.key = key
+        self.kind = kind
+        self.text = text
+        self.words = tuple(dict.fromkeys(words(text)))
+        self.weight = 0.0
+        self.count = 0
+        self.record_id = record_id
+
+
+class _Node:
+    __slots__ = ("children", "entries", "top", "ranked")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # Serials of the entries with a word ending at this node
+        self.entries: Set[int] = set()
+        # Best (weight, serial) pairs in this node's subtree, best first
+        self.top: List[Tuple[float, int]] = []
+        # This node's best entries, best first; built on demand and dropped when they change
+        self.ranked: Optional[List[int]] = None
+
+
+class SuggestIndex:
+    """Autocomplete over influencer names, categories, regions and platforms
+
+    Every word of a suggestion is stored in a prefix trie whose nodes keep the
+    best few suggestions beneath them, so a keystroke costs one walk down the
+    trie. Names are ranked by follower count and categories, regions and
+    platforms by the total followers of their creators. When the typed word
+    isn't a prefix of any known word, a trigram index over the vocabulary
+    finds words within a small edit distance instead. Upserts and deletes
+    only recompute the trie nodes on the paths of the words they touched.
+    """
+
+    # Suggestions of a complete word scanned in order before falling back to set intersections
+    SCAN_LIMIT = 64
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = (), top_per_node: int = 32):
+        """Initialize the index
+
+        Args:
+            records: Initial influencer records
+            top_per_node: Suggestions kept per trie node; bounds the results of a single-word lookup
+        """
+        self.top_per_node = top_per_node
+        self._root = _Node()
+        # Entries are referred to by integer serials, which are much cheaper to hash than their keys
+        self._entries: Dict[int, _Entry] = {}
+        self._serials: Dict[Tuple, int] = {}
+        self._next_serial = itertools.count()
+        # Record ID -> (serials of the entries it contributes to, followers it contributed)
+        self._records: Dict[int, Tuple[List[int], float]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        self.upsert(records)
+
+    @staticmethod
+    def _entry_keys(record: Dict[str, Any]) -> List[Tuple[Tuple, str, str]]:
+        keys = [(("name", record["id"]), "name", record["name"])]
+        for kind, field in SUGGESTION_FIELDS.items():
+            if kind == "name":
+                continue
+            value = record.get(field)
+            for text in (value if isinstance(value, list) else [value]):
+                if text:
+                    keys.append(((kind, str(text).lower()), kind, str(text)))
+        return keys
+
+    def _node(self, word: str, create: bool = False) -> Optional[_Node]:
+        node = self._root
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[char] = _Node()
+            node = child
+        return node
+
+    def _link(self, entry: _Entry):
+        for word in entry.words:
+            node = self._node(word, create=True)
+            if not node.entries:
+                for gram in trigrams(word):
+                    self._trigrams.setdefault(gram, set()).add(word)
+            node.entries.add(entry.serial)
+
+    def _unlink(self, entry: _Entry):
+        for word in entry.words:
+            path = [self._root]
+            for char in word:
+                path.append(path[-1].children[char])
+            path[-1].entries.discard(entry.serial)
+            if path[-1].entries:
+                continue
+            for gram in trigrams(word):
+                grams = self._trigrams[gram]
+                grams.discard(word)
+                if not grams:
+                    del self._trigrams[gram]
+            # Drop the branch if nothing else hangs off it
+            for depth in range(len(word), 0, -1):
+                node = path[depth]
+                if node.entries or node.children:
+                    break
+                del path[depth - 1].children[word[depth - 1]]
+
+    def _add_record(self, record: Dict[str, Any], changed: Set[int]):
+        followers = float(record.get("followers") or 0)
+        serials = []
+        for key, kind, text in self._entry_keys(record):
+            serial = self._serials.get(key)
+            if serial is None:
+                serial = self._serials[key] = next(self._next_serial)
+                entry = self._entries[serial] = _Entry(serial, key, kind, text, record["id"] if kind == "name" else None)
+                self._link(entry)
+            entry = self._entries[serial]
+            entry.weight += followers
+            entry.count += 1
+            changed.add(serial)
+            serials.append(serial)
+        self._records[record["id"]] = (serials, followers)
+
+    def _remove_record(self, record_id: int, changed: Set[int], removed: Dict[int, _Entry]):
+        contribution = self._records.pop(record_id, None)
+        if contribution is None:
+            return
+        serials, followers = contribution
+        for serial in serials:
+            entry = self._entries[serial]
+            entry.weight -= followers
+            entry.count -= 1
+            changed.add(serial)
+            if entry.count <= 0:
+                del self._entries[serial]
+                del self._serials[entry.key]
+                self._unlink(entry)
+                removed[serial] = entry
+
+    def _paths(self, entry: _Entry) -> Iterator[Tuple[int, _Node]]:
+        """(depth, node) of every existing node on the paths of an entry's words"""
+        yield 0, self._root
+        for word in entry.words:
+            node = self._root
+            for depth, char in enumerate(word, start=1):
+                node = node.children.get(char)
+                if node is None:
+                    break
+                yield depth, node
+
+    def _recompute(self, node: _Node):
+        candidates = {serial: self._entries[serial].weight for serial in node.entries}
+        for child in node.children.values():
+            candidates.update((serial, weight) for weight, serial in child.top)
+        node.top = heapq.nlargest(self.top_per_node, ((weight, serial) for serial, weight in candidates.items()),
+                                  key=lambda item: item[0])
+
+    def _rebuild(self, node: _Node):
+        for child in node.children.values():
+            self._rebuild(child)
+        self._recompute(node)
+
+    def _refresh(self, changed: Set[int], removed: Dict[int, _Entry]):
+        """Bring the top suggestions of the nodes on the changed entries' paths up to date
+
+        Each changed entry is moved to its new place (or dropped) in the lists
+        it belongs to. Where a full list loses an entry, or the entry drops to
+        its end, something outside the list may now rank higher, so those lists
+        are recomputed from the node's own entries and its children's lists,
+        deepest first.
+        """
+        stale: Dict[int, Tuple[int, _Node]] = {}
+        for serial in changed:
+            entry = self._entries.get(serial)
+            alive = entry is not None
+            if not alive:
+                entry = removed[serial]
+            for word in entry.words:
+                node = self._node(word)
+                if node is not None:
+                    node.ranked = None
+            for depth, node in self._paths(entry):
+                top = node.top
+                full = len(top) >= self.top_per_node
+                position = next((i for i, (_, top_serial) in enumerate(top) if top_serial == serial), None)
+                if position is not None:
+                    del top[position]
+                elif not alive or (full and entry.weight <= top[-1][0]):
+                    continue
+                if alive:
+                    # Lists are short; a linear scan finds the insertion point
+                    index = next((i for i, (weight, _) in enumerate(top) if weight < entry.weight), len(top))
+                    top.insert(index, (entry.weight, serial))
+                    del top[self.top_per_node:]
+                if position is not None and full and (not alive or index >= len(top) - 1):
+                    stale[id(node)] = (depth, node)
+        for _, node in sorted(stale.values(), key=lambda item: -item[0]):
+            self._recompute(node)
+
+    def upsert(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Add records, replacing the contributions of any already indexed under the same ID
+
+        Returns:
+            Number of records indexed
+        """
+        count = 0
+        changed: Set[int] = set()
+        removed: Dict[int, _Entry] = {}
+        with self._lock:
+            bulk = not self._records
+            for record in records:
+                self._remove_record(record["id"], changed, removed)
+                self._add_record(record, changed)
+                count += 1
+            if bulk:
+                # Computing every list once beats inserting a whole roster entry by entry
+                self._rebuild(self._root)
+            else:
+                self._refresh(changed, removed)
+        return count
+
+    def delete(self, record_ids: Iterable[int]):
+        """Remove the contributions of records"""
+        changed: Set[int] = set()
+        removed: Dict[int, _Entry] = {}
+        with self._lock:
+            for record_id in record_ids:
+                self._remove_record(record_id, changed, removed)
+            self._refresh(changed, removed)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _fuzzy_words(self, partial: str, limit: int) -> List[Tuple[int, str]]:
+        """Known words whose start is within a small edit distance of a partially typed word"""
+        grams = trigrams(partial)
+        shared = Counter(word for gram in grams for word in self._trigrams.get(gram, ()))
+        # Each edit breaks at most three trigrams
+        max_edits = 1 if len(partial) <= 5 else 2
+        needed = max(1, len(grams) - 3 * max_edits)
+        scored = []
+        for word, common in shared.items():
+            if common < needed:
+                continue
+            distance = min(
+                edit_distance(partial, word[:length], max_edits)
+                for length in range(len(partial) - 1, len(partial) + 2)
+            )
+            if distance <= max_edits:
+                scored.append((distance, -common, word))
+        return [(distance, word) for distance, _, word in sorted(scored)[:limit]]
+
+    def _ranked(self, node: _Node) -> List[int]:
+        if node.ranked is None:
+            node.ranked = heapq.nlargest(self.SCAN_LIMIT, node.entries, key=lambda serial: self._entries[serial].weight)
+        return node.ranked
+
+    def _subtree_words(self, node: _Node) -> Iterator[_Node]:
+        """Nodes of the words in a node's subtree"""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.entries:
+                yield node
+            stack.extend(node.children.values())
+
+    def _describe(self, serial: int, match: str) -> Dict[str, Any]:
+        entry = self._entries[serial]
+        suggestion = {"text": entry.text, "type": entry.kind, "match": match}
+        if entry.kind == "name":
+            suggestion["id"] = entry.record_id
+            suggestion["followers"] = int(entry.weight)
+        else:
+            suggestion["count"] = entry.count
+        return suggestion
+
+    def suggest(self, prefix: str, limit: int = 10, kinds: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Suggestions for what has been typed so far
+
+        Every word but the last must match a word of the suggestion exactly; the
+        last one may be its prefix. Typo-tolerant matches fill up the results
+        when fewer than ``limit`` suggestions match exactly.
+
+        Args:
+            prefix: Text typed so far
+            limit: Maximum number of suggestions
+            kinds: Only suggest these kinds (name, category, region, platform)
+
+        Returns:
+            Suggestions, best first: text, type, whether the match was a prefix or fuzzy,
+            and the creator's ID and followers for names or the number of creators otherwise
+        """
+        typed = words(prefix)
+        if not typed:
+            return []
+        *complete, partial = typed
+        with self._lock:
+            complete_nodes = [self._node(word) for word in complete]
+            if None in complete_nodes:
+                return []
+
+            def accept(serial: int) -> bool:
+                return (kinds is None or self._entries[serial].kind in kinds) and all(serial in node.entries for node in complete_nodes)
+
+            results: List[Dict[str, Any]] = []
+            seen: Set[int] = set()
+            node = self._node(partial)
+            ranked = [serial for _, serial in (node.top if node is not None else ()) if accept(serial)][:limit]
+            if complete_nodes and len(ranked) < limit and node is not None:
+                # The best suggestions under the partial word don't match the complete words. Try the
+                # rarest complete word's best suggestions first, then intersect its entries with every
+                # word continuing the partial one
+                rarest = min(complete_nodes, key=lambda node: len(node.entries))
+                ranked = [
+                    serial for serial in self._ranked(rarest)
+                    if accept(serial) and any(word.startswith(partial) for word in self._entries[serial].words)
+                ][:limit]
+                if len(ranked) < limit and len(rarest.entries) > self.SCAN_LIMIT:
+                    matching: Set[int] = set()
+                    for word_node in self._subtree_words(node):
+                        matching |= word_node.entries & rarest.entries
+                    ranked = heapq.nlargest(limit, filter(accept, matching), key=lambda serial: self._entries[serial].weight)
+            for serial in ranked:
+                seen.add(serial)
+                results.append(self._describe(serial, "prefix"))
+
+            if len(results) < limit and len(partial) >= 4:
+                candidates = {}
+                for distance, word in self._fuzzy_words(partial, limit):
+                    node = self._node(word)
+                    if complete_nodes:
+                        rarest = min(complete_nodes, key=lambda node: len(node.entries))
+                        pool = node.entries & rarest.entries
+                    else:
+                        pool = [serial for _, serial in node.top]
+                    for serial in pool:
+                        if serial not in seen and serial not in candidates and accept(serial):
+                            candidates[serial] = (distance, -self._entries[serial].weight)
+                for serial in sorted(candidates, key=candidates.get)[:limit - len(results)]:
+                    results.append(self._describe(serial, "fuzzy"))
+        return results
@@ -0,0 +1,143 @@
+import contextvars
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Fraction of requests traced even when they don't ask for it
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 0.0))
+# Traced requests slower than this have their span tree logged (0 disables the slow-request log)
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv('SLOW_REQUEST_THRESHOLD_MS', 1000))
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger("app.slow_requests")
+
+# Innermost open span of the current trace, or None when the request isn't traced
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("trace_span", default=None)
+
+
+class Span:
+    """A timed section of a trace with nested child spans"""
+
+    __slots__ = ("name", "attributes", "start", "end", "children")
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attributes = attributes or {}
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.children: List["Span"] = []
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        """Render the span tree with offsets relative to the root span"""
+        origin = self.start if origin is None else origin
+        entry = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration_ms, 3),
+        }
+        if self.attributes:
+            entry["attributes"] = self.attributes
+        if self.children:
+            entry["children"] = [child.to_dict(origin) for child in self.children]
+        return entry
+
+    def walk(self, depth: int = 0):
+        """Yield (depth, span) for every span below this one, depth first"""
+        for child in self.children:
+            yield depth, child
+            yield from child.walk(depth + 1)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block as a child of the current span; a no-op outside a traced request"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(name, attributes)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    finally:
+        child.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+@contextmanager
+def start_trace(name: str, **attributes):
+    """Start a new trace rooted at this block, e.g. for work outside a request"""
+    root = Span(name, attributes)
+    token = _current_span.set(root)
+    try:
+        yield root
+    finally:
+        root.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def server_timing(root: Span) -> str:
+    """Format the completed spans of a trace as a Server-Timing header value"""
+    entries = []
+    for _, child in root.walk():
+        if child.end is not None:
+            metric = "".join(c if c.isalnum() or c in "_-" else "-" for c in child.name)
+            entries.append(f"{metric};dur={child.duration_ms:.2f}")
+    return ", ".join(entries)
+
+
+class TracingMiddleware:
+    """ASGI middleware tracing requests and logging the span tree of slow ones
+
+    A request is traced when it sends ``X-Trace: 1`` or is picked by
+    TRACE_SAMPLE_RATE; untraced requests pay nothing for spans. Traced
+    requests slower than SLOW_REQUEST_THRESHOLD_MS have their span tree logged,
+    and requests that asked for a trace get the timings of their stages back
+    in a ``Server-Timing`` response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = any(key == b"x-trace" and value not in (b"", b"0") for key, value in scope.get("headers", []))
+        if not (requested or random.random() < TRACE_SAMPLE_RATE):
+            await self.app(scope, receive, send)
+            return
+
+        root = Span("request", {"method": scope.get("method"), "path": scope.get("path")})
+        token = _current_span.set(root)
+
+        async def send_wrapper(message):
+            if requested and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(root).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            root.end = time.perf_counter()
+            _current_span.reset(token)
+            if SLOW_REQUEST_THRESHOLD_MS > 0 and root.duration_ms >= SLOW_REQUEST_THRESHOLD_MS:
+                slow_logger.warning(
+                    "Slow request: %s %s took %.1f ms", scope.get("method"), scope.get("path"), root.duration_ms,
+                    extra={"trace": root.to_dict()}
+                )
+            elif requested:
+                logger.info("Trace for %s %s", scope.get("method"), scope.get("path"), extra={"trace": root.to_dict()})
@@ -1,26 +1,58 @@
-from sentence_transformers import SentenceTransformer
+import threading
 import chromadb
-from typing import List, Dict, Any
+import numpy as np
+from typing import List, Dict, Any, Optional
+from app.utils.encoders import Encoder, load_encoder
+from app.utils.forking import reset_in_child
+from app.utils.tracing import span
 
 class VectorSearch:
-    """Utility class for vector search operations"""
+    """Utility class for vector search operations
+
+    The ChromaDB client and collection are created on first use in each
+    process; ChromaDB's client can't be used across ``fork()``.
+    """
     
-    def __init__(self, collection_name: str = "influencers", model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, collection_name: str = "influencers", model_name: str = "all-MiniLM-L6-v2", encoder: Optional[Encoder] = None):
         """Initialize the vector search utility
         
         Args:
             collection_name: Name of the ChromaDB collection
             model_name: Name of the sentence transformer model to use
+            encoder: Encoder to use instead of loading one for model_name
         """
-        self.model = SentenceTransformer(model_name)
-        self.chroma_client = chromadb.Client()
-        
-        # Create or get the collection
-        try:
-            self.collection = self.chroma_client.create_collection(name=collection_name)
-        except ValueError:
-            # Collection already exists
-            self.collection = self.chroma_client.get_collection(name=collection_name)
+        self.model = encoder or load_encoder(model_name)
+        self.collection_name = collection_name
+        self._after_fork()
+        reset_in_child(self)
+    
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._client = None
+        self._collection = None
+    
+    def _open(self):
+        if self._collection is not None:
+            return
+        with self._lock:
+            if self._collection is None:
+                self._client = chromadb.Client()
+                # Create or get the collection
+                try:
+                    self._collection = self._client.create_collection(name=self.collection_name)
+                except ValueError:
+                    # Collection already exists
+                    self._collection = self._client.get_collection(name=self.collection_name)
+    
+    @property
+    def chroma_client(self):
+        self._open()
+        return self._client
+    
+    @property
+    def collection(self):
+        self._open()
+        return self._collection
     
     def add_items(self, items: List[Dict[str, Any]], id_field: str = "id", text_generator=None):
         """Add items to the vector database
@@ -61,6 +93,70 @@ class VectorSearch:
             metadatas=items
         )
     
+    def upsert_texts(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]):
+        """Embed texts in one batch and insert or replace them, keeping each text as its document
+        
+        Args:
+            ids: Unique identifiers
+            texts: Texts to embed
+            metadatas: Metadata per text; values must be strings, numbers or booleans
+        """
+        if not ids:
+            return
+        with span("encode"):
+            embeddings = self.model.encode(texts).tolist()
+        self.collection.upsert(ids=ids, embeddings=embeddings, documents=texts, metadatas=metadatas)
+    
+    def query(self, query: str, top_k: int = 5, where: Optional[Dict[str, Any]] = None,
+              exact_limit: int = 10_000) -> List[Dict[str, Any]]:
+        """Search for texts similar to the query, optionally filtered on their metadata
+        
+        ChromaDB's filtered HNSW search can return fewer matches than exist when
+        the filter is selective, so a filter matching at most ``exact_limit``
+        texts is answered by scoring every match exactly instead.
+        
+        Args:
+            query: The search query
+            top_k: Number of results to return
+            where: ChromaDB metadata filter, e.g. {"campaign_id": 3}
+            exact_limit: Most filter matches scored exactly
+            
+        Returns:
+            Matches, most similar first, with their id, document, metadata and cosine similarity
+        """
+        with span("encode"):
+            query_embedding = self.model.encode(query)
+        if where:
+            with span("vector_query"):
+                ids = self.collection.get(where=where, include=[])["ids"]
+                if len(ids) <= exact_limit:
+                    if not ids:
+                        return []
+                    matches = self.collection.get(ids=ids, include=["embeddings", "documents", "metadatas"])
+                    similarities = np.asarray(matches["embeddings"], dtype=np.float32) @ np.asarray(query_embedding, dtype=np.float32)
+                    order = np.argsort(-similarities, kind="stable")[:top_k]
+                    return [
+                        {"id": matches["ids"][i], "document": matches["documents"][i], "metadata": matches["metadatas"][i],
+                         "similarity": float(similarities[i])}
+                        for i in order
+                    ]
+        with span("vector_query"):
+            results = self.collection.query(
+                query_embeddings=[query_embedding.tolist()],
+                n_results=top_k,
+                where=where or None,
+                include=["documents", "metadatas", "distances"]
+            )
+        if not results or not results["ids"]:
+            return []
+        # Embeddings are normalized and ChromaDB's L2 distance is squared, so cosine similarity = 1 - distance / 2
+        return [
+            {"id": id_str, "document": document, "metadata": metadata, "similarity": 1 - distance / 2}
+            for id_str, document, metadata, distance in zip(
+                results["ids"][0], results["documents"][0], results["metadatas"][0], results["distances"][0]
+            )
+        ]
+    
     def search(self, query: str, top_k: int = 5):
         """Search for items similar to the query
         
@@ -72,13 +168,15 @@ class VectorSearch:
             List of matching items
         """
         # Encode the query
-        query_embedding = self.model.encode(query).tolist()
+        with span("encode"):
+            query_embedding = self.model.encode(query).tolist()
         
         # Search in the collection
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k
-        )
+        with span("vector_query"):
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=top_k
+            )
         
         # Extract and return the matched items
         if results and "metadatas" in results and results["metadatas"]:
@@ -0,0 +1,125 @@
+"""Measure response compression and conditional requests on large roster responses.
+
+For every roster size a seeded synthetic roster is loaded into the store and
+``GET /influencers/?limit=1000`` and ``GET /influencers/export`` are requested
+through the full middleware stack with each encoding the server offers,
+recording the bytes on the wire and the request latency. Revalidating a page
+with its ETag (304 Not Modified) is timed against fetching it again:
+
+    python -m benchmarks.bench_compression --sizes 10000,100000 --output compression.json
+"""
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.testclient import TestClient
+
+from app.endpoints import influencers as search_module
+from app.main import app
+from app.utils.compression import COMPRESSION_ENCODINGS, COMPRESSION_MIN_SIZE, supported_encodings
+from app.utils.influencer_store import InfluencerStore
+from benchmarks.bench_search import environment
+from benchmarks.roster import generate_roster
+
+ENDPOINTS = {
+    "page": ("/influencers/", {"limit": 1000}),
+    "export": ("/influencers/export", {"format": "ndjson"}),
+}
+
+
+def summary_ms(timings: List[float]) -> Dict[str, float]:
+    timings = sorted(timings)
+    return {
+        "calls": len(timings),
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000, 3),
+    }
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def fetch(client: TestClient, path: str, params: Dict[str, Any], headers: Dict[str, str]) -> Tuple[int, int, Dict[str, str]]:
+    """Status, bytes on the wire and headers of one request"""
+    with client.stream("GET", path, params=params, headers=headers) as response:
+        size = sum(len(chunk) for chunk in response.iter_raw())
+        return response.status_code, size, dict(response.headers)
+
+
+def run_size(size: int, args, client: TestClient) -> Dict[str, Any]:
+    search_module.influencer_store = InfluencerStore(generate_roster(size, seed=args.seed))
+    encodings = ["identity"] + supported_encodings(COMPRESSION_ENCODINGS)
+    result: Dict[str, Any] = {"size": size}
+    for name, (path, params) in ENDPOINTS.items():
+        repeat = args.repeat if name == "page" else max(1, args.repeat // 10)
+        result[name] = {}
+        for encoding in encodings:
+            headers = {"Accept-Encoding": encoding}
+            timings, wire_bytes = [], 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                _, wire_bytes, response_headers = fetch(client, path, params, headers)
+                timings.append(time.perf_counter() - start)
+            result[name][encoding] = {"bytes": wire_bytes, **summary_ms(timings)}
+
+        etag = response_headers["etag"]
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            status_code, _, _ = fetch(client, path, params, {"Accept-Encoding": encodings[-1], "If-None-Match": etag})
+            timings.append(time.perf_counter() - start)
+            assert status_code == 304
+        result[name]["not_modified"] = summary_ms(timings)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_ints, default=[10_000], help="Comma-separated roster sizes")
+    parser.add_argument("--repeat", type=int, default=50, help="Requests timed per page variant (a tenth for exports)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the roster")
+    parser.add_argument("--output", default="bench_compression.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    # Per-request INFO lines would dominate the measurement
+    logging.getLogger("app").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    client = TestClient(app)
+    original = search_module.influencer_store
+    results = []
+    try:
+        for size in args.sizes:
+            print(f"Benchmarking {size} creators...")
+            result = run_size(size, args, client)
+            results.append(result)
+            for name in ENDPOINTS:
+                for variant, stats in result[name].items():
+                    wire = f"{stats['bytes'] / 1024:>10.1f} KiB" if "bytes" in stats else " " * 14
+                    print(f"  {name:<7} {variant:<13}{wire}  p50 {stats['p50_ms']:>8.2f} ms  p99 {stats['p99_ms']:>8.2f} ms")
+    finally:
+        search_module.influencer_store = original
+
+    report = {
+        "benchmark": "compression",
+        "created_at": datetime.now().isoformat(),
+        "environment": environment(),
+        "params": {"sizes": args.sizes, "repeat": args.repeat, "seed": args.seed,
+                   "encodings": COMPRESSION_ENCODINGS, "min_size": COMPRESSION_MIN_SIZE},
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""Measure near-duplicate detection: precision, recall and time per ingested batch.
+
+For every roster size a ``DedupIndex`` is built over a seeded synthetic
+roster. Then batches are checked against it the way ``POST /influencers/``
+does with ``dedup`` enabled: half of each batch re-lists existing creators
+the way another agency would (a reformatted name, the handle at another
+domain, a reworded description), the other half are new creators.
+
+    python -m benchmarks.bench_dedup --sizes 10000,100000 --output dedup.json
+
+The roster generator draws names from a small pool, so here every creator
+gets a surname of their own; otherwise thousands of distinct creators share
+a name, category and region and are duplicates in all but ID. Time per batch
+should stay roughly flat as the roster grows, since a record is only
+compared with the records it shares an LSH bucket with.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.utils.dedup import DedupIndex
+from app.utils.encoders import HashingEncoder
+from benchmarks.roster import generate_roster
+
+SYLLABLES = ["ka", "ri", "mo", "len", "sha", "vi", "tor", "an", "del", "su", "ra", "no", "bel", "ti", "gar", "en"]
+DOMAINS = ["agency.io", "talentco.com", "gmail.com", "creators.net"]
+
+
+def with_unique_names(records: List[Dict[str, Any]], rng: random.Random, used: Set[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """Give every record a seeded name not in ``used`` (which is updated) and a handle to match"""
+    for record in records:
+        first = record["name"].split()[0]
+        while True:
+            last = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+            if (first, last) not in used:
+                used.add((first, last))
+                break
+        record["name"] = f"{first} {last}"
+        record["contact"] = f"{first.lower()}.{last.lower()}{rng.randint(1, 99)}@example.com"
+    return records
+
+
+def relisted(record: Dict[str, Any], rng: random.Random, record_id: int) -> Dict[str, Any]:
+    """The same creator as another agency would list them"""
+    first, last = record["name"].split()
+    handle = record["contact"].split("@")[0]
+    words = record["description"].split()
+    edit = rng.randint(0, 2)
+    if edit == 0:
+        words = words + rng.choice([["and", "lifestyle"], ["for", "brands"], ["since", "2019"]])
+    elif edit == 1:
+        del words[rng.randrange(len(words))]
+    return dict(
+        record,
+        id=record_id,
+        name=rng.choice([f"{first} {last}", f"{first} {last[0]}.", f"{first}{last}", f"{first} {last}".upper()]),
+        contact=rng.choice([handle.replace(".", "_"), handle.replace(".", ""), handle]) + "@" + rng.choice(DOMAINS),
+        description=" ".join(words),
+        followers=int(record["followers"] * rng.uniform(0.95, 1.05)),
+    )
+
+
+def embed(encoder: HashingEncoder, records: List[Dict[str, Any]]) -> np.ndarray:
+    return encoder.encode([f"{record['description']}. {record['name']}" for record in records])
+
+
+def summary_ms(timings: List[float]) -> Dict[str, float]:
+    timings = sorted(timings)
+    return {
+        "calls": len(timings),
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000, 3),
+    }
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def run_size(size: int, args, encoder: HashingEncoder) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    names: Set[Tuple[str, str]] = set()
+    roster = with_unique_names(generate_roster(size, seed=args.seed), rng, names)
+    embeddings = dict(zip((record["id"] for record in roster), embed(encoder, roster)))
+
+    start = time.perf_counter()
+    index = DedupIndex(roster, jaccard_threshold=args.jaccard, cosine_threshold=args.cosine)
+    build_seconds = time.perf_counter() - start
+
+    next_id = size + 1
+    timings, true_positive, false_positive, duplicates = [], 0, 0, 0
+    for _ in range(args.batches):
+        batch, originals = [], {}
+        for _ in range(args.batch_size // 2):
+            original = rng.choice(roster)
+            batch.append(relisted(original, rng, next_id))
+            originals[next_id] = original["id"]
+            next_id += 1
+        fresh = with_unique_names(generate_roster(args.batch_size - len(batch), seed=rng.randrange(1 << 30), start_id=next_id), rng, names)
+        next_id += len(fresh)
+        batch += fresh
+        duplicates += len(originals)
+        vectors = embed(encoder, batch)
+
+        start = time.perf_counter()
+        candidates = index.find(batch, vectors, lambda ids: {record_id: embeddings[record_id] for record_id in ids})
+        timings.append(time.perf_counter() - start)
+        for candidate in candidates:
+            if originals.get(candidate.record_id) == candidate.duplicate_of:
+                true_positive += 1
+            else:
+                false_positive += 1
+
+    flagged = true_positive + false_positive
+    return {
+        "size": size,
+        "build_seconds": round(build_seconds, 3),
+        "precision": round(true_positive / flagged, 4) if flagged else None,
+        "recall": round(true_positive / duplicates, 4) if duplicates else None,
+        "batch": summary_ms(timings),
+        "per_record_us": round(statistics.mean(timings) / args.batch_size * 1e6, 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_ints, default=[10_000], help="Comma-separated roster sizes")
+    parser.add_argument("--batches", type=int, default=20, help="Batches checked per size")
+    parser.add_argument("--batch-size", type=int, default=200, help="Records per batch, half of them duplicates")
+    parser.add_argument("--jaccard", type=float, default=0.6, help="Estimated Jaccard similarity a pair needs")
+    parser.add_argument("--cosine", type=float, default=0.8, help="Embedding cosine similarity a pair needs")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the roster and the batches")
+    parser.add_argument("--output", default="bench_dedup.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    encoder = HashingEncoder()
+    results = []
+    for size in args.sizes:
+        print(f"Benchmarking {size} creators...")
+        result = run_size(size, args, encoder)
+        results.append(result)
+        print(f"  build {result['build_seconds']:.2f} s, precision {result['precision']}, recall {result['recall']}")
+        stats = result["batch"]
+        print(f"  batch      p50 {stats['p50_ms']:>8.3f} ms  p99 {stats['p99_ms']:>8.3f} ms"
+              f"  ({result['per_record_us']:.1f} us per record)")
+
+    report = {
+        "benchmark": "dedup",
+        "created_at": datetime.now().isoformat(),
+        "params": {"sizes": args.sizes, "batches": args.batches, "batch_size": args.batch_size,
+                   "jaccard": args.jaccard, "cosine": args.cosine, "seed": args.seed},
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Measure the outreach history index: background embedding throughput and search latency.
+
+For every document count seeded synthetic negotiation notes and emails are
+queued on a fresh ``OutreachHistoryIndex`` the way
+``POST /outreach/negotiation/summary`` and ``/outreach/email`` do, once
+embedding them in batches and once one at a time (``--batch-size 1``). The
+time until all of them are searchable is recorded, then searches are timed
+without a filter and filtered by campaign and by influencer, like
+``GET /outreach/history/search``:
+
+    python -m benchmarks.bench_history --docs 1000,10000 --output history.json
+
+Set ``EMBEDDING_ENCODER=hashing`` to leave the embedding model out of the
+measurement; batching matters most with the real model.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.utils.encoders import EMBEDDING_ENCODER, load_encoder
+from app.utils.outreach_history import OutreachHistoryIndex
+from app.utils.vector_search import VectorSearch
+
+TOPICS = [
+    "asked for exclusive usage rights for {n} months",
+    "countered with a fee {n}% lower if we drop the video",
+    "wants the timeline pushed back by {n} weeks",
+    "agreed to {n} extra stories at no cost",
+    "objected to the whitelisting clause",
+    "needs approval from their agency before signing",
+    "prefers payment upfront instead of net {n}",
+]
+QUERIES = ["usage rights", "lower fee", "delay the timeline", "payment terms", "agency approval", "extra stories"]
+
+
+def make_documents(count: int, campaigns: int, influencers: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    documents = []
+    for i in range(count):
+        topics = rng.sample(TOPICS, 2)
+        documents.append({
+            "kind": "negotiation" if rng.random() < 0.6 else "email",
+            "source_id": i,
+            "text": "; ".join(topic.format(n=rng.randint(2, 12)) for topic in topics).capitalize(),
+            "campaign_id": rng.randrange(campaigns),
+            "influencer_id": rng.randrange(influencers),
+        })
+    return documents
+
+
+def summary_ms(timings: List[float]) -> Dict[str, float]:
+    timings = sorted(timings)
+    return {
+        "calls": len(timings),
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000, 3),
+    }
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def ingest(documents: List[Dict[str, Any]], encoder, batch_size: int) -> Dict[str, Any]:
+    index = OutreachHistoryIndex(VectorSearch(collection_name=f"bench_history_{uuid.uuid4().hex[:8]}", encoder=encoder),
+                                 batch_size=batch_size)
+    start = time.perf_counter()
+    for document in documents:
+        index.add(document["kind"], document["source_id"], document["text"],
+                  campaign_id=document["campaign_id"], influencer_id=document["influencer_id"])
+    queued = time.perf_counter() - start
+    index.flush()
+    searchable = time.perf_counter() - start
+    return {
+        "index": index,
+        "queue_us_per_doc": round(queued / len(documents) * 1e6, 2),
+        "searchable_seconds": round(searchable, 3),
+        "docs_per_second": round(len(documents) / searchable, 1),
+        "batches": index.batches,
+    }
+
+
+def run_docs(count: int, args, encoder) -> Dict[str, Any]:
+    documents = make_documents(count, args.campaigns, args.influencers, args.seed)
+    result: Dict[str, Any] = {"docs": count}
+    for name, batch_size in (("batched", args.batch_size), ("unbatched", 1)):
+        stats = ingest(documents, encoder, batch_size)
+        index = stats.pop("index")
+        result[name] = stats
+        if name == "unbatched":
+            index.search.chroma_client.delete_collection(index.search.collection.name)
+            continue
+
+        rng = random.Random(args.seed)
+        searches = {
+            "unfiltered": lambda q: index.query(q, top_k=args.top_k),
+            "by_campaign": lambda q: index.query(q, top_k=args.top_k, campaign_id=rng.randrange(args.campaigns)),
+            "by_influencer": lambda q: index.query(q, top_k=args.top_k, influencer_id=rng.randrange(args.influencers)),
+        }
+        for search_name, search in searches.items():
+            timings = []
+            for i in range(args.queries):
+                start = time.perf_counter()
+                search(QUERIES[i % len(QUERIES)])
+                timings.append(time.perf_counter() - start)
+            result[search_name] = summary_ms(timings)
+        index.search.chroma_client.delete_collection(index.search.collection.name)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=parse_ints, default=[1000], help="Comma-separated document counts")
+    parser.add_argument("--batch-size", type=int, default=64, help="Documents embedded per encoder call")
+    parser.add_argument("--campaigns", type=int, default=200, help="Distinct campaigns")
+    parser.add_argument("--influencers", type=int, default=2000, help="Distinct influencers")
+    parser.add_argument("--queries", type=int, default=100, help="Searches timed per filter")
+    parser.add_argument("--top-k", type=int, default=10, help="Results per search")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the documents and filters")
+    parser.add_argument("--output", default="bench_history.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    encoder = load_encoder("all-MiniLM-L6-v2")
+    results = []
+    for count in args.docs:
+        print(f"Benchmarking {count} documents...")
+        result = run_docs(count, args, encoder)
+        results.append(result)
+        for name in ("batched", "unbatched"):
+            stats = result[name]
+            print(f"  {name:<10} searchable after {stats['searchable_seconds']:.2f} s ({stats['docs_per_second']:.0f} docs/s)")
+        for name in ("unfiltered", "by_campaign", "by_influencer"):
+            stats = result[name]
+            print(f"  {name:<14} p50 {stats['p50_ms']:>8.2f} ms  p99 {stats['p99_ms']:>8.2f} ms")
+
+    report = {
+        "benchmark": "outreach_history",
+        "created_at": datetime.now().isoformat(),
+        "params": {"docs": args.docs, "batch_size": args.batch_size, "campaigns": args.campaigns,
+                   "influencers": args.influencers, "queries": args.queries, "top_k": args.top_k,
+                   "seed": args.seed, "encoder": EMBEDDING_ENCODER},
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""Measure what hybrid (BM25 + vector) search costs and what it finds.
+
+For every roster size a seeded synthetic roster is indexed as in
+``benchmarks.bench_search``, then three query sets are run through
+``run_search`` in ``vector`` and ``hybrid`` mode:
+
+* topical queries ("skincare beauty influencers in UK"), for the latency
+  fusion adds to ordinary searches,
+* creator names ("Priya Sharma"), scored by the share of results with that name,
+* handles taken from contact addresses ("priya.sharma42"), scored by whether
+  the creator is in the results at all.
+
+The report also covers building the lexical index and upserting into it one
+record at a time. Run from the backend directory:
+
+    python -m benchmarks.bench_hybrid --sizes 10000,100000 --output hybrid.json
+
+Set ``EMBEDDING_ENCODER=hashing`` to leave the embedding model out of the
+measurement.
+"""
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.endpoints import influencers as search_module
+from app.utils.lexical import LexicalIndex
+from benchmarks.bench_search import build_index, environment, latency_summary, make_queries, parse_ints
+from benchmarks.roster import generate_roster, iter_roster
+
+MODES = ("vector", "hybrid")
+
+
+def make_name_queries(roster: List[Dict[str, Any]], count: int, seed: int) -> List[Dict[str, Any]]:
+    """Name and handle queries for seeded picks from the roster"""
+    rng = random.Random(seed)
+    picks = [rng.choice(roster) for _ in range(count)]
+    return [
+        {"q": influencer["name"], "id": influencer["id"], "name": influencer["name"],
+         "handle": influencer["contact"].split("@")[0]}
+        for influencer in picks
+    ]
+
+
+def run_queries(queries: List[Dict[str, Any]], mode: str, top_k: int = 10):
+    """Run queries one at a time and return per-query latencies and results"""
+    timings, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search_module.run_search(query["q"], top_k=query.get("top_k", top_k), mode=mode,
+                                                category=query.get("category"), region=query.get("region")))
+        timings.append(time.perf_counter() - start)
+    return timings, results
+
+
+def time_lexical_upserts(size: int, count: int, seed: int) -> Dict[str, float]:
+    """Upsert fresh records into a full lexical index one at a time"""
+    index = LexicalIndex(generate_roster(size, seed=seed))
+    timings = []
+    for record in iter_roster(count, seed=seed + 1, start_id=size + 1):
+        start = time.perf_counter()
+        index.upsert([record])
+        timings.append(time.perf_counter() - start)
+    return latency_summary(timings)
+
+
+def run_size(size: int, args) -> Dict[str, Any]:
+    roster = generate_roster(size, seed=args.seed)
+    start = time.perf_counter()
+    LexicalIndex(roster)
+    lexical_build_seconds = time.perf_counter() - start
+    build_index(roster, prefix=f"hybrid{size}")
+
+    topical = make_queries(args.queries, seed=args.seed)
+    names = make_name_queries(roster, args.queries, seed=args.seed)
+    handles = [{**query, "q": query["handle"]} for query in names]
+    for mode in MODES:
+        run_queries(topical[:args.warmup], mode)
+
+    result: Dict[str, Any] = {
+        "size": size,
+        "lexical_build_seconds": round(lexical_build_seconds, 3),
+        "lexical_upsert": time_lexical_upserts(size, args.upserts, args.seed),
+        "modes": {},
+    }
+    for mode in MODES:
+        topical_timings, _ = run_queries(topical, mode)
+        _, name_results = run_queries(names, mode)
+        _, handle_results = run_queries(handles, mode)
+        name_precision = [
+            sum(found["name"] == query["name"] for found in found_list) / max(1, len(found_list))
+            for query, found_list in zip(names, name_results)
+        ]
+        handle_recall = [
+            any(found["id"] == query["id"] for found in found_list)
+            for query, found_list in zip(handles, handle_results)
+        ]
+        result["modes"][mode] = {
+            "topical_query": latency_summary(topical_timings),
+            "name_precision_at_10": round(sum(name_precision) / len(name_precision), 3),
+            "handle_recall_at_10": round(sum(handle_recall) / len(handle_recall), 3),
+        }
+
+    vector, hybrid = result["modes"]["vector"]["topical_query"], result["modes"]["hybrid"]["topical_query"]
+    result["fusion_overhead_ms"] = {
+        "p50": round(hybrid["p50_ms"] - vector["p50_ms"], 3),
+        "p99": round(hybrid["p99_ms"] - vector["p99_ms"], 3),
+    }
+
+    active = search_module.index_registry.active
+    if active is not None:
+        search_module.chroma_client.delete_collection(active.collection.name)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_ints, default=[10_000], help="Comma-separated roster sizes")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per query set")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed queries before measuring")
+    parser.add_argument("--upserts", type=int, default=1000, help="Single-record lexical upserts to time")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the roster and the queries")
+    parser.add_argument("--output", default="bench_hybrid.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    # Per-search INFO lines would dominate the measurement
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    original = (search_module.influencer_store, search_module.lexical_index, search_module.index_registry)
+    results = []
+    try:
+        for size in args.sizes:
+            print(f"Benchmarking {size} creators...")
+            result = run_size(size, args)
+            results.append(result)
+            print(f"  lexical build {result['lexical_build_seconds']:.2f} s, "
+                  f"upsert p50 {result['lexical_upsert']['p50_ms']:.3f} ms, "
+                  f"fusion overhead p50 {result['fusion_overhead_ms']['p50']:+.2f} ms, "
+                  f"p99 {result['fusion_overhead_ms']['p99']:+.2f} ms")
+            for mode, stats in result["modes"].items():
+                print(f"  {mode:<7} p50 {stats['topical_query']['p50_ms']:.2f} ms, "
+                      f"name precision@10 {stats['name_precision_at_10']:.2f}, "
+                      f"handle recall@10 {stats['handle_recall_at_10']:.2f}")
+    finally:
+        search_module.influencer_store, search_module.lexical_index, search_module.index_registry = original
+
+    report = {
+        "benchmark": "hybrid_search",
+        "created_at": datetime.now().isoformat(),
+        "environment": environment(),
+        "params": {"sizes": args.sizes, "queries": args.queries, "warmup": args.warmup,
+                   "upserts": args.upserts, "seed": args.seed},
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Measure logging overhead per /influencers/search request.
+
+"before" replays the burst the search endpoint used to emit (eagerly formatted
+f-strings, one INFO line per matched influencer) through a synchronous
+basicConfig-style stream handler. "after" replays the current calls (lazy
+DEBUG detail, one structured INFO summary) through the queue-based pipeline,
+both with DEBUG disabled and with DEBUG enabled but sampled per request.
+Times are measured in the request thread, which is what a request pays.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_logging --requests 5000
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from app.utils.logging_config import JSONFormatter, create_queue_handler, debug_enabled, debug_sampled
+
+MATCHES = [(f"{i}", f"Creator {i}", 0.9 - i * 0.05) for i in range(10)]
+
+
+def old_search_burst(logger: logging.Logger, q: str):
+    logger.info(f"Received search query: {q}")
+    logger.info("Encoding search query...")
+    logger.info(f"Vector search completed with {len(MATCHES)} results")
+    logger.info(f"Top similarity scores: {[f'{id}:{score:.4f}' for id, _, score in MATCHES[:5]]}")
+    for _, name, score in MATCHES:
+        logger.info(f"Vector match: {name} with similarity score {score:.4f}")
+    logger.info(f"Returning top 2 results:")
+    for _, name, score in MATCHES[:2]:
+        logger.info(f"  {name} (score: {score:.4f})")
+
+
+def new_search_burst(logger: logging.Logger, q: str):
+    verbose = debug_enabled(logger)
+    logger.debug("Received search query: %s", q)
+    logger.debug("Encoding search query...")
+    logger.debug("Vector search completed with %d results", len(MATCHES))
+    if verbose:
+        logger.debug("Top similarity scores: %s", [f'{id}:{score:.4f}' for id, _, score in MATCHES[:5]])
+    for _, name, score in MATCHES:
+        if verbose:
+            logger.debug("Vector match: %s with similarity score %.4f", name, score)
+    logger.info("Search returned %d results", 2, extra={"result_ids": [0, 1], "top_k": 2})
+
+
+def isolated_logger(name: str, handler: logging.Handler, level: int) -> logging.Logger:
+    logger = logging.getLogger(f"bench.{name}")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(level)
+    return logger
+
+
+def run(burst, logger, requests: int, sample_every: int = 1):
+    timings = []
+    for i in range(requests):
+        token = debug_sampled.set(i % sample_every == 0)
+        start = time.perf_counter()
+        burst(logger, "fashion influencers in India")
+        timings.append(time.perf_counter() - start)
+        debug_sampled.reset(token)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000, help="Simulated requests per variant")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Synchronous handler writing to a file, as logging.basicConfig would to stderr
+        with open(os.path.join(tmp, "before.log"), "w") as stream:
+            handler = logging.StreamHandler(stream)
+            handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+            logger = isolated_logger("before", handler, logging.INFO)
+            results["before (sync handler, 17 INFO lines)"] = run(old_search_burst, logger, args.requests)
+
+        for name, level, sample_every in (
+            ("after (queue, INFO)", logging.INFO, 1),
+            ("after (queue, DEBUG sampled 1%)", logging.DEBUG, 100),
+        ):
+            with open(os.path.join(tmp, "after.log"), "w") as stream:
+                handler = logging.StreamHandler(stream)
+                handler.setFormatter(JSONFormatter())
+                queue_handler, listener = create_queue_handler(handler, queue_size=100_000)
+                listener.start()
+                logger = isolated_logger(name, queue_handler, level)
+                results[name] = run(new_search_burst, logger, args.requests, sample_every)
+                listener.stop()
+                if queue_handler.dropped:
+                    print(f"  note: {name} dropped {queue_handler.dropped} records")
+
+    print(f"Logging overhead per search request over {args.requests} requests (request thread)")
+    for name, timings in results.items():
+        print(f"  {name:<40} mean {statistics.mean(timings) * 1e6:8.1f} us   p99 {sorted(timings)[int(len(timings) * 0.99)] * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
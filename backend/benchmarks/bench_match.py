@@ -0,0 +1,141 @@
+"""Measure how long matching a campaign brief against the whole roster takes.
+
+For every roster size a ``RosterMatrix`` is filled with hashing-encoder
+embeddings of a seeded synthetic roster, then seeded briefs (a topic, a mix
+of deliverables and a budget) are scored and shortlisted one at a time, the
+way ``POST /influencers/match`` does after encoding the brief. Single-record
+upserts into the matrix are timed too:
+
+    python -m benchmarks.bench_match --sizes 10000,100000 --output match.json
+
+The embedding model is left out: a brief's text is encoded once per edit and
+cached, so scoring is what runs on every change to its budget or deliverables.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.utils.encoders import HashingEncoder
+from app.utils.matching import RosterMatrix, shortlist
+from benchmarks.roster import CATEGORIES, REGIONS, generate_roster, iter_roster
+
+PLANS = [
+    {"post": 1},
+    {"post": 3},
+    {"post": 2, "video": 1},
+    {"post": 2, "stream": 1},
+    {"post": 1, "blog": 1},
+]
+
+
+def make_briefs(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Seeded briefs: a topic sentence, a deliverable plan and a total budget in USD"""
+    rng = random.Random(seed)
+    briefs = []
+    for _ in range(count):
+        category = rng.choice(list(CATEGORIES))
+        topic = rng.choice(CATEGORIES[category])
+        briefs.append({
+            "text": f"{topic} campaign for {category} audiences in {rng.choice(list(REGIONS))}",
+            "plan": rng.choice(PLANS),
+            "budget": rng.choice([2_000, 10_000, 50_000, 250_000]),
+            "region": rng.choice([None, None, None, rng.choice(list(REGIONS))]),
+        })
+    return briefs
+
+
+def summary_ms(timings: List[float]) -> Dict[str, float]:
+    timings = sorted(timings)
+    return {
+        "calls": len(timings),
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000, 3),
+    }
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def run_size(size: int, args, encoder: HashingEncoder) -> Dict[str, Any]:
+    roster = generate_roster(size, seed=args.seed)
+    embeddings = encoder.encode([f"{record['description']}. {record['name']}" for record in roster])
+    start = time.perf_counter()
+    matrix = RosterMatrix(encoder.dimension, capacity=size)
+    matrix.upsert(roster, embeddings)
+    build_seconds = time.perf_counter() - start
+
+    briefs = make_briefs(args.briefs, seed=args.seed)
+    vectors = [encoder.encode(brief["text"]) for brief in briefs]
+    score_timings, shortlist_timings, eligible = [], [], []
+    for brief, vector in zip(briefs, vectors):
+        start = time.perf_counter()
+        scored = matrix.score(vector, brief["plan"], max_cost=brief["budget"], region=brief["region"])
+        scored_at = time.perf_counter()
+        shortlist(scored, args.limit, budget=brief["budget"])
+        shortlist_timings.append(time.perf_counter() - scored_at)
+        score_timings.append(scored_at - start)
+        eligible.append(len(scored["ids"]))
+
+    upsert_timings = []
+    for record in iter_roster(args.updates, seed=args.seed + 1, start_id=size + 1):
+        embedding = encoder.encode(record["description"])[np.newaxis]
+        start = time.perf_counter()
+        matrix.upsert([record], embedding)
+        upsert_timings.append(time.perf_counter() - start)
+
+    return {
+        "size": size,
+        "build_seconds": round(build_seconds, 3),
+        "mean_eligible": round(statistics.mean(eligible), 1),
+        "score": summary_ms(score_timings),
+        "shortlist": summary_ms(shortlist_timings),
+        "total": summary_ms([a + b for a, b in zip(score_timings, shortlist_timings)]),
+        "upsert": summary_ms(upsert_timings),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_ints, default=[10_000], help="Comma-separated roster sizes")
+    parser.add_argument("--briefs", type=int, default=200, help="Briefs matched per size")
+    parser.add_argument("--limit", type=int, default=20, help="Shortlist length")
+    parser.add_argument("--updates", type=int, default=500, help="Single-record upserts to time")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the roster and the briefs")
+    parser.add_argument("--output", default="bench_match.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    encoder = HashingEncoder()
+    results = []
+    for size in args.sizes:
+        print(f"Benchmarking {size} creators...")
+        result = run_size(size, args, encoder)
+        results.append(result)
+        print(f"  build {result['build_seconds']:.2f} s, {result['mean_eligible']:.0f} eligible per brief on average")
+        for name in ("score", "shortlist", "total", "upsert"):
+            stats = result[name]
+            print(f"  {name:<10} p50 {stats['p50_ms']:>8.3f} ms  p99 {stats['p99_ms']:>8.3f} ms")
+
+    report = {
+        "benchmark": "match",
+        "created_at": datetime.now().isoformat(),
+        "params": {"sizes": args.sizes, "briefs": args.briefs, "limit": args.limit,
+                   "updates": args.updates, "seed": args.seed},
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
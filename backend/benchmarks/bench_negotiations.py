@@ -0,0 +1,168 @@
+"""Measure the negotiation summary store: write throughput and aggregate query latency.
+
+For every row count a fresh ``NegotiationStore`` is filled with seeded
+synthetic summaries by ``--writers`` threads, each waiting for its
+summary's commit the way ``POST /outreach/negotiation/summary`` does. The
+same rows are then written one commit per summary for comparison, and the
+aggregates behind ``/outreach/negotiation/acceptance`` and
+``/outreach/negotiation/budgets`` are timed over the full table:
+
+    python -m benchmarks.bench_negotiations --rows 10000,100000 --output negotiations.json
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.utils.negotiations import _COLUMNS, _INSERT, _SCHEMA, NegotiationStore
+
+CATEGORIES = ["fashion", "tech", "beauty", "food", "fitness", "travel", "gaming", "finance"]
+REGIONS = ["India", "USA", "UK", "Mexico", "Germany", "Brazil", "Indonesia", "Canada"]
+STATUSES = ["accepted", "rejected", "pending"]
+
+
+def make_summaries(count: int, campaigns: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    summaries = []
+    for i in range(count):
+        campaign_id = rng.randrange(campaigns)
+        budget = round(rng.lognormvariate(8, 1), 2)
+        summaries.append({
+            "influencer_id": rng.randrange(count),
+            "influencer_name": f"Creator {i}",
+            "brand_name": f"Brand {campaign_id % 50}",
+            "campaign_id": campaign_id,
+            "campaign_name": f"Campaign {campaign_id}",
+            "category": rng.choice(CATEGORIES),
+            "region": rng.choice(REGIONS),
+            "deliverables": "1 Instagram post, 2 stories",
+            "timeline": "2 weeks",
+            "agreed_budget": f"${budget:,.2f}",
+            "agreed_budget_usd": budget,
+            "status": rng.choices(STATUSES, weights=[5, 3, 2])[0],
+            "notes": "Asked for usage rights to be limited to 3 months",
+            "timestamp": 1_700_000_000 + i * 60,
+        })
+    return summaries
+
+
+def summary_ms(timings: List[float]) -> Dict[str, float]:
+    timings = sorted(timings)
+    return {
+        "calls": len(timings),
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000, 3),
+    }
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def write_batched(path: str, summaries: List[Dict[str, Any]], writers: int) -> Dict[str, Any]:
+    """Writer threads each wait for every summary's commit before sending the next"""
+    store = NegotiationStore(path)
+    shards = [summaries[i::writers] for i in range(writers)]
+
+    def write(shard):
+        for summary in shard:
+            store.add(summary, time.time()).result()
+
+    threads = [threading.Thread(target=write, args=(shard,)) for shard in shards]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    result = {"seconds": round(seconds, 3), "rows_per_second": round(len(summaries) / seconds, 1),
+              "commits": store.batches}
+    store.close()
+    return result
+
+
+def write_unbatched(path: str, summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One commit per summary on the same schema and pragmas"""
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    start = time.perf_counter()
+    for summary in summaries:
+        conn.execute(_INSERT, tuple(summary.get(name) for name in _COLUMNS[1:-1]) + (time.time(),))
+    seconds = time.perf_counter() - start
+    conn.close()
+    return {"seconds": round(seconds, 3), "rows_per_second": round(len(summaries) / seconds, 1), "commits": len(summaries)}
+
+
+def run_rows(count: int, args) -> Dict[str, Any]:
+    summaries = make_summaries(count, args.campaigns, args.seed)
+    with tempfile.TemporaryDirectory(prefix="bench-negotiations-") as directory:
+        batched = write_batched(os.path.join(directory, "batched.sqlite3"), summaries, args.writers)
+        unbatched = write_unbatched(os.path.join(directory, "unbatched.sqlite3"), summaries)
+
+        store = NegotiationStore(os.path.join(directory, "batched.sqlite3"))
+        queries = {
+            "acceptance_by_category": lambda: store.acceptance("category"),
+            "acceptance_by_region": lambda: store.acceptance("region"),
+            "budgets": lambda: store.budgets(),
+            "budgets_one_campaign": lambda: store.budgets(campaign_id=args.campaigns // 2),
+        }
+        aggregates = {}
+        for name, query in queries.items():
+            timings = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                query()
+                timings.append(time.perf_counter() - start)
+            aggregates[name] = summary_ms(timings)
+        store.close()
+
+    return {"rows": count, "batched": batched, "unbatched": unbatched, "aggregates": aggregates}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=parse_ints, default=[10_000], help="Comma-separated row counts")
+    parser.add_argument("--writers", type=int, default=16, help="Concurrent writer threads")
+    parser.add_argument("--campaigns", type=int, default=500, help="Distinct campaigns")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per aggregate query")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the summaries")
+    parser.add_argument("--output", default="bench_negotiations.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    results = []
+    for count in args.rows:
+        print(f"Benchmarking {count} summaries...")
+        result = run_rows(count, args)
+        results.append(result)
+        for mode in ("batched", "unbatched"):
+            stats = result[mode]
+            print(f"  {mode:<10} {stats['rows_per_second']:>9.0f} rows/s in {stats['commits']} commits")
+        for name, stats in result["aggregates"].items():
+            print(f"  {name:<24} p50 {stats['p50_ms']:>8.2f} ms  p99 {stats['p99_ms']:>8.2f} ms")
+
+    report = {
+        "benchmark": "negotiations",
+        "created_at": datetime.now().isoformat(),
+        "params": {"rows": args.rows, "writers": args.writers, "campaigns": args.campaigns,
+                   "repeats": args.repeats, "seed": args.seed},
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
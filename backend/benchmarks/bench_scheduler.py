@@ -0,0 +1,123 @@
+"""Measure the outreach scheduler: time to store jobs and dispatch throughput.
+
+For every job count a fresh ``JobStore`` is created in a temporary
+directory. The jobs are scheduled in batches the way
+``POST /outreach/schedule/email`` does, all due now, and then dispatched by
+a running ``OutreachScheduler`` through a stand-in send that sleeps for
+``--send-ms``. Send windows are left out, so every job is due at once and
+dispatch is bound by the concurrency caps and the store's writes:
+
+    python -m benchmarks.bench_scheduler --jobs 1000,10000 --output scheduler.json
+
+With ``--send-ms 0`` the report shows the scheduler's own overhead per job
+(claim and finish are two SQLite writes each).
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.utils.scheduler import Job, JobStore, OutreachScheduler
+
+
+def summary_ms(timings: List[float]) -> Dict[str, float]:
+    timings = sorted(timings)
+    return {
+        "calls": len(timings),
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000, 3),
+    }
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def run_count(count: int, args) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="bench-scheduler-") as directory:
+        store = JobStore(os.path.join(directory, "jobs.sqlite3"))
+        lateness = []
+        lock = threading.Lock()
+
+        def dispatch(job: Job) -> Dict[str, Any]:
+            if args.send_ms:
+                time.sleep(args.send_ms / 1000)
+            with lock:
+                lateness.append(time.time() - job.run_at)
+            return {"success": True}
+
+        scheduler = OutreachScheduler(
+            store, dispatch, max_concurrent=args.concurrency,
+            channel_limits={"voice": max(1, args.concurrency // 2)}, poll_seconds=1.0,
+        )
+        batches = []
+        start = time.perf_counter()
+        for offset in range(0, count, args.batch_size):
+            jobs = [
+                {"payload": {"to_email": f"creator{i}@example.com"}, "region": "India",
+                 "campaign_id": 1, "idempotency_key": f"bench:{i}"}
+                for i in range(offset, min(count, offset + args.batch_size))
+            ]
+            batch_start = time.perf_counter()
+            scheduler.schedule("voice" if offset // args.batch_size % 4 == 3 else "email", jobs)
+            batches.append(time.perf_counter() - batch_start)
+        schedule_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scheduler.start()
+        while store.counts().get("sent", 0) < count:
+            time.sleep(0.05)
+        dispatch_seconds = time.perf_counter() - start
+        scheduler.stop()
+        store.close()
+
+    return {
+        "jobs": count,
+        "schedule_batch": summary_ms(batches),
+        "schedule_jobs_per_second": round(count / schedule_seconds, 1),
+        "dispatch_seconds": round(dispatch_seconds, 3),
+        "dispatch_jobs_per_second": round(count / dispatch_seconds, 1),
+        "lateness": summary_ms(lateness),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=parse_ints, default=[1000], help="Comma-separated job counts")
+    parser.add_argument("--batch-size", type=int, default=100, help="Jobs per schedule call")
+    parser.add_argument("--concurrency", type=int, default=4, help="Most jobs sent at once (half of it for voice)")
+    parser.add_argument("--send-ms", type=float, default=0.0, help="Time the stand-in send takes")
+    parser.add_argument("--output", default="bench_scheduler.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    results = []
+    for count in args.jobs:
+        print(f"Benchmarking {count} jobs...")
+        result = run_count(count, args)
+        results.append(result)
+        stats = result["schedule_batch"]
+        print(f"  schedule   p50 {stats['p50_ms']:>8.3f} ms per batch  ({result['schedule_jobs_per_second']:.0f} jobs/s)")
+        print(f"  dispatch   {result['dispatch_seconds']:.2f} s  ({result['dispatch_jobs_per_second']:.0f} jobs/s)")
+
+    report = {
+        "benchmark": "scheduler",
+        "created_at": datetime.now().isoformat(),
+        "params": {"jobs": args.jobs, "batch_size": args.batch_size, "concurrency": args.concurrency,
+                   "send_ms": args.send_ms},
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""Measure how index builds and vector search scale with roster size.
+
+For every roster size a seeded synthetic roster is loaded into the influencer
+store, a fresh index is built through ``initialize_vector_db`` and a seeded set
+of queries is run through ``run_search`` (the search endpoint minus the
+response cache), first one at a time and then from concurrent threads. Build
+time (with a per-stage breakdown from the build trace), resident memory, query
+latency percentiles and QPS are written to a JSON report. Pass an earlier
+report as ``--baseline`` to flag regressions; the exit status is 1 if any
+metric got worse by more than ``--tolerance``.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_search --sizes 10000,100000 --output search.json
+    python -m benchmarks.bench_search --sizes 10000 --baseline search.json
+
+Encoding dominates build time with the real embedding model; 1M creators take
+hours on a CPU. Set ``EMBEDDING_ENCODER=hashing`` to benchmark the stages
+around the model with the deterministic hashing encoder instead.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.endpoints import influencers as search_module
+from app.utils.encoders import load_encoder
+from app.utils.index_versions import IndexRegistry
+from app.utils.influencer_store import InfluencerStore
+from app.utils.lexical import LexicalIndex
+from app.utils.tracing import start_trace
+from benchmarks.roster import CATEGORIES, REGIONS, generate_roster
+
+# Metrics compared against a baseline report, and whether higher values are better
+COMPARED_METRICS = {
+    "build_seconds": False,
+    "query_p50_ms": False,
+    "query_p99_ms": False,
+    "qps": True,
+}
+
+
+def rss_mb() -> float:
+    """Current resident set size in MiB (peak RSS where /proc isn't available)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(timings: List[float]) -> Dict[str, float]:
+    ordered = sorted(timings)
+    return {
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+def make_queries(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Seeded search queries; a third restrict the search to a category or region"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        category = rng.choice(list(CATEGORIES))
+        region = rng.choice(list(REGIONS))
+        topic = rng.choice(CATEGORIES[category])
+        query = {"q": f"{topic} {category} influencers in {region}", "top_k": rng.choice((2, 5, 10))}
+        kind = rng.random()
+        if kind < 1 / 6:
+            query["category"] = category
+        elif kind < 1 / 3:
+            query["region"] = region
+        queries.append(query)
+    return queries
+
+
+def timed_search(query: Dict[str, Any]) -> float:
+    start = time.perf_counter()
+    search_module.run_search(**query)
+    return time.perf_counter() - start
+
+
+def build_index(roster: List[Dict[str, Any]], prefix: str) -> Tuple[float, Dict[str, float]]:
+    """Swap a synthetic roster and an empty registry into the search module and build its index
+
+    Returns:
+        Build time in seconds and the time spent per build stage
+    """
+    search_module.influencer_store = InfluencerStore(roster)
+    search_module.lexical_index = LexicalIndex(roster)
+    registry = IndexRegistry(search_module.chroma_client, model_loader=load_encoder, prefix=prefix)
+    registry.register_model(search_module.model_name, search_module.model)
+    search_module.index_registry = registry
+
+    with start_trace("initialize_vector_db") as trace:
+        search_module._initialize_vector_db()
+    stages: Dict[str, float] = {}
+    for _, stage in trace.walk():
+        stages[stage.name] = stages.get(stage.name, 0.0) + stage.duration_ms / 1000
+    return trace.duration_ms / 1000, {name: round(seconds, 3) for name, seconds in stages.items()}
+
+
+def run_size(size: int, args) -> Dict[str, Any]:
+    rss_start = rss_mb()
+    roster = generate_roster(size, seed=args.seed)
+    build_seconds, stages = build_index(roster, prefix=f"bench{size}")
+    gc.collect()
+    rss_built = rss_mb()
+
+    queries = make_queries(args.queries, seed=args.seed)
+    for query in queries[:args.warmup]:
+        search_module.run_search(**query)
+    latency = latency_summary([timed_search(query) for query in queries])
+
+    concurrency = []
+    for threads in args.concurrency:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            start = time.perf_counter()
+            timings = list(pool.map(timed_search, queries))
+            elapsed = time.perf_counter() - start
+        concurrency.append({"threads": threads, "qps": round(len(queries) / elapsed, 1), **latency_summary(timings)})
+
+    result = {
+        "size": size,
+        "build_seconds": round(build_seconds, 3),
+        "build_stages_seconds": stages,
+        "memory_mb": {
+            "before": round(rss_start, 1),
+            "after_build": round(rss_built, 1),
+            "roster_and_index": round(rss_built - rss_start, 1),
+            "peak": round(peak_rss_mb(), 1),
+        },
+        "query": latency,
+        "concurrency": concurrency,
+    }
+
+    # Free the synthetic index before the next size
+    active = search_module.index_registry.active
+    if active is not None:
+        search_module.chroma_client.delete_collection(active.collection.name)
+    return result
+
+
+def headline(result: Dict[str, Any]) -> Dict[str, float]:
+    """The metrics of one size that are compared between reports"""
+    return {
+        "build_seconds": result["build_seconds"],
+        "query_p50_ms": result["query"]["p50_ms"],
+        "query_p99_ms": result["query"]["p99_ms"],
+        "qps": max((run["qps"] for run in result["concurrency"]), default=0.0),
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[str]:
+    """Print the change of every compared metric and return the regressions"""
+    baseline_by_size = {result["size"]: result for result in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        previous = baseline_by_size.get(result["size"])
+        if previous is None:
+            continue
+        old, new = headline(previous), headline(result)
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if not old[metric]:
+                continue
+            change = (new[metric] - old[metric]) / old[metric]
+            worse = -change if higher_is_better else change
+            flag = "REGRESSION" if worse > tolerance else ""
+            print(f"  {result['size']:>9} {metric:<14} {old[metric]:>12.3f} -> {new[metric]:>12.3f}  {change:+7.1%}  {flag}")
+            if flag:
+                regressions.append(f"{metric} at {result['size']} creators: {old[metric]} -> {new[metric]}")
+    return regressions
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "model": search_module.model_name,
+        "git_commit": commit,
+    }
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_ints, default=[10_000], help="Comma-separated roster sizes")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per measurement")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed queries before measuring")
+    parser.add_argument("--concurrency", type=parse_ints, default=[1, 4, 16], help="Comma-separated thread counts")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the roster and the queries")
+    parser.add_argument("--output", default="bench_search.json", help="Where to write the JSON report")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression before failing")
+    args = parser.parse_args(argv)
+
+    # Per-search INFO lines would dominate the measurement
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    original = (search_module.influencer_store, search_module.lexical_index, search_module.index_registry)
+    results = []
+    try:
+        for size in args.sizes:
+            print(f"Benchmarking {size} creators...")
+            result = run_size(size, args)
+            results.append(result)
+            print(
+                f"  build {result['build_seconds']:.2f} s, +{result['memory_mb']['roster_and_index']:.0f} MiB, "
+                f"p50 {result['query']['p50_ms']:.2f} ms, p99 {result['query']['p99_ms']:.2f} ms, "
+                + ", ".join(f"{run['qps']:.0f} QPS @ {run['threads']}" for run in result["concurrency"])
+            )
+    finally:
+        search_module.influencer_store, search_module.lexical_index, search_module.index_registry = original
+
+    report = {
+        "benchmark": "search",
+        "created_at": datetime.now().isoformat(),
+        "environment": environment(),
+        "params": {
+            "sizes": args.sizes,
+            "queries": args.queries,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        print(f"Compared with {args.baseline} (tolerance {args.tolerance:.0%}):")
+        regressions = compare_reports(baseline, report, args.tolerance)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
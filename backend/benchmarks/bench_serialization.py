@@ -0,0 +1,78 @@
+"""Compare serialization time for large influencer responses.
+
+"before" reproduces FastAPI's default path for ``response_model=List[Dict[str, Any]]``:
+validate the returned list against the response model, run ``jsonable_encoder``
+over it and render it with the stdlib-backed ``JSONResponse``. "after" is the
+orjson path the influencer and outreach routers use now.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_serialization --rows 10000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.utils.responses import ORJSONResponse
+from benchmarks.roster import iter_roster
+
+
+def make_rows(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Build search-result-shaped rows"""
+    rng = random.Random(seed)
+    return [{**record, "similarity_score": rng.random()} for record in iter_roster(count, seed)]
+
+
+def serialize_default(rows: List[Dict[str, Any]], adapter: TypeAdapter) -> bytes:
+    """FastAPI's default response_model path"""
+    validated = adapter.validate_python(rows)
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def serialize_orjson(rows: List[Dict[str, Any]]) -> bytes:
+    """Returning an ORJSONResponse directly"""
+    return ORJSONResponse(rows).body
+
+
+def measure(fn, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions per variant")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    adapter = TypeAdapter(List[Dict[str, Any]])
+
+    # Both paths must produce the same document
+    assert json.loads(serialize_default(rows, adapter)) == json.loads(serialize_orjson(rows))
+
+    results = {
+        "before (response_model + jsonable_encoder + json)": measure(lambda: serialize_default(rows, adapter), args.repeat),
+        "after (ORJSONResponse)": measure(lambda: serialize_orjson(rows), args.repeat),
+    }
+
+    print(f"Serializing {args.rows} rows, {args.repeat} repetitions")
+    for name, timings in results.items():
+        print(f"  {name:<52} median {statistics.median(timings) * 1000:8.2f} ms   min {min(timings) * 1000:8.2f} ms")
+    before, after = (statistics.median(t) for t in results.values())
+    print(f"  speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
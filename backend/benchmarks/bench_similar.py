@@ -0,0 +1,122 @@
+"""Measure the similar-influencer graph: build time, update cost and lookup latency.
+
+For every roster size a ``RosterMatrix`` is filled with hashing-encoder
+embeddings of a seeded synthetic roster and a ``KnnGraph`` is built over it
+in blocks. Then seeded influencers are looked up in the graph and, for
+comparison, by brute force against the matrix, and fresh records are
+upserted into the graph one at a time:
+
+    python -m benchmarks.bench_similar --sizes 10000,50000 --output similar.json
+
+The build is quadratic in the roster size, so it runs in the background in
+the server; ``--block-mb`` bounds the similarity scratch memory it uses.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.utils.encoders import HashingEncoder
+from app.utils.knn_graph import KnnGraph, nearest
+from app.utils.matching import RosterMatrix
+from benchmarks.roster import generate_roster, iter_roster
+
+
+def summary_us(timings: List[float]) -> Dict[str, float]:
+    timings = sorted(timings)
+    return {
+        "calls": len(timings),
+        "mean_us": round(statistics.mean(timings) * 1e6, 1),
+        "p50_us": round(timings[len(timings) // 2] * 1e6, 1),
+        "p99_us": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1e6, 1),
+    }
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def run_size(size: int, args, encoder: HashingEncoder) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    roster = generate_roster(size, seed=args.seed)
+    matrix = RosterMatrix(encoder.dimension, capacity=size + args.updates)
+    matrix.upsert(roster, encoder.encode([record["description"] for record in roster]))
+    ids, embeddings, _ = matrix.snapshot()
+
+    graph = KnnGraph(k=args.k, max_block_bytes=args.block_mb * 1024 * 1024)
+    tracemalloc.start()
+    start = time.perf_counter()
+    graph.build(ids, embeddings)
+    build_seconds = time.perf_counter() - start
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    targets = [rng.choice(roster)["id"] for _ in range(args.lookups)]
+    graph_timings, exact_timings = [], []
+    for record_id in targets:
+        start = time.perf_counter()
+        graph.neighbours(record_id)
+        graph_timings.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        nearest(matrix, record_id, args.k)
+        exact_timings.append(time.perf_counter() - start)
+
+    update_timings = []
+    for record in iter_roster(args.updates, seed=args.seed + 1, start_id=size + 1):
+        matrix.upsert([record], encoder.encode([record["description"]]))
+        start = time.perf_counter()
+        graph.update(matrix, [record["id"]])
+        update_timings.append(time.perf_counter() - start)
+
+    return {
+        "size": size,
+        "build_seconds": round(build_seconds, 3),
+        "build_peak_mb": round(peak_bytes / 1024 / 1024, 1),
+        "graph_lookup": summary_us(graph_timings),
+        "exact_lookup": summary_us(exact_timings),
+        "update": summary_us(update_timings),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_ints, default=[10_000], help="Comma-separated roster sizes")
+    parser.add_argument("--k", type=int, default=20, help="Neighbours per influencer")
+    parser.add_argument("--block-mb", type=int, default=64, help="Similarity scratch memory per build block")
+    parser.add_argument("--lookups", type=int, default=500, help="Lookups timed per size")
+    parser.add_argument("--updates", type=int, default=200, help="Single-record graph updates to time")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the roster and the lookups")
+    parser.add_argument("--output", default="bench_similar.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    encoder = HashingEncoder()
+    results = []
+    for size in args.sizes:
+        print(f"Benchmarking {size} creators...")
+        result = run_size(size, args, encoder)
+        results.append(result)
+        print(f"  build {result['build_seconds']:.2f} s, peak {result['build_peak_mb']:.1f} MB traced")
+        for name in ("graph_lookup", "exact_lookup", "update"):
+            stats = result[name]
+            print(f"  {name:<13} p50 {stats['p50_us']:>10.1f} us  p99 {stats['p99_us']:>10.1f} us")
+
+    report = {
+        "benchmark": "similar",
+        "created_at": datetime.now().isoformat(),
+        "params": {"sizes": args.sizes, "k": args.k, "block_mb": args.block_mb, "lookups": args.lookups,
+                   "updates": args.updates, "seed": args.seed},
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
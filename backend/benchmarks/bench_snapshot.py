@@ -0,0 +1,126 @@
+"""Measure index snapshots: export time and size, cold start from a snapshot vs. encoding, and recall.
+
+For every roster size a seeded synthetic roster is indexed as in
+``benchmarks.bench_search`` (the encoding cold start). Snapshots of that
+index are then exported in every storage type the way
+``GET /influencers/index/snapshot`` streams them, and a fresh index is
+started from each one the way a node started with ``INDEX_SNAPSHOT_PATH``
+does. Recall@k compares vector search results on the restored index with
+those on the original:
+
+    python -m benchmarks.bench_snapshot --sizes 10000,100000 --output snapshot.json
+
+With ``EMBEDDING_ENCODER=hashing`` encoding is cheap, so the gap to the
+snapshot cold start understates what it is with the sentence transformer.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.endpoints import influencers as search_module
+from app.utils.encoders import load_encoder
+from app.utils.index_versions import IndexRegistry
+from app.utils.snapshots import SNAPSHOT_DTYPES
+from benchmarks.bench_search import build_index, environment, make_queries, parse_ints
+from benchmarks.roster import generate_roster
+
+
+def search_ids(queries: List[Dict[str, Any]], top_k: int) -> List[List[int]]:
+    return [[result["id"] for result in search_module.run_search(**{**query, "top_k": top_k}, mode="vector")]
+            for query in queries]
+
+
+def run_size(size: int, args, directory: str) -> Dict[str, Any]:
+    roster = generate_roster(size, seed=args.seed)
+    encode_seconds, _ = build_index(roster, prefix=f"snapsrc{size}")
+    source = search_module.index_registry
+    queries = make_queries(args.queries, seed=args.seed)
+    expected = search_ids(queries, args.top_k)
+
+    snapshots = []
+    for dtype in args.dtypes:
+        path = os.path.join(directory, f"{size}-{dtype}.snapshot")
+        search_module.index_registry = source
+        start = time.perf_counter()
+        with open(path, "wb") as snapshot_file:
+            for chunk in search_module.export_snapshot(dtype):
+                snapshot_file.write(chunk)
+        export_seconds = time.perf_counter() - start
+
+        registry = IndexRegistry(search_module.chroma_client, model_loader=load_encoder, prefix=f"snap{dtype}{size}")
+        registry.register_model(search_module.model_name, search_module.model)
+        search_module.index_registry = registry
+        search_module.INDEX_SNAPSHOT_PATH = path
+        start = time.perf_counter()
+        search_module._initialize_vector_db()
+        restore_seconds = time.perf_counter() - start
+        search_module.INDEX_SNAPSHOT_PATH = ""
+
+        restored = search_ids(queries, args.top_k)
+        recall = sum(len(set(got) & set(want)) for got, want in zip(restored, expected)) / sum(len(want) for want in expected)
+        search_module.chroma_client.delete_collection(registry.active.collection.name)
+        snapshots.append({
+            "dtype": dtype,
+            "size_mb": round(os.path.getsize(path) / 2**20, 2),
+            "export_seconds": round(export_seconds, 3),
+            "cold_start_seconds": round(restore_seconds, 3),
+            f"recall_at_{args.top_k}": round(recall, 4),
+        })
+        os.remove(path)
+
+    search_module.chroma_client.delete_collection(source.active.collection.name)
+    return {"size": size, "encode_cold_start_seconds": round(encode_seconds, 3), "snapshots": snapshots}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_ints, default=[10_000], help="Comma-separated roster sizes")
+    parser.add_argument("--dtypes", default=",".join(SNAPSHOT_DTYPES), type=lambda value: value.split(","),
+                        help="Comma-separated snapshot storage types")
+    parser.add_argument("--queries", type=int, default=100, help="Queries compared for recall")
+    parser.add_argument("--top-k", type=int, default=10, help="Results per query")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the roster and the queries")
+    parser.add_argument("--output", default="bench_snapshot.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    # Per-search INFO lines would dominate the measurement
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    original = (search_module.influencer_store, search_module.lexical_index, search_module.index_registry)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-snapshot-") as directory:
+            for size in args.sizes:
+                print(f"Benchmarking {size} creators...")
+                result = run_size(size, args, directory)
+                results.append(result)
+                print(f"  encode     cold start {result['encode_cold_start_seconds']:>7.2f} s")
+                for snapshot in result["snapshots"]:
+                    print(f"  {snapshot['dtype']:<10} cold start {snapshot['cold_start_seconds']:>7.2f} s"
+                          f"  export {snapshot['export_seconds']:>6.2f} s  {snapshot['size_mb']:>8.1f} MB"
+                          f"  recall@{args.top_k} {snapshot[f'recall_at_{args.top_k}']:.3f}")
+    finally:
+        search_module.influencer_store, search_module.lexical_index, search_module.index_registry = original
+
+    report = {
+        "benchmark": "snapshot",
+        "created_at": datetime.now().isoformat(),
+        "environment": environment(),
+        "params": {"sizes": args.sizes, "dtypes": args.dtypes, "queries": args.queries,
+                   "top_k": args.top_k, "seed": args.seed},
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
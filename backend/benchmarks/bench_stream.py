@@ -0,0 +1,107 @@
+"""Measure how soon a streamed search shows its first hits.
+
+For every roster size a seeded synthetic roster is indexed as in
+``benchmarks.bench_search``, then seeded queries are run through
+``search_stages`` the way ``GET /influencers/search/stream`` does. For each
+query the time until the ``vector`` stage (what a streaming client renders
+first) and until the final ``results`` stage are recorded, next to the
+latency of the non-streaming ``run_search``:
+
+    python -m benchmarks.bench_stream --sizes 10000,100000 --output stream.json
+
+Set ``EMBEDDING_ENCODER=hashing`` to leave the embedding model out of the
+measurement; with a real model encoding is part of both times.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.endpoints import influencers as search_module
+from benchmarks.bench_search import build_index, environment, latency_summary, make_queries, parse_ints
+from benchmarks.roster import generate_roster
+
+
+def time_stages(query: Dict[str, Any]) -> Dict[str, float]:
+    """Seconds from the start of a streamed search until each of its stages"""
+    timings = {}
+    start = time.perf_counter()
+    for stage, _ in search_module.search_stages(**query):
+        timings[stage] = time.perf_counter() - start
+    return timings
+
+
+def run_size(size: int, args) -> Dict[str, Any]:
+    roster = generate_roster(size, seed=args.seed)
+    build_index(roster, prefix=f"stream{size}")
+
+    queries = [{**query, "top_k": args.top_k, "mode": args.mode} for query in make_queries(args.queries, seed=args.seed)]
+    for query in queries[:args.warmup]:
+        time_stages(query)
+
+    first, final, blocking = [], [], []
+    for query in queries:
+        timings = time_stages(query)
+        first.append(timings.get("vector", timings["results"]))
+        final.append(timings["results"])
+        start = time.perf_counter()
+        search_module.run_search(**query)
+        blocking.append(time.perf_counter() - start)
+
+    active = search_module.index_registry.active
+    if active is not None:
+        search_module.chroma_client.delete_collection(active.collection.name)
+    return {
+        "size": size,
+        "first_event": latency_summary(first),
+        "final_event": latency_summary(final),
+        "run_search": latency_summary(blocking),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_ints, default=[10_000], help="Comma-separated roster sizes")
+    parser.add_argument("--queries", type=int, default=200, help="Queries timed per size")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed queries before measuring")
+    parser.add_argument("--top-k", type=int, default=10, help="Results per query")
+    parser.add_argument("--mode", default="hybrid", choices=("hybrid", "vector"), help="Search mode")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the roster and the queries")
+    parser.add_argument("--output", default="bench_stream.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    # Per-search INFO lines would dominate the measurement
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    original = (search_module.influencer_store, search_module.lexical_index, search_module.index_registry)
+    results = []
+    try:
+        for size in args.sizes:
+            print(f"Benchmarking {size} creators...")
+            result = run_size(size, args)
+            results.append(result)
+            for name in ("first_event", "final_event", "run_search"):
+                stats = result[name]
+                print(f"  {name:<12} p50 {stats['p50_ms']:>8.2f} ms  p99 {stats['p99_ms']:>8.2f} ms")
+    finally:
+        search_module.influencer_store, search_module.lexical_index, search_module.index_registry = original
+
+    report = {
+        "benchmark": "stream_search",
+        "created_at": datetime.now().isoformat(),
+        "environment": environment(),
+        "params": {"sizes": args.sizes, "queries": args.queries, "warmup": args.warmup,
+                   "top_k": args.top_k, "mode": args.mode, "seed": args.seed},
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
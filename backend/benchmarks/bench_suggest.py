@@ -0,0 +1,113 @@
+"""Measure per-keystroke latency of the autocomplete index.
+
+For every roster size a ``SuggestIndex`` is built over a seeded synthetic
+roster, then seeded creator names, categories and regions are "typed" one
+keystroke at a time, both correctly and with a typo, and every prefix is
+timed. Build time and single-record upsert and delete times are reported too:
+
+    python -m benchmarks.bench_suggest --sizes 10000,100000 --output suggest.json
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.utils.suggest import SuggestIndex
+from benchmarks.roster import CATEGORIES, REGIONS, generate_roster, iter_roster
+
+
+def add_typo(rng: random.Random, text: str) -> str:
+    """Swap two adjacent letters after the first one"""
+    if len(text) < 4:
+        return text
+    position = rng.randrange(1, len(text) - 2)
+    return text[:position] + text[position + 1] + text[position] + text[position + 2:]
+
+
+def keystrokes(texts: List[str]) -> List[str]:
+    """Every prefix of every text, as typed one character at a time"""
+    return [text[:end] for text in texts for end in range(1, len(text) + 1)]
+
+
+def time_calls(call, arguments) -> Dict[str, float]:
+    """Call once per argument and summarize the latencies in microseconds"""
+    timings = []
+    for argument in arguments:
+        start = time.perf_counter()
+        call(argument)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return {
+        "calls": len(timings),
+        "mean_us": round(statistics.mean(timings), 1),
+        "p50_us": round(timings[len(timings) // 2], 1),
+        "p99_us": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 1),
+        "max_us": round(timings[-1], 1),
+    }
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def run_size(size: int, args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    roster = generate_roster(size, seed=args.seed)
+    start = time.perf_counter()
+    index = SuggestIndex(roster)
+    build_seconds = time.perf_counter() - start
+
+    targets = [rng.choice(roster)["name"] for _ in range(args.texts)]
+    targets += [rng.choice(list(CATEGORIES)) for _ in range(args.texts // 4)]
+    targets += [rng.choice(list(REGIONS)) for _ in range(args.texts // 4)]
+    typos = [add_typo(rng, text) for text in targets]
+
+    new_records = list(iter_roster(args.updates, seed=args.seed + 1, start_id=size + 1))
+    return {
+        "size": size,
+        "build_seconds": round(build_seconds, 3),
+        "suggestions": len(index),
+        "keystroke": time_calls(index.suggest, keystrokes(targets)),
+        "keystroke_with_typo": time_calls(index.suggest, keystrokes(typos)),
+        "upsert": time_calls(lambda record: index.upsert([record]), new_records),
+        "delete": time_calls(lambda record: index.delete([record["id"]]), new_records),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_ints, default=[10_000], help="Comma-separated roster sizes")
+    parser.add_argument("--texts", type=int, default=200, help="Creator names typed per size")
+    parser.add_argument("--updates", type=int, default=500, help="Single-record upserts and deletes to time")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the roster and the typed texts")
+    parser.add_argument("--output", default="bench_suggest.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        print(f"Benchmarking {size} creators...")
+        result = run_size(size, args)
+        results.append(result)
+        print(f"  build {result['build_seconds']:.2f} s, {result['suggestions']} suggestions")
+        for name in ("keystroke", "keystroke_with_typo", "upsert", "delete"):
+            stats = result[name]
+            print(f"  {name:<20} p50 {stats['p50_us']:>8.1f} us  p99 {stats['p99_us']:>8.1f} us  max {stats['max_us']:>8.1f} us")
+
+    report = {
+        "benchmark": "suggest",
+        "created_at": datetime.now().isoformat(),
+        "params": {"sizes": args.sizes, "texts": args.texts, "updates": args.updates, "seed": args.seed},
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+"""Local stand-ins for SendGrid, SMTP and the ElevenLabs Twilio outbound-call API.
+
+Each fake accepts the requests the outreach endpoints send and answers with a
+configurable latency, error rate and rate limit, so outreach can be load
+tested offline. A behaviour spec is a comma-separated list of
+``latency`` (ms), ``jitter`` (ms), ``error`` (fraction of requests failed) and
+``rate`` (requests per second before rate-limit responses; 0 = unlimited).
+
+Run from the backend directory:
+
+    python -m benchmarks.fake_providers --sendgrid latency=120,error=0.05 --smtp latency=40 --elevenlabs latency=300,rate=20
+
+then start the API with the environment printed on startup.
+"""
+import argparse
+import asyncio
+import base64
+import random
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+class FaultProfile:
+    """Latency, error and rate-limit behaviour of a fake provider"""
+
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: float = 0.0, seed: Optional[int] = None):
+        """Initialize the profile
+
+        Args:
+            latency_ms: Base response latency in milliseconds
+            jitter_ms: Uniform random latency added on top of the base
+            error_rate: Fraction of requests answered with a server error
+            rate_limit: Requests accepted per second before rate limiting (0 = unlimited)
+            seed: Random seed for reproducible error injection
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = 0
+        self._window_count = 0
+        self.stats = {"requests": 0, "ok": 0, "error": 0, "rate_limited": 0, "rejected": 0}
+
+    @classmethod
+    def parse(cls, spec: str, seed: Optional[int] = None) -> "FaultProfile":
+        """Build a profile from a spec like ``latency=80,jitter=20,error=0.05,rate=50``"""
+        names = {"latency": "latency_ms", "jitter": "jitter_ms", "error": "error_rate", "rate": "rate_limit"}
+        kwargs = {}
+        for part in filter(None, (part.strip() for part in spec.split(","))):
+            key, _, value = part.partition("=")
+            if key not in names:
+                raise ValueError(f"Unknown setting {key}; expected one of {', '.join(names)}")
+            kwargs[names[key]] = float(value)
+        return cls(seed=seed, **kwargs)
+
+    def delay(self) -> float:
+        """Seconds to wait before answering a request"""
+        return (self.latency_ms + self._rng.uniform(0, self.jitter_ms)) / 1000
+
+    def decide(self) -> str:
+        """Pick the outcome of the next request: "ok", "error" or "rate_limited" """
+        with self._lock:
+            self.stats["requests"] += 1
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window, self._window_count = window, 0
+            self._window_count += 1
+            if self.rate_limit and self._window_count > self.rate_limit:
+                outcome = "rate_limited"
+            elif self._rng.random() < self.error_rate:
+                outcome = "error"
+            else:
+                outcome = "ok"
+            self.stats[outcome] += 1
+        return outcome
+
+    def reject(self):
+        """Count a request refused for being malformed or unauthenticated"""
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["rejected"] += 1
+
+
+def sendgrid_app(profile: FaultProfile) -> Starlette:
+    """Fake of SendGrid's v3 mail send API"""
+
+    async def mail_send(request: Request):
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if not request.headers.get("authorization", "").startswith("Bearer "):
+            profile.reject()
+            return JSONResponse({"errors": [{"message": "authorization required", "field": None}]}, status_code=401)
+        if not isinstance(body, dict) or not all(key in body for key in ("personalizations", "from", "subject")):
+            profile.reject()
+            return JSONResponse({"errors": [{"message": "invalid mail send request", "field": None}]}, status_code=400)
+
+        outcome = profile.decide()
+        if outcome == "rate_limited":
+            return JSONResponse(
+                {"errors": [{"message": "too many requests", "field": None}]}, status_code=429,
+                headers={"X-RateLimit-Limit": str(int(profile.rate_limit)), "X-RateLimit-Remaining": "0",
+                         "X-RateLimit-Reset": str(int(time.time()) + 1)}
+            )
+        await asyncio.sleep(profile.delay())
+        if outcome == "error":
+            return JSONResponse({"errors": [{"message": "simulated internal error", "field": None}]}, status_code=500)
+        return Response(status_code=202, headers={"X-Message-Id": uuid.uuid4().hex})
+
+    async def stats(request: Request):
+        return JSONResponse(profile.stats)
+
+    return Starlette(routes=[Route("/v3/mail/send", mail_send, methods=["POST"]), Route("/stats", stats)])
+
+
+def elevenlabs_app(profile: FaultProfile) -> Starlette:
+    """Fake of ElevenLabs' Twilio outbound-call API"""
+
+    async def outbound_call(request: Request):
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if not request.headers.get("xi-api-key"):
+            profile.reject()
+            return JSONResponse({"detail": {"status": "invalid_api_key", "message": "Invalid API key"}}, status_code=401)
+        if not isinstance(body, dict) or not all(key in body for key in ("agent_id", "agent_phone_number_id", "to_number")):
+            profile.reject()
+            return JSONResponse({"detail": [{"msg": "Field required", "type": "missing"}]}, status_code=422)
+
+        outcome = profile.decide()
+        if outcome == "rate_limited":
+            return JSONResponse(
+                {"detail": {"status": "too_many_concurrent_requests", "message": "Too many concurrent requests"}},
+                status_code=429
+            )
+        await asyncio.sleep(profile.delay())
+        if outcome == "error":
+            return JSONResponse({"detail": {"status": "internal_error", "message": "Simulated failure"}}, status_code=500)
+        return JSONResponse({
+            "success": True,
+            "message": "Success",
+            "conversation_id": f"conv_{uuid.uuid4().hex[:24]}",
+            "callSid": f"CA{uuid.uuid4().hex}",
+        })
+
+    async def stats(request: Request):
+        return JSONResponse(profile.stats)
+
+    return Starlette(routes=[Route("/v1/convai/twilio/outbound-call", outbound_call, methods=["POST"]), Route("/stats", stats)])
+
+
+class FakeSMTPServer:
+    """Minimal ESMTP server accepting AUTH PLAIN/LOGIN without TLS"""
+
+    def __init__(self, profile: FaultProfile, hostname: str = "fake-smtp"):
+        self.profile = profile
+        self.hostname = hostname
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def reply(line: str):
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        async def read_line() -> str:
+            return (await reader.readline()).decode("utf-8", "replace").rstrip("\r\n")
+
+        await reply(f"220 {self.hostname} ESMTP ready")
+        try:
+            while True:
+                line = await read_line()
+                if not line and reader.at_eof():
+                    break
+                verb, _, argument = line.partition(" ")
+                verb = verb.upper()
+                if verb == "EHLO":
+                    await reply(f"250-{self.hostname}\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME")
+                elif verb == "HELO":
+                    await reply(f"250 {self.hostname}")
+                elif verb == "AUTH":
+                    mechanism, _, initial = argument.partition(" ")
+                    if mechanism.upper() == "PLAIN" and not initial:
+                        await reply("334 ")
+                        await read_line()
+                    elif mechanism.upper() == "LOGIN":
+                        await reply("334 " + base64.b64encode(b"Username:").decode())
+                        await read_line()
+                        await reply("334 " + base64.b64encode(b"Password:").decode())
+                        await read_line()
+                    await reply("235 2.7.0 Authentication successful")
+                elif verb == "MAIL":
+                    outcome = self.profile.decide()
+                    if outcome == "rate_limited":
+                        await reply("421 4.7.0 Too many messages, try again later")
+                        break
+                    if outcome == "error":
+                        await asyncio.sleep(self.profile.delay())
+                        await reply("451 4.3.0 Simulated temporary failure")
+                        continue
+                    await reply("250 2.1.0 OK")
+                elif verb == "RCPT":
+                    await reply("250 2.1.5 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    while (await reader.readline()) not in (b".\r\n", b".\n", b""):
+                        pass
+                    await asyncio.sleep(self.profile.delay())
+                    await reply("250 2.0.0 Queued")
+                elif verb in ("RSET", "NOOP"):
+                    await reply("250 2.0.0 OK")
+                elif verb == "QUIT":
+                    await reply("221 2.0.0 Bye")
+                    break
+                else:
+                    await reply("502 5.5.2 Command not recognized")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class FakeProviders:
+    """Runs the three fakes on one event loop in a background thread"""
+
+    def __init__(self, sendgrid: FaultProfile, smtp: FaultProfile, elevenlabs: FaultProfile, host: str = "127.0.0.1",
+                 sendgrid_port: int = 0, smtp_port: int = 0, elevenlabs_port: int = 0):
+        self.profiles = {"sendgrid": sendgrid, "smtp": smtp, "elevenlabs": elevenlabs}
+        self.host = host
+        self.ports = {
+            "sendgrid": sendgrid_port or free_port(host),
+            "smtp": smtp_port or free_port(host),
+            "elevenlabs": elevenlabs_port or free_port(host),
+        }
+        self._servers = [
+            uvicorn.Server(uvicorn.Config(app, host=host, port=self.ports[name], log_level="warning", access_log=False))
+            for name, app in (("sendgrid", sendgrid_app(sendgrid)), ("elevenlabs", elevenlabs_app(elevenlabs)))
+        ]
+        self._smtp = FakeSMTPServer(smtp)
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    async def serve(self):
+        smtp_server = await asyncio.start_server(self._smtp.handle, self.host, self.ports["smtp"])
+        for server in self._servers:
+            # The driver installs its own signal handling; don't let uvicorn take it over
+            server.install_signal_handlers = lambda: None
+        tasks = [asyncio.create_task(server.serve()) for server in self._servers]
+        while not all(server.started for server in self._servers):
+            await asyncio.sleep(0.01)
+        self._ready.set()
+        async with smtp_server:
+            await asyncio.gather(*tasks)
+
+    def start(self, timeout: float = 10.0):
+        """Start serving in a daemon thread and wait until every fake is listening"""
+        self._thread = threading.Thread(target=asyncio.run, args=(self.serve(),), name="fake-providers", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("Fake providers did not start in time")
+
+    def stop(self):
+        for server in self._servers:
+            server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables pointing the API's outreach providers at the fakes"""
+        return {
+            "SENDGRID_API_KEY": "SG.loadtest." + "x" * 48,
+            "SENDGRID_API_HOST": f"http://{self.host}:{self.ports['sendgrid']}",
+            "DEFAULT_SENDER_EMAIL": "loadtest@brandsync.local",
+            "USE_MOCK_EMAIL": "false",
+            "FALLBACK_TO_SMTP": "true",
+            "SMTP_SERVER": self.host,
+            "SMTP_PORT": str(self.ports["smtp"]),
+            "SMTP_USERNAME": "loadtest",
+            "SMTP_PASSWORD": "loadtest",
+            "SMTP_STARTTLS": "false",
+            "ELEVENLABS_API_BASE": f"http://{self.host}:{self.ports['elevenlabs']}",
+            "ELEVENLABS_API_KEY": "loadtest",
+            "ELEVENLABS_AGENT_ID": "agent_loadtest",
+            "ELEVENLABS_PHONE_NUMBER_ID": "phnum_loadtest",
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: dict(profile.stats) for name, profile in self.profiles.items()}
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--sendgrid", default="latency=100,jitter=50", help="SendGrid behaviour spec")
+    parser.add_argument("--smtp", default="latency=50,jitter=20", help="SMTP behaviour spec")
+    parser.add_argument("--elevenlabs", default="latency=250,jitter=100", help="ElevenLabs behaviour spec")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for error injection")
+
+
+def profiles_from_args(args) -> Dict[str, FaultProfile]:
+    return {
+        "sendgrid": FaultProfile.parse(args.sendgrid, seed=args.seed),
+        "smtp": FaultProfile.parse(args.smtp, seed=args.seed + 1),
+        "elevenlabs": FaultProfile.parse(args.elevenlabs, seed=args.seed + 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_profile_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--sendgrid-port", type=int, default=8101)
+    parser.add_argument("--smtp-port", type=int, default=8102)
+    parser.add_argument("--elevenlabs-port", type=int, default=8103)
+    args = parser.parse_args()
+
+    fakes = FakeProviders(
+        **profiles_from_args(args), host=args.host,
+        sendgrid_port=args.sendgrid_port, smtp_port=args.smtp_port, elevenlabs_port=args.elevenlabs_port
+    )
+    fakes.start()
+    print("Fake providers listening. Start the API with:\n")
+    print("  " + " ".join(f"{key}={value}" for key, value in fakes.env().items()) + " python server.py\n")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fakes.stop()
+        for name, stats in fakes.stats().items():
+            print(f"{name}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
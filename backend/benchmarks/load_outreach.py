@@ -0,0 +1,277 @@
+"""Drive the outreach endpoints at a target request rate.
+
+Requests to ``/outreach/email``, ``/outreach/voice`` and
+``/outreach/direct-call`` are issued open-loop: each request has a scheduled
+start time and its latency is measured from that time, so a backed-up server
+shows up as tail latency instead of silently lowering the offered load. The
+report covers throughput, latency percentiles and status codes per endpoint,
+plus the provider outcomes and fallbacks the API recorded on ``/metrics``.
+
+With ``--spawn`` the driver starts the fake providers and an API process
+pointed at them, so the whole run stays offline:
+
+    python -m benchmarks.load_outreach --spawn --rps 50 --duration 30 --sendgrid latency=150,error=0.1
+
+Against an already running API (see ``benchmarks.fake_providers``):
+
+    python -m benchmarks.load_outreach --base-url http://127.0.0.1:8000 --rps 50 --mix email=3,direct-call=1
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from benchmarks.fake_providers import FakeProviders, add_profile_arguments, free_port, profiles_from_args
+from benchmarks.roster import generate_roster
+
+ENDPOINTS = {
+    "email": "/outreach/email",
+    "voice": "/outreach/voice",
+    "direct-call": "/outreach/direct-call",
+}
+
+_SAMPLE_LINE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+_session = threading.local()
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse ``email=3,direct-call=1`` into normalized endpoint weights"""
+    weights = {}
+    for part in filter(None, (part.strip() for part in value.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {name}; expected one of {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def schedule(mix: Dict[str, float], count: int) -> List[str]:
+    """Interleave endpoints deterministically in proportion to their weights"""
+    credit = dict.fromkeys(mix, 0.0)
+    order = []
+    for _ in range(count):
+        for name, weight in mix.items():
+            credit[name] += weight
+        name = max(credit, key=credit.get)
+        credit[name] -= 1
+        order.append(name)
+    return order
+
+
+def make_payload(endpoint: str, influencer: Dict[str, Any], sequence: int) -> Dict[str, Any]:
+    if endpoint == "email":
+        return {
+            "influencer_name": influencer["name"],
+            "influencer_email": influencer["contact"],
+            "campaign_name": "Load Test Campaign",
+            "message": f"Hi {influencer['name']}, we'd love to work with you on our {influencer['category']} launch.",
+        }
+    return {
+        "phone_number": f"+1555{sequence % 10_000_000:07d}",
+        "influencer_name": influencer["name"],
+        "brand_name": "BrandSync Load Test",
+        "campaign_name": "Load Test Campaign",
+        "deliverables": "1 Instagram post, 2 stories",
+        "timeline": "Next 2 weeks",
+        "budget_range": "$1,000 - $2,000",
+    }
+
+
+def scrape_metrics(base_url: str) -> Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]:
+    """Read the API's counters and histogram counts from /metrics"""
+    try:
+        text = requests.get(f"{base_url}/metrics", timeout=10).text
+    except requests.RequestException:
+        return {}
+    samples = {}
+    for line in text.splitlines():
+        match = _SAMPLE_LINE.match(line)
+        if match and match.group(1) in ("brandsync_fallbacks_total", "brandsync_provider_call_duration_seconds_count"):
+            labels = tuple(sorted(_LABEL.findall(match.group(2))))
+            samples[(match.group(1), labels)] = float(match.group(3))
+    return samples
+
+
+def metric_deltas(before, after) -> Dict[str, Dict[str, int]]:
+    """Provider outcomes and fallbacks recorded between two scrapes"""
+    report = {"providers": {}, "fallbacks": {}}
+    for (name, labels), value in after.items():
+        delta = int(value - before.get((name, labels), 0))
+        if not delta:
+            continue
+        labels = dict(labels)
+        if name == "brandsync_fallbacks_total":
+            report["fallbacks"][f"{labels['source']}->{labels['target']}"] = delta
+        else:
+            report["providers"][f"{labels['provider']}:{labels['outcome']}"] = delta
+    return report
+
+
+def send(base_url: str, endpoint: str, payload: Dict[str, Any], scheduled: float, timeout: float) -> Tuple[str, Any, float]:
+    session = getattr(_session, "session", None)
+    if session is None:
+        session = _session.session = requests.Session()
+    try:
+        response = session.post(f"{base_url}{ENDPOINTS[endpoint]}", json=payload, timeout=timeout)
+        outcome = response.status_code
+    except requests.Timeout:
+        outcome = "timeout"
+    except requests.RequestException:
+        outcome = "connection_error"
+    return endpoint, outcome, time.perf_counter() - scheduled
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_load(base_url: str, rps: float, duration: float, mix: Dict[str, float], concurrency: int, timeout: float):
+    """Issue requests open-loop at ``rps`` for ``duration`` seconds
+
+    Returns:
+        Per-request (endpoint, status or error, latency) tuples and the wall time taken
+    """
+    count = int(rps * duration)
+    order = schedule(mix, count)
+    roster = generate_roster(min(count, 10_000) or 1, seed=1)
+    futures = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        for sequence, endpoint in enumerate(order):
+            scheduled = start + sequence / rps
+            pause = scheduled - time.perf_counter()
+            if pause > 0:
+                time.sleep(pause)
+            payload = make_payload(endpoint, roster[sequence % len(roster)], sequence)
+            futures.append(pool.submit(send, base_url, endpoint, payload, scheduled, timeout))
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def summarize(results, elapsed: float) -> Dict[str, Any]:
+    by_endpoint = defaultdict(list)
+    for endpoint, outcome, latency in results:
+        by_endpoint[endpoint].append((outcome, latency))
+    summary = {}
+    for endpoint, rows in by_endpoint.items():
+        latencies = sorted(latency for _, latency in rows)
+        outcomes = Counter(str(outcome) for outcome, _ in rows)
+        summary[endpoint] = {
+            "requests": len(rows),
+            "succeeded": outcomes.get("200", 0),
+            "throughput_rps": round(outcomes.get("200", 0) / elapsed, 2),
+            "statuses": dict(outcomes),
+            "latency_ms": {
+                "mean": round(statistics.mean(latencies) * 1000, 1),
+                "p50": round(percentile(latencies, 0.50) * 1000, 1),
+                "p90": round(percentile(latencies, 0.90) * 1000, 1),
+                "p99": round(percentile(latencies, 0.99) * 1000, 1),
+                "max": round(latencies[-1] * 1000, 1),
+            },
+        }
+    return summary
+
+
+def spawn_api(env: Dict[str, str], port: int, startup_timeout: float) -> subprocess.Popen:
+    """Start the API in a subprocess and wait until it answers"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        # The search model isn't under test here; the hashing encoder keeps startup fast and offline
+        env={"EMBEDDING_ENCODER": "hashing", **os.environ, "LOG_LEVEL": "WARNING", **env},
+    )
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API exited during startup with status {process.returncode}")
+        try:
+            requests.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except requests.RequestException:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("API did not start in time")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="API to load (ignored with --spawn)")
+    parser.add_argument("--rps", type=float, default=20, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load")
+    # /outreach/voice calls ElevenLabs through its SDK, which the fake providers don't serve
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("email=1,direct-call=1"),
+                        help="Endpoint weights, e.g. email=3,direct-call=1; voice only works against a real or mock ElevenLabs")
+    parser.add_argument("--concurrency", type=int, default=256, help="Maximum requests in flight")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--spawn", action="store_true", help="Start the fake providers and an API process pointed at them")
+    parser.add_argument("--startup-timeout", type=float, default=300, help="Seconds to wait for a spawned API")
+    parser.add_argument("--no-mock-fallback", action="store_true",
+                        help="With --spawn, let email fail instead of falling back to the mock sender")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    fakes, api = None, None
+    base_url = args.base_url.rstrip("/")
+    try:
+        if args.spawn:
+            fakes = FakeProviders(**profiles_from_args(args))
+            fakes.start()
+            env = fakes.env()
+            env["FALLBACK_TO_MOCK"] = "false" if args.no_mock_fallback else "true"
+            port = free_port()
+            api = spawn_api(env, port, args.startup_timeout)
+            base_url = f"http://127.0.0.1:{port}"
+
+        before = scrape_metrics(base_url)
+        print(f"Sending {int(args.rps * args.duration)} requests at {args.rps:g} RPS to {base_url}...")
+        results, elapsed = run_load(base_url, args.rps, args.duration, args.mix, args.concurrency, args.timeout)
+        report = {
+            "params": {"rps": args.rps, "duration": args.duration, "mix": args.mix, "concurrency": args.concurrency},
+            "elapsed_seconds": round(elapsed, 2),
+            "endpoints": summarize(results, elapsed),
+            **metric_deltas(before, scrape_metrics(base_url)),
+        }
+        if fakes is not None:
+            report["fake_providers"] = fakes.stats()
+    finally:
+        if api is not None:
+            api.terminate()
+            api.wait(timeout=10)
+        if fakes is not None:
+            fakes.stop()
+
+    print(f"Completed in {report['elapsed_seconds']} s")
+    for endpoint, stats in report["endpoints"].items():
+        latency = stats["latency_ms"]
+        print(
+            f"  {endpoint:<12} {stats['succeeded']:>6}/{stats['requests']:<6} ok  {stats['throughput_rps']:>7.1f} rps  "
+            f"p50 {latency['p50']:>7.1f}  p90 {latency['p90']:>7.1f}  p99 {latency['p99']:>7.1f}  max {latency['max']:>7.1f} ms  "
+            f"{stats['statuses']}"
+        )
+    for section in ("providers", "fallbacks", "fake_providers"):
+        if report.get(section):
+            print(f"  {section}: {report[section]}")
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
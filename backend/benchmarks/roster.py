@@ -0,0 +1,134 @@
+"""Seeded synthetic influencer roster generator.
+
+Produces records with the same shape as the roster in
+``app.endpoints.influencers`` so the search stack can be benchmarked at
+realistic sizes. The same ``(count, seed)`` always yields the same roster.
+
+    python -m benchmarks.roster --count 10000 --seed 7 > roster.ndjson
+"""
+import argparse
+import json
+import math
+import random
+import sys
+from typing import Any, Dict, Iterator, List
+
+FIRST_NAMES = [
+    "Priya", "Alex", "Raj", "Emma", "Vikram", "Sarah", "Aditya", "Maria", "Arjun", "Olivia",
+    "Kabir", "Sofia", "Rohan", "Mia", "Ananya", "Lucas", "Isha", "Noah", "Meera", "Liam",
+    "Diego", "Chloe", "Karan", "Ava", "Neha", "Mateo", "Zara", "Ethan", "Tara", "Hana",
+]
+LAST_NAMES = [
+    "Sharma", "Johnson", "Patel", "Wilson", "Singh", "Chen", "Mehta", "Rodriguez", "Kapoor", "Brown",
+    "Garcia", "Iyer", "Smith", "Nair", "Lopez", "Khan", "Taylor", "Reddy", "Martin", "Silva",
+]
+
+# Category -> description fragments
+CATEGORIES = {
+    "fashion": ["sustainable fashion", "streetwear", "Indian traditional wear", "luxury styling", "thrift hauls"],
+    "fitness": ["home workouts", "strength training", "yoga flows", "nutrition tips", "marathon prep"],
+    "tech": ["smartphone reviews", "laptop comparisons", "gadget unboxings", "coding tutorials", "AI tools"],
+    "beauty": ["skincare routines", "makeup tutorials", "haircare", "clean beauty", "nail art"],
+    "travel": ["budget backpacking", "luxury resorts", "hidden gems", "road trips", "food trails"],
+    "gaming": ["RPG walkthroughs", "esports commentary", "strategy games", "speedruns", "retro consoles"],
+    "business": ["startup advice", "personal finance", "market insights", "leadership", "marketing growth"],
+    "food": ["authentic recipes", "street food", "baking", "vegan cooking", "restaurant reviews"],
+    "parenting": ["toddler activities", "family travel", "education tips", "home organisation", "newborn care"],
+    "music": ["cover songs", "music production", "guitar lessons", "indie releases", "DJ sets"],
+}
+
+# Region -> (currency symbol, units of local currency per USD)
+REGIONS = {
+    "India": ("₹", 83.0),
+    "USA": ("$", 1.0),
+    "UK": ("£", 0.79),
+    "Mexico": ("MX$", 17.0),
+    "Germany": ("€", 0.92),
+    "Brazil": ("R$", 5.0),
+    "Indonesia": ("Rp", 15500.0),
+    "Canada": ("CA$", 1.36),
+}
+
+PLATFORMS = ["Instagram", "YouTube", "TikTok", "Twitter", "Twitch", "Blog", "LinkedIn", "Snapchat"]
+DELIVERABLES = {
+    "YouTube": "video",
+    "Twitch": "stream",
+    "Twitter": "tweet",
+    "Blog": "sponsored blog",
+    "LinkedIn": "webinar",
+}
+
+
+def _round_price(value: float) -> int:
+    """Round a price to two significant figures, like a real rate card"""
+    magnitude = 10 ** max(int(math.log10(max(value, 1))) - 1, 0)
+    return int(round(value / magnitude) * magnitude)
+
+
+def generate_influencer(rng: random.Random, influencer_id: int) -> Dict[str, Any]:
+    """Generate one influencer record"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    category = rng.choice(list(CATEGORIES))
+    region = rng.choice(list(REGIONS))
+    symbol, per_usd = REGIONS[region]
+    platforms = rng.sample(PLATFORMS, rng.randint(1, 3))
+
+    # Follower counts are roughly log-uniform; engagement falls as audiences grow
+    followers = int(10 ** rng.uniform(3.7, 7.0))
+    engagement_rate = round(max(0.5, rng.gauss(9.0 - 1.1 * math.log10(followers), 0.8)), 1)
+
+    post_usd = followers / 1000 * rng.uniform(2.0, 8.0)
+    prices = [f"{symbol}{_round_price(post_usd * per_usd):,} per post"]
+    for platform in platforms:
+        if platform in DELIVERABLES:
+            multiplier = rng.uniform(2.0, 4.0)
+            prices.append(f"{symbol}{_round_price(post_usd * multiplier * per_usd):,} per {DELIVERABLES[platform]}")
+            break
+
+    topics = rng.sample(CATEGORIES[category], 2)
+    return {
+        "id": influencer_id,
+        "name": f"{first} {last}",
+        "platforms": platforms,
+        "category": category,
+        "followers": followers,
+        "engagement_rate": engagement_rate,
+        "region": region,
+        "rate_card": ", ".join(prices),
+        "contact": f"{first.lower()}.{last.lower()}{influencer_id}@example.com",
+        "description": f"{category.capitalize()} creator from {region} covering {topics[0]} and {topics[1]}",
+    }
+
+
+def iter_roster(count: int, seed: int = 0, start_id: int = 1) -> Iterator[Dict[str, Any]]:
+    """Yield a reproducible synthetic roster without holding it all in memory"""
+    rng = random.Random(seed)
+    for influencer_id in range(start_id, start_id + count):
+        yield generate_influencer(rng, influencer_id)
+
+
+def generate_roster(count: int, seed: int = 0, start_id: int = 1) -> List[Dict[str, Any]]:
+    """Generate a reproducible synthetic roster
+
+    Args:
+        count: Number of influencers
+        seed: Random seed; the same seed always yields the same roster
+        start_id: ID of the first influencer
+
+    Returns:
+        List of influencer records
+    """
+    return list(iter_roster(count, seed, start_id))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic roster as NDJSON to stdout")
+    parser.add_argument("--count", type=int, default=10_000, help="Number of influencers")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+    for record in iter_roster(args.count, args.seed):
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Pre-fork server sharing the embedding model between workers copy-on-write.
+
+The master imports the app and loads the embedding model and the roster's
+embeddings once, moves everything it allocated into the GC's permanent
+generation with ``gc.freeze()`` and forks the workers, which share those
+pages instead of each loading their own copy. ChromaDB's client can't be used
+across ``fork()``, so each worker builds its in-memory index from the shared
+precomputed embeddings after forking (no re-encoding).
+
+Every worker has its own copy of the roster and index, so the endpoints that
+change them are rejected (``ROSTER_READ_ONLY``); ETags derive from the
+roster's content and match across workers. The outreach databases are opened
+and their background threads started by each worker on startup, never in the
+master.
+
+    python prefork_server.py --workers 4 --port 8000
+
+Send SIGUSR1 to the master to log RSS/PSS per process; the same report is
+logged once every worker is up.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("prefork")
+
+# Signals handled by the master; blocked around fork() so a worker never runs the master's handlers
+SUPERVISOR_SIGNALS = {signal.SIGINT, signal.SIGTERM, signal.SIGUSR1}
+
+MEMORY_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def read_memory(pid: int) -> Optional[Dict[str, int]]:
+    """RSS/PSS breakdown of a process in KiB from /proc/<pid>/smaps_rollup (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as rollup:
+            lines = rollup.readlines()
+    except OSError:
+        return None
+    memory = {}
+    for line in lines:
+        name, _, rest = line.partition(":")
+        if name in MEMORY_FIELDS:
+            memory[name] = int(rest.split()[0])
+    return memory
+
+
+def log_memory_report(master_pid: int, workers: Dict[int, int]):
+    rows = [("master", master_pid)] + [(f"worker {slot}", pid) for pid, slot in sorted(workers.items(), key=lambda item: item[1])]
+    total_rss = total_pss = 0
+    for label, pid in rows:
+        memory = read_memory(pid)
+        if memory is None:
+            logger.info("Memory of %s (pid %d) unavailable", label, pid)
+            continue
+        shared = memory.get("Shared_Clean", 0) + memory.get("Shared_Dirty", 0)
+        private = memory.get("Private_Clean", 0) + memory.get("Private_Dirty", 0)
+        total_rss += memory.get("Rss", 0)
+        total_pss += memory.get("Pss", 0)
+        logger.info(
+            "%s (pid %d): RSS %.1f MiB, PSS %.1f MiB, shared %.1f MiB, private %.1f MiB",
+            label, pid, memory.get("Rss", 0) / 1024, memory.get("Pss", 0) / 1024, shared / 1024, private / 1024,
+            extra={"pid": pid, "memory_kib": memory}
+        )
+    # PSS splits shared pages between the processes using them, so its sum is the real footprint
+    logger.info("Total: RSS %.1f MiB, PSS %.1f MiB", total_rss / 1024, total_pss / 1024)
+
+
+def limit_threads(threads: int):
+    """Cap math library thread pools so workers don't oversubscribe the CPUs"""
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+
+def run_worker(slot: int, app, sock: socket.socket, threads: int, ready_fd: Optional[int]):
+    """Body of a forked worker; never returns"""
+    import uvicorn
+    from app.endpoints import influencers
+
+    status = 1
+    try:
+        # The master's signal handlers and frozen GC state don't apply here
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, SUPERVISOR_SIGNALS)
+        gc.enable()
+        limit_threads(threads)
+
+        influencers.initialize_vector_db()
+        if ready_fd is not None:
+            os.write(ready_fd, b"1")
+            os.close(ready_fd)
+
+        server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+        server.run(sockets=[sock])
+        status = 0
+    except Exception:
+        logger.exception("Worker %d failed", slot)
+    finally:
+        logging.shutdown()
+        os._exit(status)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PREFORK_WORKERS", 0)) or os.cpu_count() or 1)
+    parser.add_argument("--threads-per-worker", type=int, default=int(os.getenv("PREFORK_THREADS_PER_WORKER", 0)),
+                        help="Torch/BLAS threads per worker (default: CPUs divided among workers)")
+    args = parser.parse_args(argv)
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // args.workers)
+
+    # Each worker keeps its own in-memory index; a shared persistent store would have every worker writing to it
+    if os.environ.pop("CHROMA_PERSIST_DIR", None):
+        print("CHROMA_PERSIST_DIR is ignored by the pre-fork server; workers build in-memory indexes", file=sys.stderr)
+    os.environ["DEFER_VECTOR_DB_INIT"] = "true"
+    os.environ["ROSTER_READ_ONLY"] = "true"
+
+    # Objects allocated while loading are frozen below; keep the GC from touching their pages meanwhile
+    gc.disable()
+    from app.main import app
+    from app.endpoints import influencers
+    influencers.precompute_embeddings()
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET6 if ":" in args.host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    master_pid = os.getpid()
+    workers: Dict[int, int] = {}
+    # Workers started with the server signal on this pipe once their index is built
+    ready_read, ready_write = os.pipe()
+
+    def spawn(slot: int, ready_fd: Optional[int] = None):
+        signal.pthread_sigmask(signal.SIG_BLOCK, SUPERVISOR_SIGNALS)
+        pid = os.fork()
+        if pid == 0:
+            if ready_fd is not None:
+                os.close(ready_read)
+            run_worker(slot, app, sock, threads, ready_fd)
+        workers[pid] = slot
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, SUPERVISOR_SIGNALS)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGUSR1, lambda signum, frame: log_memory_report(master_pid, workers))
+
+    logger.info("Starting %d workers on %s:%d with %d threads each", args.workers, args.host, args.port, threads)
+    for slot in range(args.workers):
+        spawn(slot, ready_write)
+    os.close(ready_write)
+
+    # Report memory once every worker has built its index
+    started = 0
+    while started < args.workers and not stopping:
+        try:
+            chunk = os.read(ready_read, args.workers - started)
+        except InterruptedError:
+            continue
+        if not chunk:
+            break
+        started += len(chunk)
+    os.close(ready_read)
+    if started == args.workers:
+        time.sleep(0.5)
+        log_memory_report(master_pid, workers)
+
+    # Supervise: replace workers that die until asked to stop
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = workers.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+        logger.warning("Worker %d (pid %d) exited with status %d, restarting", slot, pid, code)
+        spawn(slot)
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
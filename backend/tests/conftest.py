@@ -0,0 +1,11 @@
+import os
+import tempfile
+
+# Tests run offline against the deterministic hashing encoder; the real model
+# is exercised by the tests marked real_model (pytest -m real_model)
+os.environ.setdefault("EMBEDDING_ENCODER", "hashing")
+
+# Keep the outreach job and negotiation databases out of the working tree
+_databases = tempfile.mkdtemp(prefix="brandsync-tests-")
+os.environ.setdefault("SCHEDULER_DB_PATH", os.path.join(_databases, "outreach_jobs.sqlite3"))
+os.environ.setdefault("NEGOTIATION_DB_PATH", os.path.join(_databases, "negotiations.sqlite3"))
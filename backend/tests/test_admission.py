@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.utils.admission import AdmissionGate, Overloaded
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_gate_bounds_concurrency_and_sheds_when_queue_full():
+    """Test that requests beyond the slots queue, and beyond the queue are rejected"""
+    async def scenario():
+        gate = AdmissionGate("test", max_concurrent=1, max_queue={"interactive": 1, "batch": 1})
+        await gate.acquire()
+        queued = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+        assert gate.status()["queued"]["interactive"] == 1
+
+        with pytest.raises(Overloaded) as excinfo:
+            await gate.acquire()
+        assert excinfo.value.retry_after >= 1
+
+        gate.release()
+        await asyncio.wait_for(queued, 1)
+        assert gate.status()["in_flight"] == 1
+        gate.release()
+        assert gate.status()["in_flight"] == 0
+        assert gate.status()["rejected"]["interactive"] == 1
+
+    run(scenario())
+
+
+def test_interactive_lane_is_admitted_before_batch():
+    """Test that a freed slot goes to interactive waiters first"""
+    async def scenario():
+        gate = AdmissionGate("test", max_concurrent=1, max_queue={"interactive": 4, "batch": 4})
+        order = []
+
+        async def search(lane):
+            async with gate.admit(lane):
+                order.append(lane)
+
+        await gate.acquire()
+        batch = asyncio.create_task(search("batch"))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(search("interactive"))
+        await asyncio.sleep(0)
+        gate.release()
+        await asyncio.gather(batch, interactive)
+        assert order == ["interactive", "batch"]
+
+    run(scenario())
+
+
+def test_cancelled_waiter_leaves_queue():
+    """Test that a client giving up while queued frees its queue position"""
+    async def scenario():
+        gate = AdmissionGate("test", max_concurrent=1, max_queue={"interactive": 1})
+        await gate.acquire()
+        waiter = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert gate.status()["queued"]["interactive"] == 0
+        gate.release()
+        assert gate.status()["in_flight"] == 0
+
+    run(scenario())
+
+
+def test_unknown_lane_is_rejected():
+    gate = AdmissionGate("test", max_concurrent=1, max_queue={})
+    with pytest.raises(ValueError):
+        run(gate.acquire("urgent"))
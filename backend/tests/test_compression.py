@@ -0,0 +1,125 @@
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI, Request, Response, status
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.utils.compression import CompressionMiddleware, choose_encoding, encoded_etag, split_encoded_etags
+from app.utils.search_cache import etag_matches
+
+BODY = b'{"name": "Priya Sharma", "category": "Fashion"}' * 100
+ETAG = '"abc123"'
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, encodings=["gzip"], min_size=500)
+
+
+@app.get("/large")
+async def large(request: Request):
+    if etag_matches(request.headers.get("if-none-match"), ETAG):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": ETAG})
+    return Response(BODY, media_type="application/json", headers={"ETag": ETAG})
+
+
+@app.get("/small")
+async def small():
+    return Response(b'{"ok": true}', media_type="application/json")
+
+
+@app.get("/stream")
+async def stream():
+    return StreamingResponse((BODY for _ in range(3)), media_type="application/x-ndjson")
+
+
+@app.get("/events")
+async def events():
+    return StreamingResponse((BODY for _ in range(3)), media_type="text/event-stream")
+
+
+client = TestClient(app)
+
+
+def raw_get(path: str, **headers):
+    """GET without letting the client decode the body"""
+    with client.stream("GET", path, headers=headers) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_choose_encoding():
+    """Test Accept-Encoding negotiation against the preference list"""
+    assert choose_encoding("gzip, deflate, br", ["br", "gzip"]) == "br"
+    assert choose_encoding("gzip;q=0.5, br;q=0", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("*", ["gzip"]) == "gzip"
+    assert choose_encoding("identity", ["br", "gzip"]) is None
+    assert choose_encoding("", ["gzip"]) is None
+
+
+def test_etag_suffixes():
+    """Test that encoded ETags round-trip through If-None-Match"""
+    assert encoded_etag('"abc"', "gzip") == '"abc-gzip"'
+    assert encoded_etag('W/"abc"', "br") == 'W/"abc-br"'
+    header, sent = split_encoded_etags('"abc-gzip", "def"', ["br", "gzip"])
+    assert header == '"abc", "def"'
+    assert sent == {'"abc"': '"abc-gzip"'}
+
+
+def test_compresses_large_responses():
+    """Test that bodies above the threshold are gzipped with their own ETag"""
+    response, body = raw_get("/large", **{"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == '"abc123-gzip"'
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) == len(body) < len(BODY)
+    assert gzip.decompress(body) == BODY
+
+
+def test_leaves_small_and_unaccepted_responses():
+    """Test that small bodies and clients without gzip get the identity encoding"""
+    response, body = raw_get("/small", **{"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert body == b'{"ok": true}'
+
+    response, body = raw_get("/large", **{"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == ETAG
+    assert body == BODY
+
+
+def test_conditional_request_on_compressed_etag():
+    """Test that If-None-Match with the encoded ETag gets a 304 echoing it"""
+    response = client.get("/large", headers={"Accept-Encoding": "gzip", "If-None-Match": '"abc123-gzip"'})
+    assert response.status_code == 304
+    assert response.headers["etag"] == '"abc123-gzip"'
+    assert client.get("/large", headers={"If-None-Match": '"other-gzip"'}).status_code == 200
+
+
+def test_streams_compressed_chunks():
+    """Test that streamed bodies are compressed incrementally and event streams are left alone"""
+    response, body = raw_get("/stream", **{"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert zlib.decompress(body, 16 + zlib.MAX_WBITS) == BODY * 3
+
+    response, body = raw_get("/events", **{"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert body == BODY * 3
+
+
+def test_brotli_responses():
+    """Test that clients preferring brotli get brotli-compressed bodies and streams"""
+    brotli = pytest.importorskip("brotli")
+    brotli_app = FastAPI(routes=app.routes)
+    brotli_app.add_middleware(CompressionMiddleware, encodings=["br", "gzip"], min_size=500)
+    brotli_client = TestClient(brotli_app)
+    with brotli_client.stream("GET", "/large", headers={"Accept-Encoding": "br, gzip"}) as response:
+        body = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["etag"] == '"abc123-br"'
+    assert brotli.decompress(body) == BODY
+
+    with brotli_client.stream("GET", "/stream", headers={"Accept-Encoding": "br"}) as response:
+        body = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(body) == BODY * 3
@@ -0,0 +1,67 @@
+from app.utils.dedup import DedupIndex, MinHasher, shingles
+from app.utils.encoders import HashingEncoder
+from benchmarks.roster import generate_roster
+
+encoder = HashingEncoder(64)
+
+creator = {
+    "id": 1,
+    "name": "Priya Sharma",
+    "contact": "priya.sharma42@example.com",
+    "description": "Fashion creator from India covering sustainable fashion and streetwear",
+}
+
+
+def relisted(record_id, **changes):
+    """The creator above as another agency might list them"""
+    return {**creator, "id": record_id, "name": "PRIYA SHARMA", "contact": "priya_sharma42@talentco.com", **changes}
+
+
+def embed(records):
+    return encoder.encode([f"{record['description']}. {record['name']}" for record in records])
+
+
+def test_minhash_estimates_jaccard_similarity():
+    """Test that signature agreement tracks the true Jaccard similarity of two sets"""
+    hasher = MinHasher(num_perm=256)
+    first = {f"f{i}" for i in range(100)}
+    second = {f"f{i}" for i in range(50, 150)}
+    assert abs(float(hasher.jaccard(hasher.signature(first), hasher.signature(second))) - 1 / 3) < 0.1
+    assert float(hasher.jaccard(hasher.signature(first), hasher.signature(set(first)))) == 1.0
+    assert shingles(creator) & shingles(relisted(2))
+
+
+def test_find_duplicates_against_index_and_batch():
+    """Test that relisted creators are matched to the indexed record or an earlier record of the batch"""
+    roster = [creator] + generate_roster(500, seed=3, start_id=2)
+    index = DedupIndex(roster)
+    embeddings = dict(zip((record["id"] for record in roster), embed(roster)))
+
+    fresh = {**generate_roster(1, seed=9, start_id=1000)[0], "name": "Kabir Okonkwo", "contact": "kabir.o@studio.io"}
+    batch = [relisted(1001), fresh, {**fresh, "id": 1002, "contact": "KABIR.O@studio.io"}]
+    found = index.find(batch, embed(batch), lambda ids: {record_id: embeddings[record_id] for record_id in ids})
+    assert [(match.record_id, match.duplicate_of) for match in found] == [(1001, 1), (1002, 1000)]
+    assert found[0].cosine > 0.8 and found[1].same_contact
+
+    # Re-ingesting a record under its own ID is an update, not a duplicate
+    assert index.find([dict(creator, followers=2)]) == []
+
+
+def test_cosine_threshold_rejects_different_creators():
+    """Test that candidates whose embeddings disagree aren't reported, unless they share a contact"""
+    index = DedupIndex([creator], cosine_threshold=0.95)
+    other = relisted(2, description="Gaming streamer from Canada playing speedruns and retro consoles")
+    assert index.find([other], embed([other]), lambda ids: dict(zip(ids, embed([creator])))) == []
+    same_contact = dict(other, contact=creator["contact"])
+    assert [match.duplicate_of for match in index.find([same_contact], embed([same_contact]), lambda ids: dict(zip(ids, embed([creator]))))] == [1]
+
+
+def test_report_and_delete():
+    """Test that the report lists each duplicate pair once and forgets deleted records"""
+    index = DedupIndex([creator, relisted(7), relisted(9, name="Rohan Mehta", contact="rohan@example.com")])
+    report = index.report()
+    assert [(match.duplicate_of, match.record_id) for match in report] == [(1, 7)]
+    assert report[0].to_dict()["jaccard"] >= 0.6
+
+    index.delete([7])
+    assert len(index) == 2 and index.report() == []
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from app.utils.encoders import Encoder, HashingEncoder, load_encoder
+
+
+def test_hashing_encoder_is_deterministic_and_normalized():
+    encoder = HashingEncoder(64)
+    first = encoder.encode(["fashion influencer from India", "tech reviews"])
+    second = HashingEncoder(64).encode(["fashion influencer from India", "tech reviews"])
+
+    assert first.shape == (2, 64)
+    assert first.dtype == np.float32
+    assert np.array_equal(first, second)
+    assert np.allclose(np.linalg.norm(first, axis=1), 1.0)
+
+
+def test_hashing_encoder_single_text_gives_vector():
+    vector = HashingEncoder(32).encode("fitness")
+    assert vector.shape == (32,)
+
+
+def test_hashing_encoder_empty_text_is_zero_vector():
+    assert not HashingEncoder(16).encode("").any()
+
+
+def test_hashing_encoder_similar_texts_score_higher():
+    encoder = HashingEncoder()
+    query, related, unrelated = encoder.encode([
+        "tech gadget reviews",
+        "tech influencer sharing gadget reviews and unboxings",
+        "sustainable fashion and traditional wear",
+    ])
+    assert query @ related > query @ unrelated
+
+
+def test_load_encoder_selects_backend():
+    assert load_encoder("all-MiniLM-L6-v2", backend="hashing").name == "hashing-384"
+    # Hashing encoder names always reload a hashing encoder
+    assert load_encoder("hashing-128").dimension == 128
+    with pytest.raises(ValueError):
+        load_encoder("all-MiniLM-L6-v2", backend="word2vec")
+
+def test_encoder_without_encode_cannot_be_created():
+    """Test that an encoder missing encode fails at construction, not on the first query"""
+    class Incomplete(Encoder):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
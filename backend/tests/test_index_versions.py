@@ -0,0 +1,105 @@
+import uuid
+import chromadb
+import pytest
+from app.utils.index_versions import IndexRegistry, template_hash
+
+class ConstantModel:
+    """Model stand-in returning the same small embedding for every text"""
+    def __init__(self, name):
+        self.name = name
+
+    def encode(self, texts):
+        import numpy as np
+        return np.ones((len(texts), 3), dtype=np.float32)
+
+def populate(collection, model_name, model):
+    collection.add(ids=["1", "2"], embeddings=model.encode(["a", "b"]).tolist(),
+                   metadatas=[{"name": "a"}, {"name": "b"}])
+
+@pytest.fixture
+def registry():
+    prefix = f"test_{uuid.uuid4().hex[:8]}"
+    return IndexRegistry(chromadb.Client(), model_loader=ConstantModel, prefix=prefix)
+
+def collection_names(registry):
+    names = [getattr(c, "name", c) for c in registry.chroma_client.list_collections()]
+    return sorted(n for n in names if n.startswith(registry.prefix))
+
+def test_template_hash_tracks_source():
+    """Test that the template hash is stable for the same generator"""
+    def first(item):
+        return item["name"]
+
+    def second(item):
+        return item["name"].upper()
+
+    assert template_hash(first) == template_hash(first)
+    assert template_hash(first) != template_hash(second)
+
+def test_build_activates_and_collects_old_version(registry):
+    """Test that building a new version swaps it in and drops the old collection"""
+    first = registry.build("model-a", "t1", populate)
+    assert registry.active is first
+    assert first.collection.count() == 2
+
+    second = registry.build("model-b", "t1", populate)
+    assert registry.active is second
+    assert collection_names(registry) == [registry.collection_name(second.key)]
+
+def test_retired_version_kept_while_in_use(registry):
+    """Test that a version pinned by a request survives until it is released"""
+    first = registry.build("model-a", "t1", populate)
+    with registry.acquire() as version:
+        assert version is first
+        registry.build("model-b", "t1", populate)
+        # The old collection is still queryable by the in-flight request
+        assert version.collection.count() == 2
+        assert registry.collection_name(first.key) in collection_names(registry)
+    assert registry.collection_name(first.key) not in collection_names(registry)
+
+def test_load_existing_prefers_wanted_version(registry):
+    """Test reloading complete versions and discarding incomplete ones"""
+    first = registry.build("model-a", "t1", populate)
+    registry.chroma_client.create_collection(name=registry.collection_name("partial"),
+                                             metadata={"complete": False})
+
+    reloaded = IndexRegistry(registry.chroma_client, model_loader=ConstantModel, prefix=registry.prefix)
+    version = reloaded.load_existing(first.key)
+    assert version.key == first.key
+    assert version.model_name == "model-a"
+    assert collection_names(reloaded) == [registry.collection_name(first.key)]
+
+def test_acquire_without_active_version(registry):
+    """Test that acquiring before any build fails clearly"""
+    with pytest.raises(RuntimeError):
+        with registry.acquire():
+            pass
+
+def test_build_catches_up_on_changes_written_meanwhile(registry):
+    """Test that IDs written to the active version during a build reach the new version before the swap"""
+    first = registry.build("model-a", "t1", populate)
+
+    def populate_while_writing(collection, model_name, model):
+        populate(collection, model_name, model)
+        # An upsert lands on the serving version while the new one is being filled
+        with registry.writing(), registry.acquire() as version:
+            assert version is first
+            version.collection.upsert(ids=["3"], embeddings=[[1.0, 1.0, 1.0]], metadatas=[{"name": "c"}])
+            registry.note_changes(["3"])
+
+    caught_up = []
+
+    def catch_up(collection, model_name, model, ids):
+        caught_up.extend(ids)
+        collection.upsert(ids=sorted(ids), embeddings=model.encode(sorted(ids)).tolist(),
+                          metadatas=[{"name": "c"}])
+
+    second = registry.build("model-b", "t1", populate_while_writing, catch_up)
+    assert registry.active is second
+    assert caught_up == ["3"]
+    assert second.collection.get(ids=["3"])["ids"] == ["3"]
+
+    # Changes are only tracked while a build runs
+    registry.note_changes(["4"])
+    assert registry.build("model-c", "t1", populate, catch_up).collection.count() == 2
+    assert caught_up == ["3"]
@@ -0,0 +1,98 @@
+import pytest
+from app.utils.influencer_store import InfluencerStore
+
+def make_record(record_id, category="tech", region="India", platforms=("YouTube",), followers=1000, engagement_rate=1.0):
+    return {
+        "id": record_id,
+        "name": f"Creator {record_id}",
+        "platforms": list(platforms),
+        "category": category,
+        "followers": followers,
+        "engagement_rate": engagement_rate,
+        "region": region,
+    }
+
+@pytest.fixture
+def store():
+    return InfluencerStore([
+        make_record(1, followers=500, engagement_rate=2.0),
+        make_record(2, category="fashion", platforms=("Instagram",), followers=3000, engagement_rate=4.5),
+        make_record(3, region="USA", followers=3000, engagement_rate=1.5),
+        make_record(4, category="Fashion", region="USA", platforms=("Instagram", "TikTok"), followers=100),
+        make_record(5, followers=7000, engagement_rate=3.0),
+    ])
+
+def collect_pages(store, limit, **kwargs):
+    ids, cursor = [], None
+    while True:
+        page, cursor = store.query(limit=limit, cursor=cursor, **kwargs)
+        ids.extend(record["id"] for record in page)
+        if cursor is None:
+            return ids
+
+def test_cursor_pagination_covers_roster_once(store):
+    """Test that paging through the roster returns every record exactly once in order"""
+    assert collect_pages(store, 2) == [1, 2, 3, 4, 5]
+    assert collect_pages(store, 2, sort="followers", descending=True) == [5, 3, 2, 1, 4]
+    assert collect_pages(store, 3, sort="engagement_rate") == [4, 3, 1, 5, 2]
+
+def test_filters_use_indexes(store):
+    """Test categorical and range filters"""
+    assert collect_pages(store, 10, category="fashion") == [2, 4]
+    assert collect_pages(store, 10, category="FASHION", region="usa") == [4]
+    assert collect_pages(store, 10, platform="instagram") == [2, 4]
+    assert collect_pages(store, 10, min_followers=1000, max_followers=5000) == [2, 3]
+    assert collect_pages(store, 10, min_engagement=3.0) == [2, 5]
+    assert collect_pages(store, 10, category="music") == []
+
+def test_upsert_reindexes_changed_records(store):
+    """Test that replacing a record moves it in every index"""
+    version = store.version
+    store.upsert([make_record(1, category="fashion", followers=9000)])
+    assert store.version == version + 1
+    assert collect_pages(store, 10, category="fashion") == [1, 2, 4]
+    assert collect_pages(store, 10, category="tech") == [3, 5]
+    assert collect_pages(store, 10, sort="followers", descending=True)[0] == 1
+    assert len(store) == 5
+
+def test_fingerprint_follows_content(store):
+    """Test that the fingerprint depends on the records alone, not on the store or the order of upserts"""
+    records = [store.get(record_id) for record_id in range(1, 6)]
+    assert InfluencerStore(reversed(records)).fingerprint == store.fingerprint
+    original = store.fingerprint
+    store.upsert([dict(records[0], followers=501)])
+    assert store.fingerprint != original
+    store.upsert([records[0]])
+    assert store.fingerprint == original and store.version == 3
+
+def test_invalid_sort_and_cursor(store):
+    """Test that bad sort fields and foreign cursors are rejected"""
+    with pytest.raises(ValueError):
+        store.query(limit=2, sort="name")
+
+    _, cursor = store.query(limit=2, sort="followers")
+    with pytest.raises(ValueError):
+        store.query(limit=2, sort="id", cursor=cursor)
+    with pytest.raises(ValueError):
+        store.query(limit=2, cursor="not-a-cursor")
+
+def test_cost_filters_and_sorting_use_parsed_rate_cards():
+    """Test that rate cards in different currencies are filtered and sorted by their USD cost"""
+    store = InfluencerStore([
+        {**make_record(1), "rate_card": "₹50,000 per post, ₹150,000 per video"},
+        {**make_record(2), "rate_card": "$3,000 per post, $8,000 per video"},
+        {**make_record(3), "rate_card": "£2,500 per post, £5,000 for sponsored blog"},
+        {**make_record(4), "rate_card": "Rates on request"},
+    ])
+    assert store.costs(1) == {"cost_per_post": 602.41, "cost_per_video": 1807.23}
+    assert collect_pages(store, 2, sort="cost_per_post") == [1, 2, 3]
+    assert collect_pages(store, 2, sort="cost_per_video", descending=True) == [2, 1]
+    assert collect_pages(store, 10, max_cost=3000) == [1, 2]
+    assert collect_pages(store, 10, deliverable="video", min_cost=1000, max_cost=5000) == [1]
+    assert collect_pages(store, 10, deliverable="blog", max_cost=10000) == [3]
+
+    store.upsert([{**make_record(2), "rate_card": "$500 per post"}])
+    assert collect_pages(store, 10, sort="cost_per_post") == [2, 1, 3]
+    assert collect_pages(store, 10, sort="cost_per_video") == [1]
+    with pytest.raises(ValueError):
+        store.query(limit=2, deliverable="podcast", max_cost=100)
@@ -1,5 +1,6 @@
 import sys
 import os
+import json
 import pytest
 from fastapi.testclient import TestClient
 
@@ -69,3 +70,469 @@ def test_search_influencers_tech():
     results = response.json()
     assert isinstance(results, list)
     assert len(results) > 0
+
+def test_search_influencers_etag():
+    """Test that repeated searches can be answered with 304 Not Modified"""
+    response = client.get("/influencers/search?q=beauty bloggers in the UK")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert "max-age" in response.headers["cache-control"]
+
+    response = client.get("/influencers/search?q=beauty bloggers in the UK", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+def test_cached_search_matches_uncached_for_filter_case():
+    """Test that a cached search doesn't answer a filter that differs only in case"""
+    influencers.search_cache.invalidate()
+    query = {"q": "style and outfit inspiration", "top_k": 5}
+    uncached = client.get("/influencers/search", params={**query, "category": "FASHION"}).json()
+    influencers.search_cache.invalidate()
+    lower = client.get("/influencers/search", params={**query, "category": "fashion"}).json()
+    cached = client.get("/influencers/search", params={**query, "category": "FASHION"}).json()
+    assert lower and all(result["category"] == "fashion" for result in lower)
+    assert cached == uncached
+
+def test_upsert_influencer_invalidates_search_cache():
+    """Test that upserting an influencer makes it searchable and invalidates cached searches"""
+    query = "/influencers/search?q=competitive chess grandmaster streaming openings&top_k=8"
+    etag = client.get(query).headers["etag"]
+
+    new_influencer = {
+        "id": 901,
+        "name": "Test Chess Streamer",
+        "platforms": ["Twitch"],
+        "category": "gaming",
+        "followers": 120000,
+        "engagement_rate": 4.0,
+        "region": "USA",
+        "rate_card": "$1,000 per stream",
+        "contact": "chess@example.com",
+        "description": "Competitive chess grandmaster streaming openings and endgames"
+    }
+    response = client.post("/influencers/", json=[new_influencer])
+    assert response.status_code == 200
+
+    response = client.get(query, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert any(result["id"] == 901 for result in response.json())
+
+def test_get_influencers_paginated():
+    """Test cursor pagination, sorting and field projection on GET /influencers/"""
+    response = client.get("/influencers/?limit=3&sort=followers&order=desc&fields=id,name,followers")
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page) == 3
+    assert set(page[0].keys()) == {"id", "name", "followers"}
+    assert [inf["followers"] for inf in page] == sorted((inf["followers"] for inf in page), reverse=True)
+
+    next_cursor = response.headers["x-next-cursor"]
+    response = client.get(f"/influencers/?limit=3&sort=followers&order=desc&cursor={next_cursor}")
+    assert response.status_code == 200
+    assert not {inf["id"] for inf in page} & {inf["id"] for inf in response.json()}
+
+def test_get_influencers_filters_and_validation():
+    """Test structured filters and rejection of unknown fields"""
+    response = client.get("/influencers/?region=India&category=fashion")
+    assert response.status_code == 200
+    assert all(inf["region"] == "India" and inf["category"] == "fashion" for inf in response.json())
+
+    assert client.get("/influencers/?fields=id,password").status_code == 400
+    assert client.get("/influencers/?sort=name").status_code == 400
+
+def test_export_influencers_ndjson():
+    """Test streaming NDJSON export"""
+    response = client.get("/influencers/export?format=ndjson&fields=id,name")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) >= 8
+    assert set(lines[0].keys()) == {"id", "name"}
+
+    response = client.get("/influencers/export?format=json")
+    assert isinstance(response.json(), list)
+
+def test_search_influencers_trace_header():
+    """Test that X-Trace returns per-stage timings in Server-Timing"""
+    response = client.get("/influencers/search?q=gaming streamers on Twitch", headers={"X-Trace": "1"})
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    for stage in ("encode", "vector_query", "rerank"):
+        assert f"{stage};dur=" in timing
+
+def test_search_sheds_load_when_gate_is_full(monkeypatch):
+    """Test that an uncached search gets 503 with Retry-After when the gate's queue is full"""
+    import asyncio
+    from app.utils.admission import AdmissionGate
+
+    gate = AdmissionGate("search", max_concurrent=1, max_queue={"interactive": 0, "batch": 0})
+    asyncio.run(gate.acquire())  # occupy the only slot
+    monkeypatch.setattr(influencers, "search_gate", gate)
+
+    response = client.get("/influencers/search", params={"q": "overloaded gate test query"})
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+
+    gate.release()
+    response = client.get("/influencers/search", params={"q": "overloaded gate test query", "priority": "batch"})
+    assert response.status_code == 200
+
+def test_search_finds_creator_by_handle():
+    """Test that hybrid search finds a creator by a handle the embeddings miss"""
+    response = client.get("/influencers/search", params={"q": "techreviews", "top_k": 1})
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "Raj Patel"
+
+    response = client.get("/influencers/search", params={"q": "techreviews", "top_k": 5, "mode": "lexical"})
+    assert [result["id"] for result in response.json()] == [3]
+
+    response = client.get("/influencers/search", params={"q": "techreviews", "mode": "keyword"})
+    assert response.status_code == 422
+
+def test_vector_and_lexical_hits_score_cosine_similarity():
+    """Test that ChromaDB distances and stored embeddings both become the query's cosine similarity"""
+    import numpy as np
+
+    active = influencers.index_registry.active
+    query = np.asarray(active.model.encode("techreviews"), dtype=np.float32)
+    embedding = np.asarray(active.collection.get(ids=["3"], include=["embeddings"])["embeddings"][0], dtype=np.float32)
+    cosine = float(query @ embedding / (np.linalg.norm(query) * np.linalg.norm(embedding)))
+
+    vector = client.get("/influencers/search", params={"q": "techreviews", "top_k": 50, "mode": "vector"}).json()
+    lexical = client.get("/influencers/search", params={"q": "techreviews", "top_k": 5, "mode": "lexical"}).json()
+    assert [result["similarity_score"] for result in vector if result["id"] == 3] == [pytest.approx(cosine, abs=1e-4)]
+    assert lexical[0]["similarity_score"] == pytest.approx(cosine, abs=1e-4)
+
+def test_suggest_influencers():
+    """Test the GET /influencers/suggest endpoint"""
+    response = client.get("/influencers/suggest", params={"q": "pri"})
+    assert response.status_code == 200
+    assert response.json()[0]["text"] == "Priya Sharma"
+
+    response = client.get("/influencers/suggest", params={"q": "fashon", "types": "category"})
+    assert response.json() == [{"text": "fashion", "type": "category", "match": "fuzzy", "count": 1}]
+
+    response = client.get("/influencers/suggest", params={"q": "pri", "types": "brand"})
+    assert response.status_code == 400
+
+def test_search_within_budget():
+    """Test that searches can be limited and ordered by the parsed, USD-converted rate cards"""
+    response = client.get("/influencers/search", params={"q": "influencer", "top_k": 10, "max_cost": 1000})
+    assert response.status_code == 200
+    results = response.json()
+    assert results
+    costs = [influencers.influencer_store.costs(result["id"])["cost_per_post"] for result in results]
+    assert all(cost <= 1000 for cost in costs)
+
+    response = client.get("/influencers/search", params={"q": "influencer", "top_k": 10, "deliverable": "video", "sort": "cost"})
+    costs = [influencers.influencer_store.costs(result["id"]).get("cost_per_video") for result in response.json()]
+    priced = [cost for cost in costs if cost is not None]
+    assert priced == sorted(priced) and costs[:len(priced)] == priced
+
+    assert client.get("/influencers/search", params={"q": "influencer", "deliverable": "podcast"}).status_code == 400
+
+def test_get_influencer_rates():
+    """Test the parsed rate card endpoint and cost sorting of the roster"""
+    response = client.get("/influencers/4/rates")
+    assert response.status_code == 200
+    assert response.json()["prices"] == [
+        {"deliverable": "post", "amount": 2500.0, "currency": "GBP", "base_amount": 3164.56},
+        {"deliverable": "blog", "amount": 5000.0, "currency": "GBP", "base_amount": 6329.11},
+    ]
+    assert client.get("/influencers/99999/rates").status_code == 404
+
+    response = client.get("/influencers/?sort=cost_per_video&fields=id")
+    assert [record["id"] for record in response.json()][:2] == [3, 5]
+
+def test_match_campaign():
+    """Test that POST /influencers/match returns a shortlist that fits the brief's budget"""
+    brief = {
+        "brand_name": "EcoThreads",
+        "campaign_name": "Sustainable fashion launch",
+        "description": "Eco-friendly clothing for young Indian audiences",
+        "deliverables": "2 Instagram posts and 1 YouTube video",
+        "timeline": "4 weeks",
+        "budget_range": "$5,000 - $20,000",
+    }
+    response = client.post("/influencers/match", json=brief)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["deliverables"] == {"post": 2, "video": 1}
+    assert result["budget"] == {"min": 5000.0, "max": 20000.0, "currency": "USD"}
+    assert result["shortlist"][0]["name"] == "Priya Sharma"
+    assert result["total_cost"] == round(sum(entry["campaign_cost"] for entry in result["shortlist"]), 2)
+    assert result["total_cost"] <= 20000
+
+    response = client.post("/influencers/match", json={**brief, "budget_range": "$1,000", "deliverables": "1 post"})
+    assert all(entry["campaign_cost"] <= 1000 for entry in response.json()["shortlist"])
+
+    assert client.post("/influencers/match", json={**brief, "deliverables": "podcast mention"}).status_code == 400
+    assert client.post("/influencers/match", json={**brief, "weights": {"fame": 1}}).status_code == 400
+
+def test_similar_influencers(monkeypatch):
+    """Test GET /influencers/{id}/similar from the graph and before it is built"""
+    with influencers.similar_graph_building:
+        pass  # Let a build started at import finish
+    influencers.build_similar_graph()
+    response = client.get("/influencers/1/similar", params={"limit": 3})
+    assert response.status_code == 200
+    assert response.headers["x-similar-source"] == "graph"
+    results = response.json()
+    assert len(results) == 3 and 1 not in [result["id"] for result in results]
+    assert [result["similarity_score"] for result in results] == sorted((result["similarity_score"] for result in results), reverse=True)
+
+    response = client.get("/influencers/1/similar", params={"region": "USA"})
+    assert response.json() and all(result["region"] == "USA" for result in response.json())
+
+    assert client.get("/influencers/99999/similar").status_code == 404
+
+    graph_results = results
+    monkeypatch.setattr(influencers, "similar_graph", None)
+    monkeypatch.setattr(influencers, "start_similar_graph_build", lambda: None)
+    response = client.get("/influencers/1/similar", params={"limit": 3})
+    assert response.headers["x-similar-source"] == "exact"
+    assert [round(result["similarity_score"], 4) for result in response.json()] == [
+        round(result["similarity_score"], 4) for result in graph_results
+    ]
+
+def test_similar_starts_one_graph_build_at_a_time(monkeypatch):
+    """Test that /similar requests served while the graph builds don't start more builds"""
+    import threading
+
+    monkeypatch.setattr(influencers, "similar_graph", None)
+    monkeypatch.setattr(influencers, "similar_graph_matrix", None)
+    assert influencers.similar_graph_building.acquire(timeout=30)
+    try:
+        for _ in range(5):
+            response = client.get("/influencers/1/similar", params={"limit": 3})
+            assert response.status_code == 200 and response.headers["x-similar-source"] == "exact"
+        assert not any(thread.name == "similar-graph-build" for thread in threading.enumerate())
+        assert influencers.start_similar_graph_build() is False
+    finally:
+        influencers.similar_graph_building.release()
+
+def test_upsert_with_dedup():
+    """Test that POST /influencers/ reports or skips near-duplicates of known influencers"""
+    relisted = {**influencers.influencers[0], "id": 950, "name": "PRIYA SHARMA", "contact": "priya_sharma@agencyhub.in"}
+    response = client.post("/influencers/", params={"dedup": "skip"}, json=[relisted])
+    assert response.status_code == 200
+    candidates = response.json()["merge_candidates"]
+    assert [(candidate["id"], candidate["duplicate_of"]) for candidate in candidates] == [(950, 1)]
+    assert candidates[0]["cosine"] is not None
+    assert influencers.influencer_store.get(950) is None
+
+    fresh = {**relisted, "id": 951, "name": "Tomasz Kowalczyk", "contact": "tomasz@kowalczyk.pl",
+             "category": "music", "description": "Jazz pianist sharing improvisation lessons and live recordings"}
+    response = client.post("/influencers/", params={"dedup": "report"}, json=[fresh])
+    assert response.json()["merge_candidates"] == []
+    assert influencers.influencer_store.get(951) is not None
+    assert client.post("/influencers/", params={"dedup": "merge"}, json=[fresh]).status_code == 422
+
+    response = client.get("/influencers/duplicates")
+    assert response.status_code == 200
+    assert all(candidate["id"] != 951 and candidate["duplicate_of"] != 951 for candidate in response.json()["candidates"])
+
+def parse_events(text):
+    """(event, data) pairs of a Server-Sent Events stream"""
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+def test_stream_search(monkeypatch):
+    """Test that /influencers/search/stream sends vector hits first, then the /search results"""
+    params = {"q": "streaming test: tech gadget reviews", "top_k": 3}
+    response = client.get("/influencers/search/stream", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [event for event, _ in events] == ["vector", "results", "done"]
+    vector_hits, results = events[0][1], events[1][1]
+    assert 0 < len(vector_hits) <= 3
+    assert [hit["similarity_score"] for hit in vector_hits] == sorted((hit["similarity_score"] for hit in vector_hits), reverse=True)
+    assert results == client.get("/influencers/search", params=params).json()
+
+    # The completed search was cached, so a repeat skips straight to the results
+    assert [event for event, _ in parse_events(client.get("/influencers/search/stream", params=params).text)] == ["results", "done"]
+
+    import asyncio
+    from app.utils.admission import AdmissionGate
+
+    gate = AdmissionGate("search", max_concurrent=1, max_queue={"interactive": 0, "batch": 0})
+    asyncio.run(gate.acquire())
+    monkeypatch.setattr(influencers, "search_gate", gate)
+    events = parse_events(client.get("/influencers/search/stream", params={"q": "shed streaming search"}).text)
+    assert [event for event, _ in events] == ["error"] and events[0][1]["retry_after"] >= 1
+
+def test_stalled_stream_does_not_hold_search_gate(monkeypatch):
+    """Test that a stream whose reader stops reading doesn't keep /search out of the admission gate"""
+    import asyncio
+    import httpx
+    from app.utils.admission import AdmissionGate
+
+    gate = AdmissionGate("search", max_concurrent=1, max_queue={"interactive": 0, "batch": 0})
+    monkeypatch.setattr(influencers, "search_gate", gate)
+
+    async def scenario():
+        first_event, stalled = asyncio.Event(), asyncio.Event()
+
+        async def receive():
+            await stalled.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            # Take the first event, then stop reading like a stalled client
+            if message["type"] == "http.response.body" and message.get("body"):
+                first_event.set()
+                await stalled.wait()
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/influencers/search/stream", "raw_path": b"/influencers/search/stream",
+            "query_string": b"q=stalled+stream+fitness+coach", "root_path": "", "headers": [(b"host", b"testserver")],
+            "client": ("testclient", 50000), "server": ("testserver", 80),
+        }
+        stream = asyncio.create_task(app(scope, receive, send))
+        try:
+            await asyncio.wait_for(first_event.wait(), timeout=30)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as concurrent:
+                return await concurrent.get("/influencers/search", params={"q": "search beside a stalled stream"})
+        finally:
+            stream.cancel()
+            await asyncio.gather(stream, return_exceptions=True)
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert gate.status()["in_flight"] == 0
+
+def test_index_snapshot(tmp_path, monkeypatch):
+    """Test exporting a snapshot and starting an index from it without encoding"""
+    import numpy as np
+    from app.utils.snapshots import Snapshot
+
+    response = client.get("/influencers/index/snapshot", params={"dtype": "int8"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    path = tmp_path / "influencers.snapshot"
+    path.write_bytes(response.content)
+
+    snapshot = Snapshot.open(str(path))
+    roster = influencers.influencer_store.all()
+    assert snapshot.ids == [str(record["id"]) for record in roster]
+    assert snapshot.records() == roster
+    assert snapshot.model_name == influencers.model_name and snapshot.template_hash == influencers.index_template_hash()
+    with influencers.index_registry.acquire() as version:
+        stored = version.collection.get(ids=snapshot.ids[:3], include=["embeddings"])
+    assert np.allclose(snapshot.vectors(slice(0, 3)), np.asarray(stored["embeddings"]), atol=0.01)
+
+    # A new node fills its index from the snapshot; only influencers missing from it are encoded
+    encoded = []
+    class CountingModel:
+        def encode(self, texts):
+            encoded.extend(texts)
+            return influencers.model.encode(texts)
+    extra = {**roster[0], "id": 99001, "name": "Snapshot Newcomer", "contact": "newcomer@example.com"}
+    monkeypatch.setattr(influencers, "roster_documents", lambda: (
+        snapshot.ids + ["99001"],
+        [influencers.generate_influencer_description(record) for record in roster + [extra]],
+        [influencers.influencer_metadata(record) for record in roster + [extra]],
+    ))
+    collection = influencers.chroma_client.create_collection(name="snapshot_restore_test")
+    try:
+        influencers.populate_from_snapshot(snapshot)(collection, influencers.model_name, CountingModel())
+        assert collection.count() == len(roster) + 1 and len(encoded) == 1
+    finally:
+        influencers.chroma_client.delete_collection(name="snapshot_restore_test")
+    snapshot.close()
+
+    # Snapshots of another model or template are not served
+    monkeypatch.setattr(influencers, "index_template_hash", lambda: "changed")
+    assert influencers.restore_snapshot(str(path)) is False
+
+def test_roster_conditional_requests():
+    """Test that roster GETs carry a version ETag and answer a matching If-None-Match with 304"""
+    response = client.get("/influencers/", params={"limit": 3})
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    # The TestClient accepts gzip, so the ETag may name the compressed representation
+    repeat = client.get("/influencers/", params={"limit": 3}, headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.headers["etag"] == etag and repeat.content == b""
+    assert client.get("/influencers/", params={"limit": 4}, headers={"If-None-Match": etag}).status_code == 200
+
+    rates = client.get(f"/influencers/{response.json()[0]['id']}/rates")
+    assert client.get(rates.url, headers={"If-None-Match": rates.headers["etag"]}).status_code == 304
+
+    # Any roster change gives every response a new ETag
+    record = dict(influencers.influencer_store.get(response.json()[0]["id"]))
+    client.post("/influencers/", json=[{**record, "followers": record["followers"] + 1}])
+    changed = client.get("/influencers/", params={"limit": 3}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    client.post("/influencers/", json=[record])
+
+def test_roster_writes_rejected_when_read_only(monkeypatch):
+    """Test that pre-forked workers reject upserts and index changes that would reach only one of them"""
+    monkeypatch.setattr(influencers, "ROSTER_READ_ONLY", True)
+    record = influencers.influencer_store.get(1)
+    version = influencers.influencer_store.version
+    for path, body in (("/influencers/", [record]), ("/influencers/reindex", None), ("/influencers/index/rebuild", None)):
+        response = client.post(path, json=body)
+        assert response.status_code == 409 and "read-only" in response.json()["detail"]
+    assert influencers.influencer_store.version == version
+    assert client.get("/influencers/", params={"limit": 1}).status_code == 200
+
+def test_large_responses_are_compressed():
+    """Test that large roster pages are compressed for clients that accept it"""
+    response = client.get("/influencers/", params={"limit": 1000}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers.get("content-encoding") == "gzip"
+    assert response.headers["etag"].endswith('-gzip"')
+    assert isinstance(response.json(), list)
+
+    plain = client.get("/influencers/", params={"limit": 1000}, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == response.json()
+
+def test_upserts_during_background_build_survive_swap(monkeypatch):
+    """Test that an influencer upserted while a new index version builds is in that version once it is active"""
+    import threading
+    from app.utils.encoders import load_encoder
+    from app.utils.index_versions import IndexRegistry
+
+    registry = IndexRegistry(influencers.chroma_client, model_loader=load_encoder, prefix="test_catch_up")
+    registry.register_model(influencers.model_name, influencers.model)
+    monkeypatch.setattr(influencers, "index_registry", registry)
+    registry.build(influencers.model_name, influencers.index_template_hash(), influencers.populate_in_process)
+
+    populating, release = threading.Event(), threading.Event()
+    def slow_populate(collection, version_model_name, version_model):
+        influencers.populate_in_process(collection, version_model_name, version_model)
+        populating.set()
+        release.wait(10)
+
+    assert registry.build_in_background("hashing-256", influencers.index_template_hash(), slow_populate,
+                                        influencers.catch_up_changes)
+    assert populating.wait(10)
+    record = {**influencers.influencer_store.all()[0], "id": 999999, "name": "Mid Build Upsert",
+              "contact": "midbuild@example.com"}
+    try:
+        influencers.upsert_influencers([record])
+        release.set()
+        for _ in range(100):
+            if registry.building is None:
+                break
+            threading.Event().wait(0.1)
+        assert registry.last_error is None
+        assert registry.active.model_name == "hashing-256"
+        assert registry.active.collection.get(ids=["999999"])["ids"] == ["999999"]
+    finally:
+        release.set()
+        influencers.chroma_client.delete_collection(registry.active.collection.name)
+
+def test_rebuild_rejects_invalid_model_name():
+    """Test that a model name no encoder can load is rejected before a build starts"""
+    response = client.post("/influencers/index/rebuild", params={"model": "hashing-other"})
+    assert response.status_code == 400
+    assert influencers.index_registry.building is None
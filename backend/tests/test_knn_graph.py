@@ -0,0 +1,76 @@
+import random
+
+import numpy as np
+
+from app.utils.encoders import HashingEncoder
+from app.utils.knn_graph import KnnGraph, nearest
+from app.utils.matching import RosterMatrix
+from benchmarks.roster import generate_roster
+
+encoder = HashingEncoder(64)
+
+
+def make_matrix(records):
+    matrix = RosterMatrix(encoder.dimension)
+    matrix.upsert(records, encoder.encode([record["description"] for record in records]))
+    return matrix
+
+
+def similarities(graph, record_id):
+    return [round(similarity, 5) for _, similarity in graph.neighbours(record_id)]
+
+
+def test_blocked_build_matches_brute_force():
+    """Test that a build in many small blocks finds every record's exact neighbours"""
+    matrix = make_matrix(generate_roster(300, seed=1))
+    ids, embeddings, _ = matrix.snapshot()
+    graph = KnnGraph(k=5, max_block_bytes=4 * 300 * 7)  # 7 rows per block
+    graph.build(ids, embeddings)
+    assert len(graph) == 300
+    for record_id in (1, 150, 300):
+        expected = nearest(matrix, record_id, 5)
+        assert similarities(graph, record_id) == [round(similarity, 5) for _, similarity in expected]
+        assert record_id not in [neighbour_id for neighbour_id, _ in graph.neighbours(record_id)]
+
+
+def test_incremental_updates_match_a_fresh_build():
+    """Test that upserts, changes and deletes applied one at a time keep the graph exact"""
+    rng = random.Random(4)
+    roster = generate_roster(600, seed=4)
+    matrix = make_matrix(roster[:200])
+    graph = KnnGraph(k=6, max_block_bytes=4096)
+    graph.build(*matrix.snapshot()[:2])
+    live = {record["id"] for record in roster[:200]}
+    for record in roster[200:]:
+        matrix.upsert([record], encoder.encode([record["description"]]))
+        graph.update(matrix, [record["id"]])
+        live.add(record["id"])
+        if rng.random() < 0.3:
+            record_id = rng.choice(sorted(live))
+            matrix.delete([record_id])
+            graph.update(matrix, [record_id])
+            live.discard(record_id)
+        if rng.random() < 0.3:
+            record_id, other = rng.choice(sorted(live)), rng.choice(roster)
+            matrix.upsert([{**other, "id": record_id}], encoder.encode([other["description"]]))
+            graph.update(matrix, [record_id])
+
+    fresh = KnnGraph(k=6)
+    fresh.build(*matrix.snapshot()[:2])
+    assert len(graph) == len(live)
+    for record_id in live:
+        assert similarities(graph, record_id) == similarities(fresh, record_id)
+    assert all(graph.neighbours(record_id) is None for record_id in set(range(1, 601)) - live)
+
+
+def test_small_rosters():
+    """Test that rosters smaller than k give every other record as a neighbour"""
+    matrix = RosterMatrix(2)
+    records = [{"id": i, "category": "tech", "region": "India", "followers": 1000, "engagement_rate": 1.0} for i in (1, 2, 3)]
+    matrix.upsert(records, np.array([[1.0, 0.0], [0.8, 0.6], [0.0, 1.0]]))
+    graph = KnnGraph(k=10)
+    graph.build(*matrix.snapshot()[:2])
+    assert [neighbour_id for neighbour_id, _ in graph.neighbours(1)] == [2, 3]
+    matrix.delete([2])
+    graph.update(matrix, [2])
+    assert graph.neighbours(1) == [(3, 0.0)]
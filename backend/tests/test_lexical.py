@@ -0,0 +1,63 @@
+from app.utils.lexical import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+ROSTER = [
+    {"id": 1, "name": "Priya Sharma", "category": "fashion", "region": "India", "platforms": ["Instagram"],
+     "rate_card": "₹50,000 per post", "contact": "priya.sharma@influencer.com",
+     "description": "Sustainable fashion and Indian traditional wear"},
+    {"id": 2, "name": "Raj Patel", "category": "tech", "region": "India", "platforms": ["YouTube"],
+     "rate_card": "₹100,000 per video", "contact": "raj@techreviews.in",
+     "description": "Tech reviewer covering smartphones and laptops"},
+    {"id": 3, "name": "Emma Wilson", "category": "beauty", "region": "UK", "platforms": ["Instagram", "Blog"],
+     "rate_card": "£2,500 per post", "contact": "emma@beautyblog.uk",
+     "description": "Skincare routines and makeup tutorials, with the odd fashion haul"},
+]
+
+
+def test_tokenize_splits_handles_and_drops_stopwords():
+    """Test that e-mail handles split into words and common words are skipped"""
+    assert tokenize("raj@techreviews.in") == ["raj", "techreviews"]
+    assert tokenize("Fashion influencers in India") == ["fashion", "influencers", "india"]
+
+
+def test_search_ranks_name_and_handle_matches():
+    """Test that names and handles find their creator, and field weights favour the name"""
+    index = LexicalIndex(ROSTER)
+    assert index.search("techreviews")[0][0] == 2
+    assert index.search("Priya Sharma")[0][0] == 1
+    # "fashion" is Priya's category but only a word in Emma's description
+    assert [record_id for record_id, _ in index.search("fashion")] == [1, 3]
+    assert index.search("nonexistent words") == []
+
+
+def test_search_accept_filters_results():
+    """Test that the accept predicate restricts results without losing the ranking"""
+    index = LexicalIndex(ROSTER)
+    assert index.search("fashion", accept=lambda record_id: record_id != 1) == index.search("fashion")[1:]
+
+
+def test_upsert_and_delete_update_the_index_incrementally():
+    """Test that replaced and deleted records stop matching and new ones match immediately"""
+    index = LexicalIndex(ROSTER)
+    assert index.search("techreviews")  # Warm the per-term score cache
+
+    index.upsert([{**ROSTER[1], "contact": "raj@gadgetlab.in"}])
+    assert index.search("techreviews") == []
+    assert index.search("gadgetlab")[0][0] == 2
+
+    index.delete([2])
+    assert len(index) == 2
+    assert index.search("gadgetlab") == []
+
+    index.upsert([{**ROSTER[0], "id": 4, "name": "Priya Nair", "contact": "priya@nair.in"}])
+    assert {record_id for record_id, _ in index.search("priya")} == {1, 4}
+    assert index.search("nair")[0][0] == 4
+
+
+def test_reciprocal_rank_fusion():
+    """Test that items ranked by both lists win and weights shift the balance"""
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "d"]])
+    assert fused[0][0] == "b"
+    assert {item for item, _ in fused} == {"a", "b", "c", "d"}
+
+    weighted = reciprocal_rank_fusion([["a", "b"], ["c", "d"]], weights=[1.0, 2.0])
+    assert weighted[0][0] == "c"
@@ -0,0 +1,51 @@
+import io
+import json
+import logging
+import queue
+from app.utils.logging_config import (
+    DebugSamplingFilter, JSONFormatter, NonBlockingQueueHandler, current_route, debug_sampled, parse_sample_rates
+)
+
+def make_record(level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_includes_extra_fields():
+    """Test that records become one JSON object with lazily formatted message and extras"""
+    entry = json.loads(JSONFormatter().format(make_record(result_ids=[1, 2], route="/influencers/search")))
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["result_ids"] == [1, 2]
+    assert entry["route"] == "/influencers/search"
+
+def test_debug_sampling_filter():
+    """Test that DEBUG lines are dropped for unsampled requests only"""
+    sampling = DebugSamplingFilter()
+    route_token = current_route.set("/influencers/search")
+    token = debug_sampled.set(False)
+    try:
+        assert not sampling.filter(make_record(logging.DEBUG))
+        info = make_record(logging.INFO)
+        assert sampling.filter(info)
+        assert info.route == "/influencers/search"
+    finally:
+        debug_sampled.reset(token)
+        current_route.reset(route_token)
+    assert sampling.filter(make_record(logging.DEBUG))
+
+def test_queue_handler_drops_instead_of_blocking():
+    """Test that a full queue drops records rather than blocking the caller"""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.emit(make_record())
+    handler.emit(make_record())
+    assert handler.dropped == 1
+    # Records are enqueued unformatted
+    assert handler.queue.get_nowait().args == ("world",)
+
+def test_parse_sample_rates():
+    """Test the per-route sampling specification"""
+    assert parse_sample_rates("/influencers/search=0.01, /outreach/email=0.5") == {
+        "/influencers/search": 0.01, "/outreach/email": 0.5
+    }
+    assert parse_sample_rates("") == {}
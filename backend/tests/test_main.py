@@ -1,3 +1,8 @@
+import json
+import os
+import subprocess
+import sys
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -32,3 +37,44 @@ def test_api_docs_available():
     # Check that the response contains OpenAPI documentation
     assert "text/html" in response.headers["content-type"]
     assert "swagger" in response.text.lower()
+
+def test_metrics_endpoint():
+    """Test that per-route latency is exposed in the Prometheus format"""
+    client.get("/")
+    response = client.get("/metrics")
+    
+    # Check status code and format
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'brandsync_http_requests_total{method="GET",route="/",status="200"}' in response.text
+
+# Imports the app the way the pre-fork master does, then runs its startup and shutdown
+STARTUP_SCRIPT = """
+import json, os, threading
+from fastapi.testclient import TestClient
+from app.main import app
+
+def state():
+    return {"threads": sorted(t.name for t in threading.enumerate()),
+            "databases": sorted(os.listdir(os.environ["BRANDSYNC_DATA_DIR"]))}
+
+imported = state()
+with TestClient(app):
+    started = state()
+print(json.dumps({"imported": imported, "started": started}))
+"""
+
+def test_background_services_start_on_startup_not_import(tmp_path):
+    """Test that importing the app opens no database and starts no thread, and startup does both"""
+    env = {key: value for key, value in os.environ.items() if key not in ("SCHEDULER_DB_PATH", "NEGOTIATION_DB_PATH")}
+    env.update(BRANDSYNC_DATA_DIR=str(tmp_path), DEFER_VECTOR_DB_INIT="true", EMBEDDING_ENCODER="hashing")
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=backend, env=env, capture_output=True,
+                            text=True, timeout=120, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    background = {"outreach-scheduler", "negotiation-writer", "outreach-history"}
+    assert not background & set(result["imported"]["threads"])
+    assert result["imported"]["databases"] == []
+    assert background <= set(result["started"]["threads"])
+    assert {"outreach_jobs.sqlite3", "negotiations.sqlite3"} <= set(result["started"]["databases"])
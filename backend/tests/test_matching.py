@@ -0,0 +1,68 @@
+import numpy as np
+
+from app.utils.matching import RosterMatrix, shortlist
+
+ROSTER = [
+    {"id": 1, "category": "fashion", "region": "India", "platforms": ["Instagram", "YouTube"], "followers": 1200000,
+     "engagement_rate": 4.8, "rate_card": "₹50,000 per post, ₹150,000 per video"},
+    {"id": 2, "category": "fitness", "region": "USA", "platforms": ["Instagram", "YouTube"], "followers": 850000,
+     "engagement_rate": 5.2, "rate_card": "$3,000 per post, $8,000 per video"},
+    {"id": 3, "category": "fashion", "region": "UK", "platforms": ["Instagram", "Blog"], "followers": 1500000,
+     "engagement_rate": 3.9, "rate_card": "£2,500 per post, £5,000 for sponsored blog"},
+    {"id": 4, "category": "fashion", "region": "India", "platforms": ["Instagram"], "followers": 40000,
+     "engagement_rate": 7.5, "rate_card": "₹20,000 per post"},
+]
+# Two topical directions: fashion creators point along the first axis
+EMBEDDINGS = np.array([[1.0, 0.1], [0.0, 1.0], [0.9, 0.3], [0.8, 0.2]])
+
+
+def make_matrix():
+    matrix = RosterMatrix(2, capacity=2)
+    matrix.upsert(ROSTER, EMBEDDINGS)
+    return matrix
+
+
+def test_score_filters_by_price_and_fields():
+    """Test that only creators pricing every deliverable within the budget are scored"""
+    matrix = make_matrix()
+    scored = matrix.score([1.0, 0.0], {"post": 2, "video": 1})
+    assert sorted(scored["ids"].tolist()) == [1, 2]
+    assert dict(zip(scored["ids"].tolist(), scored["cost"].round(2))) == {1: 3012.05, 2: 14000.0}
+
+    assert matrix.score([1.0, 0.0], {"post": 1}, max_cost=1000)["ids"].tolist() == [1, 4]
+    assert matrix.score([1.0, 0.0], {"post": 1}, region="india", platform="instagram")["ids"].tolist() == [1, 4]
+    assert matrix.score([1.0, 0.0], {"post": 1}, category="music")["ids"].tolist() == []
+
+
+def test_weights_change_the_ranking():
+    """Test that relevance leads by default and other components can take over"""
+    matrix = make_matrix()
+    scored = matrix.score([1.0, 0.0], {"post": 1})
+    best = scored["ids"][np.argmax(scored["score"])]
+    assert best in (1, 3, 4) and scored["relevance"].max() <= 1.0
+
+    reach_only = matrix.score([1.0, 0.0], {"post": 1}, weights={"relevance": 0, "engagement": 0, "value": 0, "reach": 1})
+    assert reach_only["ids"][np.argmax(reach_only["score"])] == 3
+
+
+def test_shortlist_respects_the_total_budget():
+    """Test greedy selection in score order within the budget"""
+    matrix = make_matrix()
+    scored = matrix.score([0.0, 1.0], {"post": 1}, weights={"relevance": 1, "engagement": 0, "reach": 0, "value": 0})
+    assert [record_id for record_id, _ in shortlist(scored, limit=10)] == [2, 3, 4, 1]
+    # $3,000 leaves room for creator 4 and 1 but not creator 3 (about $3,165)
+    assert [record_id for record_id, _ in shortlist(scored, limit=10, budget=4000)] == [2, 4, 1]
+    assert [record_id for record_id, _ in shortlist(scored, limit=1)] == [2]
+
+
+def test_upsert_and_delete_keep_rows_dense():
+    """Test that replaced and deleted records are reflected and other rows survive the move"""
+    matrix = make_matrix()
+    matrix.upsert([{**ROSTER[1], "rate_card": "$500 per post"}], [[0.0, 1.0]])
+    assert len(matrix) == 4
+    matrix.delete([1, 99])
+    assert len(matrix) == 3 and 1 not in matrix
+    assert sorted(matrix.ids().tolist()) == [2, 3, 4]
+    np.testing.assert_allclose(matrix.embedding(4), EMBEDDINGS[3] / np.linalg.norm(EMBEDDINGS[3]), rtol=1e-6)
+    scored = matrix.score([0.0, 1.0], {"post": 1}, max_cost=600)
+    assert sorted(scored["ids"].tolist()) == [2, 4]
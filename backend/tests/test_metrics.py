@@ -0,0 +1,44 @@
+from app.utils.metrics import Counter, Histogram, Registry, time_provider, PROVIDER_SECONDS
+
+def test_counter_labels():
+    """Test counting per label set"""
+    counter = Counter("test_total", "Test counter", ("cache", "result"))
+    counter.inc(cache="search", result="hit")
+    counter.inc(2, cache="search", result="hit")
+    counter.inc(cache="search", result="miss")
+    assert counter.value(cache="search", result="hit") == 3
+    assert 'test_total{cache="search",result="miss"} 1' in counter.samples()
+
+def test_histogram_buckets_are_cumulative():
+    """Test histogram bucketing and exposition"""
+    histogram = Histogram("test_seconds", "Test histogram", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, stage="encode")
+    samples = histogram.samples()
+    assert 'test_seconds_bucket{stage="encode",le="0.1"} 1' in samples
+    assert 'test_seconds_bucket{stage="encode",le="1.0"} 2' in samples
+    assert 'test_seconds_bucket{stage="encode",le="+Inf"} 3' in samples
+    assert 'test_seconds_count{stage="encode"} 3' in samples
+    assert histogram.count(stage="encode") == 3
+
+def test_registry_render():
+    """Test the Prometheus text format headers"""
+    registry = Registry()
+    registry.counter("test_errors_total", "Errors", ("component",)).inc(component="email")
+    text = registry.render()
+    assert "# TYPE test_errors_total counter" in text
+    assert 'test_errors_total{component="email"} 1' in text
+
+def test_time_provider_outcome():
+    """Test that provider calls are labelled by outcome"""
+    with time_provider("test_provider") as call:
+        call["outcome"] = "error"
+    try:
+        with time_provider("test_provider"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    with time_provider("test_provider"):
+        pass
+    assert PROVIDER_SECONDS.count(provider="test_provider", outcome="error") == 2
+    assert PROVIDER_SECONDS.count(provider="test_provider", outcome="ok") == 1
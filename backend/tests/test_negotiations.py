@@ -0,0 +1,115 @@
+import os
+import statistics
+import threading
+
+import pytest
+
+from app.utils.negotiations import NegotiationStore
+
+NOW = 1_700_000_000.0
+
+
+def summary(**fields):
+    return {
+        "influencer_name": "Priya Sharma",
+        "brand_name": "GlowUp Cosmetics",
+        "campaign_name": "Diwali Glow Campaign",
+        "deliverables": "1 Instagram post",
+        "timeline": "2 weeks",
+        "status": "accepted",
+        "timestamp": NOW,
+        **fields,
+    }
+
+
+def test_batched_writes(tmp_path):
+    """Test that concurrent summaries are committed in shared transactions and survive reopening"""
+    store = NegotiationStore(str(tmp_path / "negotiations.sqlite3"), max_batch=50)
+    futures = []
+    lock = threading.Lock()
+
+    def add(offset):
+        for i in range(offset, offset + 50):
+            future = store.add(summary(influencer_id=i, notes=f"note {i}"), NOW)
+            with lock:
+                futures.append(future)
+
+    threads = [threading.Thread(target=add, args=(offset,)) for offset in range(0, 200, 50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ids = [future.result(timeout=5) for future in futures]
+    assert len(set(ids)) == 200
+    assert store.flush(timeout=5)
+    assert store.written == 200 and store.batches < 200
+    store.close()
+
+    reopened = NegotiationStore(str(tmp_path / "negotiations.sqlite3"))
+    assert reopened.counts() == {"accepted": 200}
+    record = reopened.get(ids[0])
+    assert record.notes.startswith("note ") and record.to_dict()["timestamp"].startswith("2023-11-14")
+    assert [r.influencer_id for r in reopened.list(influencer_id=7)] == [7]
+    reopened.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_forked_process_writes(tmp_path):
+    """Test that a process forked from one with a running writer commits its own summaries"""
+    store = NegotiationStore(str(tmp_path / "negotiations.sqlite3"))
+    parent_id = store.add(summary(influencer_id=1), NOW).result(timeout=5)
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            child_id = store.add(summary(influencer_id=2), NOW).result(timeout=5)
+            status = 0 if store.get(child_id).influencer_id == 2 else 1
+        finally:
+            os._exit(status)
+    _, exit_status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(exit_status) and os.WEXITSTATUS(exit_status) == 0
+    assert store.add(summary(influencer_id=3), NOW).result(timeout=5) > parent_id
+    assert sorted(r.influencer_id for r in store.list()) == [1, 2, 3]
+    store.close()
+
+
+def test_acceptance_rates(tmp_path):
+    """Test acceptance rates by category and region, counting only decided negotiations"""
+    store = NegotiationStore(str(tmp_path / "negotiations.sqlite3"))
+    outcomes = [("Beauty", "India", "accepted")] * 3 + [("Beauty", "India", "rejected"), ("Beauty", "UK", "pending"),
+                                                       ("Tech", "UK", "rejected"), ("Tech", None, "pending")]
+    for category, region, status in outcomes:
+        store.add(summary(category=category, region=region, status=status), NOW)
+    store.flush()
+
+    by_category = {row["category"]: row for row in store.acceptance("category")}
+    assert by_category["Beauty"] == {"category": "Beauty", "negotiations": 5, "accepted": 3, "rejected": 1,
+                                     "pending": 1, "acceptance_rate": 0.75}
+    assert by_category["Tech"]["acceptance_rate"] == 0.0
+    by_region = {row["region"]: row for row in store.acceptance("region")}
+    assert by_region[None]["acceptance_rate"] is None and by_region["UK"]["negotiations"] == 2
+    assert store.acceptance("category", since=NOW + 1) == []
+    store.close()
+
+
+def test_median_budgets(tmp_path):
+    """Test the median agreed budget per campaign over accepted, priced negotiations"""
+    store = NegotiationStore(str(tmp_path / "negotiations.sqlite3"))
+    budgets = {1: [1000, 5000, 2000, 8000], 2: [300, 100, 200]}
+    for campaign_id, amounts in budgets.items():
+        for amount in amounts:
+            store.add(summary(campaign_id=campaign_id, campaign_name=f"Campaign {campaign_id}",
+                              agreed_budget=f"${amount}", agreed_budget_usd=amount), NOW)
+    store.add(summary(campaign_id=1, campaign_name="Campaign 1", status="rejected", agreed_budget_usd=99999), NOW)
+    store.add(summary(campaign_id=2, campaign_name="Campaign 2", agreed_budget="TBD"), NOW)
+    store.add(summary(campaign_name="Unpriced", status="pending"), NOW)
+    store.flush()
+
+    rows = {row["campaign_name"]: row for row in store.budgets()}
+    assert rows["Campaign 1"]["median_agreed_budget_usd"] == statistics.median(budgets[1]) == 3500
+    assert rows["Campaign 1"]["negotiations"] == 5 and rows["Campaign 1"]["priced"] == 4
+    assert rows["Campaign 2"]["median_agreed_budget_usd"] == 200 and rows["Campaign 2"]["accepted"] == 4
+    assert rows["Campaign 2"]["total_agreed_budget_usd"] == 600
+    assert rows["Unpriced"]["median_agreed_budget_usd"] is None and rows["Unpriced"]["priced"] == 0
+    assert [row["campaign_id"] for row in store.budgets(campaign_id=2)] == [2]
+    store.close()
@@ -298,3 +298,114 @@ def test_negotiation_summary(valid_negotiation_summary):
     assert data["status"] == valid_negotiation_summary["status"]
     assert data["agreed_budget"] == valid_negotiation_summary["agreed_budget"]
     assert "timestamp" in data
+
+def test_negotiation_analytics(valid_negotiation_summary):
+    """Test that stored summaries feed the acceptance and budget aggregates"""
+    ids = []
+    for budget, outcome in [("$3,000", "accepted"), ("$5,000", "Accepted"), ("$4,000", "accepted"), (None, "rejected")]:
+        response = client.post("/outreach/negotiation/summary", json={
+            **valid_negotiation_summary, "agreed_budget": budget, "status": outcome,
+            "influencer_id": 1, "campaign_id": 4242,
+        })
+        assert response.status_code == 200
+        data = response.json()
+        # Category and region come from the roster
+        assert data["category"] == "fashion" and data["region"] == "India"
+        assert data["status"] == outcome.lower()
+        ids.append(data["id"])
+    assert data["agreed_budget_usd"] is None
+
+    stored = client.get("/outreach/negotiation/summaries", params={"campaign_id": 4242}).json()
+    assert sorted(summary["id"] for summary in stored) == sorted(ids)
+
+    acceptance = client.get("/outreach/negotiation/acceptance", params={"by": "region", "campaign_id": 4242}).json()
+    assert acceptance == [{"region": "India", "negotiations": 4, "accepted": 3, "rejected": 1, "pending": 0, "acceptance_rate": 0.75}]
+    assert client.get("/outreach/negotiation/acceptance", params={"by": "notes"}).status_code == 422
+
+    budgets = client.get("/outreach/negotiation/budgets", params={"campaign_id": 4242}).json()
+    assert budgets[0]["median_agreed_budget_usd"] == 4000 and budgets[0]["total_agreed_budget_usd"] == 12000
+
+def test_schedule_email(monkeypatch, valid_email_payload):
+    """Test scheduling an email: it is sent once through the email path and can't be scheduled twice"""
+    import time
+    from app.endpoints import outreach
+
+    monkeypatch.setattr(outreach.scheduler, "windows", {})  # Send now, whatever the time of day
+    schedule = {"emails": [{**valid_email_payload, "use_mock": True, "region": "India"}]}
+    with patch.dict('os.environ', {
+        'SENDGRID_API_KEY': 'test_api_key',
+        'DEFAULT_SENDER_EMAIL': 'sender@example.com'
+    }):
+        response = client.post("/outreach/schedule/email", json=schedule)
+        assert response.status_code == 202
+        assert response.json()["scheduled"] == 1
+        job = response.json()["jobs"][0]
+        assert job["idempotency_key"] == "email:1:1" and job["region"] == "India"
+
+        for _ in range(100):
+            outreach.scheduler.tick()
+            outreach.scheduler.drain(timeout=5)
+            job = client.get(f"/outreach/jobs/{job['id']}").json()
+            if job["status"] != "pending":
+                break
+            time.sleep(0.02)
+    assert job["status"] == "sent" and job["result"]["success"] is True
+
+    # Scheduling the same influencer and campaign again returns the sent job
+    repeated = client.post("/outreach/schedule/email", json=schedule).json()
+    assert repeated["scheduled"] == 0 and repeated["jobs"][0]["id"] == job["id"]
+    assert client.delete(f"/outreach/jobs/{job['id']}").status_code == 409
+    assert client.get("/outreach/jobs/999999").status_code == 404
+    assert job["id"] in [listed["id"] for listed in client.get("/outreach/jobs", params={"status": "sent"}).json()]
+    assert client.get("/outreach/scheduler").json()["jobs"]["sent"] >= 1
+
+def test_cancel_scheduled_call():
+    """Test that a call scheduled for later can be cancelled before it is placed"""
+    response = client.post("/outreach/schedule/voice", json={"calls": [{
+        "phone_number": "+12345678901",
+        "influencer_name": "Test Influencer",
+        "brand_name": "Test Brand",
+        "campaign_name": "Test Campaign",
+        "deliverables": "1 video",
+        "timeline": "2 weeks",
+        "budget_range": "$1,000",
+        "not_before": "2099-01-05T12:00:00Z",
+    }]})
+    assert response.status_code == 202
+    job = response.json()["jobs"][0]
+    assert job["run_at"].startswith("2099-01-05")
+
+    cancelled = client.delete(f"/outreach/jobs/{job['id']}")
+    assert cancelled.status_code == 200 and cancelled.json()["status"] == "cancelled"
+    assert client.post(f"/outreach/jobs/{job['id']}/retry").status_code == 409
+
+def test_search_outreach_history(valid_negotiation_summary, valid_email_payload):
+    """Test that negotiation notes and sent emails become searchable, filtered by campaign and influencer"""
+    from app.endpoints import outreach
+
+    notes = {
+        9101: "Asked for exclusive usage rights for six months before agreeing to the reel",
+        9102: "Countered with a lower fee if we drop the YouTube video and add two stories",
+    }
+    for campaign_id, text in notes.items():
+        response = client.post("/outreach/negotiation/summary", json={
+            **valid_negotiation_summary, "notes": text, "campaign_id": campaign_id, "influencer_id": 2,
+        })
+        assert response.status_code == 200
+    with patch.dict('os.environ', {'SENDGRID_API_KEY': 'test_api_key', 'DEFAULT_SENDER_EMAIL': 'sender@example.com'}):
+        response = client.post("/outreach/email", json={
+            **valid_email_payload, "use_mock": True, "campaign_id": 9101,
+            "message": "Following up on usage rights: we can offer three months of paid usage",
+        })
+        assert response.status_code == 200
+    assert outreach.outreach_history.flush(timeout=10)
+
+    results = client.get("/outreach/history/search", params={"q": "exclusive usage rights", "campaign_id": 9101}).json()
+    assert {result["kind"] for result in results} == {"negotiation", "email"}
+    assert all(result["campaign_id"] == 9101 for result in results)
+    assert results[0]["text"] == notes[9101] and results[0]["influencer_id"] == 2
+
+    emails = client.get("/outreach/history/search", params={"q": "usage rights", "kind": "email", "campaign_id": 9101}).json()
+    assert [result["kind"] for result in emails] == ["email"]
+    assert client.get("/outreach/history/search", params={"q": "fee", "campaign_id": 9102, "influencer_id": 2}).json()[0]["text"] == notes[9102]
+    assert client.get("/outreach/history/index").json()["pending"] == 0
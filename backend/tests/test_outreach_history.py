@@ -0,0 +1,50 @@
+import uuid
+
+from app.utils.encoders import HashingEncoder
+from app.utils.outreach_history import OutreachHistoryIndex
+from app.utils.vector_search import VectorSearch
+
+
+def make_index(**options):
+    search = VectorSearch(collection_name=f"test_history_{uuid.uuid4().hex[:8]}", encoder=HashingEncoder())
+    return OutreachHistoryIndex(search, **options)
+
+
+def test_batched_background_indexing():
+    """Test that queued documents are embedded in batches, blank ones skipped and re-added ones replaced"""
+    index = make_index(batch_size=16)
+    for i in range(100):
+        assert index.add("email", i, f"Follow-up email number {i} about the spring launch", campaign_id=i % 4, influencer_id=None)
+    assert not index.add("negotiation", 1, "   ")
+    index.add("negotiation", 1, "Wants a longer timeline for the video", campaign_id=1)
+    index.add("negotiation", 1, "Agreed to two reels instead of one video", campaign_id=1)
+    assert index.flush(timeout=10)
+
+    status = index.status()
+    assert status["documents"] == 101 and status["pending"] == 0 and status["errors"] == 0
+    assert status["batches"] >= 7  # At most 16 documents per encoder call
+
+    results = index.query("two reels instead of a video", kind="negotiation")
+    assert len(results) == 1 and results[0]["text"] == "Agreed to two reels instead of one video"
+    assert results[0]["id"] == "negotiation:1" and results[0]["campaign_id"] == 1
+    assert "influencer_id" not in index.query("spring launch", top_k=1)[0]
+    assert {result["campaign_id"] for result in index.query("spring launch", top_k=20, campaign_id=3)} == {3}
+
+
+
+def test_worker_starts_on_first_use_and_backfills_per_process():
+    """Test that the worker starts with the first document and that a forked process starts and backfills its own"""
+    stored = ["Asked for usage rights for twelve months"]
+    index = make_index(backfill=lambda: [index.add("negotiation", i, text) for i, text in enumerate(stored)])
+    assert index._thread is None
+    index.add("email", 1, "Spring launch brief")
+    assert index.flush(timeout=10) and index.status()["documents"] == 2
+
+    # What the fork hook does in a child: no worker, nothing queued, a fresh collection on first use
+    index._after_fork()
+    index.search._after_fork()
+    index.search.collection_name += "_child"
+    assert index._thread is None
+    index.add("email", 2, "Summer launch brief")
+    assert index.flush(timeout=10)
+    assert {result["id"] for result in index.query("launch brief usage rights", top_k=5)} == {"negotiation:0", "email:2"}
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from app.utils.rate_cards import (
+    FxTable, base_costs, normalize_deliverable, parse_budget, parse_deliverables, parse_rate_card, record_costs
+)
+from benchmarks.roster import iter_roster
+
+
+def quoted(text):
+    return [(price.deliverable, price.amount, price.currency) for price in parse_rate_card(text)]
+
+
+def test_parse_rate_card_formats():
+    """Test the currencies and phrasings found in the roster"""
+    assert quoted("₹50,000 per post, ₹150,000 per video") == [("post", 50000, "INR"), ("video", 150000, "INR")]
+    assert quoted("£2,500 per post, £5,000 for sponsored blog") == [("post", 2500, "GBP"), ("blog", 5000, "GBP")]
+    assert quoted("MX$12,000 per post and R$3,000 per stream") == [("post", 12000, "MXN"), ("stream", 3000, "BRL")]
+    assert quoted("Rp1,500,000 per post; CA$900/tweet") == [("post", 1500000, "IDR"), ("tweet", 900, "CAD")]
+    assert quoted("USD 2.5k per reel, €1.200 per post") == [("reel", 2500, "USD"), ("post", 1200, "EUR")]
+    assert quoted("€1.200,50 per post") == [("post", 1200.5, "EUR")]
+    assert quoted("₹1.5 lakh per video, ₹2 crore per stream") == [("video", 150000, "INR"), ("stream", 20000000, "INR")]
+    assert quoted("Rates on request") == []
+
+
+def test_normalize_deliverable():
+    assert normalize_deliverable("Videos") == "video"
+    assert normalize_deliverable("sponsored blog") == "blog"
+    assert normalize_deliverable("live stream") == "stream"
+    assert normalize_deliverable("podcast episode") == "podcast episode"
+
+
+def test_costs_are_converted_to_the_base_currency():
+    """Test FX conversion, keeping the cheapest quote, and unknown currencies"""
+    fx = FxTable({"INR": 80.0, "GBP": 0.8})
+    assert base_costs("₹40,000 per post, ₹80,000 per post", fx) == {"post": 500.0}
+    assert record_costs("£400 per post, £2,000 per video", fx) == {"cost_per_post": 500.0, "cost_per_video": 2500.0}
+    assert base_costs("CHF 500 per post", fx) == {}
+
+
+def test_fx_table_loads_overrides(tmp_path):
+    path = tmp_path / "fx.json"
+    path.write_text(json.dumps({"INR": 100, "CHF": 0.9}))
+    fx = FxTable.load(str(path))
+    assert fx.convert(1000, "INR") == 10.0
+    assert fx.convert(900, "chf") == pytest.approx(1000.0)
+    assert fx.convert(1, "XYZ") is None
+    # A missing file falls back to the built-in table
+    assert FxTable.load(str(tmp_path / "missing.json")).convert(83, "INR") == 1.0
+
+
+def test_every_generated_rate_card_parses():
+    """Test that the synthetic roster's rate cards all yield a per-post price in USD"""
+    for record in iter_roster(500, seed=5):
+        prices = parse_rate_card(record["rate_card"])
+        assert len(prices) == record["rate_card"].count(" per ")
+        assert prices[0].deliverable == "post" and prices[0].base_amount > 0
+
+
+def test_parse_deliverables():
+    """Test counting the deliverables of a campaign brief"""
+    assert parse_deliverables("2 Instagram posts, 1 YouTube video and 3 tweets") == {"post": 2, "video": 1, "tweet": 3}
+    assert parse_deliverables("one reel + two stories") == {"reel": 1, "story": 2}
+    assert parse_deliverables("Instagram post x2; a sponsored blog") == {"post": 2, "blog": 1}
+    assert parse_deliverables("podcast mention") == {"podcast mention": 1}
+
+
+def test_parse_budget():
+    """Test budget ranges in different currencies and phrasings"""
+    assert parse_budget("$10,000 - $20,000") == (10000, 20000)
+    assert parse_budget("10k-20k USD") == (10000, 20000)
+    assert parse_budget("INR 83,000 - 1.66 lakh") == (1000, 2000)
+    assert parse_budget("up to £790") == (None, pytest.approx(1000))
+    assert parse_budget("$5,000+") == (5000, None)
+    assert parse_budget("negotiable") == (None, None)
+    assert parse_budget("between $10k and 20k") == (10000, 20000)
+    assert parse_budget("€1.200,50") == (None, pytest.approx(1304.89, abs=0.01))
+
+
+def test_parse_budget_ignores_unrelated_numbers():
+    """Test that numbers without a currency or scale don't become bounds next to an amount that has one"""
+    assert parse_budget("2023 campaign $5000") == (None, 5000)
+    assert parse_budget("$5,000 for 3 posts") == (None, 5000)
+    assert parse_budget("Q3 2024 budget 10k-20k") == (10000, 20000)
+    assert parse_budget("$10,000 - 20,000") == (10000, 20000)
+    # Two amounts without a range separator aren't a range
+    assert parse_budget("$5,000 $8,000") == (None, 5000)
+    assert parse_budget("5000-10000") == (5000, 10000)
@@ -0,0 +1,32 @@
+import uuid
+
+import pytest
+
+from app.utils.encoders import SentenceTransformerEncoder
+from app.utils.vector_search import VectorSearch
+
+# Loads (and on first use downloads) the real model; run with pytest -m real_model
+pytestmark = pytest.mark.real_model
+
+
+@pytest.fixture(scope="module")
+def encoder():
+    return SentenceTransformerEncoder("all-MiniLM-L6-v2")
+
+
+def test_encoder_dimension(encoder):
+    assert encoder.dimension == 384
+    assert encoder.encode("fashion").shape == (384,)
+
+
+def test_semantic_search_without_shared_words(encoder):
+    """The real model matches on meaning, which the hashing encoder can't"""
+    search = VectorSearch(collection_name=f"real_model_{uuid.uuid4().hex[:8]}", encoder=encoder)
+    search.add_items([
+        {"id": 1, "category": "tech", "description": "Reviews of smartphones, laptops and gadgets"},
+        {"id": 2, "category": "fitness", "description": "Home workouts and strength training"},
+    ])
+
+    results = search.search("people who review mobile phones", top_k=1)
+
+    assert results[0]["category"] == "tech"
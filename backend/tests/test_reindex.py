@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from app.utils.reindex import ReindexCheckpoint, reindex, roster_fingerprint
+
+class RecordingCollection:
+    """Minimal stand-in for a ChromaDB collection that records upserts"""
+    def __init__(self):
+        self.upserts = []
+
+    def upsert(self, ids, embeddings, metadatas):
+        self.upserts.append((ids, embeddings, metadatas))
+
+def test_fingerprint_changes_with_input():
+    """Test that the fingerprint depends on model, records and shard size"""
+    base = roster_fingerprint("model-a", ["1", "2"], ["a", "b"], 10)
+    assert base == roster_fingerprint("model-a", ["1", "2"], ["a", "b"], 10)
+    assert base != roster_fingerprint("model-b", ["1", "2"], ["a", "b"], 10)
+    assert base != roster_fingerprint("model-a", ["1", "2"], ["a", "c"], 10)
+    assert base != roster_fingerprint("model-a", ["1", "2"], ["a", "b"], 20)
+
+def test_checkpoint_round_trip(tmp_path):
+    """Test saving and reloading checkpointed shards"""
+    checkpoint = ReindexCheckpoint(str(tmp_path / "ckpt"), "abc")
+    assert checkpoint.load() == 0
+
+    checkpoint.save_shard(0, np.ones((2, 3), dtype=np.float32))
+    checkpoint.save_shard(1, np.zeros((1, 3), dtype=np.float32))
+
+    reloaded = ReindexCheckpoint(str(tmp_path / "ckpt"), "abc")
+    assert reloaded.load() == 2
+    assert reloaded.load_shard(0).shape == (2, 3)
+
+    # A checkpoint from a different run is discarded
+    stale = ReindexCheckpoint(str(tmp_path / "ckpt"), "other")
+    assert stale.load() == 0
+    assert not (tmp_path / "ckpt").exists()
+
+def test_reindex_resumes_from_checkpoint(tmp_path):
+    """Test that fully checkpointed shards are replayed in order without encoding"""
+    ids = ["1", "2", "3"]
+    texts = ["one", "two", "three"]
+    metadatas = [{"name": t} for t in texts]
+    checkpoint_dir = str(tmp_path / "ckpt")
+
+    checkpoint = ReindexCheckpoint(checkpoint_dir, roster_fingerprint("unused-model", ids, texts, 2))
+    checkpoint.save_shard(0, np.full((2, 4), 0.5, dtype=np.float32))
+    checkpoint.save_shard(1, np.full((1, 4), 0.25, dtype=np.float32))
+
+    collection = RecordingCollection()
+    written = reindex(collection, ids, texts, metadatas, model_name="unused-model",
+                      shard_size=2, checkpoint_dir=checkpoint_dir)
+
+    assert written == 3
+    assert [upsert[0] for upsert in collection.upserts] == [["1", "2"], ["3"]]
+    assert collection.upserts[1][1] == [[0.25] * 4]
+    # The checkpoint is removed once the run completes
+    assert not (tmp_path / "ckpt").exists()
+
+def test_reindex_empty_roster():
+    """Test that an empty roster is a no-op"""
+    collection = RecordingCollection()
+    assert reindex(collection, [], [], [], model_name="unused-model") == 0
+    assert collection.upserts == []
@@ -0,0 +1,193 @@
+import os
+import threading
+from datetime import datetime, time, timezone
+
+import pytest
+
+from app.utils.scheduler import JobStore, OutreachScheduler, SendWindow, region_timezone
+
+# Monday 2024-01-08 12:00 UTC
+MONDAY_NOON = datetime(2024, 1, 8, 12, tzinfo=timezone.utc).timestamp()
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(tmp_path, dispatch, clock, **options):
+    return OutreachScheduler(JobStore(str(tmp_path / "jobs.sqlite3")), dispatch, clock=clock, **options)
+
+
+def run_due(scheduler):
+    scheduler.tick()
+    assert scheduler.drain(timeout=5)
+
+
+def test_send_window_next_open():
+    """Test that send times move to the next opening of the window in the region's local time"""
+    window = SendWindow.parse("09:00-18:00", "0-4")
+    india = region_timezone("India")
+    # 12:00 UTC is 17:30 in India: inside the window
+    assert window.next_open(MONDAY_NOON, india) == MONDAY_NOON
+    # 13:00 UTC is 18:30 in India: next morning at 09:00 IST (03:30 UTC)
+    assert window.next_open(MONDAY_NOON + 3600, india) == datetime(2024, 1, 9, 3, 30, tzinfo=timezone.utc).timestamp()
+    # Friday evening rolls over the weekend
+    friday_evening = datetime(2024, 1, 12, 20, tzinfo=timezone.utc).timestamp()
+    assert datetime.fromtimestamp(window.next_open(friday_evening, region_timezone("UK")), timezone.utc) == datetime(2024, 1, 15, 9, tzinfo=timezone.utc)
+
+    with pytest.raises(ValueError):
+        SendWindow.parse("18:00-09:00")
+    with pytest.raises(ValueError):
+        SendWindow.parse("9-5")
+
+
+def test_scheduled_jobs_are_sent_once_in_their_window(tmp_path):
+    """Test that jobs wait for their region's window, are spaced out and are sent exactly once"""
+    clock = Clock(MONDAY_NOON)
+    sent = []
+    scheduler = make_scheduler(tmp_path, lambda job: sent.append(job.payload["to"]) or {"ok": True}, clock,
+                               windows={"voice": SendWindow(time(10), time(18))})
+    stored = scheduler.schedule("voice", [
+        {"payload": {"to": "uk-1"}, "region": "UK"},
+        {"payload": {"to": "uk-2"}, "region": "UK"},
+        {"payload": {"to": "in-1"}, "region": "India"},
+    ], spacing_seconds=1800)
+    assert [created for _, created in stored] == [True, True, True]
+    uk_first, uk_second, india = (job for job, _ in stored)
+    assert uk_first.run_at == MONDAY_NOON and uk_second.run_at == MONDAY_NOON + 1800
+    # Spacing is per region, and 17:30 is still inside India's window
+    assert india.run_at == MONDAY_NOON
+
+    run_due(scheduler)
+    assert sorted(sent) == ["in-1", "uk-1"]
+    clock.now += 1800
+    run_due(scheduler)
+    run_due(scheduler)
+    assert sorted(sent) == ["in-1", "uk-1", "uk-2"]
+    assert scheduler.store.counts()["sent"] == 3
+    assert scheduler.store.get(uk_first.id).result == {"ok": True}
+
+    # The same idempotency key is never scheduled twice
+    first = scheduler.schedule("voice", [{"payload": {"to": "x"}, "idempotency_key": "campaign-1:7"}])
+    again = scheduler.schedule("voice", [{"payload": {"to": "x"}, "idempotency_key": "campaign-1:7"}])
+    assert again[0][0].id == first[0][0].id and again[0][1] is False
+
+
+def test_failed_sends_are_retried_then_marked_failed(tmp_path):
+    """Test that a raising send is retried with backoff and gives up after max_attempts"""
+    clock = Clock(MONDAY_NOON)
+
+    def fail(job):
+        raise RuntimeError("provider down")
+
+    scheduler = make_scheduler(tmp_path, fail, clock, max_attempts=2, retry_seconds=60)
+    (job, _), = scheduler.schedule("email", [{"payload": {}}])
+    run_due(scheduler)
+    retried = scheduler.store.get(job.id)
+    assert retried.status == "pending" and retried.attempts == 1 and retried.run_at == MONDAY_NOON + 60
+    assert retried.error == "provider down"
+    clock.now += 60
+    run_due(scheduler)
+    assert scheduler.store.get(job.id).status == "failed"
+
+    assert scheduler.retry(job.id)
+    assert scheduler.store.get(job.id).status == "pending"
+
+
+def test_restart_does_not_resend(tmp_path):
+    """Test that a job interrupted mid-send isn't sent again by a restarted scheduler, and pending jobs are"""
+    clock = Clock(MONDAY_NOON)
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    first = OutreachScheduler(store, lambda job: {}, clock=clock, lease_seconds=60)
+    (interrupted, _), (waiting, _) = first.schedule("email", [{"payload": {"n": 1}}, {"payload": {"n": 2}, "not_before": MONDAY_NOON + 600}])
+    # The process dies after claiming the first job
+    assert store.claim(interrupted.id, clock.now, lease_seconds=60) is not None
+    store.close()
+
+    clock.now += 3600
+    sent = []
+    restarted = make_scheduler(tmp_path, lambda job: sent.append(job.payload["n"]), clock, lease_seconds=60)
+    run_due(restarted)
+    assert sent == [2]
+    assert restarted.store.get(interrupted.id).status == "interrupted"
+
+
+def test_channel_limit_caps_concurrent_sends(tmp_path):
+    """Test that no more than the channel's limit of sends run at once"""
+    clock = Clock(MONDAY_NOON)
+    release = threading.Event()
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def slow(job):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        release.wait(5)
+        with lock:
+            running[0] -= 1
+
+    scheduler = make_scheduler(tmp_path, slow, clock, max_concurrent=4, channel_limits={"voice": 2})
+    scheduler.schedule("voice", [{"payload": {"n": n}} for n in range(6)])
+    scheduler.start()
+    try:
+        for _ in range(100):
+            if running[0] == 2:
+                break
+            threading.Event().wait(0.01)
+        threading.Event().wait(0.05)
+        assert scheduler.status()["in_flight"] == {"voice": 2}
+        release.set()
+        for _ in range(100):
+            if scheduler.store.counts()["sent"] == 6:
+                break
+            threading.Event().wait(0.05)
+        assert scheduler.store.counts()["sent"] == 6
+        assert peak[0] == 2
+    finally:
+        scheduler.stop(timeout=5)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_forked_process_runs_its_own_scheduler(tmp_path):
+    """Test that a process forked from one with a running scheduler opens its own database and dispatcher
+
+    The parent reads the database only every minute, so the job scheduled in the child is sent by the child.
+    """
+    clock = Clock(MONDAY_NOON)
+    sent = []
+    store = JobStore(str(tmp_path / "data" / "jobs.sqlite3"))
+    scheduler = OutreachScheduler(store, lambda job: sent.append(job.payload["n"]) or {}, clock=clock, poll_seconds=60)
+    scheduler.schedule("email", [{"payload": {"n": 1}}])
+    scheduler.start()
+    try:
+        for _ in range(100):
+            if store.counts().get("sent") == 1:
+                break
+            threading.Event().wait(0.01)
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                scheduler.start()
+                scheduler.schedule("email", [{"payload": {"n": 2}}])
+                for _ in range(100):
+                    if sent == [1, 2]:
+                        status = 0
+                        break
+                    threading.Event().wait(0.05)
+            finally:
+                os._exit(status)
+        _, exit_status = os.waitpid(pid, 0)
+        assert os.WIFEXITED(exit_status) and os.WEXITSTATUS(exit_status) == 0
+        for _ in range(100):
+            if store.counts().get("sent") == 2:
+                break
+            threading.Event().wait(0.05)
+        assert store.counts()["sent"] == 2
+    finally:
+        scheduler.stop(timeout=5)
@@ -0,0 +1,50 @@
+import time
+from app.utils.search_cache import SearchCache, etag_matches
+
+def test_key_normalizes_query_but_not_filters():
+    """Test that trivially different queries share a cache key and filter values are kept verbatim"""
+    cache = SearchCache()
+    first = cache.make_key("  Fashion   Influencers ", {"region": "India", "category": None}, 2, "v1:0")
+    second = cache.make_key("fashion influencers", {"region": "India"}, 2, "v1:0")
+    assert first == second
+    assert first != cache.make_key("fashion influencers", {"region": "india"}, 2, "v1:0")
+    assert first != cache.make_key("fashion influencers", {"region": "India"}, 3, "v1:0")
+    assert first != cache.make_key("fashion influencers", {"region": "India"}, 2, "v2:0")
+
+def test_get_put_and_invalidate():
+    """Test cache hits, misses and invalidation"""
+    cache = SearchCache()
+    key = cache.make_key("tech", {}, 2, "v1:0")
+    assert cache.get(key) is None
+
+    entry = cache.put(key, b"[]")
+    assert cache.get(key).body == b"[]"
+    assert entry.etag.startswith('"') and entry.etag.endswith('"')
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.invalidate()
+    assert cache.get(key) is None
+
+def test_lru_eviction_and_ttl():
+    """Test that the least recently used and expired entries are dropped"""
+    cache = SearchCache(max_entries=2, ttl_seconds=60)
+    keys = [cache.make_key(q, {}, 2, "v1:0") for q in ("a", "b", "c")]
+    cache.put(keys[0], b"a")
+    cache.put(keys[1], b"b")
+    cache.get(keys[0])
+    cache.put(keys[2], b"c")
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+
+    expiring = SearchCache(ttl_seconds=0)
+    expiring.put(keys[0], b"a")
+    time.sleep(0.01)
+    assert expiring.get(keys[0]) is None
+
+def test_etag_matches():
+    """Test If-None-Match parsing"""
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert not etag_matches('"x"', '"abc"')
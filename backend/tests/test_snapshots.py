@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from app.utils.snapshots import Snapshot, SnapshotError, write_snapshot
+
+
+def make_snapshot(path, count=300, dimension=16, dtype="float16", batch=64):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(count, dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [str(i) for i in range(count)]
+    records = [{"id": i, "name": f"Creator {i}", "platforms": ["Instagram"], **({"description": "x"} if i % 2 else {})}
+               for i in range(count)]
+    chunks = write_snapshot(ids, records, (vectors[start:start + batch] for start in range(0, count, batch)),
+                            dimension, {"model_name": "test-model", "template_hash": "abc"}, dtype=dtype)
+    with open(path, "wb") as snapshot_file:
+        for chunk in chunks:
+            snapshot_file.write(chunk)
+    return vectors, records
+
+
+@pytest.mark.parametrize("dtype,tolerance", [("float32", 0), ("float16", 1e-3), ("int8", 1e-2)])
+def test_snapshot_round_trip(tmp_path, dtype, tolerance):
+    """Test that a streamed snapshot maps back to the same IDs, records and (quantized) embeddings"""
+    path = str(tmp_path / "index.snapshot")
+    vectors, records = make_snapshot(path, dtype=dtype)
+    snapshot = Snapshot.open(path)
+    assert snapshot.model_name == "test-model" and snapshot.template_hash == "abc" and len(snapshot) == 300
+    assert isinstance(snapshot.embeddings, np.memmap) and snapshot.embeddings.dtype == np.dtype(dtype)
+    assert snapshot.records()[1] == records[1] and snapshot.records()[0]["description"] is None
+    assert np.abs(snapshot.vectors(slice(0, 300)) - vectors).max() <= tolerance
+    rows = np.array([299, 3, 150])
+    assert np.allclose(snapshot.vectors(rows), snapshot.vectors(slice(0, 300))[rows])
+    snapshot.close()
+
+
+def test_snapshot_rejects_damaged_files(tmp_path):
+    """Test that corrupt, truncated and foreign files are refused"""
+    path = tmp_path / "index.snapshot"
+    make_snapshot(str(path))
+    data = bytearray(path.read_bytes())
+
+    # Flip a byte of the embedding matrix
+    data[-100] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError, match="checksum"):
+        Snapshot.open(str(path))
+    # Without verification the damage goes unnoticed
+    assert len(Snapshot.open(str(path), verify=False)) == 300
+
+    path.write_bytes(bytes(data[:len(data) // 2]))
+    with pytest.raises(SnapshotError):
+        Snapshot.open(str(path), verify=False)
+    path.write_bytes(b"not a snapshot at all")
+    with pytest.raises(SnapshotError, match="not an index snapshot"):
+        Snapshot.open(str(path))
@@ -0,0 +1,83 @@
+import random
+
+from app.utils.suggest import SuggestIndex, edit_distance
+from benchmarks.roster import generate_roster
+
+ROSTER = [
+    {"id": 1, "name": "Priya Sharma", "category": "fashion", "region": "India", "platforms": ["Instagram", "YouTube"], "followers": 1200000},
+    {"id": 2, "name": "Priya Nair", "category": "food", "region": "India", "platforms": ["Instagram"], "followers": 300000},
+    {"id": 3, "name": "Raj Patel", "category": "tech", "region": "India", "platforms": ["YouTube", "Twitter"], "followers": 2000000},
+    {"id": 4, "name": "Emma Wilson", "category": "beauty", "region": "UK", "platforms": ["Instagram", "Blog"], "followers": 1500000},
+]
+
+
+def texts(suggestions):
+    return [suggestion["text"] for suggestion in suggestions]
+
+
+def test_prefix_suggestions_are_ranked_by_followers():
+    """Test that any word of a suggestion can be completed and bigger creators come first"""
+    index = SuggestIndex(ROSTER)
+    assert texts(index.suggest("pri")) == ["Priya Sharma", "Priya Nair"]
+    assert texts(index.suggest("sha")) == ["Priya Sharma"]
+    assert texts(index.suggest("priya n")) == ["Priya Nair"]
+    # Categories, regions and platforms are ranked by the followers of all their creators
+    assert index.suggest("in")[0] == {"text": "India", "type": "region", "match": "prefix", "count": 3}
+    assert index.suggest("raj", kinds={"name"}) == [{"text": "Raj Patel", "type": "name", "match": "prefix", "id": 3, "followers": 2000000}]
+    assert index.suggest("") == []
+
+
+def test_typos_fall_back_to_fuzzy_matches():
+    """Test that misspelt words still find suggestions, marked as fuzzy"""
+    index = SuggestIndex(ROSTER)
+    assert index.suggest("prya")[0]["match"] == "fuzzy"
+    assert set(texts(index.suggest("prya"))) == {"Priya Sharma", "Priya Nair"}
+    assert texts(index.suggest("instagarm")) == ["Instagram"]
+    assert texts(index.suggest("priya shrma")) == ["Priya Sharma"]
+    assert index.suggest("zzzz") == []
+
+
+def test_upserts_and_deletes_update_suggestions():
+    """Test that changed, added and deleted records are reflected immediately"""
+    index = SuggestIndex(ROSTER)
+    index.upsert([{**ROSTER[1], "followers": 5000000}])
+    assert texts(index.suggest("pri")) == ["Priya Nair", "Priya Sharma"]
+
+    index.upsert([{**ROSTER[3], "category": "travel"}])
+    assert texts(index.suggest("bea")) == []
+    assert texts(index.suggest("trav")) == ["travel"]
+
+    index.delete([3])
+    assert texts(index.suggest("raj")) == []
+    assert texts(index.suggest("twit")) == []
+
+
+def test_incremental_updates_match_a_fresh_build():
+    """Test that a long run of upserts and deletes leaves the same suggestions as building from scratch"""
+    rng = random.Random(3)
+    roster = generate_roster(1500, seed=3)
+    live = {record["id"]: record for record in roster[:50]}
+    index = SuggestIndex(live.values(), top_per_node=6)
+    for record in roster[50:]:
+        index.upsert([record])
+        live[record["id"]] = record
+        if rng.random() < 0.3:
+            record_id = rng.choice(list(live))
+            index.delete([record_id])
+            del live[record_id]
+        if rng.random() < 0.3:
+            record_id = rng.choice(list(live))
+            live[record_id] = {**live[record_id], "followers": rng.randint(1000, 5000000)}
+            index.upsert([live[record_id]])
+
+    fresh = SuggestIndex(live.values(), top_per_node=6)
+    for prefix in ("a", "p", "pr", "s", "t", "fo", "in", "y", "ma"):
+        assert index.suggest(prefix, limit=6) == fresh.suggest(prefix, limit=6)
+
+
+def test_edit_distance():
+    """Test the bounded edit distance used for typo tolerance"""
+    assert edit_distance("priya", "priya", 2) == 0
+    assert edit_distance("prya", "priya", 2) == 1
+    assert edit_distance("pirya", "priya", 2) == 1  # transposition
+    assert edit_distance("abcdef", "uvwxyz", 2) == 3
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import pytest
+from app.utils import tracing
+from app.utils.tracing import TracingMiddleware, span, start_trace, server_timing
+from app.utils.profiling import ProfileCapture
+
+def test_span_is_noop_outside_trace():
+    """Test that spans cost nothing when the request isn't traced"""
+    with span("encode") as current:
+        assert current is None
+
+def test_spans_nest_under_trace():
+    """Test building a span tree"""
+    with start_trace("request") as root:
+        with span("encode", records=3):
+            pass
+        with span("vector_query"):
+            with span("provider:chroma"):
+                pass
+
+    tree = root.to_dict()
+    assert [child["name"] for child in tree["children"]] == ["encode", "vector_query"]
+    assert tree["children"][0]["attributes"] == {"records": 3}
+    assert tree["children"][1]["children"][0]["name"] == "provider:chroma"
+    assert tree["duration_ms"] >= tree["children"][1]["duration_ms"]
+
+    header = server_timing(root)
+    assert header.startswith("encode;dur=")
+    assert "provider-chroma;dur=" in header
+
+def test_middleware_traces_only_sampled_or_requested(monkeypatch, caplog):
+    """Test that unsampled requests aren't traced, and only traced slow requests are logged"""
+    seen = []
+
+    async def app(scope, receive, send):
+        with span("handler") as current:
+            seen.append(current)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def request(headers=()):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/influencers/search", "headers": list(headers)}
+        await TracingMiddleware(app)(scope, None, send)
+        return dict(messages[0]["headers"])
+
+    monkeypatch.setattr(tracing, "SLOW_REQUEST_THRESHOLD_MS", 0.0001)
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0.0)
+    with caplog.at_level(logging.INFO):
+        assert b"server-timing" not in asyncio.run(request())
+        assert seen[-1] is None and not caplog.records
+
+        assert b"server-timing" in asyncio.run(request([(b"x-trace", b"1")]))
+        assert seen[-1] is not None
+        assert [record.name for record in caplog.records] == ["app.slow_requests"]
+
+        caplog.clear()
+        monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+        assert b"server-timing" not in asyncio.run(request())
+        assert seen[-1] is not None
+        assert [record.name for record in caplog.records] == ["app.slow_requests"]
+
+def test_profile_capture_arming():
+    """Test arming, path filtering and validation of the profiler"""
+    capture = ProfileCapture()
+    with pytest.raises(ValueError):
+        capture.arm(1, mode="perf")
+
+    capture.arm(1, path_prefix="/influencers")
+    assert capture._claim("/outreach/email") is None
+    assert capture._claim("/influencers/search") == "cprofile"
+    # Only one request is profiled at a time and the budget is spent
+    assert capture._claim("/influencers/search") is None
+    capture._release("GET", "/influencers/search", "cprofile", "report")
+    assert capture._claim("/influencers/search") is None
+    assert capture.list_results()[0]["report"] == "report"